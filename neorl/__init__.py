@@ -14,17 +14,10 @@
 
 # Copyright (c) 2021, NEORL authors.
 # Licensed under the MIT license
-import warnings, os
+import warnings, os, sys, importlib, multiprocessing
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", message=r"Passing", category=FutureWarning)
 
-import tensorflow as tf
-from tensorflow.python.util import deprecation
-tf.compat.v1.logging.set_verbosity(tf.compat.v1.logging.ERROR)
-if type(tf.contrib) != type(tf): tf.contrib._warning = None
-os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
-deprecation._PRINT_DEPRECATION_WARNINGS = False
-
 logo="""
 
 \t    NEORL: NeuroEvolution Optimisation with Reinforcement Learning
@@ -39,50 +32,103 @@ Copyright © 2021 Exelon Corporation (https://www.exeloncorp.com/) in collaborat
                              All Rights Reserved
 
                        \n"""
-                       
 
-try:                    
-    print(logo)
-except:
-    print(logo.encode('utf-8'))
-    #print(logo.encode('ascii', 'ignore').decode('ascii'))
-import os
+#the logo is printed once by the main process, the worker processes of joblib/multiprocessing 
+#pools import neorl again without printing it. Set the environment variable NEORL_NO_LOGO=1 to silence it
+if multiprocessing.current_process().name == 'MainProcess' and os.environ.get('NEORL_NO_LOGO', '0').lower() in ['0', 'false', '']:
+    try:                    
+        print(logo)
+    except:
+        print(logo.encode('utf-8'))
+        #print(logo.encode('ascii', 'ignore').decode('ascii'))
+
+#--------------------------------------------------------------------
+#The public classes are imported lazily (PEP 562) the first time they are 
+#accessed, e.g. ``from neorl import DE`` only loads neorl.evolu.de, so 
+#TensorFlow, gym, and neat are only loaded when a class that needs them is used
+#--------------------------------------------------------------------
+_lazy_imports={
+    #reinforcement learning
+    'A2C': 'neorl.rl.baselines.a2c',
+    'ACER': 'neorl.rl.baselines.acer',
+    'DQN': 'neorl.rl.baselines.deepq',
+    'PPO2': 'neorl.rl.baselines.ppo2',
+    'ACKTR': 'neorl.rl.baselines.acktr',
+    'MlpPolicy': 'neorl.rl.baselines.shared.policies',
+    'DQNPolicy': ('neorl.rl.baselines.deepq.policies', 'MlpPolicy'),
+    'RLLogger': 'neorl.utils.neorlcalls',
+    'CreateEnvironment': 'neorl.rl.make_env',
+    #evolutionary and swarm optimizers
+    'PSO': 'neorl.evolu.pso',
+    'SA': 'neorl.evolu.sa',
+    'BAT': 'neorl.evolu.bat',
+    'DE': 'neorl.evolu.de',
+    'XNES': 'neorl.evolu.xnes',
+    'ES': 'neorl.evolu.es',
+    'GWO': 'neorl.evolu.gwo',
+    'SSA': 'neorl.evolu.ssa',
+    'WOA': 'neorl.evolu.woa',
+    'JAYA': 'neorl.evolu.jaya',
+    'MFO': 'neorl.evolu.mfo',
+    'HHO': 'neorl.evolu.hho',
+    'ACO': 'neorl.evolu.aco',
+    'CS': 'neorl.evolu.cs',
+    'TS': 'neorl.evolu.ts',
+    'HCLPSO': 'neorl.evolu.hclpso',
+    'Evaluator': 'neorl.utils.evaluator',
+    #hybrid and multi-objective algorithms
+    'PESA': 'neorl.hybrid.pesa',
+    'PESA2': 'neorl.hybrid.pesa2',
+    'RNEAT': 'neorl.hybrid.rneat',
+    'FNEAT': 'neorl.hybrid.fneat',
+    'PPOES': 'neorl.hybrid.ppoes',
+    'ACKDE': 'neorl.hybrid.ackde',
+    'NGA': 'neorl.hybrid.nga',
+    'NHHO': 'neorl.hybrid.nhho',
+    'AEO': 'neorl.hybrid.aeo',
+    'EDEV': 'neorl.hybrid.edev',
+    'EPSO': 'neorl.hybrid.epso',
+    'NSGAII': 'neorl.multi.nsgaII',
+    'NSGAIII': 'neorl.multi.nsgaIII',
+    }
+
+#classes that load TensorFlow, which is configured before they are imported
+_tf_names=['A2C', 'ACER', 'DQN', 'PPO2', 'ACKTR', 'MlpPolicy', 'DQNPolicy', 'RLLogger', 
+           'CreateEnvironment', 'RNEAT', 'FNEAT', 'PPOES', 'ACKDE', 'NGA', 'NHHO']
+
+__all__=list(_lazy_imports)
+
+def _configure_tensorflow():
+    #silence the logging and deprecation warnings of TensorFlow
+    os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+    import tensorflow as tf
+    from tensorflow.python.util import deprecation
+    tf.compat.v1.logging.set_verbosity(tf.compat.v1.logging.ERROR)
+    if type(tf.contrib) != type(tf): tf.contrib._warning = None
+    deprecation._PRINT_DEPRECATION_WARNINGS = False
+
+def __getattr__(name):
+    if name not in _lazy_imports:
+        raise AttributeError("module 'neorl' has no attribute '{}'".format(name))
+    
+    if name in _tf_names:
+        _configure_tensorflow()
+    
+    module, attr = _lazy_imports[name], name
+    if isinstance(module, tuple):
+        module, attr = module
+    value=getattr(importlib.import_module(module), attr)
+    globals()[name]=value   #cache the class, so it is resolved only once
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
 
-from neorl.rl.baselines.a2c import A2C
-from neorl.rl.baselines.acer import ACER
-from neorl.rl.baselines.deepq import DQN
-from neorl.rl.baselines.ppo2 import PPO2
-from neorl.rl.baselines.acktr import ACKTR
-from neorl.evolu.pso import PSO
-from neorl.evolu.sa import SA
-from neorl.evolu.bat import BAT
-from neorl.evolu.de import DE
-from neorl.evolu.xnes import XNES
-from neorl.evolu.es import ES
-from neorl.evolu.gwo import GWO
-from neorl.evolu.ssa import SSA
-from neorl.evolu.woa import WOA
-from neorl.evolu.jaya import JAYA
-from neorl.evolu.mfo import MFO
-from neorl.evolu.hho import HHO
-from neorl.hybrid.pesa import PESA
-from neorl.hybrid.pesa2 import PESA2
-from neorl.rl.baselines.shared.policies import MlpPolicy
-from neorl.rl.baselines.deepq.policies import MlpPolicy as DQNPolicy
-from neorl.utils.neorlcalls import RLLogger
-from neorl.rl.make_env import CreateEnvironment
-from neorl.hybrid.rneat import RNEAT
-from neorl.hybrid.fneat import FNEAT
-from neorl.hybrid.ppoes import PPOES
-from neorl.hybrid.ackde import ACKDE
-from neorl.evolu.aco import ACO
-from neorl.evolu.cs import CS
-from neorl.hybrid.nga import NGA
-from neorl.hybrid.nhho import NHHO
-from neorl.evolu.ts import TS
-from neorl.hybrid.aeo import AEO
-from neorl.evolu.hclpso import HCLPSO
-from neorl.hybrid.edev import EDEV
-from neorl.hybrid.epso import EPSO
-from neorl.multi.nsgaII import NSGAII
-from neorl.multi.nsgaIII import NSGAIII
\ No newline at end of file
+if sys.version_info < (3, 7):
+    #module __getattr__ (PEP 562) is ignored before python 3.7, so the classes are imported eagerly, 
+    #except those whose dependencies are not installed
+    for _name in _lazy_imports:
+        try:
+            __getattr__(_name)
+        except ImportError:
+            pass
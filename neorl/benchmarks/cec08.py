@@ -24,11 +24,12 @@
 # https://github.com/thieunguyen5991  
 #--------------------------------------------------------
 
-from pandas import read_csv
-from numpy import sum, max, abs, cos, pi, sqrt, exp, e
+from numpy import sum, max, abs, cos, pi, sqrt, exp, e, prod, arange, asarray, ones, array
 from numpy.random import seed, choice, uniform
 import os 
 
+#shift vectors of all functions (column name --> array), the csv file is read once per process
+_shift_data = {}
 
 class Root:
     def __init__(self, f_name=None, f_shift_data_file=None, f_bias=None):
@@ -38,8 +39,31 @@ class Root:
         self.support_path_data=os.path.join(os.path.dirname(__file__), 'tools/data08.csv')
         
     def load_shift_data(self):
-        data = read_csv(self.support_path_data, usecols=[self.f_shift_data_file])
-        return data.values.reshape(-1)
+        if not _shift_data:
+            from pandas import read_csv
+            data = read_csv(self.support_path_data)
+            for col in data.columns:
+                values = data[col].values.reshape(-1)
+                values.flags.writeable = False   #shared by all instances
+                _shift_data[col] = values
+        return _shift_data[self.f_shift_data_file]
+
+    def fit_batch(self, X):
+        """
+        Evaluates a population at once
+
+        :param X: (2D array) population of shape (npop, d)
+        :return: (1D array) fitness of every individual
+        """
+        return array([self.fit(x) for x in X])
+
+    def _check_batch(self, X):
+        #returns the population as an array and its shifted values, or None if the size is not supported
+        X = asarray(X, dtype=float)
+        if X.shape[1] > 1000:
+            print("CEC 2008 not support for problem size > 1000")
+            return X, None
+        return X, X - self.load_shift_data()[:X.shape[1]]
 
 
 class F1(Root):
@@ -53,6 +77,12 @@ class F1(Root):
             return 1
         shift_data = self.load_shift_data()[:problem_size]
         return sum((solution - shift_data)**2) + self.f_bias
+
+    def fit_batch(self, X):
+        X, z = self._check_batch(X)
+        if z is None:
+            return ones(X.shape[0])
+        return sum(z**2, axis=1) + self.f_bias
     
     def return_global(self, nx):
         
@@ -77,6 +107,12 @@ class F2(Root):
 
         return max(abs(solution - shift_data)) + self.f_bias
 
+    def fit_batch(self, X):
+        X, z = self._check_batch(X)
+        if z is None:
+            return ones(X.shape[0])
+        return max(abs(z), axis=1) + self.f_bias
+
     def return_global(self, nx):
         
         xmin = self.load_shift_data()[:nx]
@@ -101,6 +137,13 @@ class F3(Root):
             result += 100*(z[i]**2 - z[i+1])**2 + (z[i] - 1)**2
         return result + self.f_bias
 
+    def fit_batch(self, X):
+        X, z = self._check_batch(X)
+        if z is None:
+            return ones(X.shape[0])
+        z = z + 1
+        return sum(100*(z[:, :-1]**2 - z[:, 1:])**2 + (z[:, :-1] - 1)**2, axis=1) + self.f_bias
+
     def return_global(self, nx):
         
         xmin = self.load_shift_data()[:nx]
@@ -121,6 +164,12 @@ class F4(Root):
         z = solution - shift_data
         return sum(z**2 - 10*cos(2*pi*z) + 10) + self.f_bias
 
+    def fit_batch(self, X):
+        X, z = self._check_batch(X)
+        if z is None:
+            return ones(X.shape[0])
+        return sum(z**2 - 10*cos(2*pi*z) + 10, axis=1) + self.f_bias
+
     def return_global(self, nx):
         
         xmin = self.load_shift_data()[:nx]
@@ -145,6 +194,14 @@ class F5(Root):
             temp *= cos(z[i] / sqrt(i+1))
         return result - temp + 1 + self.f_bias
 
+    def fit_batch(self, X):
+        X, z = self._check_batch(X)
+        if z is None:
+            return ones(X.shape[0])
+        result = sum(z**2/4000, axis=1)
+        temp = prod(cos(z / sqrt(arange(1, X.shape[1]+1))), axis=1)
+        return result - temp + 1 + self.f_bias
+
     def return_global(self, nx):
         
         xmin = self.load_shift_data()[:nx]
@@ -164,6 +221,13 @@ class F6(Root):
         shift_data = self.load_shift_data()[:problem_size]
         z = solution - shift_data
         return -20*exp(-0.2*sqrt(sum(z**2)/problem_size)) - exp(sum(cos(2*pi*z))/problem_size) + 20 + e + self.f_bias
+
+    def fit_batch(self, X):
+        X, z = self._check_batch(X)
+        if z is None:
+            return ones(X.shape[0])
+        problem_size = X.shape[1]
+        return -20*exp(-0.2*sqrt(sum(z**2, axis=1)/problem_size)) - exp(sum(cos(2*pi*z), axis=1)/problem_size) + 20 + e + self.f_bias
     
     def return_global(self, nx):
         
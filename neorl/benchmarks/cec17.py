@@ -19,23 +19,34 @@ from neorl.benchmarks.tools import transforms
 
 import numpy as np
 
+# Every function takes either one input vector of shape (d,) and returns a float, or a
+# population of shape (npop, d) and returns an array of shape (npop,), so the
+# functions can be used directly as a vectorized fitness (e.g. DE(..., vectorized=True)).
+# The rotation of a population is done with a single matrix product.
+
+def _rotate(x, rotation):
+    #rotates a vector or every row of a population
+    return np.matmul(x, np.transpose(rotation))
+
 def f1(x, rotation=None, shift=None):
     """
     Shifted and Rotated Bent Cigar Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][0]
     if shift is None:
-        shift = transforms.shifts[0][:nx]
-    x_transformed = np.matmul(rotation, x - shift)
+        shift = transforms.get_shifts()[0][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.bent_cigar(x_transformed) + 100.0
 
 def f2(x, rotation=None, shift=None):
@@ -43,7 +54,8 @@ def f2(x, rotation=None, shift=None):
     (Deprecated) Shifted and Rotated Sum of Different Power Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -53,12 +65,13 @@ def f2(x, rotation=None, shift=None):
     #    f2.warned = True
     #    print('WARNING: f2 has been deprecated from the CEC 2017 benchmark suite')
 
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][1]
     if shift is None:
-        shift = transforms.shifts[1][:nx]
-    x_transformed = np.matmul(rotation, x - shift)
+        shift = transforms.get_shifts()[1][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.sum_diff_pow(x_transformed) + 200.0
 
 def f3(x, rotation=None, shift=None):
@@ -66,18 +79,20 @@ def f3(x, rotation=None, shift=None):
     Shifted and Rotated Zakharov Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][2]
     if shift is None:
-        shift = transforms.shifts[2][:nx]
-    x_transformed = np.matmul(rotation, x - shift)
+        shift = transforms.get_shifts()[2][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.zakharov(x_transformed) + 300.0
 
 def f4(x, rotation=None, shift=None):
@@ -85,18 +100,20 @@ def f4(x, rotation=None, shift=None):
     Shifted and Rotated Rosenbrock’s Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][3]
     if shift is None:
-        shift = transforms.shifts[3][:nx]
-    x_transformed = np.matmul(rotation, (x - shift))
+        shift = transforms.get_shifts()[3][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.rosenbrock(x_transformed) + 400.0
 
 def f5(x, rotation=None, shift=None):
@@ -104,18 +121,20 @@ def f5(x, rotation=None, shift=None):
     Shifted and Rotated Rastrigin's Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][4]
     if shift is None:
-        shift = transforms.shifts[4][:nx]
-    x_transformed = np.matmul(rotation, (x - shift))
+        shift = transforms.get_shifts()[4][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.rastrigin(x_transformed) + 500.0
 
 def f6(x, rotation=None, shift=None):
@@ -123,18 +142,20 @@ def f6(x, rotation=None, shift=None):
     Shifted and Rotated Schaffer’s F7 Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][5]
     if shift is None:
-        shift = transforms.shifts[5][:nx]
-    x_transformed = np.matmul(rotation, (x - shift))
+        shift = transforms.get_shifts()[5][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.schaffers_f7(x_transformed) + 600.0
 
 def f7(x, rotation=None, shift=None):
@@ -142,17 +163,19 @@ def f7(x, rotation=None, shift=None):
     Shifted and Rotated Lunacek Bi-Rastrigin’s Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][6]
     if shift is None:
-        shift = transforms.shifts[6][:nx]
+        shift = transforms.get_shifts()[6][:nx]
     # pass the shift and rotation directly to the function
     return basic.lunacek_bi_rastrigin(x, shift, rotation) + 700.0
 
@@ -161,17 +184,19 @@ def f8(x, rotation=None, shift=None):
     Shifted and Rotated Non-Continuous Rastrigin’s Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][7]
     if shift is None:
-        shift = transforms.shifts[7][:nx]
+        shift = transforms.get_shifts()[7][:nx]
     # pass the shift and rotation directly to the function
     return basic.non_cont_rastrigin(x, shift, rotation) + 800.0
 
@@ -180,18 +205,20 @@ def f9(x, rotation=None, shift=None):
     Shifted and Rotated Levy Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][8]
     if shift is None:
-        shift = transforms.shifts[8][:nx]
-    x_transformed = np.matmul(rotation, (x - shift))
+        shift = transforms.get_shifts()[8][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.levy(x_transformed) + 900.0
 
 def f10(x, rotation=None, shift=None):
@@ -199,18 +226,20 @@ def f10(x, rotation=None, shift=None):
     Shifted and Rotated Schwefel’s Function
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
             vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][9]
     if shift is None:
-        shift = transforms.shifts[9][:nx]
-    x_transformed = np.matmul(rotation, (x - shift))
+        shift = transforms.get_shifts()[9][:nx]
+    x_transformed = _rotate(x - shift, rotation)
     return basic.modified_schwefel(x_transformed) + 1000.0
 
 def _shuffle_and_partition(x, shuffle, partitions):
@@ -219,26 +248,24 @@ def _shuffle_and_partition(x, shuffle, partitions):
     the percentages.
 
     Args:
-        x (array): Input vector.
+        x (array): Input vector or population.
         shuffle (array): Shuffle vector.
         partitions (list): List of percentages. Assumed to add up to 1.0.
 
     Returns:
         (list of arrays): The partitions of x after shuffling.
     """
-    nx = len(x)
+    nx = x.shape[-1]
     # shuffle
-    xs = np.zeros(x.shape)
-    for i in range(0, nx):
-        xs[i] = x[shuffle[i]]
+    xs = x[..., shuffle]
     # and partition
     parts = []
     start, end = 0, 0
     for p in partitions[:-1]:
         end = start + int(np.ceil(p * nx))
-        parts.append(xs[start:end])
+        parts.append(xs[..., start:end])
         start = end
-    parts.append(xs[end:])
+    parts.append(xs[..., end:])
     return parts
 
 def f11(x, rotation=None, shift=None, shuffle=None):
@@ -246,7 +273,8 @@ def f11(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 1 (N=3)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -254,15 +282,16 @@ def f11(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][10]
     if shift is None:
-        shift = transforms.shifts[10][:nx]
+        shift = transforms.get_shifts()[10][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][0]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.2, 0.4, 0.4])
 
     y = basic.zakharov(x_parts[0])
@@ -275,7 +304,8 @@ def f12(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 2 (N=3)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -283,15 +313,16 @@ def f12(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][11]
     if shift is None:
-        shift = transforms.shifts[11][:nx]
+        shift = transforms.get_shifts()[11][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][1]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.3, 0.3, 0.4])
 
     y = basic.high_conditioned_elliptic(x_parts[0])
@@ -304,7 +335,8 @@ def f13(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 3 (N=3)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -312,15 +344,16 @@ def f13(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][12]
     if shift is None:
-        shift = transforms.shifts[12][:nx]
+        shift = transforms.get_shifts()[12][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][2]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.3, 0.3, 0.4])
 
     y = basic.bent_cigar(x_parts[0])
@@ -333,7 +366,8 @@ def f14(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 4 (N=4)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -341,15 +375,16 @@ def f14(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][13]
     if shift is None:
-        shift = transforms.shifts[13][:nx]
+        shift = transforms.get_shifts()[13][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][3]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.2, 0.2, 0.2, 0.4])
 
     y = basic.high_conditioned_elliptic(x_parts[0])
@@ -363,7 +398,8 @@ def f15(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 5 (N=4)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -371,15 +407,16 @@ def f15(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][14]
     if shift is None:
-        shift = transforms.shifts[14][:nx]
+        shift = transforms.get_shifts()[14][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][4]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.2, 0.2, 0.3, 0.3])
 
     y = basic.bent_cigar(x_parts[0])
@@ -393,7 +430,8 @@ def f16(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 6 (N=4)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -401,15 +439,16 @@ def f16(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][15]
     if shift is None:
-        shift = transforms.shifts[15][:nx]
+        shift = transforms.get_shifts()[15][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][5]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.2, 0.2, 0.3, 0.3])
 
     y = basic.expanded_schaffers_f6(x_parts[0])
@@ -423,7 +462,8 @@ def f17(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 7 (N=5)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -431,15 +471,16 @@ def f17(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][16]
     if shift is None:
-        shift = transforms.shifts[16][:nx]
+        shift = transforms.get_shifts()[16][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][6]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.1, 0.2, 0.2, 0.2, 0.3])
 
     y = basic.katsuura(x_parts[0])
@@ -454,7 +495,8 @@ def f18(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 8 (N=5)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -462,15 +504,16 @@ def f18(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][17]
     if shift is None:
-        shift = transforms.shifts[17][:nx]
+        shift = transforms.get_shifts()[17][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][7]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.2, 0.2, 0.2, 0.2, 0.2])
 
     y = basic.high_conditioned_elliptic(x_parts[0])
@@ -485,7 +528,8 @@ def f19(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 9 (N=5)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -493,15 +537,16 @@ def f19(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][18]
     if shift is None:
-        shift = transforms.shifts[18][:nx]
+        shift = transforms.get_shifts()[18][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][8]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.2, 0.2, 0.2, 0.2, 0.2])
 
     y = basic.bent_cigar(x_parts[0])
@@ -516,7 +561,8 @@ def f20(x, rotation=None, shift=None, shuffle=None):
     Hybrid Function 10 (N=6)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotation (matrix): Optional rotation matrix. If None (default), the
             official matrix from the benchmark suite will be used.
         shift (array): Optional shift vector. If None (default), the official
@@ -524,15 +570,16 @@ def f20(x, rotation=None, shift=None, shuffle=None):
         shuffle (array): Optionbal shuffle vector. If None (default), the
             official permutation vector from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotation is None:
         rotation = transforms.rotations[nx][19]
     if shift is None:
-        shift = transforms.shifts[19][:nx]
+        shift = transforms.get_shifts()[19][:nx]
     if shuffle is None:
         shuffle = transforms.shuffles[nx][9]
 
-    x_transformed = np.matmul(rotation, x - shift)
+    x_transformed = _rotate(x - shift, rotation)
     x_parts = _shuffle_and_partition(x_transformed, shuffle, [0.1, 0.1, 0.2, 0.2, 0.2, 0.2])
 
     y = basic.happy_cat(x_parts[0])
@@ -544,228 +591,203 @@ def f20(x, rotation=None, shift=None, shuffle=None):
     return y + 2000.0
 
 def _calc_w(x, sigma):
-    nx = len(x)
-    w = 0
-    for i in range(0, nx):
-        w += x[i]*x[i]
-    if (w != 0):
-        w = ((1.0/w)**0.5) * np.exp(-w / (2.0*nx*sigma*sigma))
-    else:
-        w = float('inf')
-    return w
+    nx = x.shape[-1]
+    w = np.sum(x*x, axis=-1)
+    nz = w != 0
+    w_nz = np.where(nz, w, 1.0)
+    return np.where(nz, ((1.0/w_nz)**0.5) * np.exp(-w / (2.0*nx*sigma*sigma)), float('inf'))
+
+def _compose(w, vals):
+    #weighted sum of the values of the N functions (last axis) of a composition function
+    w_sm = np.sum(w, axis=-1, keepdims=True)
+    nz = w_sm != 0.0
+    w = np.where(nz, w / np.where(nz, w_sm, 1.0), 1/w.shape[-1])
+    return np.sum(w * vals, axis=-1)
 
 def f21(x, rotations=None, shifts=None):
     """
     Composition Function 1 (N=3)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][0]
     if shifts is None:
-        shifts = transforms.shifts_cf[0]
+        shifts = transforms.get_shifts_cf()[0]
 
     N = 3
     funcs = [basic.rosenbrock, basic.high_conditioned_elliptic, basic.rastrigin]
     sigmas = np.array([10.0, 20.0, 30.0])
     lambdas = np.array([1.0, 1.0e-6, 1.0])
     biases = np.array([0.0, 100.0, 200.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2100
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2100
 
 def f22(x, rotations=None, shifts=None):
     """
     Composition Function 2 (N=3)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][1]
     if shifts is None:
-        shifts = transforms.shifts_cf[1]
+        shifts = transforms.get_shifts_cf()[1]
 
     N = 3
     funcs = [basic.rastrigin, basic.griewank, basic.modified_schwefel]
     sigmas = np.array([10.0, 20.0, 30.0])
     lambdas = np.array([1.0, 10.0, 1.0])
     biases = np.array([0.0, 100.0, 200.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2200
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2200
 
 def f23(x, rotations=None, shifts=None):
     """
     Composition Function 3 (N=4)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][2]
     if shifts is None:
-        shifts = transforms.shifts_cf[2]
+        shifts = transforms.get_shifts_cf()[2]
 
     N = 4
     funcs = [basic.rosenbrock, basic.ackley, basic.modified_schwefel, basic.rastrigin]
     sigmas = np.array([10.0, 20.0, 30.0, 40.0])
     lambdas = np.array([1.0, 10.0, 1.0, 1.0])
     biases = np.array([0.0, 100.0, 200.0, 300.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2300
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2300
 
 def f24(x, rotations=None, shifts=None):
     """
     Composition Function 4 (N=4)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][3]
     if shifts is None:
-        shifts = transforms.shifts_cf[3]
+        shifts = transforms.get_shifts_cf()[3]
 
     N = 4
     funcs = [basic.ackley, basic.high_conditioned_elliptic, basic.griewank, basic.rastrigin]
     sigmas = np.array([10.0, 20.0, 30.0, 40.0])
     lambdas = np.array([1.0, 1.0e-6, 10.0, 1.0])
     biases = np.array([0.0, 100.0, 200.0, 300.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2400
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2400
 
 def f25(x, rotations=None, shifts=None):
     """
     Composition Function 5 (N=5)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][4]
     if shifts is None:
-        shifts = transforms.shifts_cf[4]
+        shifts = transforms.get_shifts_cf()[4]
 
     N = 5
     funcs = [basic.rastrigin, basic.happy_cat, basic.ackley, basic.discus, basic.rosenbrock]
     sigmas = np.array([10.0, 20.0, 30.0, 40.0, 50.0])
     lambdas = np.array([10.0, 1.0, 10.0, 1.0e-6, 1.0])
     biases = np.array([0.0, 100.0, 200.0, 300.0, 400.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2500
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2500
 
 def f26(x, rotations=None, shifts=None):
     """
     Composition Function 6 (N=5)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][5]
     if shifts is None:
-        shifts = transforms.shifts_cf[5]
+        shifts = transforms.get_shifts_cf()[5]
 
     N = 5
     funcs = [basic.expanded_schaffers_f6, basic.modified_schwefel, basic.griewank, basic.rosenbrock, basic.rastrigin]
@@ -774,39 +796,33 @@ def f26(x, rotations=None, shifts=None):
     #lambdas = np.array([1.0e-26, 10.0, 1.0e-6, 10.0, 5.0e-4])
     lambdas = np.array([5.0e-4, 1.0, 10.0, 1.0, 10.0])
     biases = np.array([0.0, 100.0, 200.0, 300.0, 400.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2600
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2600
 
 def f27(x, rotations=None, shifts=None):
     """
     Composition Function 7 (N=6)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][6]
     if shifts is None:
-        shifts = transforms.shifts_cf[6]
+        shifts = transforms.get_shifts_cf()[6]
 
     N = 6
     funcs = [
@@ -819,39 +835,33 @@ def f27(x, rotations=None, shifts=None):
     sigmas = np.array([10.0, 20.0, 30.0, 40.0, 50.0, 60.0])
     lambdas = np.array([10.0, 10.0, 2.5, 1.0e-26, 1.0e-6, 5.0e-4])
     biases = np.array([0.0, 100.0, 200.0, 300.0, 400.0, 500.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2700
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2700
 
 def f28(x, rotations=None, shifts=None):
     """
     Composition Function 8 (N=6)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
         shifts (array): Optional shift vectors (NxD). If None (default), the
             official vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][7]
     if shifts is None:
-        shifts = transforms.shifts_cf[7]
+        shifts = transforms.get_shifts_cf()[7]
 
     N = 6
     funcs = [
@@ -864,28 +874,21 @@ def f28(x, rotations=None, shifts=None):
     sigmas = np.array([10.0, 20.0, 30.0, 40.0, 50.0, 60.0])
     lambdas = np.array([10.0, 10.0, 1.0e-6, 1.0, 1.0, 5.0e-4])
     biases = np.array([0.0, 100.0, 200.0, 300.0, 400.0, 500.0])
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](np.matmul(rotations[i], x_shifted))
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (lambdas*vals + biases)) + 2800
+        vals[..., i] = funcs[i](_rotate(x_shifted, rotations[i]))
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, lambdas*vals + biases) + 2800
 
 def f29(x, rotations=None, shifts=None, shuffles=None):
     """
     Composition Function 9 (N=3)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
@@ -894,11 +897,12 @@ def f29(x, rotations=None, shifts=None, shuffles=None):
         shuffles (array): Optional shuffle vectors (NxD). If None (default), the
             official permutation vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][8]
     if shifts is None:
-        shifts = transforms.shifts_cf[8]
+        shifts = transforms.get_shifts_cf()[8]
     if shuffles is None:
         shuffles = transforms.shuffles_cf[nx][0]
 
@@ -907,29 +911,22 @@ def f29(x, rotations=None, shifts=None, shuffles=None):
     sigmas = np.array([10.0, 30.0, 50.0])
     biases = np.array([0.0, 100.0, 200.0])
     offsets = np.array([1500, 1600, 1700]) # subtract F* added at the end of the functions
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](x, rotation=rotations[i], shift=shifts[i][:nx], shuffle=shuffles[i])
-        vals[i] -= offsets[i]
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (vals + biases)) + 2900
+        vals[..., i] = funcs[i](x, rotation=rotations[i], shift=shifts[i][:nx], shuffle=shuffles[i])
+        vals[..., i] -= offsets[i]
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, vals + biases) + 2900
 
 def f30(x, rotations=None, shifts=None, shuffles=None):
     """
     Composition Function 10 (N=3)
 
     Args:
-        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100.
+        x (array): Input vector of dimension 2, 10, 20, 30, 50 or 100, or a
+            population of such vectors with shape (npop, d).
         rotations (matrix): Optional rotation matrices (NxDxD). If None
             (default), the official matrices from the benchmark suite will be
             used.
@@ -938,11 +935,12 @@ def f30(x, rotations=None, shifts=None, shuffles=None):
         shuffles (array): Optional shuffle vectors (NxD). If None (default), the
             official permutation vectors from the benchmark suite will be used.
     """
-    nx = len(x)
+    x = np.asarray(x, dtype=float)
+    nx = x.shape[-1]
     if rotations is None:
         rotations = transforms.rotations_cf[nx][9]
     if shifts is None:
-        shifts = transforms.shifts_cf[9]
+        shifts = transforms.get_shifts_cf()[9]
     if shuffles is None:
         shuffles = transforms.shuffles_cf[nx][1]
 
@@ -951,22 +949,14 @@ def f30(x, rotations=None, shifts=None, shuffles=None):
     sigmas = np.array([10.0, 30.0, 50.0])
     biases = np.array([0.0, 100.0, 200.0])
     offsets = np.array([1500, 1800, 1900]) # subtract F* added at the end of the functions
-    vals = np.zeros(N)
-    w = np.zeros(N)
-    w_sm = 0.0
+    vals = np.zeros(x.shape[:-1] + (N,))
+    w = np.zeros(x.shape[:-1] + (N,))
     for i in range(0, N):
         x_shifted = x-shifts[i][:nx]
-        vals[i] = funcs[i](x, rotation=rotations[i], shift=shifts[i][:nx], shuffle=shuffles[i])
-        vals[i] -= offsets[i]
-        w[i] = _calc_w(x_shifted, sigmas[i])
-        w_sm += w[i]
-
-    if (w_sm != 0.0):
-        w /= w_sm
-    else:
-        w = np.full(N, 1/N)
-
-    return np.sum(w * (vals + biases)) + 3000
+        vals[..., i] = funcs[i](x, rotation=rotations[i], shift=shifts[i][:nx], shuffle=shuffles[i])
+        vals[..., i] -= offsets[i]
+        w[..., i] = _calc_w(x_shifted, sigmas[i])
+    return _compose(w, vals + biases) + 3000
 
 all_functions = [
     f1,
@@ -20,171 +20,209 @@
 #"""
 
 import random
-from math import sin, cos, pi, exp, e, sqrt
-from operator import mul
-from functools import reduce
+import numpy as np
+from math import pi
+
+#--------------------------------------------------------
+# All functions accept one individual (list or 1D array of size d) and return a float,
+# or a population of shape (npop, d) and return an array of shape (npop,).
+# The original pure python implementations are kept in neorl.benchmarks.tools.classic_ref
+#--------------------------------------------------------
+
+def _as_array(individual):
+    return np.asarray(individual, dtype=float)
+
+def _index(x, start=0):
+    #position of every variable (start, start+1, ...) along the last axis
+    return np.arange(start, x.shape[-1]+start)
 
 def sphere(individual):
     """Sphere test objective function.
     """
-    return sum(x**2 for x in individual)
+    x = _as_array(individual)
+    return np.sum(x**2, axis=-1)
 
 def cigar(individual):
     """Cigar test objective function.
     """
-    return individual[0]**2 + 1e6 * sum(gene * gene for gene in individual)
+    x = _as_array(individual)
+    return x[..., 0]**2 + 1e6 * np.sum(x * x, axis=-1)
 
 def rosenbrock(individual):  
     """Rosenbrock test objective function.
     """
-    return sum(100 * (x * x - y)**2 + (1. - x)**2 \
-                   for x, y in zip(individual[:-1], individual[1:]))
+    x = _as_array(individual)
+    x, y = x[..., :-1], x[..., 1:]
+    return np.sum(100 * (x * x - y)**2 + (1. - x)**2, axis=-1)
 
 def ackley(individual):
     """Ackley test objective function.
     """
-    N = len(individual)
-    return 20 - 20 * exp(-0.2*sqrt(1.0/N * sum(x**2 for x in individual))) \
-            + e - exp(1.0/N * sum(cos(2*pi*x) for x in individual))
+    x = _as_array(individual)
+    N = x.shape[-1]
+    return 20 - 20 * np.exp(-0.2*np.sqrt(1.0/N * np.sum(x**2, axis=-1))) \
+            + np.e - np.exp(1.0/N * np.sum(np.cos(2*pi*x), axis=-1))
             
 def bohachevsky(individual):
     """Bohachevsky test objective function.
     """
-    return sum(x**2 + 2*x1**2 - 0.3*cos(3*pi*x) - 0.4*cos(4*pi*x1) + 0.7 
-                for x, x1 in zip(individual[:-1], individual[1:]))
+    x = _as_array(individual)
+    x, x1 = x[..., :-1], x[..., 1:]
+    return np.sum(x**2 + 2*x1**2 - 0.3*np.cos(3*pi*x) - 0.4*np.cos(4*pi*x1) + 0.7, axis=-1)
 
 def griewank(individual):
     """Griewank test objective function.
     """
-    return 1.0/4000.0 * sum(x**2 for x in individual) - \
-        reduce(mul, (cos(x/sqrt(i+1.0)) for i, x in enumerate(individual)), 1) + 1
+    x = _as_array(individual)
+    return 1.0/4000.0 * np.sum(x**2, axis=-1) - \
+        np.prod(np.cos(x/np.sqrt(_index(x, start=1))), axis=-1) + 1
             
 def rastrigin(individual):
     """Rastrigin test objective function.
     """     
-    return 10 * len(individual) + sum(gene * gene - 10 * \
-                        cos(2 * pi * gene) for gene in individual)
+    x = _as_array(individual)
+    return 10 * x.shape[-1] + np.sum(x * x - 10 * np.cos(2 * pi * x), axis=-1)
 
 def rastrigin_scaled(individual):
     """Scaled Rastrigin test objective function.
     """
-    N = len(individual)
-    return 10*N + sum((10**(i/(N-1))*x)**2 - 
-                      10*cos(2*pi*10**(i/(N-1))*x) for i, x in enumerate(individual))
+    x = _as_array(individual)
+    N = x.shape[-1]
+    x = 10**(_index(x)/(N-1))*x
+    return 10*N + np.sum(x**2 - 10*np.cos(2*pi*x), axis=-1)
 
 def rastrigin_skew(individual):
     """Skewed Rastrigin test objective function.
     """
-    N = len(individual)
-    return 10*N + sum((10*x if x > 0 else x)**2 
-                    - 10*cos(2*pi*(10*x if x > 0 else x)) for x in individual)
+    x = _as_array(individual)
+    N = x.shape[-1]
+    x = np.where(x > 0, 10*x, x)
+    return 10*N + np.sum(x**2 - 10*np.cos(2*pi*x), axis=-1)
     
 
 def schaffer(individual):
     """Schaffer test objective function.
     """
-    return sum((x**2+x1**2)**0.25 * ((sin(50*(x**2+x1**2)**0.1))**2+1.0) 
-                for x, x1 in zip(individual[:-1], individual[1:]))
+    x = _as_array(individual)
+    s = x[..., :-1]**2 + x[..., 1:]**2
+    return np.sum(s**0.25 * ((np.sin(50*s**0.1))**2+1.0), axis=-1)
 
 def schwefel(individual):
     """Schwefel test objective function.
     """    
-    N = len(individual)
-    return 418.9828872724339*N-sum(x*sin(sqrt(abs(x))) for x in individual)
+    x = _as_array(individual)
+    N = x.shape[-1]
+    return 418.9828872724339*N-np.sum(x*np.sin(np.sqrt(np.abs(x))), axis=-1)
 
 def alpinen1(individual): 
-    return sum(abs(x * sin(x) + 0.1 * x) for x in individual)
+    x = _as_array(individual)
+    return np.sum(np.abs(x * np.sin(x) + 0.1 * x), axis=-1)
 
 def alpinen2(individual):
-    return reduce(mul, (sqrt(x)*sin(x) for x in individual), 1)
+    x = _as_array(individual)
+    return np.prod(np.sqrt(x)*np.sin(x), axis=-1)
 
 def brown(individual):
-    scores=0
-    x=[item**2 for item in individual]
-    for i in range(len(individual) - 1):
-        scores += x[i] ** (x[i+1] + 1) + x[i+1]**(x[i] + 1)    
-    return scores
+    x = _as_array(individual)**2
+    x, x1 = x[..., :-1], x[..., 1:]
+    return np.sum(x ** (x1 + 1) + x1**(x + 1), axis=-1)
 
 def expo(individual):
-    return -exp(-0.5*sum(x**2 for x in individual))
+    x = _as_array(individual)
+    return -np.exp(-0.5*np.sum(x**2, axis=-1))
 
 def yang(individual):
-    return sum(random.random()*abs(x)**i for i, x in enumerate(individual,start=1))
+    x = _as_array(individual)
+    #one python random number per variable, drawn in the same order as the reference implementation
+    r = np.array([random.random() for _ in range(x.size)]).reshape(x.shape)
+    return np.sum(r*np.abs(x)**_index(x, start=1), axis=-1)
 
 def yang2(individual):
-    return sum(abs(x) for x in individual) * exp(-sum(sin(x**2) for x in individual))
+    x = _as_array(individual)
+    return np.sum(np.abs(x), axis=-1) * np.exp(-np.sum(np.sin(x**2), axis=-1))
 
 def yang3(individual):
     beta=15
     m=5
-    return exp(-sum((x/beta)**(2*m) for x in individual))  \
-            - 2*exp(-sum(x**2 for x in individual)) * reduce(mul, (cos(x)**2 for x in individual), 1)
+    x = _as_array(individual)
+    return np.exp(-np.sum((x/beta)**(2*m), axis=-1))  \
+            - 2*np.exp(-np.sum(x**2, axis=-1)) * np.prod(np.cos(x)**2, axis=-1)
 
 def yang4(individual):
-    return (sum(sin(x)**2 for x in individual) - exp(-sum(x**2 for x in individual))) \
-            * exp(-sum(sin(sqrt(abs(x)))**2 for x in individual))
+    x = _as_array(individual)
+    return (np.sum(np.sin(x)**2, axis=-1) - np.exp(-np.sum(x**2, axis=-1))) \
+            * np.exp(-np.sum(np.sin(np.sqrt(np.abs(x)))**2, axis=-1))
             
 def zakharov (individual):
-    return sum(x**2 for x in individual) + sum(0.5*i*x for i, x in enumerate(individual,start=1))**2 \
-            + sum(0.5*i*x for i, x in enumerate(individual,start=1))**4
+    x = _as_array(individual)
+    s = np.sum(0.5*_index(x, start=1)*x, axis=-1)
+    return np.sum(x**2, axis=-1) + s**2 + s**4
             
 def salomon (individual):
-    return 1-cos(2*pi*sqrt(sum(x**2 for x in individual))) + 0.1*sqrt(sum(x**2 for x in individual))
+    x = _as_array(individual)
+    r = np.sqrt(np.sum(x**2, axis=-1))
+    return 1-np.cos(2*pi*r) + 0.1*r
 
 def st(individual):
-    return 0.5*sum(x**4 - 16*x**2 + 5*x for x in individual)
+    x = _as_array(individual)
+    return 0.5*np.sum(x**4 - 16*x**2 + 5*x, axis=-1)
 
 def shubert(individual):  #2d function, global minima at -186.7309
-    score=1
-    for i in range(len(individual)):
-        score*= sum(x*cos((x+1)*individual[i] + x) for x in [1,2,3,4,5])
-    return score
+    x = _as_array(individual)
+    j = np.arange(1, 6)
+    return np.prod(np.sum(j*np.cos((j+1)*x[..., np.newaxis] + j), axis=-1), axis=-1)
 
 def ridge(individual): 
     d=1
     alpha=0.5
-    return individual[0] + d*sum(individual[i]**2 for i in range(1,len(individual)))**alpha
+    x = _as_array(individual)
+    return x[..., 0] + d*np.sum(x[..., 1:]**2, axis=-1)**alpha
 
 def powell(individual):
-    return sum(abs(x)**(i+1) for i,x in enumerate (individual,start=1))
+    x = _as_array(individual)
+    return np.sum(np.abs(x)**(_index(x, start=2)), axis=-1)
 
 #def periodic(individual):
 #    return 1+sum(sin(x)**2 for x in individual)-0.1*exp(sum(x**2 for x in individual))
 
 def qing(individual):
-    return sum((x**2 - i)**2 for i,x in enumerate (individual,start=1))
+    x = _as_array(individual)
+    return np.sum((x**2 - _index(x, start=1))**2, axis=-1)
 
 def quartic(individual):
-    return sum(i*x**4 for i,x in enumerate (individual,start=1)) + random.random()
+    x = _as_array(individual)
+    #one python random number per individual, as in the reference implementation
+    r = np.array([random.random() for _ in range(x.size // x.shape[-1])]).reshape(x.shape[:-1])
+    return np.sum(_index(x, start=1)*x**4, axis=-1) + r
 
 def happycat(individual):
-    l2=sum(x**2 for x in individual)
-    n=len(individual)
+    x = _as_array(individual)
+    l2=np.sum(x**2, axis=-1)
+    n=x.shape[-1]
     alpha=1/8
-    return ((l2-n)**2)**alpha + 1/n*(0.5*l2 + sum(individual)) + 0.5
+    return ((l2-n)**2)**alpha + 1/n*(0.5*l2 + np.sum(x, axis=-1)) + 0.5
 
 def schwefel2(individual):
-    return sum(abs(x) for x in individual) + reduce(mul, (abs(x) for x in individual), 1)
+    x = _as_array(individual)
+    return np.sum(np.abs(x), axis=-1) + np.prod(np.abs(x), axis=-1)
 
 def dixonprice(individual):
-    score=0
-    for i in range(1,len(individual)):
-         score+= (i+1)*(2*individual[i]**2-individual[i-1])**2
-    score += (individual[0]-1)**2
+    x = _as_array(individual)
+    score = np.sum(_index(x, start=2)[:-1]*(2*x[..., 1:]**2-x[..., :-1])**2, axis=-1)
+    score += (x[..., 0]-1)**2
     return  score
 
 def levy(individual):
 
-    d = len(individual)
+    x = _as_array(individual)
     
-    w=[1 + (x - 1)/4 for x in individual]
+    w=1 + (x - 1)/4
     
-    term1 = sin(pi*w[0])**2
-    term3 = (w[-1]-1)**2 * (1+sin(2*pi*w[-1])**2)
+    term1 = np.sin(pi*w[..., 0])**2
+    term3 = (w[..., -1]-1)**2 * (1+np.sin(2*pi*w[..., -1])**2)
     
-    term2 = 0;
-    for i in range (d-1):
-        term2 += (w[i]-1)**2 * (1+10*sin(pi*w[i]+1)**2)
+    wi = w[..., :-1]
+    term2 = np.sum((wi-1)**2 * (1+10*np.sin(pi*wi+1)**2), axis=-1)
         
     return term1 + term2 + term3
 
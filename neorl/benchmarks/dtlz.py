@@ -5,6 +5,7 @@ Created on Fri Jun 10 16:47:16 2022
 @author: Majdi Radaideh
 """
 
+import os
 import warnings
 from abc import abstractmethod
 
@@ -367,6 +368,19 @@ class DTLZ(Problem):
 
         super().__init__(n_var=n_var, n_obj=n_obj, n_constr=0, xl=0, xu=1, type_var=anp.double)
 
+    def pareto_front(self, ref_dirs=None, p=4, cache_dir=None):
+        """
+        Returns
+        -------
+        P : np.array
+            The Pareto front on the reference directions ref_dirs. If ref_dirs is None, the uniform
+            reference points with p divisions along each objective are used (as in NSGA-III), and the front
+            is cached in memory and on disk (in cache_dir, see reference_front) for this problem, number of objectives and p.
+        """
+        if ref_dirs is not None:
+            return self._calc_pareto_front(np.asarray(ref_dirs, dtype=float))
+        return reference_front(self, p, cache_dir)
+
     def g1(self, X_M):
         return 100 * (self.k + anp.sum(anp.square(X_M - 0.5) - anp.cos(20 * anp.pi * (X_M - 0.5)), axis=1))
 
@@ -399,5 +413,106 @@ class DTLZ2(DTLZ):
         g = self.g2(X_M)
         out["F"] = self.obj_func(X_, g, alpha=1)
 
+class DTLZ1(DTLZ):
+    def __init__(self, n_var=7, n_obj=3, **kwargs):
+        super().__init__(n_var, n_obj, **kwargs)
+
+    def _calc_pareto_front(self, ref_dirs):
+        return 0.5 * ref_dirs
+
+    def obj_func(self, X_, g):
+        f = []
+
+        for i in range(0, self.n_obj):
+            _f = 0.5 * (1 + g)
+            _f *= anp.prod(X_[:, :X_.shape[1] - i], axis=1)
+            if i > 0:
+                _f *= 1 - X_[:, X_.shape[1] - i]
+            f.append(_f)
+
+        return anp.column_stack(f)
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        X_, X_M = x[:, :self.n_obj - 1], x[:, self.n_obj - 1:]
+        g = self.g1(X_M)
+        out["F"] = self.obj_func(X_, g)
+
+class DTLZ3(DTLZ):
+    def __init__(self, n_var=10, n_obj=3, **kwargs):
+        super().__init__(n_var, n_obj, **kwargs)
+
+    def _calc_pareto_front(self, ref_dirs):
+        return generic_sphere(ref_dirs)
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        X_, X_M = x[:, :self.n_obj - 1], x[:, self.n_obj - 1:]
+        g = self.g1(X_M)
+        out["F"] = self.obj_func(X_, g, alpha=1)
+
+class DTLZ4(DTLZ):
+    def __init__(self, n_var=10, n_obj=3, alpha=100, **kwargs):
+        super().__init__(n_var, n_obj, **kwargs)
+        self.alpha = alpha
+
+    def _calc_pareto_front(self, ref_dirs):
+        return generic_sphere(ref_dirs)
+
+    def _evaluate(self, x, out, *args, **kwargs):
+        X_, X_M = x[:, :self.n_obj - 1], x[:, self.n_obj - 1:]
+        g = self.g2(X_M)
+        out["F"] = self.obj_func(X_, g, alpha=self.alpha)
+
 def generic_sphere(ref_dirs):
-    return ref_dirs / anp.tile(anp.linalg.norm(ref_dirs, axis=1)[:, None], (1, ref_dirs.shape[1]))
\ No newline at end of file
+    return ref_dirs / anp.tile(anp.linalg.norm(ref_dirs, axis=1)[:, None], (1, ref_dirs.shape[1]))
+
+# The reference fronts used for benchmarking are computed once for each (problem, n_obj, p): they are kept
+# in _fronts and saved as .npy files in the cache folder ($XDG_CACHE_HOME/neorl/pareto_fronts, or
+# ~/.cache/neorl/pareto_fronts), so later runs and the other processes of a sweep load them instead of
+# generating the reference points again. The cache folder is read when a front is first needed, so it can
+# be changed with the cache_dir argument or the XDG_CACHE_HOME variable (e.g. to a temporary folder in tests).
+# The pareto_fronts folder next to this file is only used if the cache folder cannot be written,
+# and if neither can be written, the fronts are only kept in memory.
+
+_fronts = {}
+
+def _front_dirs(cache_dir=None):
+    #"""
+    #returns the folders where the fronts are looked for and saved, in order of preference
+    #"""
+    if cache_dir is None:
+        cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        cache_dir = os.path.join(cache_home, 'neorl', 'pareto_fronts')
+    return [cache_dir, os.path.join(os.path.dirname(__file__), 'tools', 'pareto_fronts')]
+
+def reference_front(problem, p=4, cache_dir=None):
+    """
+    Returns the Pareto front of a DTLZ problem on the uniform reference points with p divisions along each objective
+
+    :param problem: (DTLZ) the problem, e.g. ``DTLZ2(n_var=12, n_obj=3)``
+    :param p: (int) number of divisions along each objective
+    :param cache_dir: (str) folder where the front is loaded from and saved to. If ``None``, ``$XDG_CACHE_HOME/neorl/pareto_fronts`` (or ``~/.cache/neorl/pareto_fronts``) is used
+    :return: (numpy.ndarray) read-only array of shape (Combination(n_obj + p - 1, p), n_obj)
+    """
+    key = '{}_M{}_p{}'.format(problem.name(), problem.n_obj, p)
+    if key not in _fronts:
+        front_dirs = _front_dirs(cache_dir)
+        paths = [os.path.join(front_dir, key + '.npy') for front_dir in front_dirs]
+        saved = [path for path in paths if os.path.exists(path)]
+        if saved:
+            front = np.load(saved[0], allow_pickle=False)
+        else:
+            from neorl.multi.tools import uniform_reference_points
+            front = np.asarray(problem._calc_pareto_front(uniform_reference_points(nobj=problem.n_obj, p=p)))
+            for front_dir, path in zip(front_dirs, paths):
+                try:
+                    os.makedirs(front_dir, exist_ok=True)
+                    #write to a temporary file first, so other processes never open a partial file
+                    tmp = os.path.join(front_dir, '{}.{}.tmp.npy'.format(key, os.getpid()))
+                    np.save(tmp, front)
+                    os.replace(tmp, path)
+                    break
+                except OSError:
+                    pass
+        front.flags.writeable = False
+        _fronts[key] = front
+    return _fronts[key]
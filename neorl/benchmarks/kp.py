@@ -42,22 +42,21 @@ import random
 class KP(gym.Env):
 
   def __init__ (self,obj_list,weight_capacity,optimum_knapsack = None, episode_length = None, method = None):                
-    self.obj_library = {}
     self.weight_capacity = weight_capacity
-    self.obj_weight_to_value = {}
-    
-    for i in range(len(obj_list)):
-        self.obj_library["%d"%(i + 1)] = [obj_list[i][0],obj_list[i][1]]
-        w_to_v = obj_list[i][1] / obj_list[i][0]
-        self.obj_weight_to_value["%d"%(i + 1)] = w_to_v
-    
     self.number_of_objects = len(obj_list)
+    self.values = np.array([obj[0] for obj in obj_list], dtype = float) # value of object 'i' is in row i - 1
+    self.weights = np.array([obj[1] for obj in obj_list], dtype = float) # weight of object 'i' is in row i - 1
+    if self.weights.sum() <= self.weight_capacity:
+        raise ValueError("--error: the weight capacity is higher than the sum of the weights of all the objects. The problem is trivial")
     self.state = - 10**6.0 * np.ones((self.number_of_objects,3), dtype = float) # values/weight/weight to value ratio
     
     self.episode_length = episode_length # Number of kp solved per episodes
-    self.obj_id = copy.deepcopy(list(self.obj_library.keys())) # list with the ids of the objects
+    self.obj_ids = ["%d"%(i + 1) for i in range(self.number_of_objects)] # ids of the objects
+    self.available = np.ones(self.number_of_objects, dtype = bool) # objects not chosen yet in the current knapsack
     self.obj_list = [] # List representing a bag of objects
-    self.full_obj_list = copy.deepcopy(np.transpose(obj_list)) # store all the objects for plotting purposes
+    self.knap_value = 0 # running sums of the values and weights of the objects in the knapsack
+    self.knap_weight = 0
+    self.full_obj_list = np.array([self.values, self.weights]) # store all the objects for plotting purposes
     self.counter = 0 # counter to record a knap
     self.subcounter = 0 # counter to record each knap per episode
     self.method = method #RL method used for optimization
@@ -76,14 +75,42 @@ class KP(gym.Env):
     self.done = False
     if optimum_knapsack is not None: # record the (known) best knapsack map and plot it
         optimum_knap_map = - 10**6.0 * np.ones((self.number_of_objects,2), dtype = float) 
-        for increment in range(0,len(optimum_knapsack)):
-            optimum_knap_map[:,0][increment] = self.obj_library['%d'%(optimum_knapsack[increment])][0]
-            optimum_knap_map[:,1][increment] = self.obj_library['%d'%(optimum_knapsack[increment])][1]
+        index = np.asarray(optimum_knapsack, dtype = int) - 1
+        optimum_knap_map[:len(index),0] = self.values[index]
+        optimum_knap_map[:len(index),1] = self.weights[index]
         optimum_knap_value = self.Compute_knap_value(knap = optimum_knap_map)
         title_map = "Sum of the values : {} \n".format(optimum_knap_value)
         title_map += "Sum of the weights : {} \n".format(self._check_weight_cap(optimum_knap_map))
         title_map += "Weight's limit : {} \n".format(self.weight_capacity)
-        _plot_knap_map(optimum_knap_map,flag = False, name = "Optimum_knap_map_%d.png"%(len(obj_list)), title_map = title_map, all_objects=np.transpose(obj_list))
+        _plot_knap_map(optimum_knap_map,flag = False, name = "Optimum_knap_map_%d.png"%(len(obj_list)), title_map = title_map, all_objects=self.full_obj_list)
+
+  def _add_object(self, action):
+    """
+      Place the object chosen by action 'action' in the knapsack if it fits, 
+      return False if the weight capacity is exceeded
+    """
+    remaining = self.available.nonzero()[0]
+    if action > len(remaining) - 1: # ensure a valid action considering that the action space is fixed
+        action = random.randint(0,len(remaining) - 1)
+    index = remaining[action] # recover the object corresponding to action 'action' and remove it from the action space
+    self.available[index] = False
+    self.obj_list.append(self.obj_ids[index]) # list of objects in the knapsack (for neorl callback)
+    weight = self.knap_weight + self.weights[index]
+    if weight > self.weight_capacity: # the object does not fit, the knapsack is complete
+        self.obj_list.pop(-1)
+        return False
+    # place the objects in the knapsack and fill the state space
+    self.knap_weight = weight
+    self.knap_value = self.knap_value + self.values[index]
+    self.state[self.counter - 1] = [self.values[index], self.weights[index], self.weights[index] / self.values[index]]
+    return True
+
+  def _clear_knap(self):
+    self.available[:] = True
+    self.knap_value = 0
+    self.knap_weight = 0
+    self.state[:,:] = - 10**6.0
+
   def step(self, x): 
     if self.method in ['ppo', 'a2c', 'acktr', 'neat']:
         self.counter = 0 # initialize the per knapsack counter
@@ -91,74 +118,30 @@ class KP(gym.Env):
             if self.counter == 0:
                 self.reset()
             self.counter += 1
-            if action <= len(self.obj_id) - 1:  
-                new_obj = self.obj_id[action] # recover the objects corresponding to action 'action'
-            else: # ensure a valid action considering that the action space is fixed
-                action = random.randint(0,len(self.obj_id) - 1)
-                new_obj = self.obj_id[action]
-
-            # place the objects in hte knapsack and fill the state space
-            self.state[:,0][self.counter - 1] = self.obj_library[new_obj][0]# --- put as embedding the value
-            self.state[:,1][self.counter - 1] = self.obj_library[new_obj][1]# --- put as embedding the weights
-            self.state[:,2][self.counter - 1] = self.state[:,1][self.counter - 1] / self.state[:,0][self.counter - 1]
-    
-            index1 = self.obj_id.index(self.obj_id[action]) # remove the objects chosen by action : 'action' from the action space
-            self.obj_id.pop(index1)
-            self.obj_list.append(new_obj) # list of objects in the knapsack (for neorl callback)
-
-            if  self._check_weight_cap(self.state) > self.weight_capacity:
-                self.state[:,0][self.counter - 1] = - 10**6.0 # --- remove last object
-                self.state[:,1][self.counter - 1] = - 10**6.0
-                self.state[:,2][self.counter - 1] = - 10**6.0
+            if not self._add_object(action):
                 break # stop filling the knapsack and evaluate the reward
-            elif self.obj_list == []:
-                raise ValueError("--error: the weight capacity is higher than the sum of the weights of all the objects. The problem is trivial")
 
         reward = self._get_stats()
         self.subcounter += 1 
         if self.subcounter != self.episode_length + 1: # generate the new knapsack
-            self.obj_id = copy.deepcopy(list(self.obj_library.keys()))
-            self.obj_list.pop(-1)
-            individual = copy.deepcopy(self.obj_list)
+            individual = self.obj_list
             self.obj_list = []
-            self.state[:,0] = - 10**6.0 * np.ones(self.number_of_objects)
-            self.state[:,1] = - 10**6.0 * np.ones(self.number_of_objects)
-            self.state[:,2] = - 10**6.0 * np.ones(self.number_of_objects)     
+            self._clear_knap()
     
     elif self.method in ['acer', 'dqn']:
         action = x
-        if action <= len(self.obj_id) - 1:  
-            new_obj = self.obj_id[action] # recover the object corresponding to action 'action'
-        else: # ensure a valid action considering that the action space is fixed
-            action = random.randint(0,len(self.obj_id) - 1)
-            new_obj = self.obj_id[action]
         self.counter += 1 # --- increment the global counter
-        # place the objects in hte knapsack and fill the state space
-        self.state[:,0][self.counter - 1] = self.obj_library[new_obj][0]# --- put as embedding the value
-        self.state[:,1][self.counter - 1] = self.obj_library[new_obj][1]# --- put as embedding the weights
-        self.state[:,2][self.counter - 1] = self.state[:,1][self.counter - 1] / self.state[:,0][self.counter - 1]
-    
-        index1 = self.obj_id.index(self.obj_id[action]) # remove the objects chosen by action : 'action' from the action space
-        self.obj_id.pop(index1)
-        self.obj_list.append(new_obj) # list of objects in the knapsack (for neorl callback)
         reward = 0
-        if  self._check_weight_cap(self.state) > self.weight_capacity:
-            self.state[:,0][self.counter - 1] = - 10**6.0 # --- remove last object
-            self.state[:,1][self.counter - 1] = - 10**6.0
-            self.state[:,2][self.counter - 1] = - 10**6.0
+        if not self._add_object(action):
             reward = self._get_stats()
             self.subcounter += 1
             self.counter = 0
             if self.subcounter != self.episode_length + 1: # generate the new knapsack 
-                self.obj_id = copy.deepcopy(list(self.obj_library.keys()))
-                self.obj_list.pop(-1)
-                individual = copy.deepcopy(self.obj_list)
+                individual = self.obj_list
                 self.obj_list = []
-                self.state[:,0] = - 10**6.0 * np.ones(self.number_of_objects)
-                self.state[:,1] = - 10**6.0 * np.ones(self.number_of_objects)
-                self.state[:,2] = - 10**6.0 * np.ones(self.number_of_objects)
+                self._clear_knap()
         else:
-            individual = copy.deepcopy(self.obj_list) # a knapsack is not complete.
+            individual = list(self.obj_list) # a knapsack is not complete.
 
     if self.subcounter == self.episode_length:# episode terminates
         self.done = True
@@ -168,37 +151,44 @@ class KP(gym.Env):
 
   def reset(self):
     self.done = False
-    self.obj_id = copy.deepcopy(list(self.obj_library.keys()))
-    self.state[:,0] = - 10**6.0 * np.ones(self.number_of_objects)
-    self.state[:,1] = - 10**6.0 * np.ones(self.number_of_objects)
-    self.state[:,2] = - 10**6.0 * np.ones(self.number_of_objects)
+    self._clear_knap()
     return (self.state.flatten())
 
   def Compute_knap_value(self, knap = None):
     if knap is None:
-        knap = copy.deepcopy(self.state)        
-    value = 0
+        return self.knap_value
     limit_knap = np.where(knap[:,0] == -10**6.0)[0] # the list of objects is either -10**6.0 or a reasonable weights
     if len(limit_knap) > 0:
         limit_knap = limit_knap[0]
     else:
-        limit_knap = self.numlocs 
-    for increment in range(0,limit_knap): # sum the values of the object chosen
-        value += knap[:,0][increment]    
-    return value
+        limit_knap = len(knap) 
+    return np.sum(knap[:limit_knap,0]) # sum the values of the object chosen
 
   def _check_weight_cap(self, knap = None):
     if knap is None:
-        knap = copy.deepcopy(self.state) 
-    value = 0
+        return self.knap_weight
     limit_knap = np.where(knap[:,0] == -10**6.0)[0] # the list of objects is either -10**6.0 or a reasonable weights
     if len(limit_knap) > 0:
         limit_knap = limit_knap[0]
     else:
-        limit_knap = self.numlocs 
-    for increment in range(0,limit_knap): # sum the weights of the object chosen and verify that it does not exceed the weight limit
-        value += knap[:,1][increment]    
-    return value 
+        limit_knap = len(knap) 
+    return np.sum(knap[:limit_knap,1]) # sum the weights of the object chosen
+
+  def evaluate(self, selections):
+    """
+      Evaluate a population of knapsacks at once
+      
+      :param selections: (list or array) 0/1 (or boolean) array of shape (number_of_objects,) or (npop, number_of_objects), 
+                         1 if the object is in the knapsack
+      :return: (tuple) the sum of the values, the sum of the weights and a boolean array that is True 
+               when the weight capacity is respected, one entry per knapsack
+    """
+    selections = np.asarray(selections, dtype = float)
+    if selections.shape[-1] != self.number_of_objects:
+        raise ValueError("--error: the knapsacks must have {} entries, not {}".format(self.number_of_objects, selections.shape[-1]))
+    values = selections @ self.values
+    weights = selections @ self.weights
+    return values, weights, weights <= self.weight_capacity
 
   def _get_stats(self,flag = True):
       score = self.Compute_knap_value() 
@@ -208,7 +198,7 @@ class KP(gym.Env):
             current_knap_value = self.Compute_knap_value(knap = self.state)
             title_map = " Episode: {}, Value of the Knapsack : {} \n".format(self._iter_episode + 1, np.ceil(current_knap_value))
             title_map += "Sum of the weights : {} \n".format(self._check_weight_cap(self.state))
-            _plot_knap_map(self.state,flag = False, name = "Best_Knap_map_%d_%s.png"%(len(np.transpose(self.full_obj_list)),self.method), title_map = title_map, all_objects = self.full_obj_list)
+            _plot_knap_map(self.state,flag = False, name = "Best_Knap_map_%d_%s.png"%(self.number_of_objects,self.method), title_map = title_map, all_objects = self.full_obj_list)
 
       return score
             
@@ -1,7 +1,6 @@
 import numpy as np
 from pathlib import Path
-import pandas as pd
-from tensorflow.keras.models import load_model
+import json
 import sys
 import inspect
 
@@ -15,26 +14,83 @@ def transform_features(x, f="cos"):
     elif f == "tanh":
         return np.tanh(x)
 
+activations = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "tanh": np.tanh,
+    "sigmoid": lambda x: 1/(1 + np.exp(-x)),
+}
+
+def _decode(name):
+    return name.decode("utf8") if isinstance(name, bytes) else name
+
+def load_dense_layers(model_file):
+    """
+    Read the weights of a Keras Sequential model of Dense layers saved in h5 format,
+    without TensorFlow. Returns a list of (kernel, bias, activation name) for every layer.
+    """
+    import h5py
+    with h5py.File(str(model_file), "r") as f:
+        config = json.loads(_decode(f.attrs["model_config"]))["config"]
+        #the config is a list of layers in older versions of keras
+        layer_configs = config["layers"] if isinstance(config, dict) else config
+        activation = {layer["config"]["name"]: layer["config"].get("activation", "linear")
+                      for layer in layer_configs}
+        weights = f["model_weights"] if "model_weights" in f else f
+        layers = []
+        for name in weights.attrs["layer_names"]:
+            name = _decode(name)
+            group = weights[name]
+            if len(group.attrs["weight_names"]) == 0:
+                continue
+            kernel, bias = [np.array(group[_decode(w)], dtype=float) for w in group.attrs["weight_names"]]
+            if activation[name] not in activations:
+                raise ValueError("--error: activation {} of layer {} is not supported".format(activation[name], name))
+            layers.append((kernel, bias, activation[name]))
+    return layers
+
 class QPowerModel:
     """
     Use to evaluate quadrant power splits from control drum configurations.
     Set up as init, then separately use method call to minimize reading times.
+    The neural network is evaluated with NumPy, so TensorFlow is not needed.
     """
     def __init__(self):
         #Find and load file
         model_file = cpath / Path("tools/microreactor_power_model.h5")
-        self.raw_model = load_model(model_file)
+        self.layers = load_dense_layers(model_file)
+
+    def predict(self, perts):
+        """Forward pass of the network for numpy array perts of shape (npop, 8)"""
+        out = np.asarray(perts, dtype=float)
+        for kernel, bias, activation in self.layers:
+            out = activations[activation](out@kernel + bias)
+        return out
+
+    def eval_batch(self, perts):
+        """
+        Evaluate the quadrant power splits of many drum configurations at once.
+        perts is numpy array of shape (npop, 8) of drum angles
+        returns numpy array of shape (npop, 4), every row sums to 1
+        """
+        unorm = self.predict(perts)
+        return unorm/unorm.sum(axis=-1, keepdims=True)
 
     def eval(self, pert):
-        pert2 = pert.copy()
-        pertn = np.array([pert2, ])
-        unorm = self.raw_model.predict(pertn).flatten()
-        return unorm/unorm.sum()
+        return self.eval_batch(np.reshape(pert, (1, -1)))[0]
+
+_model = None #QPowerModel, created once per process
+
+def get_model():
+    """Return the QPowerModel, the weights are read only on the first call"""
+    global _model
+    if _model is None:
+        _model = QPowerModel()
+    return _model
 
 def qPowerModel(pert):
-    """Wrapper for QPowerModel that initializes and runs"""
-    a = QPowerModel()
-    return a.eval(pert)
+    """Wrapper for QPowerModel that initializes (once) and runs"""
+    return get_model().eval(pert)
 
 if __name__ == "__main__":
     thetas = np.zeros(8)
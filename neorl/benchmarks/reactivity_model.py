@@ -21,8 +21,8 @@ def get_jminus(typ = "wtd"): #wtd, refl or abs
     jm_configB["centers"] -= 4.0677
 
     #center periodic functions on 0
-    jm_configA["centers"][jm_configA["centers"] < -np.pi] += 2*np.pi
-    jm_configB["centers"][jm_configB["centers"] < -np.pi] += 2*np.pi
+    jm_configA.loc[jm_configA["centers"] < -np.pi, "centers"] += 2*np.pi
+    jm_configB.loc[jm_configB["centers"] < -np.pi, "centers"] += 2*np.pi
 
     #add buffer on each side for periodic integral evaluations
     lowcopy = jm_configA.copy()
@@ -126,6 +126,34 @@ def integrate_sq(x, y, lbnd, ubnd):
 
     return full_blocks_integral + lower_block_integral + upper_block_integral
 
+def cumulative_integrals(jminus):
+    """
+    Integrate the (piecewise linear) j- and j-^2 functions from the first point of the table
+    up to every point, so an integral between any bounds is the difference of two lookups.
+    jminus is pandas array with "centers" and "hist" columns
+    returns x, y, integral of j-, integral of j-^2 (numpy arrays of the table size)
+    """
+    x, y = jminus["centers"].values, jminus["hist"].values
+    dx = np.diff(x)
+    int1 = np.concatenate([[0], np.cumsum(dx*(y[:-1] + y[1:])/2)])
+    int2 = np.concatenate([[0], np.cumsum(dx*(y[:-1]**2 + y[:-1]*y[1:] + y[1:]**2)/3)])
+    return x, y, int1, int2
+
+def cumulative_eval(table, t, power = 1):
+    """
+    Integral of j- (power = 1) or j-^2 (power = 2) from the first point of the table up to t.
+    table is the output of cumulative_integrals
+    t is numpy array of any shape
+    """
+    x, y, int1, int2 = table
+    k = np.clip(np.searchsorted(x, t, side = "right") - 1, 0, len(x) - 2)
+    u = t - x[k]
+    yk = y[k]
+    yt = yk + (y[k+1] - yk)/(x[k+1] - x[k])*u
+    if power == 1:
+        return int1[k] + u*(yk + yt)/2
+    return int2[k] + u*(yk**2 + yk*yt + yt**2)/3
+
 def int_bounds(theta, cangle):
     """get bounds on j-^2 integrals given rotation angle, theta and coating angle cangle
     returns (thetaA&thetaA0'), (thetaA'&thetaA0)"""
@@ -206,6 +234,60 @@ class ReactivityModel:
         fB = interp1d(self.jmB["centers"].values, self.jmB["hist"].values)
         self.jmfs = [fA, fB, fB, fA, fA, fB, fB, fA]
 
+        #precomputed integrals of j- and j-^2 for config A (0) and config B (1)
+        self.jm_tables = [cumulative_integrals(self.jmA), cumulative_integrals(self.jmB)]
+        self.configs = np.array([0, 1, 1, 0, 0, 1, 1, 0])
+        #j-^2 integral over the coating of every drum at the nominal angle 0
+        self.nominal_sq = self.drum_integrals(np.zeros(8), power = 2)
+
+    def drum_integrals(self, thetas, power = 1):
+        """
+        Integral of j- (power = 1) or j-^2 (power = 2) over the coating of every drum.
+        thetas is numpy array of shape (..., 8) of rotation angles
+        """
+        lbnd = thetas - self.cangles/2
+        ubnd = thetas + self.cangles/2
+        integrals = np.empty(np.shape(thetas))
+        for config, table in enumerate(self.jm_tables):
+            drums = self.configs == config
+            integrals[..., drums] = cumulative_eval(table, ubnd[..., drums], power) \
+                                    - cumulative_eval(table, lbnd[..., drums], power)
+        return integrals
+
+    def zetatildes(self, thetas):
+        """
+        Same as calc_zetatildes for numpy array thetas of shape (..., 8)
+        """
+        gammastar = np.ones(np.shape(thetas)[:-1] + (9,))
+        gammastar[..., 1:] = 1 - self.drum_integrals(thetas, power = 1)
+        return gammastar@self.alphas.values.T
+
+    def worths(self, thetas):
+        """
+        Difference of the j-^2 integrals of every drum (int1 - int2 in terms of int_bounds),
+        in all cases of int_bounds it reduces to the integral over the rotated coating minus
+        the integral over the nominal coating.
+        thetas is numpy array of shape (..., 8) of rotation angles in [-np.pi, np.pi]
+        """
+        return self.drum_integrals(thetas, power = 2) - self.nominal_sq
+
+    def eval_batch(self, perts, nom = None):
+        """
+        Evaluate reactivity worth of many drum perturbations at once.
+        Perts is numpy array of shape (npop, 8) of drum angles in radians with 
+        coordinate systems described in the README.md.
+        Nom is an optional starting state of 8 angles, common to all perturbations
+        returns numpy array of shape (npop,)
+        """
+        #bring drum angles into [-np.pi, np.pi]
+        perts = adj_coords(np.asarray(perts, dtype = float))
+
+        reactivities = (self.zetatildes(perts)*self.worths(perts)).sum(axis = -1)
+
+        if nom is not None:
+            return reactivities - self.eval_batch(nom) #assume reactivites additive
+        return reactivities
+
     def eval(self, pert, nom = None):
         """
         Evaluate reactivity worth of drum perturbation.
@@ -213,34 +295,7 @@ class ReactivityModel:
         coordinate systems described in the README.md.
         Nom is an optional starting state given same as pert
         """
-        #bring drum angles into [-np.pi, np.pi]
-        pert = adj_coords(pert)
-
-        #pull in zetatildes from external function
-        zetatildes = calc_zetatildes(theta = pert,
-                                     cangles = self.cangles,
-                                     alphas = self.alphas,
-                                     jminusA = self.jmA,
-                                     jminusB = self.jmB)
-
-        #loop through drums and calculate each contribution
-        reactivities = np.zeros(8)
-        for i in range(8):
-            b1, b2 = int_bounds(pert[i], self.cangles[i])
-            if i in [0, 3, 4, 7]: #if config A
-                int1 = integrate_sq(self.jmA["centers"], self.jmA["hist"], *b1)
-                int2 = integrate_sq(self.jmA["centers"], self.jmA["hist"], *b2)
-            else: #if config A
-                int1 = integrate_sq(self.jmB["centers"], self.jmB["hist"], *b1)
-                int2 = integrate_sq(self.jmB["centers"], self.jmB["hist"], *b2)
-            reactivities[i] = zetatildes[i]*(int1 - int2)
-
-        #basically just return conditionals
-        if nom: #little trick
-            return self.eval(pert) - self.eval(nom) #assume
-                                                          #reactivites additive
-        else:
-            return reactivities.sum()
+        return self.eval_batch(pert, nom)
 
     def evald(self, pert, k, zetatildes = None):
         """
@@ -260,26 +315,10 @@ class ReactivityModel:
                                       alphas = self.alphas,
                                       jmfs = self.jmfs)
         if zetatildes is None:
-            zetatildes = calc_zetatildes(theta = pert,
-                                         cangles = self.cangles,
-                                         alphas = self.alphas,
-                                         jminusA = self.jmA,
-                                         jminusB = self.jmB)
-
-        #define vector to hold summation
-        drdtk = np.zeros(8)
+            zetatildes = self.zetatildes(pert)
 
-        #iterate through all drums
-        for i in range(8):
-            b1, b2 = int_bounds(pert[i], self.cangles[i])
-            if i in [0, 3, 4, 7]: #if config A
-                int1 = integrate_sq(self.jmA["centers"], self.jmA["hist"], *b1)
-                int2 = integrate_sq(self.jmA["centers"], self.jmA["hist"], *b2)
-            else: #if config B
-                int1 = integrate_sq(self.jmB["centers"], self.jmB["hist"], *b1)
-                int2 = integrate_sq(self.jmB["centers"], self.jmB["hist"], *b2)
-
-            drdtk[i] += dzetatildes[i] * (int1 - int2)
+        #contribution of all drums
+        drdtk = dzetatildes * self.worths(pert)
 
         #tack on extra term from eq41
         drdtk[k-1] += zetatildes[k-1]*calc_W(pert[k-1], self.cangles[k-1], self.jmfs[k-1])
@@ -293,30 +332,31 @@ class ReactivityModel:
         Pert is numpy array of 8 drum angles in radians with 
         coordinate systems described in the README.md.
         """
-        zetatildes = calc_zetatildes(theta = pert,
-                                     cangles = self.cangles,
-                                     alphas = self.alphas,
-                                     jminusA = self.jmA,
-                                     jminusB = self.jmB)
+        zetatildes = self.zetatildes(np.asarray(pert, dtype = float))
         grad = np.zeros(8)
         for i in range(8):
             grad[i] = self.evald(pert, i+1, zetatildes)
         return grad
 
+_models = {} #typ --> ReactivityModel, created once per process
+
+def get_model(typ = "wtd"):
+    """Return the ReactivityModel of type typ, the files are read only on the first call"""
+    if typ not in _models:
+        _models[typ] = ReactivityModel(typ)
+    return _models[typ]
+
 def reactivityModelEval(pert, nom = None, typ = "wtd"):
-    """Wrapper for ReactivityModel that initializes and runs"""
-    a = ReactivityModel(typ)
-    return a.eval(pert, nom)
+    """Wrapper for ReactivityModel that initializes (once) and runs"""
+    return get_model(typ).eval(pert, nom)
 
 def reactivityModelEvald(pert, k, typ = "wtd"):
-    """Wrapper for ReactivityModel that initializes and runs"""
-    aa = ReactivityModel(typ)
-    return aa.evald(pert, k)
+    """Wrapper for ReactivityModel that initializes (once) and runs"""
+    return get_model(typ).evald(pert, k)
 
 def reactivityModelEvalg(pert, typ = "wtd"):
-    """Wrapper for ReactivityModel that initializes and runs"""
-    aa = ReactivityModel(typ)
-    return aa.evalg(pert)
+    """Wrapper for ReactivityModel that initializes (once) and runs"""
+    return get_model(typ).evalg(pert)
 
 if __name__ == "__main__":
     a = ReactivityModel()
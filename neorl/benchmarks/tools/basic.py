@@ -16,187 +16,140 @@
 
 import numpy as np
 
+# All functions accept a single vector of shape (d,) and return a float, or a population
+# of shape (npop, d) and return an array of shape (npop,). The sums run over the last axis
+
 def bent_cigar(x):
-    sm = 0.0
-    for i in range(1, len(x)):
-        sm += x[i]*x[i]
+    sm = np.sum(x[..., 1:]*x[..., 1:], axis=-1)
     sm *= 10e6
-    return x[0]*x[0] + sm
+    return x[..., 0]*x[..., 0] + sm
 
 def sum_diff_pow(x):
-    sm = 0.0
-    for i in range(0, len(x)):
-        sm += (abs(x[i])) ** (i+1)
-    return sm
+    i = np.arange(1, x.shape[-1]+1)
+    return np.sum(np.abs(x) ** i, axis=-1)
 
 def zakharov(x):
-    sms = 0.0
-    sm = 0.0
-    for i in range(0, len(x)):
-        sms += x[i]*x[i]
-        # Note: the i+1 term is not in the CEC function definitions, but is
-        # in the code and in any definition you find online
-        sm += (i+1)*x[i]
+    sms = np.sum(x*x, axis=-1)
+    # Note: the i+1 term is not in the CEC function definitions, but is
+    # in the code and in any definition you find online
+    sm = np.sum(np.arange(1, x.shape[-1]+1)*x, axis=-1)
     sm = 0.5 * sm
     sm = sm * sm
     return sms + sm + (sm * sm)
 
 def rosenbrock(x):
     x = 0.02048 * x + 1.0
-    sm = 0
-    for i in range(0, len(x)-1):
-        t1 = x[i]*x[i] - x[i+1]
-        t1 = 100*t1*t1
-        t2 = x[i] - 1
-        t2 = t2*t2
-        sm += t1 + t2
-    return sm
+    t1 = x[..., :-1]*x[..., :-1] - x[..., 1:]
+    t1 = 100*t1*t1
+    t2 = x[..., :-1] - 1
+    t2 = t2*t2
+    return np.sum(t1 + t2, axis=-1)
 
 def rastrigin(x):
     # Note: the 0.0512 shrinking is omitted in the problem definitions but is
     # present in the provided code
     x = 0.0512 * x
     tpi = 2.0 * np.pi
-    sm = 0.0
     cs = np.cos(tpi*x)
-    for i in range(0, len(x)):
-        sm += x[i]*x[i] - 10*cs[i]
-    return sm + 10*len(x)
+    return np.sum(x*x - 10*cs, axis=-1) + 10*x.shape[-1]
 
 def expanded_schaffers_f6(x):
-    sm = 0.0
-    for i in range(0, len(x)-1):
-        t = x[i]*x[i] + x[i+1]*x[i+1]
-        t1 = np.sin(np.sqrt(t))
-        t1 = t1*t1 - 0.5
-        t2 = 1 + 0.001*t
-        t2 = t2*t2
-        sm += 0.5 + t1/t2
-    return sm
+    t = x[..., :-1]*x[..., :-1] + x[..., 1:]*x[..., 1:]
+    t1 = np.sin(np.sqrt(t))
+    t1 = t1*t1 - 0.5
+    t2 = 1 + 0.001*t
+    t2 = t2*t2
+    return np.sum(0.5 + t1/t2, axis=-1)
 
 def lunacek_bi_rastrigin(x, shift=None, rotation=None):
     # a special case; we need the shift vector and rotation matrix
-    nx = len(x)
+    nx = x.shape[-1]
     if shift is None:
         shift = np.zeros(nx)
 
     # calculate the coefficients
     mu0=2.5
-    tmpx = np.zeros(nx)
     s = 1 - 1 / (2 * ((nx+20)**0.5) - 8.2)
     mu1 = -((mu0*mu0-1)/s)**0.5
 
     # shift and scale
     y = 0.1 * (x - shift)
 
-    for i in range(0, nx):
-        tmpx[i] = 2*y[i]
-        if shift[i] < 0.0:
-            tmpx[i] *= -1.0
+    tmpx = np.where(shift < 0.0, -2*y, 2*y)
 
     z = tmpx.copy()
     tmpx = tmpx + mu0
 
-    t1=0.0
-    t2=0.0
-    for i in range(0, nx):
-        t = tmpx[i]-mu0
-        t1 += t*t
-        t = tmpx[i]-mu1
-        t2 += t*t
+    t = tmpx-mu0
+    t1 = np.sum(t*t, axis=-1)
+    t = tmpx-mu1
+    t2 = np.sum(t*t, axis=-1)
     t2 *= s
     t2 += nx
 
-    y = z if rotation is None else np.matmul(rotation, z)
+    y = z if rotation is None else np.matmul(z, np.transpose(rotation))
 
-    t = 0.0
-    y = np.cos(2.0*np.pi*y)
-    for i in range(0, nx):
-        t += y[i]
+    t = np.sum(np.cos(2.0*np.pi*y), axis=-1)
 
-    r = t1 if t1 < t2 else t2
+    r = np.minimum(t1, t2)
     return r + 10.0*(nx-t)
 
 def non_cont_rastrigin(x, shift=None, rotation=None):
     # a special case; we need the shift vector and rotation matrix
     if shift is None:
-        shift = np.zeros(x.shape)
+        shift = np.zeros(x.shape[-1])
 
-    nx = len(x)
-    sm = 0.0
-    for i in range(0, nx):
-        if abs(x[i]-shift[i]) > 0.5:
-            x[i] = shift[i] + np.floor(2*(x[i]-shift[i])+0.5)/2
+    xs = x - shift
+    x = np.where(np.abs(xs) > 0.5, shift + np.floor(2*xs+0.5)/2, x)
 
     z = 0.0512 * (x - shift)
-    z = z if rotation is None else np.matmul(rotation, z)
+    z = z if rotation is None else np.matmul(z, np.transpose(rotation))
 
-    for i in range(0, nx):
-        sm += (z[i]*z[i] - 10.0*np.cos(2.0*np.pi*z[i]) + 10.0)
-    return sm
+    return np.sum(z*z - 10.0*np.cos(2.0*np.pi*z) + 10.0, axis=-1)
 
 def levy(x):
     # Note: the function definitions state to scale by 5.12/100, but the code
     # doesn't do this, and the example graph in the definitions correspond to
     # the version without scaling
     # x = 0.0512 * x
-    nx = len(x)
     w = 1.0 + 0.25*(x - 1.0)
 
-    term1 = (np.sin(np.pi*w[0]))**2
-    term3 = ((w[nx-1] - 1)**2) * (1 + ((np.sin(2*np.pi*w[nx-1]))**2))
-
-    sm = 0.0
+    term1 = (np.sin(np.pi*w[..., 0]))**2
+    term3 = ((w[..., -1] - 1)**2) * (1 + ((np.sin(2*np.pi*w[..., -1]))**2))
 
-    for i in range(0, nx-1):
-        wi = w[i]
-        newv = ((wi-1)**2) * (1 + 10*((np.sin(np.pi*wi+1))**2))
-        sm += newv
+    wi = w[..., :-1]
+    sm = np.sum(((wi-1)**2) * (1 + 10*((np.sin(np.pi*wi+1))**2)), axis=-1)
 
     return term1 + sm + term3
 
 def modified_schwefel(x):
-    nx = len(x)
+    nx = x.shape[-1]
     x = 10.0 * x # scale to search range
-    sm = 0.0
-    for i in range(0, nx):
-        z = x[i] + 420.9687462275036
-        if z < -500:
-            zm = (abs(z) % 500) - 500
-            t = z + 500
-            t = t*t
-            sm += zm * np.sin(np.sqrt(abs(zm))) - t / (10000*nx)
-        elif z > 500:
-            zm = 500 - (z % 500)
-            t = z - 500
-            t = t*t
-            sm += zm * np.sin(np.sqrt(abs(zm))) - t / (10000*nx)
-        else:
-            sm += z * np.sin(np.sqrt(abs(z)))
+    z = x + 420.9687462275036
+    # z < -500
+    zm = (np.abs(z) % 500) - 500
+    low = zm * np.sin(np.sqrt(np.abs(zm))) - (z + 500)**2 / (10000*nx)
+    # z > 500
+    zm = 500 - (z % 500)
+    high = zm * np.sin(np.sqrt(np.abs(zm))) - (z - 500)**2 / (10000*nx)
+    # -500 <= z <= 500
+    mid = z * np.sin(np.sqrt(np.abs(z)))
+    sm = np.sum(np.where(z < -500, low, np.where(z > 500, high, mid)), axis=-1)
 
     return 418.9829*nx - sm
 
 def high_conditioned_elliptic(x):
-    factor = 6 / (len(x) - 1)
-    sm = 0.0
-    for i in range(0, len(x)):
-        sm += x[i]*x[i] * 10**(i*factor)
-    return sm
+    factor = 6 / (x.shape[-1] - 1)
+    i = np.arange(x.shape[-1])
+    return np.sum(x*x * 10**(i*factor), axis=-1)
 
 def discus(x):
-    sm = 1e+6*x[0]*x[0]
-    for i in range(1, len(x)):
-        sm += x[i]*x[i]
-    return sm
+    return 1e+6*x[..., 0]*x[..., 0] + np.sum(x[..., 1:]*x[..., 1:], axis=-1)
 
 def ackley(x):
-    smsq = 0.0
-    smcs = 0.0
-    cs = np.cos((2*np.pi)*x)
-    for i in range(0, len(x)):
-        smsq += x[i]*x[i]
-        smcs += cs[i]
-    inx = 1/len(x)
+    smsq = np.sum(x*x, axis=-1)
+    smcs = np.sum(np.cos((2*np.pi)*x), axis=-1)
+    inx = 1/x.shape[-1]
     return -20*np.exp(-0.2*np.sqrt(inx*smsq)) - np.exp(inx*smcs) + 20 + np.e
 
 def weierstrass(x):
@@ -204,94 +157,69 @@ def weierstrass(x):
     k = np.arange(start=0, stop=21, step=1)
     ak = 0.5**k
     bk = np.pi * (3**k)
-    sm = 0.0
-    for i in range(0, len(x)):
-        kcs = ak * np.cos(2*(x[i]+0.5)*bk)
-        ksm = 0.0
-        for j in range(0, 21):
-            ksm += kcs[j]
-        sm += ksm
-    kcs = ak * np.cos(bk)
-    ksm = 0.0
-    for j in range(0, 21):
-        ksm += kcs[j]
-    return sm - len(x)*ksm
+    sm = np.sum(ak * np.cos(2*(x[..., np.newaxis]+0.5)*bk), axis=(-2, -1))
+    ksm = np.sum(ak * np.cos(bk))
+    return sm - x.shape[-1]*ksm
 
 def griewank(x):
     x = 6.0 * x
     factor = 1/4000
-    cs = np.cos(x / np.arange(start=1, stop=len(x)+1))
-    sm = 0.0
-    pd = 1.0
-    for i in range(0, len(x)):
-        sm += factor*x[i]*x[i]
-        pd *= cs[i]
+    cs = np.cos(x / np.arange(start=1, stop=x.shape[-1]+1))
+    sm = np.sum(factor*x*x, axis=-1)
+    pd = np.prod(cs, axis=-1)
     return sm - pd + 1
 
 def katsuura(x):
     x = 0.05 * x
-    nx = len(x)
+    nx = x.shape[-1]
     pw = 10/(nx**1.2)
-    prd = 1.0
     tj = 2**np.arange(start=1, stop=33, step=1)
-    for i in range(0, nx):
-        tjx = tj*x[i]
-        t = np.abs(tjx - np.round(tjx)) / tj
-        tsm = 0.0
-        for j in range(0, 32):
-            tsm += t[j]
-        prd *= (1+ (i+1)*tsm)**pw
+    tjx = tj*x[..., np.newaxis]
+    tsm = np.sum(np.abs(tjx - np.round(tjx)) / tj, axis=-1)
+    prd = np.prod((1 + np.arange(1, nx+1)*tsm)**pw, axis=-1)
     df = 10/(nx*nx)
     return df*prd - df
 
 def happy_cat(x):
     x = (0.05 * x) - 1
-    nx = len(x)
-    sm = 0.0
-    smsq = 0.0
-    for i in range(0, nx):
-        sm += x[i]
-        smsq += x[i]*x[i]
-    return (abs(smsq - nx))**0.25 + (0.5*smsq + sm)/nx + 0.5
+    nx = x.shape[-1]
+    sm = np.sum(x, axis=-1)
+    smsq = np.sum(x*x, axis=-1)
+    return (np.abs(smsq - nx))**0.25 + (0.5*smsq + sm)/nx + 0.5
 
 def h_g_bat(x):
     x = (0.05 * x) - 1
-    nx = len(x)
-    sm = 0.0
-    smsq = 0.0
-    for i in range(0, nx):
-        sm += x[i]
-        smsq += x[i]*x[i]
-    return (abs(smsq*smsq - sm*sm))**0.5 + (0.5*smsq + sm)/nx + 0.5
+    nx = x.shape[-1]
+    sm = np.sum(x, axis=-1)
+    smsq = np.sum(x*x, axis=-1)
+    return (np.abs(smsq*smsq - sm*sm))**0.5 + (0.5*smsq + sm)/nx + 0.5
 
 def expanded_griewanks_plus_rosenbrock(x):
     x = (0.05 * x) + 1
 
-    sm = 0.0
-    for i in range(0, len(x)-1):
-        tmp1 = x[i]*x[i]-x[i+1]
-        tmp2 = x[i] - 1.0
-        temp = 100*tmp1*tmp1 + tmp2*tmp2
-        sm += (temp*temp)/4000.0 - np.cos(temp) + 1
-        tmp1 = x[-1]*x[-1] - x[0]
-        tmp2 = x[-1] - 1
-        temp = 100.0*tmp1*tmp1 + tmp2*tmp2
-        sm += (temp*temp)/4000.0 - np.cos(temp) + 1.0
+    tmp1 = x[..., :-1]*x[..., :-1]-x[..., 1:]
+    tmp2 = x[..., :-1] - 1.0
+    temp = 100*tmp1*tmp1 + tmp2*tmp2
+    sm = np.sum((temp*temp)/4000.0 - np.cos(temp) + 1, axis=-1)
+    # Note: the original code adds the (x[-1], x[0]) term inside the loop,
+    # so it is counted len(x)-1 times, which is kept for consistency
+    tmp1 = x[..., -1]*x[..., -1] - x[..., 0]
+    tmp2 = x[..., -1] - 1
+    temp = 100.0*tmp1*tmp1 + tmp2*tmp2
+    sm += (x.shape[-1]-1)*((temp*temp)/4000.0 - np.cos(temp) + 1.0)
     return sm
 
 def schaffers_f7(x):
-    nx = len(x)
+    nx = x.shape[-1]
     # Note: the function definitions state to scale by 0.5/100, but the code
     # doesn't do this, and the example graph in the definitions correspond to
     # the version without scaling
     # x = 0.005 * x
-    sm = 0.0
-    for i in range(0, nx-1):
-        si = (x[i]*x[i] + x[i+1]*x[i+1])**0.5
-        tmp = np.sin(50.0*(si**0.2))
-        # Note: the original code has this error here (tmp shouldn't be squared)
-        # that I'm keeping for consistency.
-        sm += (si**0.5) * (tmp*tmp + 1)
+    si = (x[..., :-1]*x[..., :-1] + x[..., 1:]*x[..., 1:])**0.5
+    tmp = np.sin(50.0*(si**0.2))
+    # Note: the original code has this error here (tmp shouldn't be squared)
+    # that I'm keeping for consistency.
+    sm = np.sum((si**0.5) * (tmp*tmp + 1), axis=-1)
     sm = (sm*sm) / (nx*nx - 2*nx + 1)
     return sm
 
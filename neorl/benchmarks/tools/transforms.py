@@ -17,56 +17,139 @@
 import numpy as np
 import pickle
 import os
+import sys
+from collections.abc import Mapping
 
-#print(os.path.join(os.path.dirname(__file__), 'data.pkl'))
+# The CEC2017 data (rotation matrices, shift vectors and permutations) is distributed in data.pkl.
+# Nothing is read when this module is imported: the first time an array is requested, data.pkl
+# is converted to one .npy file per array (in the cec17 folder next to it), and the .npy files are
+# then opened with mmap_mode='r'. This way only the matrices of the requested dimension are read,
+# and the pages are shared by all the processes that evaluate the functions in parallel.
+# If the folder cannot be written, the arrays of data.pkl are kept in memory instead.
 
-with open(os.path.join(os.path.dirname(__file__), 'data.pkl'), 'rb') as _pkl_file:
-    _pkl = pickle.load(_pkl_file)
+_pkl_path = os.path.join(os.path.dirname(__file__), 'data.pkl')
+_npy_dir = os.path.join(os.path.dirname(__file__), 'cec17')
+_pkl = None
+_arrays = {}
+
+def _read_pkl():
+    global _pkl
+    if _pkl is None:
+        with open(_pkl_path, 'rb') as _pkl_file:
+            _pkl = pickle.load(_pkl_file)
+    return _pkl
+
+def _export_npy():
+    #writes every array of data.pkl to its own .npy file, returns False if the folder is not writable
+    data = _read_pkl()    #raises FileNotFoundError before creating the folder if data.pkl is not installed
+    try:
+        os.makedirs(_npy_dir, exist_ok=True)
+        for key, value in data.items():
+            path = os.path.join(_npy_dir, key + '.npy')
+            if not os.path.exists(path):
+                #write to a temporary file first, so other processes never open a partial file
+                tmp = os.path.join(_npy_dir, '{}.{}.tmp.npy'.format(key, os.getpid()))
+                np.save(tmp, np.asarray(value))
+                os.replace(tmp, path)
+    except OSError:
+        return False
+    return True
+
+def load(key):
+    """
+    Returns one array of the CEC2017 data (e.g. 'M_D10' or 'shift'), it is read only once
+
+    :param key: (str) name of the array in data.pkl
+    :return: (numpy.ndarray) the array, memory-mapped when possible
+    """
+    if key not in _arrays:
+        path = os.path.join(_npy_dir, key + '.npy')
+        if os.path.exists(path) or _export_npy():
+            #a plain ndarray view of the mapped file avoids the overhead of np.memmap on every indexing
+            _arrays[key] = np.asarray(np.load(path, mmap_mode='r', allow_pickle=False))
+        else:
+            _arrays[key] = np.asarray(_read_pkl()[key])
+    return _arrays[key]
+
+class _LazyData(Mapping):
+    #a read-only {dimension: array} dict whose arrays are loaded on first access
+    def __init__(self, keys):
+        self._keys = keys
+    def __getitem__(self, nx):
+        return load(self._keys[nx])
+    def __iter__(self):
+        return iter(self._keys)
+    def __len__(self):
+        return len(self._keys)
 
 # Each has shape (20, N, N) containing an N-dimensional rotation matrix
 # for functions f1 to f20
-rotations = {
-    2: _pkl['M_D2'],
-    10: _pkl['M_D10'],
-    20: _pkl['M_D20'],
-    30: _pkl['M_D30'],
-    50: _pkl['M_D50'],
-    100: _pkl['M_D100']
-}
+rotations = _LazyData({
+    2: 'M_D2',
+    10: 'M_D10',
+    20: 'M_D20',
+    30: 'M_D30',
+    50: 'M_D50',
+    100: 'M_D100'
+})
 
 # Each has shape (10, 10, N, N) containing 10 N-dimensional rotation matrices
 # for functions f21 to f30
-rotations_cf = {
-    2: _pkl['M_cf_d2'],
-    10: _pkl['M_cf_D10'],
-    20: _pkl['M_cf_D20'],
-    30: _pkl['M_cf_D30'],
-    50: _pkl['M_cf_D50'],
-    100: _pkl['M_cf_D100']
-}
-
-# Shape (20, 100)
-# Contains 100-dimension shift vectors for functions f1 to f20
-shifts = _pkl['shift']
-
-# Shape (10, 10, 100)
-# Contains 10 100-dimension shift vectors for functions f21 to f30
-shifts_cf = _pkl['shift_cf']
+rotations_cf = _LazyData({
+    2: 'M_cf_d2',
+    10: 'M_cf_D10',
+    20: 'M_cf_D20',
+    30: 'M_cf_D30',
+    50: 'M_cf_D50',
+    100: 'M_cf_D100'
+})
 
 # Each has shape (10, N) containing N-dimensional permutations for functions f11
 # to f20 (note: the original were 1-indexed, these are 0-indexed)
-shuffles = {
-    10: _pkl['shuffle_D10'],
-    30: _pkl['shuffle_D30'],
-    50: _pkl['shuffle_D50'],
-    100: _pkl['shuffle_D100']
-}
+shuffles = _LazyData({
+    10: 'shuffle_D10',
+    30: 'shuffle_D30',
+    50: 'shuffle_D50',
+    100: 'shuffle_D100'
+})
 
 # Each has shape (2, 10, N) containing 10 N-dimensional permutations for
 # functions f29 and f30 (note: the original were 1-indexed, these are 0-indexed)
-shuffles_cf = {
-    10: _pkl['shuffle_cf_D10'],
-    30: _pkl['shuffle_cf_D30'],
-    50: _pkl['shuffle_cf_D50'],
-    100: _pkl['shuffle_cf_D100']
-}
+shuffles_cf = _LazyData({
+    10: 'shuffle_cf_D10',
+    30: 'shuffle_cf_D30',
+    50: 'shuffle_cf_D50',
+    100: 'shuffle_cf_D100'
+})
+
+def get_shifts():
+    """
+    Shift vectors of the functions f1 to f20
+
+    :return: (numpy.ndarray) shape (20, 100), 100-dimension shift vectors
+    """
+    return load('shift')
+
+def get_shifts_cf():
+    """
+    Shift vectors of the composition functions f21 to f30
+
+    :return: (numpy.ndarray) shape (10, 10, 100), 10 100-dimension shift vectors per function
+    """
+    return load('shift_cf')
+
+def __getattr__(name):
+    #transforms.shifts and transforms.shifts_cf are loaded on first access (python >= 3.7, PEP 562)
+    if name == 'shifts':
+        return get_shifts()
+    if name == 'shifts_cf':
+        return get_shifts_cf()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+if sys.version_info < (3, 7):
+    #module __getattr__ is not supported, the shift vectors are loaded at import if data.pkl is available
+    try:
+        shifts = get_shifts()
+        shifts_cf = get_shifts_cf()
+    except (OSError, KeyError):
+        pass
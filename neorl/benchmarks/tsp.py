@@ -28,7 +28,6 @@
 import gym
 from gym.spaces import Discrete, Box, MultiDiscrete
 import numpy as np
-import bisect
 import copy
 import matplotlib.pyplot as plt
 import random
@@ -42,33 +41,25 @@ import random
 
 class TSP(gym.Env):
 
-  def __init__ (self,city_loc_list,optimum_tour_city = None, episode_length = None, method = None):                
-    self.city_library = {}
-    self.city_dist_to_origin = {}
-    self.city_clost_to_each_other = {}
-    self.city_clost_to_each_other_for_helperfunc = {}
-    self.number_of_cities = len(city_loc_list)
+  def __init__ (self,city_loc_list,optimum_tour_city = None, episode_length = None, method = None, n_neighbours = 10):                
+    self.city_loc = np.array([[loc[0], loc[1]] for loc in city_loc_list], dtype = float) # coordinates, city 'i' is in row i - 1
+    self.number_of_cities = len(self.city_loc)
     self.state = - 10**6.0 * np.ones((self.number_of_cities,4), dtype = float) # initialize the state space with a single number 
-    for i in range(len(city_loc_list)): # initialize the dictionnaries
-        self.city_library["%d"%(i + 1)] = [city_loc_list[i][0],city_loc_list[i][1]]
-        loc1 = np.array([city_loc_list[i][0],city_loc_list[i][1]])
-        dist = np.sqrt(np.sum(np.power(loc1,2)))
-        self.city_dist_to_origin["%d"%(i + 1)] = dist # get the distance of each city to the origin and store it in a dictionnary
-        close_dist = []
-        i_close_dist = []
-        for index in range(0,self.number_of_cities):
-            if index != i:
-                loc2 = np.array([city_loc_list[index][0],city_loc_list[index][1]])
-                dist2 = np.sqrt(np.sum(np.power(loc1 - loc2,2)))
-                bisect.insort_left(close_dist,dist2) 
-                new_index = np.where(close_dist == dist2)[0][0]
-                i_close_dist = np.insert(i_close_dist,new_index,"%d"%(index+1))
-        self.city_clost_to_each_other["%d"%(i + 1)] = close_dist 
-        self.city_clost_to_each_other_for_helperfunc["%d"%(i + 1)] = i_close_dist #  evaluate the closest city to each city and store it in a dictionnary
+    # distance between every pair of cities and distance of each city to the origin 
+    self.dist_matrix = np.sqrt(np.sum(np.power(self.city_loc[:,None,:] - self.city_loc[None,:,:],2), axis = 2))
+    self.round_dist_matrix = np.round(self.dist_matrix) # the tour cost sums the rounded distance of every leg
+    self.dist_to_origin = np.sqrt(np.sum(np.power(self.city_loc,2), axis = 1))
+    # nearest neighbours of each city, sorted from the closest (used by the local search) 
+    other_cities = self.dist_matrix + np.diag(np.full(self.number_of_cities, np.inf))
+    n_neighbours = max(1, min(n_neighbours, self.number_of_cities - 1))
+    self.neighbours = np.argsort(other_cities, axis = 1, kind = 'stable')[:,:n_neighbours]
+    self.closest_dist = other_cities[np.arange(self.number_of_cities), self.neighbours[:,0]] # distance to the closest city
     
     self.episode_length = episode_length # Number of tsp solved per episodes
-    self.city_id = copy.deepcopy(list(self.city_library.keys())) # list with the ids of the cities
+    self.city_ids = ["%d"%(i + 1) for i in range(self.number_of_cities)] # ids of the cities
+    self.city_id = list(self.city_ids) # cities not visited yet in the current tour
     self.city_list = [] # List representing a tour
+    self.tour_index = [] # index of the cities in the state space, in the order of the tour
     
     self.counter = 0 # counter to record a tour
     self.subcounter = 0 # counter to record each tour per episode
@@ -88,12 +79,34 @@ class TSP(gym.Env):
     self.done = False
     if optimum_tour_city is not None: # record the (known) best tour map and plot it
         optimum_tour_map = - 10**6.0 * np.ones((self.number_of_cities,4), dtype = float) 
-        for increment in range(0,len(list(self.city_library.keys()))):
-            optimum_tour_map[:,0][increment] = self.city_library['%d'%(optimum_tour_city[increment])][0]
-            optimum_tour_map[:,1][increment] = self.city_library['%d'%(optimum_tour_city[increment])][1] 
+        optimum_tour_map[:,:2] = self.city_loc[np.asarray(optimum_tour_city, dtype = int) - 1]
         optimum_tour_value = np.ceil(-1 * self.Compute_tour_cost(tour = optimum_tour_map))
         title_map = " Length of Tour : {} \n".format(optimum_tour_value)
-        _plot_tour_map(optimum_tour_map,flag = False, name = "Optimum_Tour_map_%d.png"%(len(self.city_id)), title_map = title_map)
+        _plot_tour_map(optimum_tour_map,flag = False, name = "Optimum_Tour_map_%d.png"%(len(self.city_ids)), title_map = title_map)
+
+  def _add_city(self, index):
+    """
+      Place the city of index 'index' in the (partial) tour at the location that reduces 
+      the cost of the tour the most and fill the state space
+    """
+    tour = self.tour_index
+    if len(tour) != 0:
+        # inserting the city before position k replaces the leg (k-1, k) by the legs (k-1, city) and (city, k)
+        prev = np.roll(tour, 1)
+        added_cost = self.round_dist_matrix[prev, index] + self.round_dist_matrix[index, tour] - self.round_dist_matrix[prev, tour]
+        best_k = int(np.argmin(added_cost))
+    else:
+        best_k = 0
+    tour.insert(best_k, index)
+    self.state[:len(tour),0] = self.city_loc[tour,0]
+    self.state[:len(tour),1] = self.city_loc[tour,1]
+    self.state[:,2][self.counter - 1] = self.closest_dist[index]
+    self.state[:,3][self.counter - 1] = self.dist_to_origin[index]
+
+  def _clear_tour(self):
+    self.city_id = list(self.city_ids)
+    self.tour_index = []
+    self.state[:,:] = - 10**6.0
 
   def step(self, x): 
     if self.method in ['ppo', 'a2c', 'acktr', 'neat']:
@@ -103,107 +116,37 @@ class TSP(gym.Env):
                 self.reset()
             self.counter += 1
 
-            if action <= len(self.city_id) - 1:  
-                new_city = self.city_id[action] # recover the city corresponding to action 'action'
-            else: # ensure a valid action considering that the action space is fixed
+            if action > len(self.city_id) - 1: # ensure a valid action considering that the action space is fixed
                 action = random.randint(0,len(self.city_id) - 1)
-                new_city = self.city_id[action]
-
-            if len(np.where(self.state[:,0] != -10**6.0)[0]) != 0:
-                non_zero = np.where(self.state[:,0] != -10**6.0)[0]
-                max_cost = -10**6.0
-                for k in range(len(non_zero)): # place the city chosen in the location that reduces the partial tour
-                    temp_state_0 = copy.deepcopy(self.state[:,0])
-                    temp_state_1 = copy.deepcopy(self.state[:,1])
-                    self.state[:,0] = np.delete(np.insert(self.state[:,0],k,self.city_library[new_city][0]),-1)
-                    self.state[:,1] = np.delete(np.insert(self.state[:,1],k,self.city_library[new_city][1]),-1)
-                    temp_score = self.Compute_tour_cost()# evalaute the cost of a partial tour 
-                    if temp_score > max_cost:
-                        best_k = k
-                        max_cost = temp_score
-                    self.state[:,0] = temp_state_0
-                    self.state[:,1] = temp_state_1
-
-                # fill the state space
-                self.state[:,0] = np.delete(np.insert(self.state[:,0],best_k,self.city_library[new_city][0]),-1) 
-                self.state[:,1] = np.delete(np.insert(self.state[:,1],best_k,self.city_library[new_city][1]),-1)
-                self.state[:,2][self.counter - 1] = self.city_clost_to_each_other[new_city][0]
-                self.state[:,3][self.counter - 1] = self.city_dist_to_origin[new_city]
-
-            else: # place the first city and fill the state space
-                self.state[:,0][self.counter - 1] = self.city_library[new_city][0]
-                self.state[:,1][self.counter - 1] = self.city_library[new_city][1] 
-                self.state[:,2][self.counter - 1] = self.city_clost_to_each_other[new_city][0]
-                self.state[:,3][self.counter - 1] = self.city_dist_to_origin[new_city]
-
-            index1 = self.city_id.index(self.city_id[action]) # remove the city chosen by action : 'action' from the action space
-            self.city_id.pop(index1)
+            new_city = self.city_id.pop(action) # recover the city corresponding to action 'action' and remove it from the action space
+            self._add_city(int(new_city) - 1)
             self.city_list.append(new_city) # sequence of cities in the tour (for neorl callback)
 
         reward = self._get_stats()
         self.subcounter += 1 
         if self.subcounter != self.episode_length + 1: # generate the new tour
-            self.city_id = copy.deepcopy(list(self.city_library.keys()))
             individual = self.city_list
             self.city_list = []
-            self.state[:,0] = - 10**6.0 * np.ones(self.number_of_cities)
-            self.state[:,1] = - 10**6.0 * np.ones(self.number_of_cities)
-            self.state[:,2] = - 10**6.0 * np.ones(self.number_of_cities)
-            self.state[:,3] = - 10**6.0 * np.ones(self.number_of_cities)      
+            self._clear_tour()
     
     elif self.method in ['acer', 'dqn']:
         action = x
-        if action <= len(self.city_id) - 1:  
-            new_city = self.city_id[action] # recover the city corresponding to action 'action'
-        else: # ensure a valid action considering that the action space is fixed
+        if action > len(self.city_id) - 1: # ensure a valid action considering that the action space is fixed
             action = random.randint(0,len(self.city_id) - 1)
-            new_city = self.city_id[action]
+        new_city = self.city_id.pop(action) # recover the city corresponding to action 'action' and remove it from the action space
         self.counter += 1 # --- increment the global counter
-        if len(np.where(self.state[:,0] != -10**6.0)[0]) != 0:
-            non_zero = np.where(self.state[:,0] != -10**6.0)[0]
-            max_cost = -10**6.0
-            for k in range(len(non_zero)): # place the city chosen in the location that reduces the partial tour
-                temp_state_0 = copy.deepcopy(self.state[:,0])
-                temp_state_1 = copy.deepcopy(self.state[:,1])
-                self.state[:,0] = np.delete(np.insert(self.state[:,0],k,self.city_library[new_city][0]),-1)
-                self.state[:,1] = np.delete(np.insert(self.state[:,1],k,self.city_library[new_city][1]),-1)
-                temp_score = self.Compute_tour_cost()# evalaute the cost of a partial tour 
-                if temp_score > max_cost:
-                    best_k = k
-                    max_cost = temp_score
-                self.state[:,0] = temp_state_0
-                self.state[:,1] = temp_state_1
-            # fill the state space
-            self.state[:,0] = np.delete(np.insert(self.state[:,0],best_k,self.city_library[new_city][0]),-1) 
-            self.state[:,1] = np.delete(np.insert(self.state[:,1],best_k,self.city_library[new_city][1]),-1)
-            self.state[:,2][self.counter - 1] = self.city_clost_to_each_other[new_city][0]
-            self.state[:,3][self.counter - 1] = self.city_dist_to_origin[new_city]
-        else:
-            self.state[:,0][self.counter - 1] = self.city_library[new_city][0]
-            self.state[:,1][self.counter - 1] = self.city_library[new_city][1] 
-            self.state[:,2][self.counter - 1] = self.city_clost_to_each_other[new_city][0]
-            self.state[:,3][self.counter - 1] = self.city_dist_to_origin[new_city]
-
-
-        index1 = self.city_id.index(self.city_id[action]) # remove the city chosen by action : 'action' from the action space
-        self.city_id.pop(index1)
+        self._add_city(int(new_city) - 1)
         self.city_list.append(new_city) # sequence of cities in the tour (for neorl callback)
-        reward = self._get_stats(flag = False#self.state = - 10**6.0 * np.ones((self.number_of_cities,4), dtype = float)
-    ) * -10**3 # evaluate a partial tour. Increase the reward for it to be always bigger than a full tour
+        reward = self._get_stats(flag = False) * -10**3 # evaluate a partial tour. Increase the reward for it to be always bigger than a full tour
 
-        if len(np.where(self.state[:,0] == -10**6.0)[0]) == 0:# a tour is complete.
+        if len(self.tour_index) == self.number_of_cities:# a tour is complete.
             reward = self._get_stats()
             self.subcounter += 1
             self.counter = 0
             if self.subcounter != self.episode_length + 1: # generate the new tour 
-                self.city_id = copy.deepcopy(list(self.city_library.keys()))
                 individual = self.city_list
                 self.city_list = []
-                #self.state = - 10**6.0* * np.ones((self.number_of_cities,4), dtype = float)# reinitialize the state space
-                self.state[:,0] = - 10**6.0 * np.ones(self.number_of_cities)
-                self.state[:,1] = - 10**6.0 * np.ones(self.number_of_cities)
-                self.state[:,2] = - 10**6.0 * np.ones(self.number_of_cities)
-                self.state[:,3] = - 10**6.0 * np.ones(self.number_of_cities)
+                self._clear_tour()
         else:
             individual = self.city_list # a tour is not complete. No individuals are return (for neorl callback function)
 
@@ -215,40 +158,56 @@ class TSP(gym.Env):
 
   def reset(self):
     self.done = False
-    self.city_id = copy.deepcopy(list(self.city_library.keys()))
-    self.state[:,0] = - 10**6.0 * np.ones(self.number_of_cities)
-    self.state[:,1] = - 10**6.0 * np.ones(self.number_of_cities)
-    self.state[:,2] = - 10**6.0 * np.ones(self.number_of_cities)
-    self.state[:,3] = - 10**6.0 * np.ones(self.number_of_cities)
+    self._clear_tour()
     return (self.state.flatten())
 
   def Compute_tour_cost(self, tour = None):
     if tour is None:
-        tour = copy.deepcopy(self.state)
-    cost = 0
+        tour = self.state
     limit_tour = np.where(tour[:,0] == -10**6.0)[0] # a tour ends with the traveling salesman circling back to the initial city
     if len(limit_tour) > 0:
         limit_tour = limit_tour[0] - 1
     else:
         limit_tour = self.number_of_cities - 1  
-    for increment in range(0,limit_tour): # compute euclidean distance from cities to cities
-        loc1 = np.array([tour[:,0][increment],tour[:,1][increment]])
-        loc2 = np.array([tour[:,0][increment + 1],tour[:,1][increment + 1]])
-        dist = np.sqrt(np.sum(np.power(loc1 - loc2,2)))
-        cost += int(round(dist))
-    loc1 = np.array([tour[:,0][limit_tour],tour[:,1][limit_tour]])
-    loc2 = np.array([tour[:,0][0],tour[:,1][0]])
-    dist = np.sqrt(np.sum(np.power(loc1 - loc2,2)))
-    cost += int(round(dist)) 
+    if limit_tour < 0: # empty tour
+        return 0
+    # compute euclidean distance from cities to cities
+    loc = tour[:limit_tour + 1,:2]
+    dist = np.sqrt(np.sum(np.power(loc - np.roll(loc, -1, axis = 0),2), axis = 1))
+    cost = int(np.sum(np.round(dist)))
     score  =  - cost 
     return score    
 
+  def tour_length(self, tours):
+    """
+      Compute the cost of complete tours with the distance matrix (same cost as Compute_tour_cost)
+      
+      :param tours: (list or array) a tour, or 2D array of shape (ntours, number_of_cities), given as city ids from 1 to number_of_cities
+      :return: (int or numpy array) the cost of every tour
+    """
+    index = np.asarray(tours, dtype = int) - 1
+    return self.round_dist_matrix[index, np.roll(index, -1, axis = -1)].sum(axis = -1).astype(int)
+
+  def local_search(self, tours, max_passes = 50):
+    """
+      Improve a batch of tours with 2-opt and Or-opt moves (first improvement over the nearest neighbours of each city),
+      until no move improves the tours or max_passes is reached
+      
+      :param tours: (list or array) a tour, or 2D array of shape (ntours, number_of_cities), given as city ids from 1 to number_of_cities
+      :param max_passes: (int) maximum number of passes over all cities for each tour
+      :return: (tuple) the improved tours (same shape as tours) and their cost
+    """
+    index = np.asarray(tours, dtype = int) - 1
+    improved = np.array([_local_search(tour, self.round_dist_matrix, self.neighbours, max_passes) 
+                         for tour in index.reshape(-1, self.number_of_cities)]).reshape(index.shape) + 1
+    return improved, self.tour_length(improved)
+
   def _get_stats(self,flag = True):
       score = self.Compute_tour_cost() 
       if flag: # compute the best tour and plot it only for complete tour
         if score - self.best_tour > 0:
             self.best_tour = score
-            current_tour_cost = -1 * self.Compute_tour_cost(tour = self.state)
+            current_tour_cost = -1 * score
             title_map = " Episode: {}, Length of Tour : {} \n".format(self._iter_episode + 1, np.ceil(current_tour_cost))
             _plot_tour_map(self.state,flag = False, name = "Best_Tour_map_%d_%s.png"%(self.number_of_cities,self.method), title_map = title_map)
 
@@ -257,6 +216,71 @@ class TSP(gym.Env):
   def render(self, mode = 'human'):
     pass
 
+def _reverse(tour, pos, i, j):
+    """
+      Reverse tour[i+1..j] (i < j) in place and update the positions of the cities
+    """
+    tour[i+1:j+1] = tour[i+1:j+1][::-1]
+    pos[tour[i+1:j+1]] = np.arange(i+1, j+1)
+
+def _local_search(tour, dist, neighbours, max_passes):
+    """
+      2-opt and Or-opt local search of one tour (array of city indices)
+    """
+    tour = np.array(tour)
+    n = len(tour)
+    if n < 5:
+        return tour
+    pos = np.empty(n, dtype = int)
+    pos[tour] = np.arange(n)
+    for _ in range(max_passes):
+        improved = False
+        #--- 2-opt: replace the legs (a, succ a) and (c, succ c) by (a, c) and (succ a, succ c)
+        for a in range(n):
+            i = pos[a]
+            b = tour[(i + 1) % n]
+            for c in neighbours[a]:
+                if dist[a, c] >= dist[a, b]:
+                    break
+                j = pos[c]
+                d = tour[(j + 1) % n]
+                if c == b or d == a:
+                    continue
+                if dist[a, b] + dist[c, d] - dist[a, c] - dist[b, d] > 0:
+                    _reverse(tour, pos, min(i, j), max(i, j))
+                    improved = True
+                    break
+        #--- Or-opt: move a segment of 1 to 3 cities next to a neighbour of its first city
+        for length in [1, 2, 3]:
+            for s1 in range(n):
+                i = pos[s1]
+                if i + length >= n: # keep the segment inside the array (the first city of the array is kept in place)
+                    continue
+                segment = tour[i:i + length]
+                p, nxt = tour[i - 1], tour[i + length]
+                removal_gain = dist[p, s1] + dist[segment[-1], nxt] - dist[p, nxt]
+                for c in neighbours[s1]:
+                    if dist[c, s1] >= removal_gain:
+                        break
+                    j = pos[c]
+                    if i - 1 <= j < i + length or (i == 0 and j == n - 1): # c is in the segment or is the city before it (at the end of the array if i == 0)
+                        continue
+                    d = tour[(j + 1) % n]
+                    # insert between c and d, with the segment in the same order or reversed
+                    forward = dist[c, s1] + dist[segment[-1], d] - dist[c, d]
+                    backward = dist[c, segment[-1]] + dist[s1, d] - dist[c, d]
+                    if removal_gain - min(forward, backward) > 0:
+                        moved = segment if forward <= backward else segment[::-1]
+                        rest = np.delete(tour, np.arange(i, i + length))
+                        k = int(np.where(rest == c)[0][0]) + 1
+                        tour = np.concatenate([rest[:k], moved, rest[k:]])
+                        pos[tour] = np.arange(n)
+                        improved = True
+                        break
+        if not improved:
+            break
+    return tour
+
 def _plot_tour_map(tour_embed,dirname_2 = ".", flag = False, name ="Tour_map.png", title_map = None):
     """
       Plot a Tour stored in : tour_embed
@@ -26,9 +26,10 @@
 
 import random
 import numpy as np
-import joblib
+from neorl.evolu.discrete import Space
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population
+from neorl.utils.evaluator import batch_fit, Evaluator
 
 class ACO(object):
     """
@@ -43,10 +44,12 @@ class ACO(object):
     :param Z: (float) deviation-distance ratio or pheromone evaporation rate, high Z leads to slow convergence (see **Notes** below).
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all ants as a 2D array of shape (nants, d) and must return an array of shape (nants,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
     """
 
     def __init__(self, mode, fit, bounds, nants=40, narchive=10,
-                 Q=0.5, Z=1.0, ncores=1, seed=None):
+                 Q=0.5, Z=1.0, ncores=1, seed=None, vectorized=False, evaluator=None):
         
         assert narchive <= nants, '--error: narchive must be less than or equal nants'
         self.seed=seed
@@ -64,12 +67,15 @@ class ACO(object):
                 use either `min` or `max`')
             
         self.bounds = bounds
+        self.space = Space(bounds)
         self.npop = narchive
         self.nvars = len(bounds)
         self.nants = nants
         self.q = Q
         self.z = Z
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         
         self.__final_best_solution = None 
         self.__probs = None
@@ -96,20 +102,8 @@ class ACO(object):
         return j
 
     def ensure_bounds(self, vec): # bounds check
-        vec=vec.flatten()
-        vec_new = []
-
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # less than minimum 
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # more than maximum
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        return np.array(vec_new)
+        #clip a single ant to the lower/upper bounds
+        return self.space.clip(vec.flatten())
                       
     def evolute(self, ngen, x0=None, verbose=False):
         """
@@ -123,9 +117,9 @@ class ACO(object):
         """
         if x0:
             assert len(x0) == self.nants, '--error: the length of x0 ({}) (initial population) must equal to number of ants ({})'.format(len(x0), self.nants)
-            pops = Populations(self.nants, self.nvars, self.fit, self.bounds, ncores=self.ncores, x0=x0)
+            pops = Populations(self.nants, self.nvars, self.fit, self.bounds, ncores=self.ncores, x0=x0, vectorized=self.vectorized, evaluator=self.evaluator)
         else:
-            pops = Populations(self.nants, self.nvars, self.fit, self.bounds, ncores=self.ncores, x0=None)
+            pops = Populations(self.nants, self.nvars, self.fit, self.bounds, ncores=self.ncores, x0=None, vectorized=self.vectorized, evaluator=self.evaluator)
             
         fit_hist=[]
         self.history = {'local_fitness':[], 'global_fitness':[], 'last_pop':[]}
@@ -152,24 +146,27 @@ class ACO(object):
                 self.__sigmas[l_i, :] = (self.z * d) / (self.npop - 1) 
             
             self.__new_pops = Populations.createEmptyNewPopulations(self.nants, self.nvars)
+            positions = np.zeros((self.nants, self.nvars))
             for i in range(self.nants):
                 for j in range(self.nvars):
                     # Select Gaussian Kernel
                     k = self.__rouletteWheelSelection()
                     # Generate Gaussian Random Variable
-                    self.__new_pops[i].position[j] = self.__means[k, j] + self.__sigmas[k, j] * self.__random.randn()
-                # Apply Variable Bounds
-                self.__new_pops[i].position=self.ensure_bounds(self.__new_pops[i].position)
+                    positions[i, j] = self.__means[k, j] + self.__sigmas[k, j] * self.__random.randn()
+            # Apply Variable Bounds to all ants at once
+            positions = self.space.clip(positions)
+            for i in range(self.nants):
+                self.__new_pops[i].position=positions[i]
                 
             # Evaluation     
-            if self.ncores > 1:
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    temp_fitness=parallel(joblib.delayed(self.fit)(indv.position) for indv in self.__new_pops)
+            if self.vectorized:
+                temp_fitness=batch_fit(self.fit, [indv.position for indv in self.__new_pops])
                 for i in range(self.nants):
                     self.__new_pops[i].cost_function = temp_fitness[i]
             else:
+                temp_fitness=self.evaluator.map(self.fit, [indv.position for indv in self.__new_pops])
                 for i in range(self.nants):
-                    self.__new_pops[i].cost_function = self.fit(self.__new_pops[i].position)
+                    self.__new_pops[i].cost_function = temp_fitness[i]
                 
                     
             # Merge Main Population (Archive) and New Population (Samples)
@@ -287,7 +284,7 @@ class Populations(object):
     #"""
     #Specifies Populations of the Ant Colony i.e. the Archive Size
     #"""
-    def __init__(self, n_pop, n_vars, fit, bounds, ncores, x0=None):
+    def __init__(self, n_pop, n_vars, fit, bounds, ncores, x0=None, vectorized=False, evaluator=None):
         #"""
         #Constructor
         #:param: n_pop: population size
@@ -302,6 +299,8 @@ class Populations(object):
         self.pops_sorted = None
         self.x0=x0
         self.ncores=ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         
     def __initializePopulation(self):
         #"""
@@ -323,13 +322,10 @@ class Populations(object):
             else:
                 position.append(np.array(self.x0[i]))
 
-        if self.ncores > 1:
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                cost=parallel(joblib.delayed(self.fit)(indv) for indv in position)                
+        if self.vectorized:
+            cost=list(batch_fit(self.fit, position))
         else:
-            cost=[]
-            for i in range(self.npop):
-                cost.append(self.fit(position[i]))
+            cost=self.evaluator.map(self.fit, position)
                             
         for i in range(self.npop):
             self.__pops[i] = Population(position=position[i], cost_function=cost[i])
@@ -22,11 +22,12 @@
 import random
 import numpy as np
 import math
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 #Main reference of the BAT algorithm:
 #Xie, J., Zhou, Y., & Chen, H. (2013). A novel bat algorithm based on 
@@ -51,10 +52,13 @@ class BAT(object):
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors (must be ``<= nbats``)
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all bats as a 2D array of shape (nbats, d) and must return an array of shape (nbats,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the BAT phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
     def __init__(self, mode, bounds, fit, nbats=50, fmin=0, 
                  fmax=1, A=0.5, r0=0.5, alpha=1.0, gamma=0.9, 
-                 levy='False', int_transform='nearest_int', ncores=1, seed=None):
+                 levy='False', int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
         
         set_neorl_seed(seed)
         
@@ -71,6 +75,9 @@ class BAT(object):
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
         
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -78,6 +85,8 @@ class BAT(object):
             
         self.bounds=bounds
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.nbats=nbats
         
         self.fmax=fmax
@@ -103,10 +112,12 @@ class BAT(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=np.array([self.bounds[item][1] for item in self.bounds])
         self.ub=np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
 
     def init_sample(self, bounds):
         #sample initializer
@@ -130,15 +141,10 @@ class BAT(object):
         for case in range (0, position_array.shape[0]):
             core_lst.append(position_array[case, :])
     
-        if self.ncores > 1:
-
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in core_lst)
-                
+        if self.vectorized:
+            fitness_lst=list(self.fit_batch(core_lst))
         else:
-            fitness_lst=[]
-            for item in core_lst:
-                fitness_lst.append(self.fit_worker(item))
+            fitness_lst=self.evaluator.map(self.worker, core_lst)
         
         return fitness_lst
 
@@ -151,39 +157,16 @@ class BAT(object):
         return best_pos, best_fit 
     
     def ensure_bounds(self, vec, bounds):
-    
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(bounds.items()):
-    
-            # variable exceedes the minimum boundary
-            if vec[i] < bounds[key][1]:
-                vec_new.append(bounds[key][1])
-    
-            # variable exceedes the maximum boundary
-            if vec[i] > bounds[key][2]:
-                vec_new.append(bounds[key][2])
-    
-            # the variable is fine
-            if bounds[key][1] <= vec[i] <= bounds[key][2]:
-                vec_new.append(vec[i])
-                
-        return vec_new
-    
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
+
     def fit_worker(self, x):
-        #This worker is for parallel calculations
-        
-        # Clip the bat with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x,self.bounds)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-        
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all bats in one fitness call
+        return self.worker.batch(pop)
     
     def ensure_discrete(self, vec):
         #"""
@@ -197,19 +180,8 @@ class BAT(object):
         #vec - updated bat position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.a,
-                                               method=self.int_transform,
-                                               )
-        
-        return vec
-    
+        return self.space.discretize(vec, alpha=self.a, method=self.int_transform)
+
     def Levy(self, dim):
         #function to return levy step
         beta = 1.5
@@ -237,129 +209,156 @@ class BAT(object):
         self.history = {'local_fitness':[], 'global_fitness':[], 'A': [], 'r': []}
         self.fbest=float("inf")
         self.verbose=verbose
-        self.Positions = np.zeros((self.nbats, self.dim))
-        self.r=self.r0
-        if x0:
-            assert len(x0) == self.nbats, '--error: the length of x0 ({}) MUST equal the number of bats in the group ({})'.format(len(x0), self.nbats)
-            for i in range(self.nbats):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
-                if self.grid_flag:
-                    self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                else:
-                    self.Positions[i,:] = x0[i]
-        else:
-            # Initialize the positions of bats
-            for i in range(self.nbats):
-                self.Positions[i,:]=self.init_sample(self.bounds)
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            self.Positions = np.zeros((self.nbats, self.dim))
+            self.r=self.r0
+            if x0:
+                assert len(x0) == self.nbats, '--error: the length of x0 ({}) MUST equal the number of bats in the group ({})'.format(len(x0), self.nbats)
+                for i in range(self.nbats):
+                    check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                    if self.grid_flag:
+                        self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    else:
+                        self.Positions[i,:] = x0[i]
+            else:
+                # Initialize the positions of bats
+                for i in range(self.nbats):
+                    self.Positions[i,:]=self.init_sample(self.bounds)
         
-        #Initialize and evaluate the first bat population
-        fitness0=self.eval_bats(position_array=self.Positions)
-        x0, f0=self.select(pos=self.Positions,fit=fitness0)
-        self.xbest=np.copy(x0)
+            #Initialize and evaluate the first bat population
+            fitness0=self.eval_bats(position_array=self.Positions)
+            x0, f0=self.select(pos=self.Positions,fit=fitness0)
+            self.xbest=np.copy(x0)
         
         # Main BAT loop
         for l in range(0, ngen):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             self.a= 1 - l * ((1) / ngen)  #mir: a decreases linearly between 1 to 0, for discrete mutation
             #------------------------------------------------------
             # Stage 1A: Loop over all bats to update the positions
             #------------------------------------------------------
-            for i in range(0, self.nbats):
+            with phase(self.profiler, 'update'):
+                for i in range(0, self.nbats):
                 
-                if self.levy_flight:
-                    #Eq.(11) make a levy flight jump to increase population diversity
-                    self.Positions[i,:]=self.Positions[i,:]+np.multiply(np.random.randn(self.dim), self.Levy(self.dim))
+                    if self.levy_flight:
+                        #Eq.(11) make a levy flight jump to increase population diversity
+                        self.Positions[i,:]=self.Positions[i,:]+np.multiply(np.random.randn(self.dim), self.Levy(self.dim))
                 
-                #Eq.(8)-(10)
-                f1=((self.fmin-self.fmax)*l/ngen+self.fmax)*random.random()
-                f2=((self.fmax-self.fmin)*l/ngen+self.fmin)*random.random()
-                betas=random.sample(list(range(0,self.nbats)),4)
-                self.Positions[i, :]=self.xbest+f1*(self.Positions[betas[0],:]-self.Positions[betas[1],:])
-                +f2*(self.Positions[betas[2],:]-self.Positions[betas[3],:])
-                self.Positions[i, :] = self.ensure_bounds(self.Positions[i , :], self.bounds)
-                self.Positions[i, :] = self.ensure_discrete(self.Positions[i , :])
+                    #Eq.(8)-(10)
+                    f1=((self.fmin-self.fmax)*l/ngen+self.fmax)*random.random()
+                    f2=((self.fmax-self.fmin)*l/ngen+self.fmin)*random.random()
+                    betas=random.sample(list(range(0,self.nbats)),4)
+                    self.Positions[i, :]=self.xbest+f1*(self.Positions[betas[0],:]-self.Positions[betas[1],:])
+                    +f2*(self.Positions[betas[2],:]-self.Positions[betas[3],:])
+                #all bats are clipped and discretized at once (first check bounds, then check discrete)
+                with phase(self.profiler, 'ensure_bounds'):
+                    self.Positions = self.space.clip(self.Positions)
+                with phase(self.profiler, 'ensure_discrete'):
+                    self.Positions = self.space.discretize(self.Positions, alpha=self.a, method=self.int_transform)
             #-----------------------
             #Stage 1B: evaluation
             #-----------------------
-            fitness1=self.eval_bats(position_array=self.Positions)
-            x1, f1=self.select(pos=self.Positions,fit=fitness1)
-            if f1 <= self.fbest:
-                self.fbest=f1
-                self.xbest=x1.copy()
+            with phase(self.profiler, 'evaluation'):
+                fitness1=self.eval_bats(position_array=self.Positions)
+            with phase(self.profiler, 'selection'):
+                x1, f1=self.select(pos=self.Positions,fit=fitness1)
+                if f1 <= self.fbest:
+                    self.fbest=f1
+                    self.xbest=x1.copy()
             #---------------------------------
             #Stage 2A: Generate new positions
             #---------------------------------
-            for i in range(0, self.nbats):
-                # Pulse rate
-                if random.random() > self.r:
-                    self.Positions[i, :] = self.xbest + self.A * np.random.uniform(-1,1,self.dim)
-                self.Positions[i, :] = self.ensure_bounds(self.Positions[i , :], self.bounds)
-                self.Positions[i, :] = self.ensure_discrete(self.Positions[i , :])
+            with phase(self.profiler, 'update'):
+                for i in range(0, self.nbats):
+                    # Pulse rate
+                    if random.random() > self.r:
+                        self.Positions[i, :] = self.xbest + self.A * np.random.uniform(-1,1,self.dim)
+                #all bats are clipped and discretized at once (first check bounds, then check discrete)
+                with phase(self.profiler, 'ensure_bounds'):
+                    self.Positions = self.space.clip(self.Positions)
+                with phase(self.profiler, 'ensure_discrete'):
+                    self.Positions = self.space.discretize(self.Positions, alpha=self.a, method=self.int_transform)
             #-----------------------
             #Stage 2B: evaluation
             #-----------------------
-            fitness2=self.eval_bats(position_array=self.Positions)
-            x2, f2=self.select(pos=self.Positions,fit=fitness2)
-            if f2 <= self.fbest:
-                self.fbest=f2
-                self.xbest=x2.copy()
+            with phase(self.profiler, 'evaluation'):
+                fitness2=self.eval_bats(position_array=self.Positions)
+            with phase(self.profiler, 'selection'):
+                x2, f2=self.select(pos=self.Positions,fit=fitness2)
+                if f2 <= self.fbest:
+                    self.fbest=f2
+                    self.xbest=x2.copy()
             #---------------------------------
             #Stage 3A: Generate new positions
             #---------------------------------
-            for i in range(0, self.nbats):
-                # loudness effect
-                if random.random() < self.A:
-                    self.Positions[i, :] = self.xbest + self.r * np.random.uniform(-1,1,self.dim)
-                self.Positions[i, :] = self.ensure_bounds(self.Positions[i , :], self.bounds)
-                self.Positions[i, :] = self.ensure_discrete(self.Positions[i , :])
+            with phase(self.profiler, 'update'):
+                for i in range(0, self.nbats):
+                    # loudness effect
+                    if random.random() < self.A:
+                        self.Positions[i, :] = self.xbest + self.r * np.random.uniform(-1,1,self.dim)
+                #all bats are clipped and discretized at once (first check bounds, then check discrete)
+                with phase(self.profiler, 'ensure_bounds'):
+                    self.Positions = self.space.clip(self.Positions)
+                with phase(self.profiler, 'ensure_discrete'):
+                    self.Positions = self.space.discretize(self.Positions, alpha=self.a, method=self.int_transform)
             #-----------------------
             #Stage 3B: evaluation
             #-----------------------
-            fitness3=self.eval_bats(position_array=self.Positions)
-            x3, f3=self.select(pos=self.Positions,fit=fitness3)
-            if f3 <= self.fbest:
-                self.fbest=f3
-                self.xbest=x3.copy()
+            with phase(self.profiler, 'evaluation'):
+                fitness3=self.eval_bats(position_array=self.Positions)
+            with phase(self.profiler, 'selection'):
+                x3, f3=self.select(pos=self.Positions,fit=fitness3)
+                if f3 <= self.fbest:
+                    self.fbest=f3
+                    self.xbest=x3.copy()
             #---------------------------------
             #Stage 4: Check and update A/r
             #---------------------------------                
-            if min(f1, f2, f3) <= self.fbest:
-                #update A
-                self.A = self.alpha*self.A
-                #update r
-                self.r = self.r0*(1-math.exp(-self.gamma*l))  
+            with phase(self.profiler, 'update'):
+                if min(f1, f2, f3) <= self.fbest:
+                    #update A
+                    self.A = self.alpha*self.A
+                    #update r
+                    self.r = self.r0*(1-math.exp(-self.gamma*l))  
             #---------------------------------
             #Stage 5: post-processing
             #---------------------------------             
             #--mir
-            if self.mode=='max':
-                self.fitness_best_correct=-self.fbest
-                self.local_fitness = -min(f1 , f2 , f3)
-            else:
-                self.fitness_best_correct=self.fbest
-                self.local_fitness = min(f1 , f2 , f3)
+            with phase(self.profiler, 'logging'):
+                if self.mode=='max':
+                    self.fitness_best_correct=-self.fbest
+                    self.local_fitness = -min(f1 , f2 , f3)
+                else:
+                    self.fitness_best_correct=self.fbest
+                    self.local_fitness = min(f1 , f2 , f3)
             
-            self.last_pop=self.Positions.copy()
-            self.last_fit=np.array(fitness3).copy()
-            self.best_position=self.xbest.copy()
-            self.history['local_fitness'].append(self.local_fitness)
-            self.history['global_fitness'].append(self.fitness_best_correct)
-            self.history['A'].append(self.A)
-            self.history['r'].append(self.r)   
+                self.last_pop=self.Positions.copy()
+                self.last_fit=np.array(fitness3).copy()
+                self.best_position=self.xbest.copy()
+                self.history['local_fitness'].append(self.local_fitness)
+                self.history['global_fitness'].append(self.fitness_best_correct)
+                self.history['A'].append(self.A)
+                self.history['r'].append(self.r)   
             
-            # Print statistics
-            if self.verbose and i % self.nbats:
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('BAT step {}/{}, nbats={}, Ncores={}'.format((l+1)*self.nbats, ngen*self.nbats, self.nbats, self.ncores))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('Best Bat Fitness:', np.round(self.fitness_best_correct,6))
-                if self.grid_flag:
-                    self.bat_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
-                    print('Best Bat Position:', self.bat_decoded)
-                else:
-                    print('Best Bat Position:', self.best_position)
-                print('Loudness A:', self.A)
-                print('Pulse rate r:', self.r)
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                # Print statistics
+                if self.verbose and i % self.nbats:
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('BAT step {}/{}, nbats={}, Ncores={}'.format((l+1)*self.nbats, ngen*self.nbats, self.nbats, self.ncores))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('Best Bat Fitness:', np.round(self.fitness_best_correct,6))
+                    if self.grid_flag:
+                        self.bat_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
+                        print('Best Bat Position:', self.bat_decoded)
+                    else:
+                        print('Best Bat Position:', self.best_position)
+                    print('Loudness A:', self.A)
+                    print('Pulse rate r:', self.r)
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+            if self.profiler is not None:
+                self.profiler.end_generation()
         
         #mir-grid
         if self.grid_flag:
@@ -377,10 +376,15 @@ class BAT(object):
             self.last_fit=-self.last_fit
         
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
             
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.bat_correct, self.fitness_best_correct, self.history
\ No newline at end of file
@@ -24,11 +24,12 @@ import random
 import numpy as np
 import math
 import time
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 class CS(object):
     """
@@ -43,8 +44,11 @@ class CS(object):
     :param int_transform: (str) method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors (must be ``<= ncuckoos``)
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all cuckoos as a 2D array of shape (ncuckoos, d) and must return an array of shape (ncuckoos,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the CS phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__(self, mode, bounds, fit, ncuckoos=15, pa=0.25, int_transform='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, ncuckoos=15, pa=0.25, int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
         
         set_neorl_seed(seed)
         assert ncores <= ncuckoos, '--error: ncores ({}) must be less than or equal than ncuckoos ({})'.format(ncores, ncuckoos)
@@ -58,6 +62,9 @@ class CS(object):
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
           
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -65,6 +72,8 @@ class CS(object):
             
         self.bounds=bounds
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.ncuckoos = ncuckoos
         self.pa = pa # Discovery rate of parasitic eggs/solutions
         
@@ -81,10 +90,12 @@ class CS(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=np.array([self.bounds[item][1] for item in self.bounds])
         self.ub=np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
 
     def init_sample(self, bounds):
         #"""
@@ -108,23 +119,17 @@ class CS(object):
         if newnest is None:
             for case in range (0, self.Positions.shape[0]):
                 core_lst.append(self.Positions[case, :])
-            if self.ncores > 1:
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    fitness_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in core_lst)
+            if self.vectorized:
+                fitness_lst=list(self.fit_batch(core_lst))
             else:
-                fitness_lst=[]
-                for item in core_lst:
-                    fitness_lst.append(self.fit_worker(item))
+                fitness_lst=self.evaluator.map(self.worker, core_lst)
         else:# fitness of new cuckoo versus old cuckoo must also be compared. newnest are the new cuckoos
             for case in range (0, newnest.shape[0]):
                 core_lst.append(newnest[case, :])
-            if self.ncores > 1:
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    fitness_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in core_lst)
+            if self.vectorized:
+                fitness_lst=list(self.fit_batch(core_lst))
             else:
-                fitness_lst=[]
-                for item in core_lst:
-                    fitness_lst.append(self.fit_worker(item))
+                fitness_lst=self.evaluator.map(self.worker, core_lst)
             
         return fitness_lst
 
@@ -136,30 +141,16 @@ class CS(object):
         return best_pos, best_fit 
         
     def ensure_bounds(self, vec):
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # variable exceedes the minimum boundary
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # variable exceedes the maximum boundary
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # the variable is fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        return vec_new
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
 
     def fit_worker(self, x):
-        #This worker is for parallel calculations
-        # Clip the cuckoo with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all cuckoos in one fitness call
+        return self.worker.batch(pop)
 
     def ensure_discrete(self, vec):
         #"""
@@ -172,19 +163,8 @@ class CS(object):
         #Return:
         #vec - updated salp position vector with discrete values
         #"""
-
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.a,
-                                               method=self.int_transform,
-                                               )
-
-        return vec
+        
+        return self.space.discretize(vec, alpha=self.a, method=self.int_transform)
 
     def UpdateCuckoos(self):
         # perform Levy flights to generate 
@@ -204,9 +184,13 @@ class CS(object):
             v = np.random.randn(len(s))
             step = u / abs(v) ** (1 / beta)
             stepsize = 0.01 * (step * (s - self.best_position))
-            s = s + stepsize * np.random.randn(len(s))
-            tempnest[j,:]=self.ensure_bounds(s)
-            tempnest[j,:] = self.ensure_discrete(s)
+            tempnest[j,:] = s + stepsize * np.random.randn(len(s))
+        
+        #all cuckoos are clipped and discretized at once (first check bounds, then check discrete)
+        with phase(self.profiler, 'ensure_bounds'):
+            tempnest = self.space.clip(tempnest)
+        with phase(self.profiler, 'ensure_discrete'):
+            tempnest = self.space.discretize(tempnest, alpha=self.a, method=self.int_transform)
          
         return tempnest
         
@@ -223,101 +207,116 @@ class CS(object):
         self.history = {'local_fitness':[], 'global_fitness':[]}
         self.best_fitness=float("inf") 
         self.verbose=verbose
-        self.Positions = np.zeros((self.ncuckoos, self.dim))
-        if x0:
-            assert len(x0) == self.ncuckoos, '--error: the length of x0 ({}) MUST equal the number of cuckoos in the group ({})'.format(len(x0), self.ncuckoos)
-            for i in range(self.ncuckoos):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
-                if self.grid_flag:
-                    self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                else:
-                    self.Positions[i,:] = x0[i]
-        else:
-            #self.Positions=self.init_sample(self.bounds)  #TODO, update later for mixed-integer optimisation
-            # Initialize the positions of cuckoos
-            for i in range(self.ncuckoos):
-                self.Positions[i,:]=self.init_sample(self.bounds)
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            self.Positions = np.zeros((self.ncuckoos, self.dim))
+            if x0:
+                assert len(x0) == self.ncuckoos, '--error: the length of x0 ({}) MUST equal the number of cuckoos in the group ({})'.format(len(x0), self.ncuckoos)
+                for i in range(self.ncuckoos):
+                    check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                    if self.grid_flag:
+                        self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    else:
+                        self.Positions[i,:] = x0[i]
+            else:
+                #self.Positions=self.init_sample(self.bounds)  #TODO, update later for mixed-integer optimisation
+                # Initialize the positions of cuckoos
+                for i in range(self.ncuckoos):
+                    self.Positions[i,:]=self.init_sample(self.bounds)
 
-        fitness=self.eval_cuckoos() # evaluate the first cuckoos
-        self.best_position, self.best_fitness = self.select(pos = self.Positions,fit = fitness) # find the initial best position and fitness
+            fitness=self.eval_cuckoos() # evaluate the first cuckoos
+            self.best_position, self.best_fitness = self.select(pos = self.Positions,fit = fitness) # find the initial best position and fitness
         for l in range(1, ngen+1):# Main loop
+            if self.profiler is not None:
+                self.profiler.start_generation()
             
             self.a= 1 - (l-1) * ((1) / ngen)  #mir: a decreases linearly between 1 to 0, for discrete mutation
             #-----------------------------
             # Obtain new Cuckoo Positions by Lévy flights
             #-----------------------------
-            newnest = self.UpdateCuckoos() # new cuckoos after Lévy Flights
+            with phase(self.profiler, 'update'):
+                newnest = self.UpdateCuckoos() # new cuckoos after Lévy Flights
             #----------------------
             #  Evaluate New Cuckoos
             #----------------------
             # Evaluating all new solutions
-            tempnest = np.copy(self.Positions)
-            fnew = self.eval_cuckoos(newnest)
+            with phase(self.profiler, 'evaluation'):
+                tempnest = np.copy(self.Positions)
+                fnew = self.eval_cuckoos(newnest)
             # and update current Cuckoos
-            for j in range(0, self.ncuckoos):
-                if fnew[j] <= fitness[j]:
-                    fitness[j] = fnew[j]
-                    tempnest[j, :] = newnest[j, :]
-            self.Positions = tempnest.copy() # Take only the fittest individual
+            with phase(self.profiler, 'selection'):
+                for j in range(0, self.ncuckoos):
+                    if fnew[j] <= fitness[j]:
+                        fitness[j] = fnew[j]
+                        tempnest[j, :] = newnest[j, :]
+                self.Positions = tempnest.copy() # Take only the fittest individual
             #----------------------
             #  Discover a fraction ~pa of Cuckoos from the Cuckoos after Lévy flights
             #----------------------
-            new_nest = np.zeros((self.ncuckoos, self.dim))
-            K = np.random.uniform(0, 1, (self.ncuckoos, self.dim)) > self.pa
-            stepsize = random.random() * (
-                newnest[np.random.permutation(self.ncuckoos), :] - newnest[np.random.permutation(self.ncuckoos), :]
-            )
-            new_nest = newnest + stepsize * K # Update a fraction ~pa of Cuckoo after the Lévy flights
+            with phase(self.profiler, 'update'):
+                new_nest = np.zeros((self.ncuckoos, self.dim))
+                K = np.random.uniform(0, 1, (self.ncuckoos, self.dim)) > self.pa
+                stepsize = random.random() * (
+                    newnest[np.random.permutation(self.ncuckoos), :] - newnest[np.random.permutation(self.ncuckoos), :]
+                )
+                new_nest = newnest + stepsize * K # Update a fraction ~pa of Cuckoo after the Lévy flights
             
-            #ensure bounds and discrete for the newnest
-            for cuckoo in range(self.ncuckoos):
-                new_nest[cuckoo,:]=self.ensure_bounds(new_nest[cuckoo,:])
-                new_nest[cuckoo,:] = self.ensure_discrete(new_nest[cuckoo,:])
+                #ensure bounds and discrete for the newnest
+                with phase(self.profiler, 'ensure_bounds'):
+                    new_nest = self.space.clip(new_nest)
+                with phase(self.profiler, 'ensure_discrete'):
+                    new_nest = self.space.discretize(new_nest, alpha=self.a, method=self.int_transform)
             #----------------------
             #  Re-evaluate the Cuckoos obtained and update to get the fittest individuals
             #----------------------
-            tempnest = np.copy(self.Positions) # Will save the fittest individual
-            fnew = self.eval_cuckoos(new_nest)
-            for j in range(0, self.ncuckoos): # Compare Cuckoo fitness of newly generated Cuckoos (newnest) and current Cuckoos (self.positions)
-                if fnew[j] <= fitness[j]:
-                    fitness[j] = fnew[j]
-                    tempnest[j, :] = new_nest[j, :]
-            self.Positions = tempnest.copy() # Update the population
+            with phase(self.profiler, 'evaluation'):
+                tempnest = np.copy(self.Positions) # Will save the fittest individual
+                fnew = self.eval_cuckoos(new_nest)
+            with phase(self.profiler, 'selection'):
+                for j in range(0, self.ncuckoos): # Compare Cuckoo fitness of newly generated Cuckoos (newnest) and current Cuckoos (self.positions)
+                    if fnew[j] <= fitness[j]:
+                        fitness[j] = fnew[j]
+                        tempnest[j, :] = new_nest[j, :]
+                self.Positions = tempnest.copy() # Update the population
             
             #----------------------
             #  Logger related portion
             #----------------------
-            for i, fits in enumerate(fitness):  
-                #save the best of the best!!!
-                if fits < self.best_fitness:
-                    self.best_fitness=fits
-                    self.best_position=self.Positions[i, :].copy()
+            with phase(self.profiler, 'logging'):
+                for i, fits in enumerate(fitness):  
+                    #save the best of the best!!!
+                    if fits < self.best_fitness:
+                        self.best_fitness=fits
+                        self.best_position=self.Positions[i, :].copy()
             
-            self.last_fit=np.array(fitness)
-            self.last_pop=self.Positions.copy()
+                self.last_fit=np.array(fitness)
+                self.last_pop=self.Positions.copy()
             
-            #--mir
-            if self.mode=='max':
-                self.fitness_best_correct=-self.best_fitness
-                self.local_fitness=-np.min(fitness)
-            else:
-                self.fitness_best_correct=self.best_fitness
-                self.local_fitness=np.min(fitness)
-
-            self.history['local_fitness'].append(self.local_fitness)
-            self.history['global_fitness'].append(self.fitness_best_correct)
-            # Print statistics
-            if self.verbose and i % self.ncuckoos:
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('CS step {}/{}, ncuckoos={}, Ncores={}'.format((l)*self.ncuckoos, ngen*self.ncuckoos, self.ncuckoos, self.ncores))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('Best Cuckoo/Nest Fitness:', np.round(self.fitness_best_correct,6))
-                if self.grid_flag:
-                    self.cuckoo_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
-                    print('Best Cuckoo Position:', self.cuckoo_decoded)
+                #--mir
+                if self.mode=='max':
+                    self.fitness_best_correct=-self.best_fitness
+                    self.local_fitness=-np.min(fitness)
                 else:
-                    print('Best Cuckoo Position:', self.best_position)
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    self.fitness_best_correct=self.best_fitness
+                    self.local_fitness=np.min(fitness)
+
+                self.history['local_fitness'].append(self.local_fitness)
+                self.history['global_fitness'].append(self.fitness_best_correct)
+                # Print statistics
+                if self.verbose and i % self.ncuckoos:
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('CS step {}/{}, ncuckoos={}, Ncores={}'.format((l)*self.ncuckoos, ngen*self.ncuckoos, self.ncuckoos, self.ncores))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('Best Cuckoo/Nest Fitness:', np.round(self.fitness_best_correct,6))
+                    if self.grid_flag:
+                        self.cuckoo_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
+                        print('Best Cuckoo Position:', self.cuckoo_decoded)
+                    else:
+                        print('Best Cuckoo Position:', self.best_position)
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -329,11 +328,12 @@ class CS(object):
             self.last_fit=-self.last_fit
             
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
              
         if self.verbose:
             print('------------------------ CS Summary --------------------------')
@@ -341,4 +341,8 @@ class CS(object):
             print('Best individual (x) found:', self.cuckoo_correct)
             print('--------------------------------------------------------------') 
     
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.cuckoo_correct, self.fitness_best_correct, self.history
\ No newline at end of file
@@ -18,11 +18,12 @@
 
 import random
 import numpy as np
-import joblib 
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space 
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator, FitnessCache, eval_pop
+from neorl.utils.profiler import phase
 
 class DE:
     """
@@ -37,9 +38,13 @@ class DE:
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with the whole population as a 2D array of shape (npop, d) and must return an array of shape (npop,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param cache_size: (int) maximum number of evaluated individuals to memorize, repeated individuals are not evaluated again (useful for int/grid spaces). If ``None``, no cache is used
+    :param profiler: (Profiler) records the time of the fitness and of the DE phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
     def __init__ (self, mode, bounds, fit, npop=50, F=0.5, CR=0.3, 
-                  int_transform='nearest_int', ncores=1, seed=None, **kwargs):  
+                  int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, cache_size=None, profiler=None, **kwargs):  
 
         self.seed=seed
         set_neorl_seed(self.seed)
@@ -60,6 +65,9 @@ class DE:
         self.npop=npop
         self.bounds=bounds
         self.ncores=ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
+        self.cache=FitnessCache(maxsize=cache_size) if cache_size else None
         #--mir
         self.mode=mode
         if mode == 'max':
@@ -70,6 +78,9 @@ class DE:
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
 
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -93,30 +104,38 @@ class DE:
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=[self.bounds[item][1] for item in self.bounds]
         self.ub=[self.bounds[item][2] for item in self.bounds]
+        self.int_index=np.where(self.var_type == 'int')[0]
+        self.space=Space(self.orig_bounds)
         
     def ensure_bounds(self, vec):
+        #clip a single individual to the lower/upper bounds
+        return [min(max(x, lb), ub) for x, lb, ub in zip(vec, self.lb, self.ub)]
     
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(self.bounds.items()):
-    
-            # variable exceedes the minimum boundary
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-    
-            # variable exceedes the maximum boundary
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
+    def to_indv(self, vec):
+        #converts a row of the population array back to the list form sent to the fitness,
+        #where int variables are python integers
+        indv=vec.tolist()
+        for dim in self.int_index:
+            indv[dim]=int(indv[dim])
+        return indv
     
-            # the variable is fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-            
-        return vec_new
+    def mutant_index(self):
+        #"""
+        #Samples three distinct random indices for every target vector j, 
+        #all different from j, for the whole population at once
+        
+        #Return:
+        #index - integer array of shape (npop, 3)
+        #"""
+        #rank random keys over the npop-1 candidates of each target, then skip j
+        index=np.argsort(np.random.random((self.npop, self.npop-1)), axis=1)[:,:3]
+        index+=(index >= np.arange(self.npop)[:,None])
+        return index
 
     def GenIndv(self, bounds):
         #"""
@@ -164,41 +183,29 @@ class DE:
         return pop
 
     def fit_worker(self, x):
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all individuals in one fitness call
+        return self.worker.batch(pop)
 
-        # Clip the wolf with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-            
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        
-        return fitness
+    def eval_pop(self, pop):
+        #evaluates a list of individuals, in one batch if vectorized or with the evaluator pool otherwise
+        return eval_pop(self, pop)
 
     def ensure_discrete(self, vec):
         #"""
         #to mutate a vector if discrete variables exist 
 
         #Params:
-        #vec - position in vector/list form
+        #vec - position in vector (1D array) form, or the population (2D array)
 
         #Return:
-        #vec - updated position vector with discrete values
+        #vec - updated position(s) with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.b,
-                                               method=self.int_transform,
-                                               )
-        
+        vec[:]=self.space.discretize(vec, alpha=self.b, method=self.int_transform)
         return vec
     
     def mix_population(self, pop, scores):
@@ -208,7 +215,8 @@ class DE:
         rl_indices=random.sample(range(self.RLdata.shape[0]),self.npop_rl)
         for i, idx in  enumerate(worst_index):
             #print(pop[idx], fit_lst[idx])
-            pop[idx] = list(self.RLdata[rl_indices[i],:])
+            pop[idx] = self.RLdata[rl_indices[i],:]
+            self.outdated[idx] = True   #the RL individual is evaluated in the next generation
         
         return pop
 
@@ -225,126 +233,120 @@ class DE:
         """        
         set_neorl_seed(self.seed)
         self.de_hist={}
+        if self.profiler is not None:
+            self.profiler.reset()
         #--- INITIALIZE the population
         
-        if x0:
-            assert len(x0) == self.npop, '--error: the length of x0 ({}) (initial population) must equal to number of individuals npop ({})'.format(len(x0), self.npop)
-            self.population = self.InitPopulation(x0=x0, verbose=verbose)
-        else:
-            self.population = self.InitPopulation(verbose=verbose)
-                
+        with phase(self.profiler, 'initialization'):
+            if x0:
+                assert len(x0) == self.npop, '--error: the length of x0 ({}) (initial population) must equal to number of individuals npop ({})'.format(len(x0), self.npop)
+                self.population = self.InitPopulation(x0=x0, verbose=verbose)
+            else:
+                self.population = self.InitPopulation(verbose=verbose)
+        
+        #the population is kept as an array of shape (npop, d)
+        self.population=np.array(self.population, dtype=float)
+        #fitness of the current population, outdated targets are not evaluated yet
+        self.fitness=np.zeros(self.npop)
+        self.outdated=np.ones(self.npop, dtype=bool)
+        self.nfev=0
+        
         # loop through all generations
         self.best_scores=[]
         for gen in range(1,ngen+1):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             
-            #print(population)
-            gen_scores = [] # score keeping
+            #-----------------------------
+            #Mutation
+            #-----------------------------
+            with phase(self.profiler, 'mutation'):
+                # select three random vectors for each target, not including the target itself
+                index=self.mutant_index()
+                x_1=self.population[index[:,0]]
+                x_2=self.population[index[:,1]]
+                x_3=self.population[index[:,2]]
+                
+                # multiply the difference (x2-x3) by the mutation factor (F) and add to x_1
+                v_donor=np.clip(x_1 + self.F * (x_2 - x_3), self.lb, self.ub)
             
-            x_t_lst=[]
-            v_trial_lst = []
+            #-----------------------------
+            #Recombination
+            #-----------------------------
+            with phase(self.profiler, 'crossover'):
+                crossover=np.random.random((self.npop, self.dim)) <= self.CR
+                v_trial=np.where(crossover, v_donor, self.population)
             
-            # cycle through each individual in the population
-            for j in range(0, self.npop):
-                self.b= 1 - j * ((1) / ngen)  #mir: b decreases linearly between 1 to 0, for discrete mutation
-                #-----------------------------
-                #Mutation
-                #-----------------------------
-                # select three random vector index positions [0, popsize), not including current vector (j)
-                candidates = list(range(0, self.npop))
-                candidates.remove(j)
-                random_index = random.sample(candidates, 3)
-                            
-                x_1 = self.population[random_index[0]]
-                x_2 = self.population[random_index[1]]
-                x_3 = self.population[random_index[2]]
-                x_t = self.population[j]     # target individual
-    
-                # subtract x3 from x2, and create a new vector (x_diff)
-                x_diff = [x_2_i - x_3_i for x_2_i, x_3_i in zip(x_2, x_3)]
-    
-                # multiply x_diff by the mutation factor (F) and add to x_1
-                v_donor = [x_1_i + self.F * x_diff_i for x_1_i, x_diff_i in zip(x_1, x_diff)]
-                v_donor = self.ensure_bounds(v_donor) #XXX check this line
-    
-                #-----------------------------
-                #Recombination
-                #-----------------------------
-    
-                v_trial = []
-                for k in range(len(x_t)):
-                    crossover = random.random()
-                    if crossover <= self.CR:
-                        v_trial.append(v_donor[k])
-    
-                    else:
-                        v_trial.append(x_t[k])
-                
-                x_t=self.ensure_discrete(x_t)
-                v_trial=self.ensure_discrete(v_trial)
-                
-                x_t_lst.append(x_t)
-                v_trial_lst.append(v_trial)
+            #-----------------------------
+            #Discrete mutation
+            #-----------------------------
+            if len(self.int_index):
+                with phase(self.profiler, 'ensure_discrete'):
+                    x_t_old=self.population.copy()
+                    #mir: b decreases linearly between 1 to 0 over the individuals, for discrete mutation
+                    self.b=1 - np.arange(self.npop)[:,None] * ((1) / ngen)
+                    self.population=self.ensure_discrete(self.population)
+                    v_trial=self.ensure_discrete(v_trial)
+                    #the targets mutated by ensure_discrete lose their fitness 
+                    self.outdated |= np.any(self.population != x_t_old, axis=1)
             
             #--------------------------------
             #paralell evaluation
             #--------------------------------
-            if self.ncores > 1:
-
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    score_trial_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in v_trial_lst)
-                    score_target_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in x_t_lst)
-                    
-            else:
-                score_trial_lst=[]
-                score_target_lst=[]
-                for item in v_trial_lst:
-                    score_trial_lst.append(self.fit_worker(item))  
-                for item in x_t_lst:
-                    score_target_lst.append(self.fit_worker(item))  
+            #trials and outdated targets are evaluated in one batch
+            with phase(self.profiler, 'evaluation'):
+                x_t_index=np.where(self.outdated)[0]
+                eval_lst=[self.to_indv(x) for x in v_trial] + [self.to_indv(self.population[j]) for j in x_t_index]
+                misses=self.cache.misses if self.cache is not None else 0
+                scores=np.array(self.eval_pop(eval_lst), dtype=float)
+            #the individuals found in the fitness cache are not sent to the fitness function
+            self.nfev += self.cache.misses - misses if self.cache is not None else len(scores)
+            score_trial=scores[:self.npop]
+            self.fitness[x_t_index]=scores[self.npop:]
+            self.outdated[:]=False
             
             #-----------------------------
             #Selection
             #-----------------------------
-            index=0
-            for (score_trial, score_target, v_trial) in zip(score_trial_lst, score_target_lst, v_trial_lst):
-                if score_trial > score_target:
-                    self.population[index] = v_trial
-                    gen_scores.append(score_trial)
-                else:
-                    gen_scores.append(score_target)
-                
-                index+=1
+            with phase(self.profiler, 'selection'):
+                improved=score_trial > self.fitness
+                self.population[improved]=v_trial[improved]
+                self.fitness[improved]=score_trial[improved]
+                gen_scores=list(self.fitness)
             
             #-----------------------------
             #Fitness saving 
             #-----------------------------
-            gen_avg = sum(gen_scores) / self.npop                   # current generation avg. fitness
-            y_best = max(gen_scores)                                # fitness of best individual
-            x_best = self.population[gen_scores.index(max(gen_scores))]  # solution of best individual
-            self.best_scores.append(y_best)
+            with phase(self.profiler, 'logging'):
+                gen_avg = sum(gen_scores) / self.npop                   # current generation avg. fitness
+                y_best = max(gen_scores)                                # fitness of best individual
+                x_best = self.to_indv(self.population[gen_scores.index(max(gen_scores))])  # solution of best individual
+                self.best_scores.append(y_best)
             
-            if self.RLmode:
-                self.population=self.mix_population(pop=self.population, scores=gen_scores)
+                if self.RLmode:
+                    self.population=self.mix_population(pop=self.population, scores=gen_scores)
                 
-            #--mir
-            if self.mode=='min':
-                y_best_correct=-y_best
-                gen_avg=-gen_avg
-            else:
-                y_best_correct=y_best
-
-            if verbose:
-                print('************************************************************')
-                print('DE step {}/{}, F={}, CR={}, Ncores={}'.format(gen*self.npop, ngen*self.npop, self.F, self.CR, self.ncores))
-                print('************************************************************')
-                print('Best fitness:', np.round(y_best_correct,6))
-                if self.grid_flag:
-                    x_decoded = decode_discrete_to_grid(x_best, self.orig_bounds, self.bounds_map)
-                    print('Best individual:', x_decoded)
+                #--mir
+                if self.mode=='min':
+                    y_best_correct=-y_best
+                    gen_avg=-gen_avg
                 else:
-                    print('Best individual:', x_best)
-                print('Average fitness:', np.round(gen_avg,6))
-                print('************************************************************')
+                    y_best_correct=y_best
+
+                if verbose:
+                    print('************************************************************')
+                    print('DE step {}/{}, F={}, CR={}, Ncores={}'.format(gen*self.npop, ngen*self.npop, self.F, self.CR, self.ncores))
+                    print('************************************************************')
+                    print('Best fitness:', np.round(y_best_correct,6))
+                    if self.grid_flag:
+                        x_decoded = decode_discrete_to_grid(x_best, self.orig_bounds, self.bounds_map)
+                        print('Best individual:', x_decoded)
+                    else:
+                        print('Best individual:', x_best)
+                    print('Average fitness:', np.round(gen_avg,6))
+                    print('************************************************************')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -360,11 +362,12 @@ class DE:
             
         #---update final logger
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.de_hist['last_pop'] = get_population(self.population, fits=gen_scores, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.de_hist['last_pop'] = get_population(self.population, fits=gen_scores, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.de_hist['last_pop'] = get_population([self.to_indv(x) for x in self.population], fits=gen_scores, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.de_hist['last_pop'] = get_population([self.to_indv(x) for x in self.population], fits=gen_scores, grid_flag=False)
             
         if self.mode == 'min':
             self.best_scores=[-item for item in self.best_scores]
@@ -374,5 +377,15 @@ class DE:
             self.de_hist['global_fitness'] = np.maximum.accumulate(self.best_scores)
         
         self.de_hist['local_fitness'] = self.best_scores
+        self.de_hist['nfev'] = self.nfev   #number of individuals sent to the fitness function
             
+        #--number of individuals found in/missing from the fitness cache
+        if self.cache is not None:
+            self.de_hist['cache_hits']=self.cache.hits
+            self.de_hist['cache_misses']=self.cache.misses
+        
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.de_hist['profile']=self.profiler.history()
+        
         return x_best_correct, y_best_correct, self.de_hist
@@ -20,12 +20,23 @@
 #@author: Katelin, Majdi, Devin
 #"""
 
-import warnings
-warnings.filterwarnings("ignore")
 import random
 import numpy as np
 import math
 
+def random_other_int(x, lb, ub):
+    #"""
+    #Draws an integer in [lb, ub] different from x, with the same random draw as 
+    #random.choice on the list range(lb, ub+1) without x, but without building the list
+
+    #Return:
+    #int - new discrete value
+    #"""
+    if not lb <= x <= ub or lb == ub:
+        raise ValueError('--error: cannot draw an integer in [{}, {}] different from {}'.format(lb, ub, x))
+    k = random.randint(lb, ub-1)
+    return k + 1 if k >= x else k
+
 def mutate_discrete(x_ij, x_min, x_max, lb, ub, alpha, method):
     #"""
     #Changes float to discrete integer.
@@ -59,9 +70,7 @@ def mutate_discrete(x_ij, x_min, x_max, lb, ub, alpha, method):
             flag=False
     
         if (rand < sig and rand < alpha) or flag:
-            choices = list(range(lb, ub+1)) # each <class 'int'>
-            choices.remove(int(x_ij))
-            to_ret = random.choice(choices)
+            to_ret = random_other_int(int(x_ij), lb, ub)
             #print('--I am mutating')
         else:
             #print('--I am NOT mutating')
@@ -78,9 +87,7 @@ def mutate_discrete(x_ij, x_min, x_max, lb, ub, alpha, method):
             flag = False
             
         if (norm >= 0.5 and rand < alpha) or flag:
-            choices = list(range(lb, ub+1))
-            choices.remove(int(x_ij))
-            to_ret = random.choice(choices)
+            to_ret = random_other_int(int(x_ij), lb, ub)
             #print('--I am mutating')
         else:
             to_ret = int(x_ij)
@@ -94,12 +101,30 @@ def mutate_discrete(x_ij, x_min, x_max, lb, ub, alpha, method):
 
     return to_ret
 
-bounds={
-'cxpb': ['float', 0.1, 0.9],             
-'mu':   ['int', 30, 60],                 
-'alpha':['grid', (0.1, 0.2, 0.3, 0.4)],    
-'cxmode':['grid', ('blend', 'cx2point')]}
+class GridMap(dict):
+    #"""
+    #Map {index: grid value} of one grid variable, as stored in bounds_map, with the lookups 
+    #precomputed once: forward (array of the grid values, indexed by the discrete index) and 
+    #reverse ({grid value: index}), so populations are encoded/decoded without scanning the map
+    #"""
+    def __init__(self, values):
+        super().__init__(enumerate(values))
+        self.forward=np.empty(len(values), dtype=object)
+        self.forward[:]=list(values)
+        self.reverse={}
+        self.repeated=set()   #grid values given more than once, which cannot be encoded
+        for k, v in enumerate(values):
+            if v in self.reverse:
+                self.repeated.add(v)
+            self.reverse.setdefault(v, k)
 
+def grid_lookups(indv_map):
+    #"""
+    #Returns the map of a grid variable with its lookups, a map built by hand (plain dict) is converted
+    #"""
+    if not isinstance(indv_map, GridMap):
+        indv_map=GridMap([indv_map[k] for k in sorted(indv_map)])
+    return indv_map
 
 def encode_grid_to_discrete(bounds):
     
@@ -109,17 +134,12 @@ def encode_grid_to_discrete(bounds):
     for item in bounds:
         if bounds[item][0] == 'grid':
             bounds_new[item]=['int', 0, len(bounds[item][1])-1]
-            
-            bounds_map[item]={}
-            for i in range(len(bounds[item][1])):
-                bounds_map[item][i] = bounds[item][1][i]
+            bounds_map[item]=GridMap(bounds[item][1])
         else:
             bounds_new[item]=bounds[item]
         
     return bounds_new, bounds_map
 
-bounds_new, bounds_map=encode_grid_to_discrete(bounds)
-
 def decode_discrete_to_grid(individual, bounds, bounds_map):
     new_indv=[]
     for i, key in enumerate(bounds):
@@ -132,23 +152,123 @@ def decode_discrete_to_grid(individual, bounds, bounds_map):
     
     return new_indv   
 
-x=[0.2, 45, 2, 1]
-y=decode_discrete_to_grid(x, bounds, bounds_map)
-
 def encode_grid_indv_to_discrete(individual, bounds, bounds_map):
     
     new_indv=[]
     
     for i, key in enumerate(bounds):
         if bounds[key][0]=='grid':
-            indv_map=bounds_map[key]   #obtain the map for this parameter
-            indv_disc=[k for k,v in indv_map.items() if v == individual[i]] #find the key (discrete) value that corresponds to the categorical value
-            assert len(indv_disc) == 1, '--error: two key values in the bounds_map {} correspond to same categorical value {}'.format(indv_disc, individual[i])
-            new_indv.append(indv_disc[0])
+            indv_map=grid_lookups(bounds_map[key])   #obtain the map for this parameter
+            #find the key (discrete) value that corresponds to the categorical value
+            assert individual[i] not in indv_map.repeated, '--error: two key values in the bounds_map {} correspond to same categorical value {}'.format(
+                    [k for k,v in indv_map.items() if v == individual[i]], individual[i])
+            new_indv.append(indv_map.reverse[individual[i]])
         else:
             new_indv.append(individual[i])
     
     return new_indv
+
+class Space:
+    """
+    Mixed-integer parameter space built once from ``bounds``, to clip, discretize, and 
+    encode/decode whole populations stored as arrays of shape (npop, d) (or single individuals of shape (d,)).
+    Grid variables are encoded to the int indices of their values, as ``encode_grid_to_discrete`` does.
+    
+    :param bounds: (dict) input parameter type and lower/upper bounds in dictionary form. Example: ``bounds={'x1': ['int', 1, 4], 'x2': ['float', 0.1, 0.8], 'x3': ['grid', ('a', 'b')]}``
+    """
+    def __init__(self, bounds):
+        self.orig_bounds=bounds
+        self.types=np.array([bounds[item][0] for item in bounds])
+        self.grid_flag="grid" in self.types
+        if self.grid_flag:
+            self.bounds, self.bounds_map=encode_grid_to_discrete(bounds)
+        else:
+            self.bounds, self.bounds_map=bounds, {}
+        self.dim=len(bounds)
+        self.lb=np.array([self.bounds[item][1] for item in self.bounds], dtype=float)
+        self.ub=np.array([self.bounds[item][2] for item in self.bounds], dtype=float)
+        #grid variables are int variables in the encoded space
+        self.int_index=np.where(self.types != 'float')[0]
+        self.float_index=np.where(self.types == 'float')[0]
+        self.grid_index=np.where(self.types == 'grid')[0]
+        #forward (index -> value) and reverse (value -> index) lookups of the grid variables
+        self.grid_values=[self.bounds_map[item].forward for item in bounds if bounds[item][0] == 'grid']
+        self.grid_indices=[self.bounds_map[item].reverse for item in bounds if bounds[item][0] == 'grid']
+
+    def clip(self, x):
+        #"""
+        #Clips individuals to the lower/upper bounds
+
+        #Return:
+        #array - clipped copy of x
+        #"""
+        return np.clip(np.asarray(x, dtype=float), self.lb, self.ub)
+
+    def discretize(self, x, alpha=None, method='nearest_int'):
+        #"""
+        #Changes the int variables of the individuals to discrete values, as mutate_discrete does
+        #for each int variable, where x_min/x_max are the minimum/maximum of each individual before discretization.
+        #The random draws use numpy.random
+
+        #Params:
+        #x - individuals, array of shape (npop, d) or (d,)
+        #alpha - probability to mutate a discrete (used for sigmoid/minmax)
+        #method - out of {'nearest_int', 'sigmoid', 'minmax'}
+
+        #Return:
+        #array - copy of x with discrete values for the int variables
+        #"""
+        x=np.array(x, dtype=float)
+        if not len(self.int_index):
+            return x
+        xi=x[..., self.int_index]
+        lb, ub=self.lb[self.int_index], self.ub[self.int_index]
+        
+        if method == 'nearest_int':
+            new=np.trunc(xi)
+        elif method in ['sigmoid', 'minmax']:
+            x_min=x.min(axis=-1, keepdims=True)
+            x_max=x.max(axis=-1, keepdims=True)
+            rand=np.random.random(xi.shape)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if method == 'sigmoid':
+                    flag=x_max == x_min #force perturbation
+                    sig_a=0 #support for sigmoid min
+                    sig_b=2 #support for sigmoid max
+                    norm=(sig_b-sig_a)*(xi - x_min) / (x_max - x_min) + sig_a
+                    mutate=((rand < 1 / (1 + np.exp(norm))) & (rand < alpha)) | flag
+                else:
+                    flag=np.abs(x_min) + x_max == 0 #force perturbation
+                    norm=(xi + x_min) / (np.abs(x_min) + x_max)
+                    mutate=((norm >= 0.5) & (rand < alpha)) | flag
+            #a random integer of the bounds that differs from the current one
+            current=np.trunc(xi)
+            other=np.floor(lb + np.random.random(xi.shape)*(ub-lb))
+            other=other + (other >= current)
+            new=np.where(mutate, other, current)
+        else:
+            raise ValueError('--error: int_transform entered by user is invalid, must be `nearest_int`, `sigmoid`, or `minmax`')
         
-x2=[0.2,40, 0.3, 'cx2point']
-y2=encode_grid_indv_to_discrete(x2, bounds, bounds_map)
+        x[..., self.int_index]=np.clip(new, lb, ub)
+        return x
+
+    def encode(self, pop):
+        #"""
+        #Encodes individuals of the original space (with grid values) to an array of shape (npop, d)
+        #"""
+        pop=np.array(pop, dtype=object).reshape(len(pop), self.dim)
+        for j, indices in zip(self.grid_index, self.grid_indices):
+            pop[:, j]=[indices[v] for v in pop[:, j]]
+        return pop.astype(float)
+
+    def decode(self, x):
+        #"""
+        #Decodes an array of shape (npop, d) back to the list of individuals of the original space, 
+        #where int variables are python integers and grid variables take their grid values
+        #"""
+        x=np.asarray(x, dtype=float)
+        pop=x.astype(object)
+        pop[:, self.int_index]=x[:, self.int_index].astype(int).astype(object)
+        for j, values in zip(self.grid_index, self.grid_values):
+            pop[:, j]=values[x[:, j].astype(int)]
+        return pop.tolist()
@@ -22,13 +22,12 @@
 import random
 import numpy as np
 from collections import defaultdict
-import copy
-import joblib
-from neorl.evolu.crossover import cxES2point, cxESBlend
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator, FitnessCache, eval_pop
+from neorl.utils.profiler import phase
 
 class ES:
     """
@@ -46,9 +45,13 @@ class ES:
     :param smax: (float): maximum bound for the strategy vector
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with the whole population as a 2D array of shape (lambda\_, d) and must return an array of shape (lambda\_,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param cache_size: (int) maximum number of evaluated individuals to memorize, repeated individuals are not evaluated again (useful for int/grid spaces). If ``None``, no cache is used
+    :param profiler: (Profiler) records the time of the fitness and of the ES phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
     def __init__ (self, mode, bounds, fit, lambda_=60, mu=30, cxmode='cx2point', 
-                  alpha=0.5, cxpb=0.6, mutpb=0.3, smin=0.01, smax=0.5, clip=True, ncores=1, seed=None, **kwargs):  
+                  alpha=0.5, cxpb=0.6, mutpb=0.3, smin=0.01, smax=0.5, clip=True, ncores=1, seed=None, vectorized=False, evaluator=None, cache_size=None, profiler=None, **kwargs):  
         
         set_neorl_seed(seed)
         
@@ -76,8 +79,14 @@ class ES:
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
             
         self.ncores=ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
+        self.cache=FitnessCache(maxsize=cache_size) if cache_size else None
         self.smin=smin
         self.smax=smax
         self.cxpb=cxpb
@@ -113,9 +122,11 @@ class ES:
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, clip=False, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
-        self.lb = np.array([self.bounds[item][1] for item in self.bounds])
-        self.ub = np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
+        self.lb, self.ub=self.space.lb, self.space.ub
+        self.int_index, self.float_index=self.space.int_index, self.space.float_index
             
     def GenES(self, bounds):
         #"""
@@ -182,162 +193,140 @@ class ES:
                 pop[i].append(ind)
                 pop[i].append(strategy)
                 
-        if self.ncores > 1:  #evaluate warmup in parallel
-            core_list=[]
-            for key in pop:
-                core_list.append(pop[key][0])
-           
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness=parallel(joblib.delayed(self.fit_worker)(item) for item in core_list)
-                    
-            [pop[ind].append(fitness[ind]) for ind in range(len(pop))]
-        
-        else: #evaluate warmup in series
-            for key in pop:
-                fitness=self.fit_worker(pop[key][0])
-                pop[key].append(fitness)
+        #evaluate warmup in one batch or with the evaluator pool
+        core_list=[]
+        for key in pop:
+            core_list.append(pop[key][0])
+       
+        fitness=self.eval_pop(core_list)
+                
+        [pop[ind].append(fitness[ind]) for ind in range(len(pop))]
         
         return pop  #return final pop dictionary with ind, strategy, and fitness
 
-    def ensure_bounds(self, vec): # bounds check
+    def ensure_bounds(self, x):
+        #clips an individual, or all rows of a population array, to the lower/upper bounds
+        return self.space.clip(x)
 
-        vec_new = []
-
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # less than minimum 
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # more than maximum
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        
-        return vec_new
+    def ensure_discrete(self, x):
+        #clips to the bounds and truncates the int variables of an individual or a population array
+        return self.space.discretize(self.space.clip(x))
 
-    def ensure_discrete(self, ind):
-        
-        ind=self.ensure_bounds(ind)
-        for i in range(len(ind)):
-            if self.datatype[i] == 'int':
-                ind[i] = int(ind[i])
-        return ind
+    def to_indv(self, vec):
+        #converts a row of the population array back to the list form sent to the fitness,
+        #where int variables are python integers
+        indv=vec.tolist()
+        for i in self.int_index:
+            indv[i]=int(indv[i])
+        return indv
 
+    def to_arrays(self, pop):
+        #individuals and strategies of a population dict as (npop, d) arrays
+        x=np.array([pop[key][0] for key in pop], dtype=float)
+        strat=np.array([pop[key][1] for key in pop], dtype=float)
+        return x, strat
+    
     def fit_worker(self, x):
-        #"""
-        #Evaluates fitness of an individual.
-        #"""
-        
-        
-        #mir-grid
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map) 
-                    
-        fitness = self.fit(x)
-        return fitness
-            
-    def select(self, pop, k=1):
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all individuals in one fitness call
+        return self.worker.batch(pop)
+
+    def eval_pop(self, pop):
+        #evaluates a list of individuals, in one batch if vectorized or with the evaluator pool otherwise
+        return eval_pop(self, pop)
+    
+    def select(self, fitness, k=1):
         #"""
         #Select function sorts the population from max to min based on fitness and select k best
         #Inputs:
-        #    pop (dict): population in dictionary structure
+        #    fitness (numpy.ndarray): fitness of the population
         #    k (int): top k individuals are selected
         #Returns:
-        #    best_dict (dict): the new ordered dictionary with top k selected 
+        #    index (numpy.ndarray): the row indices of the top k individuals, from best to worst 
         #"""
-        
-        pop=list(pop.items())
-        pop.sort(key=lambda e: e[1][2], reverse=True)
-        sorted_dict=dict(pop[:k])
-        
-        #This block creates a new dict where keys are reset to 0 ... k in order to avoid unordered keys after sort
-        best_dict=defaultdict(list)
-        index=0
-        for key in sorted_dict:
-            best_dict[index].append(sorted_dict[key][0])
-            best_dict[index].append(sorted_dict[key][1])
-            best_dict[index].append(sorted_dict[key][2])
-            index+=1
-        
-        sorted_dict.clear()
-        return best_dict
+        return np.argsort(-np.asarray(fitness), kind='stable')[:k]
 
-    def mutES(self, ind, strat):
-        #"""Mutate an evolution strategy according to mixed Discrete/Continuous mutation rules
+    def mutES(self, x, strat):
+        #"""Mutate evolution strategies according to mixed Discrete/Continuous mutation rules
         #attribute as described in [Li2013].
         #The function mutates discrete/float variables according to their type as indicated in self.bounds
         #.. Li, Rui, et al. "Mixed integer evolution strategies for parameter optimization." 
         #   Evolutionary computation 21.1 (2013): 29-64.
         #Inputs:
-        #    -ind (list): individual to be mutated.
-        #    -strat (list): individual strategy to be mutated.
+        #    -x (numpy.ndarray): individuals to be mutated, one per row.
+        #    -strat (numpy.ndarray): strategies of the individuals.
         #Returns: 
-        #    -ind (list): new individual after mutatation
-        #    -strat (list): individual strategy after mutatation
-        
+        #    -x (numpy.ndarray): new individuals after mutatation
+        #    -strat (numpy.ndarray): strategies after mutatation
         #"""
-        # Infer the datatype, lower/upper bounds from self.bounds for flexible usage 
-            
-        size = len(ind)
+        size = x.shape[1]
         tau=1/np.sqrt(2*size)
         tau_prime=1/np.sqrt(2*np.sqrt(size))
         
-        ind=self.ensure_bounds(ind)  #keep it for choice.remove(x) to work
-        
-        for i in range(size):
-            #--------------------------
-            # Discrete ES Mutation 
-            #--------------------------
-            if self.datatype[i] == 'int':
-                
-                #check first the integers falls within lower/upper boundaries
-                norm=random.gauss(0,1)
-                # modify the ind strategy
-                strat[i] = 1/(1+(1-strat[i])/strat[i]*np.exp(-tau*norm-tau_prime*random.gauss(0,1)))
-                #make a transformation of strategy to ensure it is between smin,smax 
-                y=(strat[i]-self.smin)/(self.smax-self.smin)
-                if np.floor(y) % 2 == 0:
-                    y_prime=np.abs(y-np.floor(y))
-                else:
-                    y_prime=1-np.abs(y-np.floor(y))
-                strat[i] = self.smin + (self.smax-self.smin) * y_prime
-                
-                # check if this attribute is mutated based on the updated strategy
-                if random.random() < strat[i]:
-                    
-                    if int(self.lb[i]) == int(self.ub[i]):
-                        ind[i] = int(self.lb[i])
-                    else:
-                        # make a list of possiblities after excluding the current value to enforce mutation
-                        choices=list(range(int(self.lb[i]),int(self.ub[i])+1))
-                        choices.remove(int(ind[i]))
-                        # randint is NOT used here since it could re-draw the same integer value, choice is used instead
-                        ind[i] = random.choice(choices)
-                
-                else:
-
-                    ind[i]=int(ind[i])
-                            
-            #--------------------------
-            # Continuous ES Mutation 
-            #--------------------------
-            elif self.datatype[i] == 'float':
-                norm=random.gauss(0,1)
-                strat[i] *= np.exp(tau*norm + tau_prime * random.gauss(0, 1)) #normal mutation of strategy
-                ind[i] += strat[i] * random.gauss(0, 1) # update the individual position
-                
-                
+        x=self.ensure_bounds(x)
+        strat=strat.copy()
+        #--------------------------
+        # Discrete ES Mutation 
+        #--------------------------
+        if len(self.int_index):
+            xi, si=x[:, self.int_index], strat[:, self.int_index]
+            lb, ub=self.lb[self.int_index].astype(int), self.ub[self.int_index].astype(int)
+            # modify the ind strategy
+            si = 1/(1+(1-si)/si*np.exp(-tau*np.random.normal(size=si.shape)-tau_prime*np.random.normal(size=si.shape)))
+            #make a transformation of strategy to ensure it is between smin,smax 
+            y=(si-self.smin)/(self.smax-self.smin)
+            y_prime=np.where(np.floor(y) % 2 == 0, np.abs(y-np.floor(y)), 1-np.abs(y-np.floor(y)))
+            si = self.smin + (self.smax-self.smin) * y_prime
             
-            else:
-                raise Exception ('ES mutation strategy works with either int/float datatypes, the type provided cannot be interpreted')
+            # check if this attribute is mutated based on the updated strategy,
+            # a new value is drawn among the integers of the bounds excluding the current one to enforce mutation
+            xi=np.trunc(xi)
+            new=np.floor(lb + np.random.random(xi.shape)*(ub-lb)) 
+            new=new + (new >= xi)
+            new=np.where(lb == ub, lb, new)
+            xi=np.where(np.random.random(xi.shape) < si, new, xi)
+            x[:, self.int_index], strat[:, self.int_index]=xi, si
+        #--------------------------
+        # Continuous ES Mutation 
+        #--------------------------
+        if len(self.float_index):
+            sf=strat[:, self.float_index]
+            sf *= np.exp(tau*np.random.normal(size=sf.shape) + tau_prime*np.random.normal(size=sf.shape)) #normal mutation of strategy
+            x[:, self.float_index] += sf * np.random.normal(size=sf.shape) # update the individual position
+            strat[:, self.float_index]=sf
         
-        ind=self.ensure_bounds(ind)
-        strat=list(np.clip(strat, self.smin, self.smax))
-        return ind, strat
+        x=self.ensure_bounds(x)
+        strat=np.clip(strat, self.smin, self.smax)
+        return x, strat
 
-    def GenOffspring(self, pop):
+    def crossover(self, x1, x2, strat1, strat2):
+        #"""
+        #Crossover of the pairs of parents (x1[i], x2[i]), the first child of each pair is returned 
+        #(cxES2point or cxESBlend applied to all pairs at once)
+        #"""
+        n, size = x1.shape
+        if self.cxmode.strip() =='cx2point':
+            #two cut points 1 <= pt1 < pt2 <= size, the segment [pt1, pt2) comes from the second parent
+            pt1 = np.random.randint(1, size+1, n)
+            pt2 = np.random.randint(1, max(size, 2), n)
+            pt2 = np.where(pt2 >= pt1, pt2+1, pt2)
+            pt1, pt2 = np.minimum(pt1, pt2), np.maximum(pt1, pt2)
+            cols = np.arange(size)
+            swap = (cols >= pt1[:,None]) & (cols < pt2[:,None])
+            return np.where(swap, x2, x1), np.where(swap, strat2, strat1)
+        elif self.cxmode.strip() == 'blend':
+            gamma = (1. + 2. * self.alpha) * np.random.random((n, size)) - self.alpha
+            x = (1. - gamma) * x1 + gamma * x2
+            gamma = (1. + 2. * self.alpha) * np.random.random((n, size)) - self.alpha
+            strat = (1. - gamma) * strat1 + gamma * strat2
+            return x, strat
+        else:
+            raise ValueError('--error: the cxmode selected (`{}`) is not available in ES, either choose `cx2point` or `blend`'.format(self.cxmode))
+
+    def GenOffspring(self, x, strat):
         #"""
         # 
         #This function generates the offspring by applying crossover, mutation **or** reproduction. 
@@ -346,70 +335,60 @@ class ES:
         #The new offspring goes for fitness evaluation
         
         #Inputs:
-        #    pop (dict): population in dictionary structure
+        #    x (numpy.ndarray): individuals of the population, one per row
+        #    strat (numpy.ndarray): strategies of the population
         #Returns:
-        #    offspring (dict): new modified population in dictionary structure    
+        #    x_off, strat_off (numpy.ndarray): lambda_ new individuals and their strategies    
         #"""
         
-        
-        pop_indices=list(range(0,len(pop)))
-        offspring = defaultdict(list)
-        for i in range(self.lambda_):
-            rn = random.random()
-            #------------------------------
-            # Crossover
-            #------------------------------
-            if rn < self.cxpb:            
-                index1, index2 = random.sample(pop_indices,2)
-                if self.cxmode.strip() =='cx2point':
-                    ind1, ind2, strat1, strat2 = cxES2point(ind1=list(pop[index1][0]),ind2=list(pop[index2][0]), 
-                                                            strat1=list(pop[index1][1]),strat2=list(pop[index2][1]))
-                elif self.cxmode.strip() == 'blend':
-                    ind1, ind2, strat1, strat2=cxESBlend(ind1=list(pop[index1][0]), ind2=list(pop[index2][0]), 
-                                                                         strat1=list(pop[index1][1]),strat2=list(pop[index2][1]),
-                                                                         alpha=self.alpha)
-                else:
-                    raise ValueError('--error: the cxmode selected (`{}`) is not available in ES, either choose `cx2point` or `blend`'.format(self.cxmode))
-                
-                ind1=self.ensure_bounds(ind1)
-                ind2=self.ensure_bounds(ind2)
-                
-                ind1=self.ensure_discrete(ind1)  #check discrete variables after crossover
-                ind2=self.ensure_discrete(ind2)  #check discrete variables after crossover
-                
-                offspring[i].append(ind1)
-                offspring[i].append(strat1)
-                #print('crossover is done for sample {} between {} and {}'.format(i,index1,index2))
-            #------------------------------
-            # Mutation
-            #------------------------------
-            elif rn < self.cxpb + self.mutpb:  # Apply mutation
-                index = random.choice(pop_indices)
-                ind, strat=self.mutES(ind=list(pop[index][0]), strat=list(pop[index][1]))
-                offspring[i].append(ind)
-                offspring[i].append(strat)
-                #print('mutation is done for sample {} based on {}'.format(i,index))
-            #------------------------------
-            # Reproduction from population
-            #------------------------------
-            else:                         
-                index=random.choice(pop_indices)
-                pop[index][0]=self.ensure_discrete(pop[index][0])
-                offspring[i].append(pop[index][0])
-                offspring[i].append(pop[index][1])
-                #print('reproduction is done for sample {} based on {}'.format(i,index))
+        npop=x.shape[0]
+        x_off=np.empty((self.lambda_, x.shape[1]))
+        strat_off=np.empty((self.lambda_, x.shape[1]))
+        rn=np.random.random(self.lambda_)
+        #------------------------------
+        # Crossover
+        #------------------------------
+        cx=np.where(rn < self.cxpb)[0]
+        if len(cx):
+            #two distinct parents per child
+            index1=np.random.randint(npop, size=len(cx))
+            index2=np.random.randint(npop-1, size=len(cx))
+            index2[index2 >= index1] += 1
+            x_cx, strat_cx=self.crossover(x[index1], x[index2], strat[index1], strat[index2])
+            x_off[cx]=self.ensure_discrete(x_cx)  #check discrete variables after crossover
+            strat_off[cx]=strat_cx
+        #------------------------------
+        # Mutation
+        #------------------------------
+        mut=np.where((rn >= self.cxpb) & (rn < self.cxpb + self.mutpb))[0]
+        if len(mut):
+            index=np.random.randint(npop, size=len(mut))
+            x_off[mut], strat_off[mut]=self.mutES(x[index], strat[index])
+        #------------------------------
+        # Reproduction from population
+        #------------------------------
+        rep=np.where(rn >= self.cxpb + self.mutpb)[0]
+        if len(rep):
+            index=np.random.randint(npop, size=len(rep))
+            x_off[rep]=self.ensure_discrete(x[index])
+            strat_off[rep]=strat[index]
                 
         if self.clip:
-            for item in offspring:
-                offspring[item][1]=list(np.clip(offspring[item][1], self.smin, self.smax))
+            strat_off=np.clip(strat_off, self.smin, self.smax)
         
-        return offspring
+        return x_off, strat_off
 
     def mix_population(self, pop):
         #function used to mix RL with ES population when RLmode is True.
+        #pop is either the array of individuals sorted from best to worst (ES) or the population dict (NSGA-II/III).
         
         kbs_append=False
         indices=random.sample(range(self.RLdata.shape[0]),self.npop_rl)
+        if isinstance(pop, np.ndarray):
+            #replace the worst individuals in pop with RL individuals
+            pop[len(pop)-1-np.arange(len(indices))]=self.RLdata[indices,:]
+            return pop
+        
         last_index=list(pop.keys())[-1]
         for i in range (len(indices)):
             ind_vec=list(self.RLdata[indices[i],:])
@@ -438,75 +417,75 @@ class ES:
         self.y_opt=-np.inf
         self.best_scores=[]
         self.best_indvs=[]
-        if x0:    
-            assert len(x0) == self.lambda_, '--error: the length of x0 ({}) (initial population) must equal to the size of lambda ({})'.format(len(x0), self.lambda_)
-            self.population=self.init_pop(x0=x0, verbose=verbose)
-        else:
-            self.population=self.init_pop(verbose=verbose)
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            if x0:    
+                assert len(x0) == self.lambda_, '--error: the length of x0 ({}) (initial population) must equal to the size of lambda ({})'.format(len(x0), self.lambda_)
+                pop=self.init_pop(x0=x0, verbose=verbose)
+            else:
+                pop=self.init_pop(verbose=verbose)
+            #the population is kept as arrays: individuals and strategies (one row per individual), and fitness
+            self.x, self.strat=self.to_arrays(pop)
+            self.fitness=np.array([pop[key][2] for key in pop], dtype=float)
             
         # Begin the evolution process
         for gen in range(1, ngen + 1):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             
             # Vary the population and generate new offspring
-            offspring = self.GenOffspring(pop=self.population)
+            with phase(self.profiler, 'offspring'):
+                x_off, strat_off = self.GenOffspring(x=self.x, strat=self.strat)
             
-            # Evaluate the individuals with an invalid fitness with multiprocessign Pool
-            # create and run the Pool
-            if self.ncores > 1:
-                core_list=[]
-                for key in offspring:
-                    core_list.append(offspring[key][0])
-
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    fitness=parallel(joblib.delayed(self.fit_worker)(item) for item in core_list)
-                    
-                [offspring[ind].append(fitness[ind]) for ind in range(len(offspring))]
+            # Evaluate the individuals with an invalid fitness in one batch
+            # or with the evaluator pool
+            with phase(self.profiler, 'evaluation'):
+                fit_off=np.array(self.eval_pop([self.to_indv(x) for x in x_off]), dtype=float)
                 
-            else: #serial calcs
+            # Select the next generation population (mu best offspring, from best to worst)
+            with phase(self.profiler, 'selection'):
+                best=self.select(fitness=fit_off, k=self.mu)
+                self.x, self.strat, self.fitness=x_off[best], strat_off[best], fit_off[best]
+                if self.RLmode:  #perform RL informed ES
+                    self.x=self.mix_population(self.x)
                 
-                for ind in range(len(offspring)):
-                    fitness=self.fit_worker(offspring[ind][0])
-                    offspring[ind].append(fitness)
-        
-                
-            # Select the next generation population
-            self.population = copy.deepcopy(self.select(pop=offspring, k=self.mu))
-            if self.RLmode:  #perform RL informed ES
-                self.population=self.mix_population(self.population)
-                
-            inds, rwd=[self.population[i][0] for i in self.population], [self.population[i][2] for i in self.population]
-            self.best_scores.append(np.max(rwd))
-            arg_max=np.argmax(rwd)
-            self.best_indvs.append(inds[arg_max])
-            if rwd[arg_max] > self.y_opt:
-                self.y_opt=rwd[arg_max]
-                self.x_opt=copy.deepcopy(inds[arg_max])
+            with phase(self.profiler, 'logging'):
+                rwd=self.fitness
+                self.best_scores.append(np.max(rwd))
+                arg_max=np.argmax(rwd)
+                self.best_indvs.append(self.to_indv(self.x[arg_max]))
+                if rwd[arg_max] > self.y_opt:
+                    self.y_opt=rwd[arg_max]
+                    self.x_opt=self.to_indv(self.x[arg_max])
             
-            #--mir
-            if self.mode=='min':
-                self.y_opt_correct=-self.y_opt
-            else:
-                self.y_opt_correct=self.y_opt
+                #--mir
+                if self.mode=='min':
+                    self.y_opt_correct=-self.y_opt
+                else:
+                    self.y_opt_correct=self.y_opt
 
-            #mir-grid
-            if self.grid_flag:
-                self.x_opt_correct=decode_discrete_to_grid(self.x_opt,self.orig_bounds,self.bounds_map)
-            else:
-                self.x_opt_correct=self.x_opt
+                #mir-grid
+                if self.grid_flag:
+                    self.x_opt_correct=decode_discrete_to_grid(self.x_opt,self.orig_bounds,self.bounds_map)
+                else:
+                    self.x_opt_correct=self.x_opt
             
-            mean_strategy=[np.mean(self.population[i][1]) for i in self.population]
-            self.es_hist['mean_strategy'].append(np.mean(mean_strategy))
-            if verbose:
-                print('##############################################################################')
-                print('ES step {}/{}, CX={}, MUT={}, MU={}, LAMBDA={}, Ncores={}'.format(gen*self.lambda_,ngen*self.lambda_, np.round(self.cxpb,2), np.round(self.mutpb,2), self.mu, self.lambda_, self.ncores))
-                print('##############################################################################')
-                print('Statistics for generation {}'.format(gen))
-                print('Best Fitness:', np.round(np.max(rwd),6) if self.mode == 'max' else -np.round(np.max(rwd),6))
-                print('Best Individual:', inds[0] if not self.grid_flag else decode_discrete_to_grid(inds[0],self.orig_bounds,self.bounds_map))
-                print('Max Strategy:', np.round(np.max(mean_strategy),3))
-                print('Min Strategy:', np.round(np.min(mean_strategy),3))
-                print('Average Strategy:', np.round(np.mean(mean_strategy),3))
-                print('##############################################################################')
+                mean_strategy=np.mean(self.strat, axis=1)
+                self.es_hist['mean_strategy'].append(np.mean(mean_strategy))
+                if verbose:
+                    print('##############################################################################')
+                    print('ES step {}/{}, CX={}, MUT={}, MU={}, LAMBDA={}, Ncores={}'.format(gen*self.lambda_,ngen*self.lambda_, np.round(self.cxpb,2), np.round(self.mutpb,2), self.mu, self.lambda_, self.ncores))
+                    print('##############################################################################')
+                    print('Statistics for generation {}'.format(gen))
+                    print('Best Fitness:', np.round(np.max(rwd),6) if self.mode == 'max' else -np.round(np.max(rwd),6))
+                    print('Best Individual:', self.to_indv(self.x[0]) if not self.grid_flag else decode_discrete_to_grid(self.to_indv(self.x[0]),self.orig_bounds,self.bounds_map))
+                    print('Max Strategy:', np.round(np.max(mean_strategy),3))
+                    print('Min Strategy:', np.round(np.min(mean_strategy),3))
+                    print('Average Strategy:', np.round(np.mean(mean_strategy),3))
+                    print('##############################################################################')
+            if self.profiler is not None:
+                self.profiler.end_generation()
         
         if verbose:
             print('------------------------ ES Summary --------------------------')
@@ -515,11 +494,12 @@ class ES:
             print('--------------------------------------------------------------') 
 
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.es_hist['last_pop'] = get_population(offspring, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.es_hist['last_pop'] = get_population(offspring, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.es_hist['last_pop'] = get_population(x_off, fits=fit_off, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.es_hist['last_pop'] = get_population(x_off, fits=fit_off, grid_flag=False)
             
         if self.mode == 'min':
             self.best_scores=[-item for item in self.best_scores]
@@ -530,5 +510,14 @@ class ES:
         
         self.es_hist['local_fitness'] = self.best_scores
         
+        #--number of individuals found in/missing from the fitness cache
+        if self.cache is not None:
+            self.es_hist['cache_hits']=self.cache.hits
+            self.es_hist['cache_misses']=self.cache.misses
+        
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.es_hist['profile']=self.profiler.history()
+        
         return self.x_opt_correct, self.y_opt_correct, self.es_hist
     
@@ -22,11 +22,12 @@
 
 import random
 import numpy as np
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.profiler import phase
+from neorl.utils.evaluator import FitWorker, Evaluator, FitnessCache, eval_pop
 
 class GWO(object):
     """
@@ -39,8 +40,12 @@ class GWO(object):
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors (must be ``<= nwolves``)
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all wolves as a 2D array of shape (nwolves, d) and must return an array of shape (nwolves,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param cache_size: (int) maximum number of evaluated individuals to memorize, repeated individuals are not evaluated again (useful for int/grid spaces). If ``None``, no cache is used
+    :param profiler: (Profiler) records the time of the fitness and of the GWO phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__(self, mode, bounds, fit, nwolves=5, int_transform ='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, nwolves=5, int_transform ='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, cache_size=None, profiler=None):
         
         set_neorl_seed(seed)
         
@@ -56,6 +61,9 @@ class GWO(object):
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
         
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -63,6 +71,9 @@ class GWO(object):
         
         self.bounds=bounds
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
+        self.cache=FitnessCache(maxsize=cache_size) if cache_size else None
         self.nwolves=nwolves
         
         #infer variable types 
@@ -80,10 +91,12 @@ class GWO(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=[self.bounds[item][1] for item in self.bounds]
         self.ub=[self.bounds[item][2] for item in self.bounds]
+        self.space=Space(self.orig_bounds)
 
     def init_sample(self, bounds):
     
@@ -100,36 +113,20 @@ class GWO(object):
         return indv
     
     def ensure_bounds(self, vec): # bounds check
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
 
-        vec_new = []
-
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # less than minimum 
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # more than maximum
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        
-        return vec_new
-    
     def fit_worker(self, x):
-        #This worker is for parallel calculations of the GWO
-        
-        # Clip the wolf with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-        
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all wolves in one fitness call
+        return self.worker.batch(pop)
+
+    def eval_pop(self, pop):
+        #evaluates a list of wolves, in one batch if vectorized or with the evaluator pool otherwise
+        return eval_pop(self, pop)
 
     def ensure_discrete(self, vec):
         #"""
@@ -143,19 +140,8 @@ class GWO(object):
         #vec - updated wolf position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.b,
-                                               method=self.int_transform,
-                                               )
-        
-        return vec
-    
+        return self.space.discretize(vec, alpha=self.b, method=self.int_transform)
+
     def evolute(self, ngen, x0=None, verbose=False, **kwargs):
         """
         This function evolutes the GWO algorithm for number of generations.
@@ -169,21 +155,24 @@ class GWO(object):
         self.history = {'alpha_wolf':[], 'beta_wolf':[], 'delta_wolf': [], 'fitness':[]}
         self.fitness_best=float("inf") 
         self.verbose=verbose
-        self.Positions = np.zeros((self.nwolves, self.dim))
-        if x0:
-            assert len(x0) == self.nwolves, '--error: the length of x0 ({}) MUST equal the number of wolves in the group ({})'.format(len(x0), self.nwolves)
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            self.Positions = np.zeros((self.nwolves, self.dim))
+            if x0:
+                assert len(x0) == self.nwolves, '--error: the length of x0 ({}) MUST equal the number of wolves in the group ({})'.format(len(x0), self.nwolves)
             
-            for i in range(self.nwolves):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
-                if self.grid_flag:
-                    self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                else:
-                    self.Positions[i,:] = x0[i]
+                for i in range(self.nwolves):
+                    check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                    if self.grid_flag:
+                        self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    else:
+                        self.Positions[i,:] = x0[i]
                     
-        else:
-            # Initialize the positions of search agents
-            for i in range(self.nwolves):
-                self.Positions[i,:]=self.init_sample(self.bounds)
+            else:
+                # Initialize the positions of search agents
+                for i in range(self.nwolves):
+                    self.Positions[i,:]=self.init_sample(self.bounds)
             
  
         # initialize alpha, beta, and delta_pos
@@ -196,27 +185,21 @@ class GWO(object):
         Delta_pos = np.zeros(self.dim)
         Delta_score = float("inf") #GWO is built to minimize
            
-        with joblib.Parallel(n_jobs=self.ncores) as parallel:
-            
-            for l in range(0, ngen):
-                self.b= 1 - l * ((1) / ngen)  #mir: b decreases linearly between 1 to 0, for discrete mutation
-                #---------------------
-                # Fitness calcs
-                #---------------------
+        for l in range(0, ngen):
+            if self.profiler is not None:
+                self.profiler.start_generation()
+            self.b= 1 - l * ((1) / ngen)  #mir: b decreases linearly between 1 to 0, for discrete mutation
+            #---------------------
+            # Fitness calcs
+            #---------------------
+            with phase(self.profiler, 'evaluation'):
                 core_lst=[]
                 for case in range (0, self.Positions.shape[0]):
                     core_lst.append(self.Positions[case, :])
+        
+                fitness=self.eval_pop(core_lst)
             
-                if self.ncores > 1:
-
-                    with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                        fitness=parallel(joblib.delayed(self.fit_worker)(item) for item in core_lst)
-                        
-                else:
-                    fitness=[]
-                    for item in core_lst:
-                        fitness.append(self.fit_worker(item))  
-                
+            with phase(self.profiler, 'selection'):
                 self.last_pop=self.Positions.copy()  #for logging
                 self.last_fit=np.array(fitness)      #for logging
                 #----------------------
@@ -233,44 +216,45 @@ class GWO(object):
                         Alpha_score = fits
                         # Update alpha
                         Alpha_pos = self.Positions[i, :].copy()
-        
+    
                     if fits > Alpha_score and fits < Beta_score:
                         Delta_score = Beta_score  # Update delte
                         Delta_pos = Beta_pos.copy()
                         Beta_score = fits  # Update beta
                         Beta_pos = self.Positions[i, :].copy()
-        
+    
                     if fits > Alpha_score and fits > Beta_score and fits < Delta_score:
                         Delta_score = fits  # Update delta
                         Delta_pos = self.Positions[i, :].copy()
-                    
+                
                     #save the best of the best!!!
                     if fits < self.fitness_best:
                         self.fitness_best=fits
                         self.x_best=self.Positions[i, :].copy()
-                    
-                    
+                
+                
                 self.history['alpha_wolf'].append(Alpha_score)
                 self.history['beta_wolf'].append(Beta_score)
                 self.history['delta_wolf'].append(Delta_score)
-                
+            
+            with phase(self.profiler, 'update'):
                 if 'a' in kwargs:
                     assert len(kwargs["a"]) == ngen, '--error: the length of `a` in kwargs must equal to ngen'
                     a=kwargs["a"][l]
                 else:
                     a = 2 - l * ((2) / ngen)
                 # a decreases linearly from 2 to 0
-                
+            
                 #--------------------------------
                 # Position update loop
                 #--------------------------------
                 # Update the position of search wolves
                 for i in range(0, self.nwolves):
                     for j in range(0, self.dim):
-        
+    
                         r1 = random.random()  # r1 is a random number in [0,1]
                         r2 = random.random()  # r2 is a random number in [0,1]
-        
+    
                         A1 = 2 * a * r1 - a
                         # Equation (3.3)
                         C1 = 2 * r2
@@ -280,10 +264,10 @@ class GWO(object):
                         # Equation (3.5)-part 1
                         X1 = Alpha_pos[j] - A1 * D_alpha
                         # Equation (3.6)-part 1
-        
+    
                         r1 = random.random()
                         r2 = random.random()
-        
+    
                         A2 = 2 * a * r1 - a
                         # Equation (3.3)
                         C2 = 2 * r2
@@ -293,10 +277,10 @@ class GWO(object):
                         # Equation (3.5)-part 2
                         X2 = Beta_pos[j] - A2 * D_beta
                         # Equation (3.6)-part 2
-        
+    
                         r1 = random.random()
                         r2 = random.random()
-        
+    
                         A3 = 2 * a * r1 - a
                         # Equation (3.3)
                         C3 = 2 * r2
@@ -306,18 +290,22 @@ class GWO(object):
                         # Equation (3.5)-part 3
                         X3 = Delta_pos[j] - A3 * D_delta
                         # Equation (3.5)-part 3
-        
+    
                         self.Positions[i, j] = (X1 + X2 + X3) / 3  # Equation (3.7)
-                    
-                    self.Positions[i,:]=self.ensure_bounds(self.Positions[i,:])
-                    self.Positions[i, :] = self.ensure_discrete(self.Positions[i, :])
-                 
-                #--mir
+                
+                #all wolves are clipped and discretized at once (first check bounds, then check discrete)
+                with phase(self.profiler, 'ensure_bounds'):
+                    self.Positions = self.space.clip(self.Positions)
+                with phase(self.profiler, 'ensure_discrete'):
+                    self.Positions = self.space.discretize(self.Positions, alpha=self.b, method=self.int_transform)
+             
+            #--mir
+            with phase(self.profiler, 'logging'):
                 if self.mode=='max':
                     self.fitness_best_correct=-self.fitness_best
                 else:
                     self.fitness_best_correct=self.fitness_best
-                
+            
                 # Print statistics
                 if self.verbose and i % self.nwolves:
                     print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
@@ -334,9 +322,11 @@ class GWO(object):
                     print('Delta wolf Fitness:', np.round(Delta_score,6) if self.mode == 'min' else -np.round(Delta_score,6))
                     print('a:', a)
                     print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+
     
-        
                 self.history['fitness'].append(self.fitness_best)
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -359,11 +349,21 @@ class GWO(object):
             self.last_fit=-self.last_fit
         
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
-            
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
+
+        #--number of individuals found in/missing from the fitness cache
+        if self.cache is not None:
+            self.history['cache_hits']=self.cache.hits
+            self.history['cache_misses']=self.cache.misses
+        
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.wolf_correct, self.fitness_best_correct, self.history
 
@@ -21,12 +21,13 @@
 
 import random
 import numpy as np
-import joblib
 from numpy import arange, dot, multiply, exp, ones, zeros, ceil
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 
 class HCLPSO(object):
@@ -41,8 +42,11 @@ class HCLPSO(object):
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors (must be ``<= g1+g2``)
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all particles as a 2D array of shape (npop, d) and must return an array of shape (npop,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the HCLPSO phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__(self, mode, bounds, fit, g1=15, g2=25, int_transform='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, g1=15, g2=25, int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
         
         set_neorl_seed(seed)
         
@@ -58,6 +62,9 @@ class HCLPSO(object):
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
           
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -65,6 +72,8 @@ class HCLPSO(object):
             
         self.bounds=bounds
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.num_g1=g1
         self.num_g2=g2
         self.num_g=self.num_g1 + self.num_g2
@@ -84,10 +93,12 @@ class HCLPSO(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=np.array([self.bounds[item][1] for item in self.bounds])
         self.ub=np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
 
     def init_sample(self, bounds):
     
@@ -112,15 +123,10 @@ class HCLPSO(object):
         for case in range (0, self.Positions.shape[0]):
             core_lst.append(self.Positions[case, :])
     
-        if self.ncores > 1:
-
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in core_lst)
-                
+        if self.vectorized:
+            fitness_lst=list(self.fit_batch(core_lst))
         else:
-            fitness_lst=[]
-            for item in core_lst:
-                fitness_lst.append(self.fit_worker(item))
+            fitness_lst=self.evaluator.map(self.worker, core_lst)
         
         return fitness_lst
 
@@ -133,39 +139,16 @@ class HCLPSO(object):
         return best_pos, best_fit 
         
     def ensure_bounds(self, vec):
-    
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(self.bounds.items()):
-    
-            # variable exceedes the minimum boundary
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-    
-            # variable exceedes the maximum boundary
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-    
-            # the variable is fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-            
-        return vec_new
-    
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
+
     def fit_worker(self, x):
-        #This worker is for parallel calculations
-        
-        # Clip the salp with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-        
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all particles in one fitness call
+        return self.worker.batch(pop)
     
     def ensure_discrete(self, vec):
         #"""
@@ -179,18 +162,7 @@ class HCLPSO(object):
         #vec - updated salp position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.a,
-                                               method=self.int_transform,
-                                               )
-        
-        return vec
+        return self.space.discretize(vec, alpha=self.a, method=self.int_transform)
 
     def UpdateParticles(self, a, b, friend_num, check_slope=False):
         
@@ -236,62 +208,65 @@ class HCLPSO(object):
         self.history = {'local_fitness':[], 'global_fitness':[], 'c1': [], 'c2': [], 'K': []}
         self.best_fitness=float("inf") 
         self.verbose=verbose
-        self.Positions = np.zeros((self.num_g, self.dim))
-        self.a=1
-        if x0:
-            assert len(x0) == self.num_g, '--error: the length of x0 ({}) MUST equal the number of particles in the group `g1+g2 `({})'.format(len(x0), self.num_g)
-            for i in range(self.num_g):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
-                if self.grid_flag:
-                    self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                else:
-                    self.Positions[i,:] = x0[i]
-        else:
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            self.Positions = np.zeros((self.num_g, self.dim))
+            self.a=1
+            if x0:
+                assert len(x0) == self.num_g, '--error: the length of x0 ({}) MUST equal the number of particles in the group `g1+g2 `({})'.format(len(x0), self.num_g)
+                for i in range(self.num_g):
+                    check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                    if self.grid_flag:
+                        self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    else:
+                        self.Positions[i,:] = x0[i]
+            else:
 
-            for i in range(self.num_g):
-                self.Positions[i,:]=self.init_sample(self.bounds)
+                for i in range(self.num_g):
+                    self.Positions[i,:]=self.init_sample(self.bounds)
 
-        self.check_vel=np.zeros((self.num_g, ngen))
-        j=np.linspace(0,1,self.num_g)
-        j=np.dot(j,10)
+            self.check_vel=np.zeros((self.num_g, ngen))
+            j=np.linspace(0,1,self.num_g)
+            j=np.dot(j,10)
         
-        #learning probability Pc
-        self.Pc=np.dot(ones((self.dim,1)),(0.0 + (multiply((0.25),(exp(j)- exp(j[0]))) / (exp(j[self.num_g-1]) - exp(j[0]))))[np.newaxis])
-        self.Weight=0.99 - dot((arange(ngen)),0.79) / ngen  #inertia weight
-        self.K=3 - dot((arange(ngen)),1.5) / ngen    # constriction coeff
-        self.c1=2.5 - dot((arange(ngen)),2) / ngen   #cognitive coeff
-        self.c2=0.5 + dot((arange(ngen)),2) / ngen    #social coeff
+            #learning probability Pc
+            self.Pc=np.dot(ones((self.dim,1)),(0.0 + (multiply((0.25),(exp(j)- exp(j[0]))) / (exp(j[self.num_g-1]) - exp(j[0]))))[np.newaxis])
+            self.Weight=0.99 - dot((arange(ngen)),0.79) / ngen  #inertia weight
+            self.K=3 - dot((arange(ngen)),1.5) / ngen    # constriction coeff
+            self.c1=2.5 - dot((arange(ngen)),2) / ngen   #cognitive coeff
+            self.c2=0.5 + dot((arange(ngen)),2) / ngen    #social coeff
         
-        # Initialization
-        self.range_min=np.tile(self.lb,(self.num_g,1))
-        self.range_max=np.tile(self.ub,(self.num_g,1))
-        interval=self.range_max - self.range_min
-        v_max=dot(interval,0.2)
-        v_min=-v_max
-        self.Positions=self.range_min + multiply(interval,np.random.uniform(size=(self.num_g,self.dim)))
-        self.vel=v_min + multiply((v_max - v_min),np.random.uniform(size=(self.num_g,self.dim)))
+            # Initialization
+            self.range_min=np.tile(self.lb,(self.num_g,1))
+            self.range_max=np.tile(self.ub,(self.num_g,1))
+            interval=self.range_max - self.range_min
+            v_max=dot(interval,0.2)
+            v_min=-v_max
+            self.Positions=self.range_min + multiply(interval,np.random.uniform(size=(self.num_g,self.dim)))
+            self.vel=v_min + multiply((v_max - v_min),np.random.uniform(size=(self.num_g,self.dim)))
         
-        #ensure discrete mutation
-        for iii in range(self.Positions.shape[0]):
-            self.Positions[iii, :] = self.ensure_bounds(self.Positions[iii, :])
-            self.Positions[iii, :] = self.ensure_discrete(self.Positions[iii, :])
+            #ensure discrete mutation
+            self.Positions = self.space.discretize(self.space.clip(self.Positions), alpha=self.a, method=self.int_transform)
                 
-        fitness0=self.eval_particles()
-        self.gbest_pos, self.gbest_val = self.select(self.Positions, fitness0)
+            fitness0=self.eval_particles()
+            self.gbest_pos, self.gbest_val = self.select(self.Positions, fitness0)
         
-        self.pbest_pos=self.Positions.copy()
-        self.pbest_val=np.array(fitness0)
-        self.fri_best_pos=zeros((self.num_g,self.dim))
-        self.fri_best=dot((arange(self.num_g)[np.newaxis]).T,ones((1,self.dim)))
-        self.obj_func_slope=zeros((self.num_g))
+            self.pbest_pos=self.Positions.copy()
+            self.pbest_val=np.array(fitness0)
+            self.fri_best_pos=zeros((self.num_g,self.dim))
+            self.fri_best=dot((arange(self.num_g)[np.newaxis]).T,ones((1,self.dim)))
+            self.obj_func_slope=zeros((self.num_g))
         
-        #Updating particles for group 1 (exploration)
-        self.UpdateParticles(a=0, b=self.num_g1, friend_num=self.num_g1, check_slope=False)
+            #Updating particles for group 1 (exploration)
+            self.UpdateParticles(a=0, b=self.num_g1, friend_num=self.num_g1, check_slope=False)
 
-        #Updating particles for group 2 (exploitation)
-        self.UpdateParticles(a=self.num_g1, b=self.num_g, friend_num=self.num_g, check_slope=False)        
+            #Updating particles for group 2 (exploitation)
+            self.UpdateParticles(a=self.num_g1, b=self.num_g, friend_num=self.num_g, check_slope=False)        
                        
         for k in range(ngen):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             
             self.a= 1 - k * ((1) / ngen)  #mir: a decreases linearly between 1 to 0, for discrete mutation
             
@@ -300,91 +275,99 @@ class HCLPSO(object):
             #----------------------------
             
             #group 1 position estimate
-            delta_g1=(multiply(multiply(self.K[k],np.random.uniform(size=(self.num_g1,self.dim))),(self.fri_best_pos[:self.num_g1,:] - self.Positions[:self.num_g1,:])))
-            vel_g1=dot(self.Weight[k],self.vel[:self.num_g1,:]) + delta_g1
-            vel_g1=(multiply((vel_g1 < v_min[:self.num_g1,:]),v_min[:self.num_g1,:]))  \
-                    + (multiply((vel_g1 > v_max[:self.num_g1,:]),v_max[:self.num_g1,:])) \
-                    + (multiply((np.logical_and((vel_g1 < v_max[:self.num_g1,:]),(vel_g1 > v_min[:self.num_g1,:]))),vel_g1))
-            pos_g1=self.Positions[:self.num_g1,:] + vel_g1
+            with phase(self.profiler, 'update'):
+                delta_g1=(multiply(multiply(self.K[k],np.random.uniform(size=(self.num_g1,self.dim))),(self.fri_best_pos[:self.num_g1,:] - self.Positions[:self.num_g1,:])))
+                vel_g1=dot(self.Weight[k],self.vel[:self.num_g1,:]) + delta_g1
+                vel_g1=(multiply((vel_g1 < v_min[:self.num_g1,:]),v_min[:self.num_g1,:]))  \
+                        + (multiply((vel_g1 > v_max[:self.num_g1,:]),v_max[:self.num_g1,:])) \
+                        + (multiply((np.logical_and((vel_g1 < v_max[:self.num_g1,:]),(vel_g1 > v_min[:self.num_g1,:]))),vel_g1))
+                pos_g1=self.Positions[:self.num_g1,:] + vel_g1
             
-            #group 2 position estimate
-            gbest_pos_temp=np.tile(self.gbest_pos,(self.num_g2,1))
-            delta_g2=(multiply(multiply(self.c1[k],np.random.uniform(size=(self.num_g2,self.dim))),(self.fri_best_pos[self.num_g1:,:] - self.Positions[self.num_g1:,:]))) \
-                     + (multiply(multiply(self.c2[k],np.random.uniform(size=(self.num_g2,self.dim))),(gbest_pos_temp - self.Positions[self.num_g1:,:])))
+                #group 2 position estimate
+                gbest_pos_temp=np.tile(self.gbest_pos,(self.num_g2,1))
+                delta_g2=(multiply(multiply(self.c1[k],np.random.uniform(size=(self.num_g2,self.dim))),(self.fri_best_pos[self.num_g1:,:] - self.Positions[self.num_g1:,:]))) \
+                         + (multiply(multiply(self.c2[k],np.random.uniform(size=(self.num_g2,self.dim))),(gbest_pos_temp - self.Positions[self.num_g1:,:])))
             
-            vel_g2=dot(self.Weight[k],self.vel[self.num_g1:,:]) + delta_g2
-            vel_g2=(multiply((vel_g2 < v_min[self.num_g1:,:]),v_min[self.num_g1:,:])) \
-                    + (multiply((vel_g2 > v_max[self.num_g1:,:]),v_max[self.num_g1:,:])) \
-                    + (multiply((np.logical_and((vel_g2 < v_max[self.num_g1:,:]),(vel_g2 > v_min[self.num_g1:,:]))),vel_g2))
-            pos_g2=self.Positions[self.num_g1:,:] + vel_g2
+                vel_g2=dot(self.Weight[k],self.vel[self.num_g1:,:]) + delta_g2
+                vel_g2=(multiply((vel_g2 < v_min[self.num_g1:,:]),v_min[self.num_g1:,:])) \
+                        + (multiply((vel_g2 > v_max[self.num_g1:,:]),v_max[self.num_g1:,:])) \
+                        + (multiply((np.logical_and((vel_g2 < v_max[self.num_g1:,:]),(vel_g2 > v_min[self.num_g1:,:]))),vel_g2))
+                pos_g2=self.Positions[self.num_g1:,:] + vel_g2
             
-            #whole group concatenatation
-            self.Positions=np.concatenate((pos_g1, pos_g2), axis=0)
+                #whole group concatenatation
+                self.Positions=np.concatenate((pos_g1, pos_g2), axis=0)
             #ensure discrete mutation
-            for iii in range(self.Positions.shape[0]):
-                self.Positions[iii, :] = self.ensure_bounds(self.Positions[iii, :])
-                self.Positions[iii, :] = self.ensure_discrete(self.Positions[iii, :])
+            with phase(self.profiler, 'ensure_bounds'):
+                self.Positions = self.space.clip(self.Positions)
+            with phase(self.profiler, 'ensure_discrete'):
+                self.Positions = self.space.discretize(self.Positions, alpha=self.a, method=self.int_transform)
             
             self.vel=np.concatenate((vel_g1, vel_g2), axis=0)
                     
             #----------------------
             #  Evaluate New Particles
             #----------------------
-            fitness=self.eval_particles()
-            for i, fits in enumerate(fitness):
-                #save the best of the best!!!
-                if fits < self.best_fitness:
-                    self.best_fitness=fits
-                    self.best_position=self.Positions[i, :].copy()
+            with phase(self.profiler, 'evaluation'):
+                fitness=self.eval_particles()
+            with phase(self.profiler, 'selection'):
+                for i, fits in enumerate(fitness):
+                    #save the best of the best!!!
+                    if fits < self.best_fitness:
+                        self.best_fitness=fits
+                        self.best_position=self.Positions[i, :].copy()
 
-                if fits < self.pbest_val[i]:
-                    self.pbest_pos[i,:]=self.Positions[i, :].copy()
-                    self.pbest_val[i]=fits
-                    self.obj_func_slope[i]=0
-                else:
-                    self.obj_func_slope[i]=self.obj_func_slope[i] + 1
+                    if fits < self.pbest_val[i]:
+                        self.pbest_pos[i,:]=self.Positions[i, :].copy()
+                        self.pbest_val[i]=fits
+                        self.obj_func_slope[i]=0
+                    else:
+                        self.obj_func_slope[i]=self.obj_func_slope[i] + 1
                     
-                if self.pbest_val[i] < self.gbest_val:
-                    self.gbest_pos=self.pbest_pos[i,:].copy()
-                    self.gbest_val=self.pbest_val[i]
+                    if self.pbest_val[i] < self.gbest_val:
+                        self.gbest_pos=self.pbest_pos[i,:].copy()
+                        self.gbest_val=self.pbest_val[i]
             
-            #Updating particles for group 1 (exploration)
-            self.UpdateParticles(a=0, b=self.num_g1, friend_num=self.num_g1, check_slope=True)  #check slop is true
+            with phase(self.profiler, 'update'):
+                #Updating particles for group 1 (exploration)
+                self.UpdateParticles(a=0, b=self.num_g1, friend_num=self.num_g1, check_slope=True)  #check slop is true
     
-            #Updating particles for group 2 (exploitation)
-            self.UpdateParticles(a=self.num_g1, b=self.num_g, friend_num=self.num_g-1, check_slope=True)  #check slop is true       
+                #Updating particles for group 2 (exploitation)
+                self.UpdateParticles(a=self.num_g1, b=self.num_g, friend_num=self.num_g-1, check_slope=True)  #check slop is true       
                 
             #--mir
-            if self.mode=='max':
-                self.fitness_best_correct=-self.best_fitness
-                self.local_fitness=-np.min(fitness)
-            else:
-                self.fitness_best_correct=self.best_fitness
-                self.local_fitness=np.min(fitness)
+            with phase(self.profiler, 'logging'):
+                if self.mode=='max':
+                    self.fitness_best_correct=-self.best_fitness
+                    self.local_fitness=-np.min(fitness)
+                else:
+                    self.fitness_best_correct=self.best_fitness
+                    self.local_fitness=np.min(fitness)
 
-            self.last_pop=self.Positions.copy()
-            self.last_fit=np.array(fitness).copy()            
-            self.history['local_fitness'].append(self.local_fitness)
-            self.history['global_fitness'].append(self.fitness_best_correct)
-            self.history['c1'].append(self.c1[k])
-            self.history['c2'].append(self.c2[k])
-            self.history['K'].append(self.K[k])
+                self.last_pop=self.Positions.copy()
+                self.last_fit=np.array(fitness).copy()            
+                self.history['local_fitness'].append(self.local_fitness)
+                self.history['global_fitness'].append(self.fitness_best_correct)
+                self.history['c1'].append(self.c1[k])
+                self.history['c2'].append(self.c2[k])
+                self.history['K'].append(self.K[k])
             
-            # Print statistics
-            if self.verbose:
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('HCLPSO step {}/{}, npar = g1+g2 ={}, Ncores={}'.format((k+1)*self.num_g, ngen*self.num_g, self.num_g, self.ncores))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('Best Particle Fitness:', np.round(self.fitness_best_correct,6))
-                if self.grid_flag:
-                    self.particle_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
-                    print('Best Particle Position:', self.particle_decoded)
-                else:
-                    print('Best Particle Position:', self.best_position)
-                print('c1:', self.c1[k])
-                print('c2:', self.c2[k])
-                print('K:', self.K[k])
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                # Print statistics
+                if self.verbose:
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('HCLPSO step {}/{}, npar = g1+g2 ={}, Ncores={}'.format((k+1)*self.num_g, ngen*self.num_g, self.num_g, self.ncores))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('Best Particle Fitness:', np.round(self.fitness_best_correct,6))
+                    if self.grid_flag:
+                        self.particle_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
+                        print('Best Particle Position:', self.particle_decoded)
+                    else:
+                        print('Best Particle Position:', self.best_position)
+                    print('c1:', self.c1[k])
+                    print('c2:', self.c2[k])
+                    print('K:', self.K[k])
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -396,11 +379,12 @@ class HCLPSO(object):
             self.last_fit=-self.last_fit
         
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
         
         if self.verbose:
             print('------------------------ HCLPSO Summary --------------------------')
@@ -408,5 +392,9 @@ class HCLPSO(object):
             print('Best individual (x) found:', self.hclpso_correct)
             print('--------------------------------------------------------------')  
             
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.hclpso_correct, self.fitness_best_correct, self.history
 
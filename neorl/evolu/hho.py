@@ -30,12 +30,12 @@ import random
 import numpy as np
 import math
 import time
-import joblib
-import matplotlib.pyplot as plt
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator, eval_pop
+from neorl.utils.profiler import phase
 
 class HHO(object):
     """
@@ -47,9 +47,12 @@ class HHO(object):
     :param nhawks: (int): number of the hawks in the group
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors (must be ``<= nhawks``)
-    :param seed: (int) random seed for sampling
+    :param seed: (int) random seed for sampling. The rapid dives of all the hawks are evaluated together after the position update (see ``rapid_dives``): a diving hawk moves once its batch is evaluated, and the levy/normal draws of the second dives are made after all the draws of the update loop, so a seeded run does not give the same hawks as with the NEORL versions that evaluated each dive in the loop. The seeded runs with ``vectorized=True`` and ``vectorized=False`` are identical
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all hawks as a 2D array of shape (nhawks, d) and must return an array of shape (nhawks,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the HHO phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__(self, mode, bounds, fit, nhawks, int_transform='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, nhawks, int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
         
         self.seed = seed
         set_neorl_seed(self.seed)
@@ -65,9 +68,14 @@ class HHO(object):
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
             
         self.int_transform=int_transform
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.nhawks = nhawks
         self.dim = len(bounds)
         self.bounds = bounds
@@ -87,9 +95,11 @@ class HHO(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.lb = np.array([self.bounds[item][1] for item in self.bounds])
         self.ub = np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
         
     def evolute(self, ngen, x0=None, verbose=False, **kwargs):
         """
@@ -107,26 +117,31 @@ class HHO(object):
         self.rabbit_energy = float("inf")
         self.rabbit_location = np.zeros(self.dim)
         self.verbose = verbose
+        if self.profiler is not None:
+            self.profiler.reset()
 
         ##################################
         # Set initial locations of hawks #
         ##################################
-        self.hawk_positions = np.zeros((self.nhawks, self.dim))
-        if x0:
-            assert len(x0) == self.nhawks, '--error: the length of x0 ({}) MUST equal the number of hawks in the group ({})'.format(len(x0), self.nhawks)
-            for i in range(self.nhawks):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
-                if self.grid_flag:
-                    self.hawk_positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                else:
-                    self.hawk_positions[i,:] = x0[i]
-        else:
-            # self.hawk_positions = np.asarray([x * (self.ub - self.lb) + self.lb for x in np.random.uniform(0, 1, (self.nhawks, self.dim))])
-            for hawk_i in range(self.nhawks):
-                self.hawk_positions[hawk_i, :] = self.init_sample()
+        with phase(self.profiler, 'initialization'):
+            self.hawk_positions = np.zeros((self.nhawks, self.dim))
+            if x0:
+                assert len(x0) == self.nhawks, '--error: the length of x0 ({}) MUST equal the number of hawks in the group ({})'.format(len(x0), self.nhawks)
+                for i in range(self.nhawks):
+                    check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                    if self.grid_flag:
+                        self.hawk_positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    else:
+                        self.hawk_positions[i,:] = x0[i]
+            else:
+                # self.hawk_positions = np.asarray([x * (self.ub - self.lb) + self.lb for x in np.random.uniform(0, 1, (self.nhawks, self.dim))])
+                for hawk_i in range(self.nhawks):
+                    self.hawk_positions[hawk_i, :] = self.init_sample()
         
         self.best_scores=[]
         for t in range(ngen):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             self.a= 1 - t * ((1) / ngen)  #mir: a decreases linearly between 1 to 0, for discrete mutation
 
             if 'E1' in kwargs:
@@ -140,57 +155,53 @@ class HHO(object):
             ###########################
             # Evaluate hawk fitnesses #
             ###########################
-            fitness_lst = self.eval_hawks()
+            with phase(self.profiler, 'evaluation'):
+                fitness_lst = self.eval_hawks()
             
             #for logging
-            self.prev_pop=self.hawk_positions.copy()
-            self.prev_fits=np.array(fitness_lst)
-            self.best_scores.append(np.min(fitness_lst))
-            #######################################################################
-            # Update rabbit energy and rabbit location based on best hawk fitness #
-            #######################################################################
-            for i, fitness in enumerate(fitness_lst):
-                if fitness < self.rabbit_energy:
-                    self.rabbit_energy = fitness
-                    self.rabbit_location = self.hawk_positions[i, :].copy()
+            with phase(self.profiler, 'selection'):
+                self.prev_pop=self.hawk_positions.copy()
+                self.prev_fits=np.array(fitness_lst)
+                self.best_scores.append(np.min(fitness_lst))
+                #######################################################################
+                # Update rabbit energy and rabbit location based on best hawk fitness #
+                #######################################################################
+                for i, fitness in enumerate(fitness_lst):
+                    if fitness < self.rabbit_energy:
+                        self.rabbit_energy = fitness
+                        self.rabbit_location = self.hawk_positions[i, :].copy()
             
             #####################################################
             # Update best global and local fitnesses in history #
             #####################################################
-            if self.mode=='max':
-                self.best_global_fitness = -self.rabbit_energy
-            else:
-                self.best_global_fitness = self.rabbit_energy
-
-            if self.verbose and t % self.nhawks: # change depending on how often message should be displayed
-                print(f'HHO step {t*self.nhawks}/{ngen*self.nhawks}, nhawks={self.nhawks}, ncores={self.ncores}')
-                print('Best global fitness:', np.round(self.best_global_fitness, 6))
-                #mir-grid
-                if self.grid_flag:
-                    self.rabbit_decoded=decode_discrete_to_grid(self.rabbit_location,self.orig_bounds,self.bounds_map)
-                    print('Best rabbit position:', self.rabbit_decoded)
-                else:    
-                    print('Best rabbit position:', np.round(self.rabbit_location, 6))
-                print('E1:', self.E1)
-                print()
+            with phase(self.profiler, 'logging'):
+                if self.mode=='max':
+                    self.best_global_fitness = -self.rabbit_energy
+                else:
+                    self.best_global_fitness = self.rabbit_energy
+
+                if self.verbose and t % self.nhawks: # change depending on how often message should be displayed
+                    print(f'HHO step {t*self.nhawks}/{ngen*self.nhawks}, nhawks={self.nhawks}, ncores={self.ncores}')
+                    print('Best global fitness:', np.round(self.best_global_fitness, 6))
+                    #mir-grid
+                    if self.grid_flag:
+                        self.rabbit_decoded=decode_discrete_to_grid(self.rabbit_location,self.orig_bounds,self.bounds_map)
+                        print('Best rabbit position:', self.rabbit_decoded)
+                    else:    
+                        print('Best rabbit position:', np.round(self.rabbit_location, 6))
+                    print('E1:', self.E1)
+                    print()
 
             ################################
             # Update the location of hawks #
             ################################
-            self.update_hawks(fitness_lst) # now self.hawk_positions is updated
-
-            for hawk_i in range(self.nhawks):
-                #mir: this bound check  line is needed to ensure that choices.remove option to work 
-                self.hawk_positions[hawk_i, :] = self.ensure_bounds(self.hawk_positions[hawk_i, :], self.bounds)
-                for dim in range(self.dim):
-                    if self.var_type[dim] == 'int':
-                        self.hawk_positions[hawk_i, dim] = mutate_discrete(x_ij=self.hawk_positions[hawk_i, dim], 
-                                           x_min=self.hawk_positions[hawk_i, :].min(), 
-                                           x_max=self.hawk_positions[hawk_i, :].max(),
-                                           lb=self.lb[dim], 
-                                           ub=self.ub[dim], 
-                                           alpha=self.a,
-                                           method=self.int_transform)
+            with phase(self.profiler, 'update'):
+                self.update_hawks(fitness_lst) # now self.hawk_positions is updated
+
+            #all hawks are clipped and discretized at once (first check bounds, then check discrete)
+            self.hawk_positions = self.clip_discretize(self.hawk_positions)
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -215,34 +226,23 @@ class HHO(object):
         self.history['local_fitness'] = self.best_scores
                 
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.prev_pop, fits=self.prev_fits, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.prev_pop, fits=self.prev_fits, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.prev_pop, fits=self.prev_fits, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.prev_pop, fits=self.prev_fits, grid_flag=False)
             
         
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.rabbit_correct, self.best_global_fitness, self.history
 
     def ensure_bounds(self, vec, bounds):
-    
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(bounds.items()):
-    
-            # variable exceedes the minimum boundary
-            if vec[i] < bounds[key][1]:
-                vec_new.append(bounds[key][1])
-    
-            # variable exceedes the maximum boundary
-            if vec[i] > bounds[key][2]:
-                vec_new.append(bounds[key][2])
-    
-            # the variable is fine
-            if bounds[key][1] <= vec[i] <= bounds[key][2]:
-                vec_new.append(vec[i])
-            
-        return vec_new
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
 
     def init_sample(self):
         #"""
@@ -271,14 +271,11 @@ class HHO(object):
         #list - hawk fitnesses
         #"""
         #print(self.hawk_positions)
-        if self.ncores > 1:
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness_lst = parallel(joblib.delayed(self.fit_worker)(self.hawk_positions[i, :]) for i in range(self.nhawks))
-        else:
-            fitness_lst = []
-            for i in range(self.nhawks):
-                fitness_lst.append(self.fit_worker(self.hawk_positions[i, :]))
-        return fitness_lst
+        return self.eval_pop([self.hawk_positions[i, :] for i in range(self.nhawks)])
+
+    def eval_pop(self, pop):
+        #evaluates a list of hawk positions, in one batch if vectorized or with the evaluator pool otherwise
+        return eval_pop(self, pop)
 
     def update_hawks(self, fitness_lst):
         #"""
@@ -293,6 +290,7 @@ class HHO(object):
         #None
         #"""            
         
+        dives = [] # (hawk index, dive position) of the hawks performing team rapid dives
         for i in range(self.nhawks):
 
             E0 = 2 * random.random() - 1
@@ -320,7 +318,10 @@ class HHO(object):
                 # Phase 2: performing team rapid dives (leapfrog movements) #
                 #############################################################
                 elif r < 0.5:
-                    self.team_rapid_dives(i, fitness_lst[i], rabbit_escape_energy)
+                    dives.append((i, self.team_rapid_dives(i, rabbit_escape_energy)))
+
+        #the candidates of all the rapid dives are evaluated together
+        self.rapid_dives(dives, fitness_lst)
 
     def exploration(self, hawk_index):
         #"""
@@ -374,19 +375,19 @@ class HHO(object):
             self.hawk_positions[hawk_index, :] = (self.rabbit_location - self.hawk_positions[hawk_index, :]) \
                                         - escape_energy * abs(J * self.rabbit_location - self.hawk_positions[hawk_index, :])
 
-    def team_rapid_dives(self, hawk_index, hawk_fitness, escape_energy):
+    def team_rapid_dives(self, hawk_index, escape_energy):
         #"""
         #Exploitation phase 2 based on two strategies:
         #    1. Hard besiege with team rapid dives
         #    2. Soft besiege with team rapid dives
+        #The dive is evaluated later with the dives of the other hawks (see rapid_dives)
 
         #Params:
         #hawk_index - index of hawk being updated
-        #hawk_fitness - fitness of current hawk
         #escape_energy - escape energy of the rabbit
 
         #Return:
-        #None
+        #array - dive position Y, before the bound and discrete checks
         #"""
         #########################
         # Soft besiege eq. (10) #
@@ -395,26 +396,6 @@ class HHO(object):
             J = 2 * (1 - random.random())
             Y = self.rabbit_location \
                 - escape_energy * abs(J * self.rabbit_location - self.hawk_positions[hawk_index, :])
-            
-            #mir: uses a built-in function 
-            #(order is important for choices.remove(), first check bounds, then check discrete)
-            Y=self.ensure_bounds(Y, self.bounds)
-            Y=self.ensure_discrete(Y)
-            
-            if self.fit_worker(Y) < hawk_fitness:  # improved move?
-                self.hawk_positions[hawk_index, :] = Y.copy()
-            else:  # hawks perform self.levy-based short rapid dives around the rabbit
-                Z = self.rabbit_location \
-                    - escape_energy * abs(J * self.rabbit_location - self.hawk_positions[hawk_index, :]) \
-                    + np.multiply(np.random.randn(self.dim), self.levy())
-                    
-                #mir---
-                #(order is important for choices.remove(), first check bounds, then check discrete)
-                Z=self.ensure_bounds(Z, self.bounds)
-                Z=self.ensure_discrete(Z)
-            
-                if self.fit_worker(Z) < hawk_fitness:
-                    self.hawk_positions[hawk_index, :] = Z.copy()
         #########################
         # Hard besiege eq. (11) #
         #########################
@@ -422,49 +403,60 @@ class HHO(object):
             J = 2 * (1 - random.random())
             Y = self.rabbit_location \
                 - escape_energy * abs(J * self.rabbit_location - self.hawk_positions.mean(0))
-            
-            #---mir
-            #(order is important for choices.remove(), first check bounds, then check discrete)
-            Y=self.ensure_bounds(Y, self.bounds)
-            Y=self.ensure_discrete(Y)
-        
-            if self.fit_worker(Y) < hawk_fitness:  # improved move?
-                self.hawk_positions[hawk_index, :] = Y.copy()
-            else:  # Perform levy-based short rapid dives around the rabbit
-                Z = self.rabbit_location \
-                    - escape_energy * abs(J * self.rabbit_location - self.hawk_positions.mean(0)) \
-                    + np.multiply(np.random.randn(self.dim), self.levy())
-                    
-                #--mir
-                #(order is important for choices.remove(), first check bounds, then check discrete)
-                Z=self.ensure_bounds(Z, self.bounds)
-                Z=self.ensure_discrete(Z)
-                
-                if self.fit_worker(Z) < hawk_fitness:
-                    self.hawk_positions[hawk_index, :] = Z.copy()
-                    
+        return Y
 
-    def fit_worker(self, hawk_pos):
+    def rapid_dives(self, dives, fitness_lst):
         #"""
-        #Evaluates fitness of a hawk.
+        #Moves the hawks performing team rapid dives: the dive positions Y of all the hawks are
+        #evaluated in one batch, then the levy-based short rapid dives Z = Y + levy of the hawks
+        #that did not improve are evaluated in a second batch. A hawk moves to Y or Z if it improves its fitness.
 
         #Params:
-        #hawk_pos - hawk position vector
+        #dives - list of (hawk index, dive position Y) from team_rapid_dives
+        #fitness_lst - list of hawk fitnesses in current generation
 
         #Return:
-        #float - hawk fitness
+        #None
         #"""
+        if not dives:
+            return
         
-        #mir---
-        hawk_pos=self.ensure_bounds(hawk_pos, self.bounds)
+        #the dives of all hawks are clipped and discretized at once (first check bounds, then check discrete)
+        Y = self.clip_discretize([dive for _, dive in dives])
+        failed = [] # the hawks that did not improve with Y
+        with phase(self.profiler, 'evaluation'):
+            fitness_Y = self.eval_pop(Y)
+        for (i, dive), y, fitness in zip(dives, Y, fitness_Y):
+            if fitness < fitness_lst[i]:  # improved move?
+                self.hawk_positions[i, :] = y
+            else:
+                failed.append((i, dive))
+        if not failed:
+            return
         
-        #mir-grid
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            hawk_pos=decode_discrete_to_grid(hawk_pos,self.orig_bounds,self.bounds_map) 
-                    
-        fitness = self.fit(hawk_pos)
-        return fitness
+        # hawks perform levy-based short rapid dives around the rabbit
+        Z = self.clip_discretize([dive + np.multiply(np.random.randn(self.dim), self.levy()) for _, dive in failed])
+        with phase(self.profiler, 'evaluation'):
+            fitness_Z = self.eval_pop(Z)
+        for (i, _), z, fitness in zip(failed, Z, fitness_Z):
+            if fitness < fitness_lst[i]:
+                self.hawk_positions[i, :] = z
+
+    def clip_discretize(self, pop):
+        #clips all the individuals of pop to the bounds, then changes their int variables to discrete values
+        with phase(self.profiler, 'ensure_bounds'):
+            pop = self.space.clip(pop)
+        with phase(self.profiler, 'ensure_discrete'):
+            pop = self.space.discretize(pop, alpha=self.a, method=self.int_transform)
+        return pop
+
+    def fit_worker(self, hawk_pos):
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(hawk_pos)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all hawks in one fitness call
+        return self.worker.batch(pop)
     
     def ensure_discrete(self, vec):
         #"""
@@ -478,18 +470,7 @@ class HHO(object):
         #vec - updated hawk position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.a,
-                                               method=self.int_transform,
-                                               )
-        
-        return vec
+        return self.space.discretize(vec, alpha=self.a, method=self.int_transform)
 
     def levy(self):
         #"""
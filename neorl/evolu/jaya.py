@@ -19,11 +19,12 @@
 #"""
 import random
 import numpy as np
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 class JAYA:
     """
@@ -36,9 +37,12 @@ class JAYA:
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all individuals as a 2D array of shape (npop, d) and must return an array of shape (npop,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the JAYA phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
     
-    def __init__(self, mode, bounds, fit, npop=50, int_transform ='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, npop=50, int_transform ='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
 
         self.seed=seed
         set_neorl_seed(self.seed)
@@ -47,6 +51,8 @@ class JAYA:
         self.npop= npop
         self.bounds=bounds
         self.ncores=ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
 
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -62,6 +68,9 @@ class JAYA:
             self.fit = fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
 
         #infer variable types 
         self.var_type = np.array([bounds[item][0] for item in bounds])
@@ -78,10 +87,12 @@ class JAYA:
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, clip=False, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=[self.bounds[item][1] for item in self.bounds]
         self.ub=[self.bounds[item][2] for item in self.bounds]
+        self.space=Space(self.orig_bounds)
         
     def gen_indv(self, bounds): # individual 
 
@@ -118,22 +129,9 @@ class JAYA:
         return pop
 
     def ensure_bounds(self, vec): # bounds check
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
 
-        vec_new = []
-
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # less than minimum 
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # more than maximum
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        
-        return vec_new
-    
     def eval_pop(self, pos_array):
         #"""
         #Evaluate fitness of the population with parallel processing.
@@ -141,27 +139,19 @@ class JAYA:
         #Return:
         #list - pop fitnesses
         #"""
-        if self.ncores > 1:
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness_lst = parallel(joblib.delayed(self.fit_worker)(pos_array[i, :]) for i in range(self.npop))
+        if self.vectorized:
+            fitness_lst = list(self.fit_batch([pos_array[i, :] for i in range(self.npop)]))
         else:
-            fitness_lst = []
-            for i in range(self.npop):
-                fitness_lst.append(self.fit_worker(pos_array[i, :]))
+            fitness_lst = self.evaluator.map(self.worker, [pos_array[i, :] for i in range(self.npop)])
         return fitness_lst
 
     def fit_worker(self, x):
-        
-        # Clip the wolf with position outside the lower/upper bounds and return same position
-        # x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-
-        fitness = self.fit(x)
-
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all individuals in one fitness call
+        return self.worker.batch(pop)
     
     def ensure_discrete(self, vec):
         #"""
@@ -174,18 +164,7 @@ class JAYA:
         #vec - updated position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.b,
-                                               method=self.int_transform,
-                                               )
-        
-        return vec
+        return self.space.discretize(vec, alpha=self.b, method=self.int_transform)
 
     def evolute(self, ngen, x0=None, verbose=False):
         """
@@ -198,6 +177,8 @@ class JAYA:
         :return: (tuple) (best individual, best fitness, and a list of fitness history)
         """
         self.history = {'local_fitness':[], 'global_fitness':[]}
+        if self.profiler is not None:
+            self.profiler.reset()
         N = self.npop # population size
         dim = len(self.bounds) # individual length
 
@@ -211,95 +192,106 @@ class JAYA:
         Worst_score = float('inf')
         ## INITIALIZE
         #  population
-        if x0:
-            assert len(x0) == N, '--error: the length of x0 ({}) (initial population) must equal to number of individuals npop ({})'.format(len(x0), self.npop)
-            pos = self.init_population(x0=x0, verbose=verbose)
-        else:
-            pos = self.init_population(verbose=verbose)
+        with phase(self.profiler, 'initialization'):
+            if x0:
+                assert len(x0) == N, '--error: the length of x0 ({}) (initial population) must equal to number of individuals npop ({})'.format(len(x0), self.npop)
+                pos = self.init_population(x0=x0, verbose=verbose)
+            else:
+                pos = self.init_population(verbose=verbose)
 
-        pos = pos*1.0   #this is to account for mixed intger-cont. problems, data needs to be float
+            pos = pos*1.0   #this is to account for mixed intger-cont. problems, data needs to be float
         
-        # calulate fitness 
-        fitness_mat=self.eval_pop(pos)
-        for i in range(N):
-            if fitness_mat[i] > Best_score:
-                Best_score = fitness_mat[i]
-                Best_pos = pos[i, :]
-            if fitness_mat[i] < Worst_score:
-                Worst_score = fitness_mat[i]
-                Worst_pos = pos[i, :]
+            # calulate fitness 
+            fitness_mat=self.eval_pop(pos)
+            for i in range(N):
+                if fitness_mat[i] > Best_score:
+                    Best_score = fitness_mat[i]
+                    Best_pos = pos[i, :]
+                if fitness_mat[i] < Worst_score:
+                    Worst_score = fitness_mat[i]
+                    Worst_pos = pos[i, :]
 
         ## main loop
         best_scores = []
         for gen in range(1, ngen+1):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             self.b= 1 - gen * ((1) / ngen)  #mir: b decreases linearly between 1 to 0, for discrete mutation
-            new_pos = np.zeros((N,dim))
-
-            # update pos
-            for i in range(N):
-                r1=np.random.random(dim)
-                r2=np.random.random(dim)
-                # Update pos
-                new_pos[i,:] = (
-                    pos[i,:] 
-                    + r1*(Best_pos - abs(pos[i,:]))
-                    - r2*(Worst_pos - abs(pos[i,:])) # !! minus
-                )
-                # check bounds            
-                new_pos[i,:] = self.ensure_bounds(new_pos[i,:])
-                new_pos[i,:] = self.ensure_discrete(new_pos[i,:])
+            with phase(self.profiler, 'update'):
+                new_pos = np.zeros((N,dim))
+
+                # update pos
+                for i in range(N):
+                    r1=np.random.random(dim)
+                    r2=np.random.random(dim)
+                    # Update pos
+                    new_pos[i,:] = (
+                        pos[i,:] 
+                        + r1*(Best_pos - abs(pos[i,:]))
+                        - r2*(Worst_pos - abs(pos[i,:])) # !! minus
+                    )
+                #all individuals are clipped and discretized at once (first check bounds, then check discrete)
+                with phase(self.profiler, 'ensure_bounds'):
+                    new_pos = self.space.clip(new_pos)
+                with phase(self.profiler, 'ensure_discrete'):
+                    new_pos = self.space.discretize(new_pos, alpha=self.b, method=self.int_transform)
             
             
-            fitness_new=self.eval_pop(new_pos)
+            with phase(self.profiler, 'evaluation'):
+                fitness_new=self.eval_pop(new_pos)
                         
-            for i in range(N):
-                if fitness_new[i] > fitness_mat[i]:
-                    pos[i,:] = new_pos[i,:]
-                    fitness_mat[i] = fitness_new[i]
-
-            # update best_score and worst_score
-            for i in range(N):
-                if fitness_mat[i] > Best_score:
-                    Best_score = fitness_mat[i]
-                    Best_pos = pos[i, :]
-                if fitness_mat[i] < Worst_score:
-                    Worst_score = fitness_mat[i]
-                    Worst_pos = pos[i, :]            
+            with phase(self.profiler, 'selection'):
+                for i in range(N):
+                    if fitness_new[i] > fitness_mat[i]:
+                        pos[i,:] = new_pos[i,:]
+                        fitness_mat[i] = fitness_new[i]
+
+                # update best_score and worst_score
+                for i in range(N):
+                    if fitness_mat[i] > Best_score:
+                        Best_score = fitness_mat[i]
+                        Best_pos = pos[i, :]
+                    if fitness_mat[i] < Worst_score:
+                        Worst_score = fitness_mat[i]
+                        Worst_pos = pos[i, :]            
 
             #-----------------------------
             #Fitness saving 
             #-----------------------------
-            self.last_pop=new_pos.copy()
-            self.last_fit=np.array(fitness_new).copy()  
+            with phase(self.profiler, 'logging'):
+                self.last_pop=new_pos.copy()
+                self.last_fit=np.array(fitness_new).copy()  
             
-            gen_avg = sum(fitness_mat) / N                   # current generation avg. fitness
-            y_best = Best_score                                # fitness of best individual
-            x_best = Best_pos.copy()
-            best_scores.append(y_best)
+                gen_avg = sum(fitness_mat) / N                   # current generation avg. fitness
+                y_best = Best_score                                # fitness of best individual
+                x_best = Best_pos.copy()
+                best_scores.append(y_best)
             
-            #--mir  show the value wrt min/max
-            if self.mode=='min':
-                y_best_correct=-y_best
-                gen_avg=-gen_avg
-                self.history['local_fitness'].append(-np.max(fitness_new))
-            else:
-                y_best_correct=y_best
-                self.history['local_fitness'].append(np.max(fitness_new))
-
-            if verbose:
-                print('************************************************************')
-                print('JAYA step {}/{}, Ncores={}'.format(gen*self.npop, ngen*self.npop, self.ncores))
-                print('************************************************************')
-                print('Best fitness:', np.round(y_best_correct,6))
-
-                if self.grid_flag:
-                    x_decoded = decode_discrete_to_grid(x_best, self.orig_bounds, self.bounds_map)
-                    print('Best individual:', x_decoded)
+                #--mir  show the value wrt min/max
+                if self.mode=='min':
+                    y_best_correct=-y_best
+                    gen_avg=-gen_avg
+                    self.history['local_fitness'].append(-np.max(fitness_new))
                 else:
-                    print('Best individual:', x_best)
+                    y_best_correct=y_best
+                    self.history['local_fitness'].append(np.max(fitness_new))
+
+                if verbose:
+                    print('************************************************************')
+                    print('JAYA step {}/{}, Ncores={}'.format(gen*self.npop, ngen*self.npop, self.ncores))
+                    print('************************************************************')
+                    print('Best fitness:', np.round(y_best_correct,6))
+
+                    if self.grid_flag:
+                        x_decoded = decode_discrete_to_grid(x_best, self.orig_bounds, self.bounds_map)
+                        print('Best individual:', x_decoded)
+                    else:
+                        print('Best individual:', x_best)
                 
-                print('Average fitness:', np.round(gen_avg,6))
-                print('************************************************************')
+                    print('Average fitness:', np.round(gen_avg,6))
+                    print('************************************************************')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -320,10 +312,15 @@ class JAYA:
         self.history['global_fitness'] = best_scores
         
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
+        
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
         
         return x_best_correct, y_best_correct, self.history
@@ -20,11 +20,12 @@
 import random
 import numpy as np
 import math
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 
 class MFO:
@@ -39,9 +40,12 @@ class MFO:
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all moths as a 2D array of shape (nmoths, d) and must return an array of shape (nmoths,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the MFO phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
     
-    def __init__(self, mode, bounds, fit, nmoths=50, b=1, int_transform='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, nmoths=50, b=1, int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
 
         self.seed=seed
         set_neorl_seed(self.seed)
@@ -58,6 +62,9 @@ class MFO:
             self.fit = fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
 
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -66,6 +73,8 @@ class MFO:
         self.npop= nmoths
         self.bounds=bounds
         self.ncores=ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.b=b
         
         #infer variable types 
@@ -83,10 +92,12 @@ class MFO:
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=np.array([self.bounds[item][1] for item in self.bounds])
         self.ub=np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
         
     def gen_indv(self, bounds): # individual 
 
@@ -128,33 +139,16 @@ class MFO:
         return pop
 
     def ensure_bounds(self, vec): # bounds check
-
-        vec_new = []
-
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # less than minimum 
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # more than maximum
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        
-        return vec_new
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
 
     def fit_worker(self, x):
-        
-        x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-            
-        fitness = self.fit(x)
-
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all moths in one fitness call
+        return self.worker.batch(pop)
     
     def ensure_discrete(self, vec):
         #"""
@@ -168,18 +162,7 @@ class MFO:
         #vec - updated moth position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.a,
-                                               method=self.int_transform,
-                                               )
-        
-        return vec
+        return self.space.discretize(vec, alpha=self.a, method=self.int_transform)
 
     def evolute(self, ngen, x0=None, verbose=False, **kwargs):
         """
@@ -194,6 +177,8 @@ class MFO:
         
         self.history = {'local_fitness':[], 'global_fitness':[], 'r': []}
         self.best_fitness=float("inf")
+        if self.profiler is not None:
+            self.profiler.reset()
         N = self.npop # population size
         dim = len(self.bounds) # individual length
 
@@ -201,13 +186,14 @@ class MFO:
 
         ## INITIALIZE
         #  moths
-        if x0:
-            assert len(x0) == N, '--error: the length of x0 ({}) (initial population) must equal to number of individuals npop ({})'.format(len(x0), self.npop)
-            Moth_pos = self.init_population(x0=x0, verbose=verbose)
-        else:
-            Moth_pos = self.init_population(verbose=verbose)
+        with phase(self.profiler, 'initialization'):
+            if x0:
+                assert len(x0) == N, '--error: the length of x0 ({}) (initial population) must equal to number of individuals npop ({})'.format(len(x0), self.npop)
+                Moth_pos = self.init_population(x0=x0, verbose=verbose)
+            else:
+                Moth_pos = self.init_population(verbose=verbose)
             
-        Moth_pos = Moth_pos * 1.0 #this is to account for mixed intger-cont. problems, data needs to be float
+            Moth_pos = Moth_pos * 1.0 #this is to account for mixed intger-cont. problems, data needs to be float
         Moth_fitness = np.full(N, float('inf'))  # set as worst result
         
         
@@ -228,126 +214,132 @@ class MFO:
         
         ## main loop
         for gen in range(1, ngen+1):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             #print(Moth_pos)
             self.a= 1 - gen * ((1) / ngen)  #mir: a decreases linearly between 1 to 0, for discrete mutation
             Flame_no = round(N - gen*((N-1) / (ngen+1)))
 
-            core_lst=[]
-            for case in range (0, Moth_pos.shape[0]):
-                core_lst.append(Moth_pos[case, :])
+            with phase(self.profiler, 'evaluation'):
+                core_lst=[]
+                for case in range (0, Moth_pos.shape[0]):
+                    core_lst.append(Moth_pos[case, :])
                     
-            if self.ncores > 1: 
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    Moth_fitness=parallel(joblib.delayed(self.fit_worker)(indv) for indv in core_lst) # 2d list
-                Moth_pos = np.array(Moth_pos)
-                Moth_fitness = np.array(Moth_fitness)
-            else:
-                Moth_fitness=[]
-                for item in core_lst:
-                    Moth_fitness.append(self.fit_worker(item))
-
-            for i, fits in enumerate(Moth_fitness):
-                #save the best of the best!!!
-                if fits < self.best_fitness:
-                    self.best_fitness=fits
-                    self.best_position=list(Moth_pos[i, :].copy())
+                if self.vectorized:
+                    Moth_fitness=list(self.fit_batch(core_lst))
+                else:
+                    Moth_fitness=self.evaluator.map(self.worker, core_lst)
+
+            with phase(self.profiler, 'selection'):
+                for i, fits in enumerate(Moth_fitness):
+                    #save the best of the best!!!
+                    if fits < self.best_fitness:
+                        self.best_fitness=fits
+                        self.best_position=list(Moth_pos[i, :].copy())
                                                             
-            if gen == 1: # OF # equal to OM #
-                # sort the moths
-                fitness_sorted = np.sort(Moth_fitness) # default: (small -> large)
-                #fitness_sorted = -(np.sort(-np.array(Moth_fitness)))  # descend (large -> small)
-                I = np.argsort(np.array(Moth_fitness)) # index of sorted list 
-                sorted_population = Moth_pos[I, :]
-
-                # update flames
-                best_flames = sorted_population
-                best_flame_fitness = fitness_sorted
-
-            else: # #OF may > #OM
+                if gen == 1: # OF # equal to OM #
+                    # sort the moths
+                    fitness_sorted = np.sort(Moth_fitness) # default: (small -> large)
+                    #fitness_sorted = -(np.sort(-np.array(Moth_fitness)))  # descend (large -> small)
+                    I = np.argsort(np.array(Moth_fitness)) # index of sorted list 
+                    sorted_population = Moth_pos[I, :]
+
+                    # update flames
+                    best_flames = sorted_population
+                    best_flame_fitness = fitness_sorted
+
+                else: # #OF may > #OM
                 
-                double_population = np.concatenate((self.previous_population, best_flames), axis=0)
-                double_fitness = np.concatenate((self.previous_fitness, best_flame_fitness), axis=0)
+                    double_population = np.concatenate((self.previous_population, best_flames), axis=0)
+                    double_fitness = np.concatenate((self.previous_fitness, best_flame_fitness), axis=0)
                 
-                double_fitness_sorted = np.sort(double_fitness)
-                I2 = np.argsort(double_fitness)
-                double_sorted_population = double_population[I2, :]
+                    double_fitness_sorted = np.sort(double_fitness)
+                    I2 = np.argsort(double_fitness)
+                    double_sorted_population = double_population[I2, :]
                 
-                fitness_sorted = double_fitness_sorted[0:N]
-                sorted_population = double_sorted_population[0:N, :]
+                    fitness_sorted = double_fitness_sorted[0:N]
+                    sorted_population = double_sorted_population[0:N, :]
 
-                best_flames = sorted_population
-                best_flame_fitness = fitness_sorted
+                    best_flames = sorted_population
+                    best_flame_fitness = fitness_sorted
             
-            # record the best flame so far   
-            Best_flame_score = fitness_sorted[0]
-            Best_flame_pos = sorted_population[0, :]
-
-            # previous for logging
-            self.previous_population = np.copy(Moth_pos)  # if not using np.copy(),changes of Moth_pos after this code will also change previous_population!  
-            self.previous_fitness = np.copy(Moth_fitness) # because of the joblib..
-
-            if 'r' in kwargs:
-                #take it from external vector
-                assert len(kwargs["r"]) == ngen, '--error: the length of `r` in kwargs must equal to ngen'
-                r=kwargs["r"][gen-1]
-            else:
-                # r linearly dicreases from -1 to -2 to calculate t in Eq. (3.12)
-                r = -1 + gen * ((-1) / ngen)
+                # record the best flame so far   
+                Best_flame_score = fitness_sorted[0]
+                Best_flame_pos = sorted_population[0, :]
+
+                # previous for logging
+                self.previous_population = np.copy(Moth_pos)  # if not using np.copy(),changes of Moth_pos after this code will also change previous_population!  
+                self.previous_fitness = np.copy(Moth_fitness) # because of the joblib..
+
+            with phase(self.profiler, 'update'):
+                if 'r' in kwargs:
+                    #take it from external vector
+                    assert len(kwargs["r"]) == ngen, '--error: the length of `r` in kwargs must equal to ngen'
+                    r=kwargs["r"][gen-1]
+                else:
+                    # r linearly dicreases from -1 to -2 to calculate t in Eq. (3.12)
+                    r = -1 + gen * ((-1) / ngen)
                 
-            # update moth position
-            for i in range(0, N):
-                for j in range(0,dim):
-                    if i <= Flame_no:
-                        distance_to_flame = abs(sorted_population[i,j]-Moth_pos[i,j])
-                        t = (r-1)*random.random()+1
-                        # eq. (3.12)
-                        Moth_pos[i,j] = (
-                            distance_to_flame*math.exp(self.b*t)*math.cos(t*2*math.pi)
-                        + sorted_population[i,j] 
-                        )
-
-                    if i > Flame_no: 
-                        distance_to_flame = abs(sorted_population[Flame_no,j]-Moth_pos[i,j])
-                        t = (r-1)*random.random()+1     
-                        # rebundant moths all fly to the last Flame_no
-                        Moth_pos[i,j] = (
-                            distance_to_flame*math.exp(self.b*t)*math.cos(t*2*math.pi)
-                        + sorted_population[Flame_no,j] 
-                        )
-
-                Moth_pos[i,:]=self.ensure_bounds(Moth_pos[i,:])
-                Moth_pos[i,:] = self.ensure_discrete(Moth_pos[i, :])
+                # update moth position
+                for i in range(0, N):
+                    for j in range(0,dim):
+                        if i <= Flame_no:
+                            distance_to_flame = abs(sorted_population[i,j]-Moth_pos[i,j])
+                            t = (r-1)*random.random()+1
+                            # eq. (3.12)
+                            Moth_pos[i,j] = (
+                                distance_to_flame*math.exp(self.b*t)*math.cos(t*2*math.pi)
+                            + sorted_population[i,j] 
+                            )
+
+                        if i > Flame_no: 
+                            distance_to_flame = abs(sorted_population[Flame_no,j]-Moth_pos[i,j])
+                            t = (r-1)*random.random()+1     
+                            # rebundant moths all fly to the last Flame_no
+                            Moth_pos[i,j] = (
+                                distance_to_flame*math.exp(self.b*t)*math.cos(t*2*math.pi)
+                            + sorted_population[Flame_no,j] 
+                            )
+
+                #all moths are clipped and discretized at once (first check bounds, then check discrete)
+                with phase(self.profiler, 'ensure_bounds'):
+                    Moth_pos = self.space.clip(Moth_pos)
+                with phase(self.profiler, 'ensure_discrete'):
+                    Moth_pos = self.space.discretize(Moth_pos, alpha=self.a, method=self.int_transform)
                 
             #-----------------------------
             #Fitness saving 
             #-----------------------------
-            gen_avg = sum(best_flame_fitness) / len(best_flame_fitness)  # current generation avg. fitness
+            with phase(self.profiler, 'logging'):
+                gen_avg = sum(best_flame_fitness) / len(best_flame_fitness)  # current generation avg. fitness
                 
-            #--mir
-            if self.mode=='max':
-                self.fitness_best_correct=-self.best_fitness
-                self.local_fitness=-Best_flame_score
-            else:
-                self.fitness_best_correct=self.best_fitness
-                self.local_fitness=Best_flame_score
-
-            self.history['local_fitness'].append(self.local_fitness)
-            self.history['global_fitness'].append(self.fitness_best_correct)
-            self.history['r'].append(r)
-
-            if verbose:
-                print('************************************************************')
-                print('MFO step {}/{}, Ncores={}'.format(gen*self.npop, ngen*self.npop, self.ncores))
-                print('************************************************************')
-                print('Best fitness:', np.round(self.fitness_best_correct,6))
-                if self.grid_flag:
-                    self.moth_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
-                    print('Best individual:', self.moth_decoded)
+                #--mir
+                if self.mode=='max':
+                    self.fitness_best_correct=-self.best_fitness
+                    self.local_fitness=-Best_flame_score
                 else:
-                    print('Best individual:', self.best_position)
-                print('Average fitness:', np.round(gen_avg,6))
-                print('r:', r)
-                print('************************************************************')
+                    self.fitness_best_correct=self.best_fitness
+                    self.local_fitness=Best_flame_score
+
+                self.history['local_fitness'].append(self.local_fitness)
+                self.history['global_fitness'].append(self.fitness_best_correct)
+                self.history['r'].append(r)
+
+                if verbose:
+                    print('************************************************************')
+                    print('MFO step {}/{}, Ncores={}'.format(gen*self.npop, ngen*self.npop, self.ncores))
+                    print('************************************************************')
+                    print('Best fitness:', np.round(self.fitness_best_correct,6))
+                    if self.grid_flag:
+                        self.moth_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
+                        print('Best individual:', self.moth_decoded)
+                    else:
+                        print('Best individual:', self.best_position)
+                    print('Average fitness:', np.round(gen_avg,6))
+                    print('r:', r)
+                    print('************************************************************')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -365,10 +357,15 @@ class MFO:
             self.previous_fitness=-self.previous_fitness
             
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.previous_population, fits=self.previous_fitness, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.previous_population, fits=self.previous_fitness, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.previous_population, fits=self.previous_fitness, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.previous_population, fits=self.previous_fitness, grid_flag=False)
             
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.moth_correct, self.fitness_best_correct, self.history
@@ -18,14 +18,13 @@
 
 import random
 import numpy as np
-from collections import defaultdict
-import copy
 import time
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator, FitnessCache, eval_pop
+from neorl.utils.profiler import phase
 
 class PSO:
     """
@@ -40,8 +39,12 @@ class PSO:
     :param speed_mech: (str) type of speed mechanism to update particle velocity, choose between ``constric``, ``timew``, ``globw``.			
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with the whole swarm as a 2D array of shape (npar, d) and must return an array of shape (npar,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param cache_size: (int) maximum number of evaluated individuals to memorize, repeated individuals are not evaluated again (useful for int/grid spaces). If ``None``, no cache is used
+    :param profiler: (Profiler) records the time of the fitness and of the PSO phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__ (self, mode, bounds, fit, npar=50, c1=2.05, c2=2.05, speed_mech='constric', ncores=1, seed=None):  
+    def __init__ (self, mode, bounds, fit, npar=50, c1=2.05, c2=2.05, speed_mech='constric', ncores=1, seed=None, vectorized=False, evaluator=None, cache_size=None, profiler=None):  
 
         set_neorl_seed(seed)
         
@@ -58,8 +61,14 @@ class PSO:
             self.fit=fitness_wrapper	
         else:	
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
               
         self.ncores=ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
+        self.cache=FitnessCache(maxsize=cache_size) if cache_size else None
         self.speed_mech=speed_mech
         self.c1=c1
         self.c2=c2
@@ -96,9 +105,11 @@ class PSO:
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
-        self.low = np.array([self.bounds[item][1] for item in self.bounds])
-        self.up = np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
+        self.low, self.up=self.space.lb, self.space.ub
+        self.int_index, self.float_index=self.space.int_index, self.space.float_index
                         
     def GenParticle(self, bounds):
         #"""
@@ -124,61 +135,34 @@ class PSO:
         return particle, speed
 
     def ensure_bounds(self, vec):
-    
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(self.bounds.items()):
-    
-            # variable exceedes the minimum boundary
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-    
-            # variable exceedes the maximum boundary
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-    
-            # the variable is fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-            
-        return vec_new
+        #clip a single particle to the lower/upper bounds
+        return list(self.space.clip(vec))
     
     def fit_worker(self, x):
-        #"""
-        #Evaluates fitness of an individual.
-        #"""
-        
-        x=self.ensure_bounds(x)
-        
-        #mir-grid
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map) 
-                    
-        fitness = self.fit(x)
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all particles in one fitness call
+        return self.worker.batch(pop)
+
+    def eval_pop(self, pop):
+        #evaluates a list of particles, in one batch if vectorized or with the evaluator pool otherwise
+        return eval_pop(self, pop)
     
     def InitSwarm(self, x0=None, verbose=False):
         #"""
         #Swarm intializer 
         #Inputs:
-        #    -warmup (int): number of individuals to create and evaluate initially
+        #    -x0 (list of lists): initial positions given by the user
         #Returns 
-        #    -pop (dict): initial swarm in a dictionary form, looks like this:
-        #        
-        #    pop={particle key: [particle position, particle velocity, particle fitness]}
-        #    pop={0: [[1,2,3,4,5], [0.1,0.2,0.3,0.4,0.5], 1.2], 
-        #         ... 
-        #         99: [[1.1,2.1,3.1,4.1,5.1], [0.1,0.2,0.3,0.4,0.5], 5.2]}
-        #   
+        #    -pos (numpy.ndarray): positions of the particles, shape (npar, d)
+        #    -vel (numpy.ndarray): velocities of the particles, shape (npar, d)
+        #    -fitness (numpy.ndarray): fitness of the particles, shape (npar,)
         #"""
         #initialize the swarm and velocity and run them in parallel (these samples will be used to initialize the swarm)
-
-            
-        pop=defaultdict(list)
-        # dict key runs from 0 to self.npar-1
-        # index 0: individual, index 1: velocity, index 2: fitness 
         
+        pos=[]
         #Establish the swarm
         if x0:
             if verbose:
@@ -187,121 +171,81 @@ class PSO:
             for i in range(len(x0)):                
                 check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
                 if self.grid_flag:
-                    x_encoded=encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                    speed = list(self.v0*np.array(x_encoded))
-                    pop[i].append(x_encoded)
+                    pos.append(encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map))
                 else:
-                    pop[i].append(x0[i])
-                    speed = list(self.v0*np.array(x0[i]))
-                
-                pop[i].append(speed)
+                    pos.append(x0[i])
             
         else:
             for i in range (self.npar):
                 particle, speed=self.GenParticle(self.bounds)
-                pop[i].append(particle)
-                pop[i].append(speed)
+                pos.append(particle)
         
-        #Evaluate the swarm
-        if self.ncores > 1:  #evaluate swarm in parallel
-            core_list=[]
-            for particle in pop:
-                core_list.append(pop[particle][0])
-
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness=parallel(joblib.delayed(self.fit_worker)(item) for item in core_list)
-                
-            [pop[particle].append(fitness[particle]) for particle in range(len(pop))]
+        pos=np.array(pos, dtype=float)
+        vel=self.v0*pos
         
-        else: #evaluate swarm in series
-            for particle in pop:
-                fitness=self.fit_worker(pop[particle][0])
-                pop[particle].append(fitness)
-                
-        #Setup the local position and fitness for PSO calculations
-        local_pos=[]
-        local_fit=[]
-        for particle in pop:
-            local_pos.append(pop[particle][0])
-            local_fit.append(pop[particle][2])
+        #Evaluate the swarm
+        fitness=np.array(self.eval_pop([self.to_indv(x) for x in pos]), dtype=float)
         
-        return pop, local_pos, local_fit  #return final pop dictionary with particle, velocity, and fitness
+        return pos, vel, fitness
+    
+    def to_indv(self, vec):
+        #converts a particle position back to the list form sent to the fitness,
+        #where int variables are python integers
+        indv=vec.tolist()
+        for i in self.int_index:
+            indv[i]=int(indv[i])
+        return indv
     
-    def UpdateParticle(self, particle, local_pos, local_fit):
+    def UpdateSwarm(self):
         #"""
-        #Function that updates the particle speed and position based on the 
-        #best local positon of the particle and best global position of the swarm
+        #Function that updates the speed and position of all particles at once based on the 
+        #best local positon of each particle and best global position of the swarm
         #The function works with both int or float variables
-        #Input: 
-        #    particle (list of lists):
-        #            particle[0] (list) = current position
-        #            particle[1] (list) = speed 
-        #            particle[2] (list) = current fit 
-        #    local_pos (list): best local position observed for this particle
         #
-        #Return:
-        #    new_particle (list of lists): modified particle with same structure as `particle` 
+        #Updates:
+        #    self.vel (numpy.ndarray): new particle speeds 
+        #    self.pos (numpy.ndarray): new particle positions 
         #"""  
         
-        new_particle=copy.deepcopy(particle)
-        for i in range (self.size):
-            r1=random.random()
-            r2=random.random()
-            
-            #**********************
-            #Update Speed
-            #**********************
-            speed_cognitive=self.c1*r1*(local_pos[i]-particle[0][i])
-            speed_social=self.c2*r2*(self.swm_pos[i]-particle[0][i])
-            
-            if self.speed_mech=='constric':
-                new_particle[1][i]=self.w*(particle[1][i]+speed_cognitive+speed_social)
-                #print('constric', self.w)
-            elif self.speed_mech=='timew':
-                new_particle[1][i]=self.w*particle[1][i]+speed_cognitive+speed_social
-            elif self.speed_mech=='globw':
-                
-                try:
-                    self.w=1.1-self.swm_fit/local_fit
-                except:
-                    self.w=random.uniform(0.1,0.9)   #when division by zero occurs for "w"
-                
-                #print('globw', self.w)
-                new_particle[1][i]=self.w*particle[1][i]+speed_cognitive+speed_social
-            else:
-                raise ('only constric, timew, globw, are allowed for speed_mech, the mechanism used is not defined')
-            
-            #***********************************   
-            #Update Position based on data type
-            #************************************
-            if self.datatype[i].strip() == 'float':
-                new_particle[0][i]=particle[0][i]+new_particle[1][i]
-            
-                # adjust maximum position if necessary
-                if new_particle[0][i] > self.up[i]:
-                    new_particle[0][i]=self.up[i]
-    
-                # adjust minimum position if neseccary
-                if new_particle[0][i] < self.low[i]:
-                    new_particle[0][i]=self.low[i]
-            
-            elif self.datatype[i].strip() == 'int':
-                move_cond=(random.random() < self._sigmoid(new_particle[1][i])) * 1    #returns binary 0/1              
-                if move_cond: #perturb this parameter
-                    
-                    if int(self.low[i]) == int(self.up[i]):
-                        new_particle[0][i] = int(self.low[i])
-                    else:
-                        # make a list of possiblities after excluding the current value to enforce mutation
-                        choices=list(range(self.low[i],self.up[i]+1))
-                        choices.remove(new_particle[0][i])
-                        # randint is NOT used here since it could re-draw the same integer value, choice is used instead
-                        new_particle[0][i] = random.choice(choices)
-            else:
-                raise Exception('The particle position in PSO cannot be modified, either int/float data types are allowed')
-                     
-                     
-        return new_particle
+        r1=np.random.random((self.npar, self.size))
+        r2=np.random.random((self.npar, self.size))
+        
+        #**********************
+        #Update Speed
+        #**********************
+        speed_cognitive=self.c1*r1*(self.local_pos-self.pos)
+        speed_social=self.c2*r2*(self.swm_pos_arr-self.pos)
+        
+        if self.speed_mech=='constric':
+            self.vel=self.w*(self.vel+speed_cognitive+speed_social)
+        elif self.speed_mech=='timew':
+            self.vel=self.w*self.vel+speed_cognitive+speed_social
+        elif self.speed_mech=='globw':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                w=1.1-self.swm_fit/self.local_fit
+            #when division by zero occurs for "w"
+            invalid=~np.isfinite(w)
+            w[invalid]=np.random.uniform(0.1,0.9,size=np.sum(invalid))
+            self.w=w
+            self.vel=w[:,None]*self.vel+speed_cognitive+speed_social
+        else:
+            raise ('only constric, timew, globw, are allowed for speed_mech, the mechanism used is not defined')
+        
+        #***********************************   
+        #Update Position based on data type
+        #************************************
+        f=self.float_index
+        self.pos[:,f]=self.space.clip(self.pos+self.vel)[:,f]
+        
+        i=self.int_index
+        if len(i):
+            #perturb the int parameters with a probability given by the sigmoid of their speed
+            move_cond=np.random.random((self.npar, len(i))) < self._sigmoid(self.vel[:,i])
+            #draw uniformly from [low, up] after excluding the current value to enforce mutation
+            width=self.up[i]-self.low[i]
+            choices=self.low[i]+np.floor(np.random.random((self.npar, len(i)))*width)
+            choices+=(choices >= self.pos[:,i]) * (width > 0)
+            self.pos[:,i]=np.where(move_cond, choices, self.pos[:,i])
 
     def _sigmoid(self, x):
         #"""
@@ -313,48 +257,6 @@ class PSO:
         #"""
         return 1 / (1 + np.exp(-x))
 
-    def select(self, pop, k=1):
-        #"""
-        #Reorder the swarm and select the best `k` particles from it
-        #Input:
-        #    -pop (dict): swarm of particles 
-        #    -k (int): number of particles to survive [ k < len(pop) ]
-        #Returns:
-        #    -best_dict (dict): dictionary of the best k particles in the swarm
-        #"""
-        pop=list(pop.items())
-        pop.sort(key=lambda e: e[1][2], reverse=True)
-        sorted_dict=dict(pop[:k])
-        #Next block creates a new dict where keys are reset to 0 ... k in order to avoid unordered keys after sort
-        best_dict=defaultdict(list)
-        index=0
-        for key in sorted_dict:
-            for j in range (3): 
-                #5 refers to the properties of each particle in order
-                #0: current pos, 1: speed, 2: current fitness, 3: best local pos, 4: best local fitness
-                best_dict[index].append(sorted_dict[key][j])
-            index+=1
-        
-        sorted_dict.clear()
-        return best_dict
-
-    def GenSwarm(self, swm):
-        #"""
-        #Generate the new swarm (offspring) based on the old swarm, 
-        #by looping and updating all particles
-        #Input:
-        #    swm (dict): current swarm 
-        #Return:
-        #    offspring (dict): new updated swarm
-        #"""
-        offspring = defaultdict(list)
-        for i in range(len(swm)):
-            
-            offspring[i] = self.UpdateParticle(particle=swm[i], local_pos=self.local_pos[i], local_fit=self.local_fit[i])
-            offspring[i][2] = 0  #this fitness item is set to zero since it is not evaluated yet by the fitness
-    
-        return offspring
-
     def evolute(self, ngen, x0=None, verbose=False, **kwargs):
         """
         This function evolutes the PSO algorithm for number of generations.
@@ -368,76 +270,60 @@ class PSO:
         self.pso_hist={}
         self.pso_hist['mean_speed']=[]
         self.best_scores=[]
-        if x0:
-            #get the initial swarm position from the user, it has to be 
-            #print('-- Using The Initial PSO Swarm from the User')
-            assert len(x0) == self.npar, '--error: the length of x0 ({}) (initial swarm) must equal to number of particles ({})'.format(len(x0), self.npar)
-            swarm, self.local_pos, self.local_fit=self.InitSwarm(x0=x0, verbose=verbose)
-        else:
-            #print('-- Using A Random Initial PSO Swarm')
-            #generate the initial swarm internally, assign all variables
-            swarm, self.local_pos, self.local_fit=self.InitSwarm(verbose=verbose)
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            if x0:
+                #get the initial swarm position from the user, it has to be 
+                #print('-- Using The Initial PSO Swarm from the User')
+                assert len(x0) == self.npar, '--error: the length of x0 ({}) (initial swarm) must equal to number of particles ({})'.format(len(x0), self.npar)
+                self.pos, self.vel, self.fitness=self.InitSwarm(x0=x0, verbose=verbose)
+            else:
+                #print('-- Using A Random Initial PSO Swarm')
+                #generate the initial swarm internally, assign all variables
+                self.pos, self.vel, self.fitness=self.InitSwarm(verbose=verbose)
+        
+        #Setup the local position and fitness for PSO calculations
+        self.local_pos=self.pos.copy()
+        self.local_fit=self.fitness.copy()
         
-        swm0=self.select(swarm, k=1)
-        self.swm_pos=swm0[0][0]
-        self.swm_fit=swm0[0][2]
+        best=np.argmax(self.fitness)
+        self.swm_pos_arr=self.pos[best].copy()
+        self.swm_pos=self.to_indv(self.swm_pos_arr)
+        self.swm_fit=self.fitness[best]
 
         #-----------------------------
         # Begin the evolution process
         #-----------------------------
         for gen in range(1, ngen + 1):
+            if self.profiler is not None:
+                self.profiler.start_generation()
                     
-            #--Vary the particles and generate new offspring/swarm
-            offspring = self.GenSwarm(swm=swarm)
+            #--Vary the particles and generate new swarm
+            with phase(self.profiler, 'update_swarm'):
+                self.UpdateSwarm()
             
             #***************************
-            #Parallel: Evaluate the particles 
-            # with multiprocessign Pool
+            #Evaluate the particles in one batch 
+            # or with the evaluator pool
             #***************************
-            if self.ncores > 1:
+            with phase(self.profiler, 'evaluation'):
                 t0=time.time()
-                core_list=[]
-                for key in offspring:
-                    core_list.append(offspring[key][0])
-
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    fitness=parallel(joblib.delayed(self.fit_worker)(item) for item in core_list)
-                
+                self.fitness=np.array(self.eval_pop([self.to_indv(x) for x in self.pos]), dtype=float)
                 self.partime=time.time()-t0
-                #print('PSO:', self.partime)
+            #print('PSO:', self.partime)
                 
-                #append fitness data to the swarm dict
-                for k in range(len(offspring)):
-                    offspring[k][2] = fitness[k]
-                    
+            with phase(self.profiler, 'selection'):
                 #check and update local best
-                for par in range (len(fitness)):
-                    if fitness[par] > self.local_fit[par]:
-                        self.local_pos[par]= copy.deepcopy(offspring[par][0])
-                        self.local_fit[par]= fitness[par]
-                        #check and update global/swarm best
-                        if fitness[par] > self.swm_fit:
-                            self.swm_fit = fitness[par]
-                            self.swm_pos=copy.deepcopy(offspring[par][0])
-            #***************************
-            #Serial: no Pool
-            #***************************
-            else: 
-                for par in range(len(offspring)):
-                    
-                    fitness=self.fit_worker(offspring[par][0])
-                    offspring[par][2]=fitness
-            
-                    #check and update local best
-                    if fitness > self.local_fit[par]:
-                        self.local_pos[par]= copy.deepcopy(offspring[par][0])
-                        self.local_fit[par]= fitness
-                        #check and update global/swarm best
-                        if fitness > self.swm_fit:
-                            self.swm_fit = fitness
-                            self.swm_pos=copy.deepcopy(offspring[par][0])
-                
-                self.partime=0
+                improved=self.fitness > self.local_fit
+                self.local_pos[improved]=self.pos[improved]
+                self.local_fit[improved]=self.fitness[improved]
+                #check and update global/swarm best
+                best=np.argmax(self.fitness)
+                if self.fitness[best] > self.swm_fit:
+                    self.swm_fit=self.fitness[best]
+                    self.swm_pos_arr=self.pos[best].copy()
+                    self.swm_pos=self.to_indv(self.swm_pos_arr)
                             
             if self.speed_mech=='timew':
                 
@@ -452,43 +338,42 @@ class PSO:
                     self.w = self.wmax - (self.wmax-self.wmin)*step/totsteps
                     #print('timew', self.w)
             
-            fit_best=np.max([offspring[item][2] for item in offspring])  #get the max fitness for this generation
-            self.best_scores.append(fit_best)
-            swarm = copy.deepcopy(offspring) 
-            
-            #--mir
-            if self.mode=='min':
-                self.swm_fit_correct=-self.swm_fit
-            else:
-                self.swm_fit_correct=self.swm_fit
+            with phase(self.profiler, 'logging'):
+                fit_best=np.max(self.fitness)  #get the max fitness for this generation
+                self.best_scores.append(fit_best)
             
-            # Print data
-            mean_speed=[np.mean(swarm[i][1]) for i in swarm]
-            self.pso_hist['mean_speed'].append(np.mean(mean_speed))
-            if verbose:
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('PSO step {}/{}, C1={}, C2={}, W={}, Particles={}, Ncores={}'.format(gen*self.npar, ngen*self.npar, np.round(self.c1,2), np.round(self.c2,2), np.round(self.w,2), self.npar, self.ncores))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('Statistics for generation {}'.format(gen))
-                print('Best Swarm Fitness:', np.round(self.swm_fit_correct,6))
-                if self.grid_flag:
-                    self.swm_decoded = decode_discrete_to_grid(self.swm_pos, self.orig_bounds, self.bounds_map)
-                    print('Best Swarm Position:', self.swm_decoded,6)
+                #--mir
+                if self.mode=='min':
+                    self.swm_fit_correct=-self.swm_fit
                 else:
-                    print('Best Swarm Position:', self.swm_pos)             
-                print('Max Speed:', np.round(np.max(mean_speed),3))
-                print('Min Speed:', np.round(np.min(mean_speed),3))
-                print('Average Speed:', np.round(np.mean(mean_speed),3))
-                if self.speed_mech=='timew':
-                    print('w:', self.w)
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    self.swm_fit_correct=self.swm_fit
+            
+                # Print data
+                mean_speed=np.mean(self.vel, axis=1)
+                self.pso_hist['mean_speed'].append(np.mean(mean_speed))
+                if verbose:
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('PSO step {}/{}, C1={}, C2={}, W={}, Particles={}, Ncores={}'.format(gen*self.npar, ngen*self.npar, np.round(self.c1,2), np.round(self.c2,2), np.round(self.w,2), self.npar, self.ncores))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('Statistics for generation {}'.format(gen))
+                    print('Best Swarm Fitness:', np.round(self.swm_fit_correct,6))
+                    if self.grid_flag:
+                        self.swm_decoded = decode_discrete_to_grid(self.swm_pos, self.orig_bounds, self.bounds_map)
+                        print('Best Swarm Position:', self.swm_decoded,6)
+                    else:
+                        print('Best Swarm Position:', self.swm_pos)             
+                    print('Max Speed:', np.round(np.max(mean_speed),3))
+                    print('Min Speed:', np.round(np.min(mean_speed),3))
+                    print('Average Speed:', np.round(np.mean(mean_speed),3))
+                    if self.speed_mech=='timew':
+                        print('w:', self.w)
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
-        #Select and order the last population 
-        self.population=copy.deepcopy(self.select(pop=swarm, k=self.npar))
-        # Append local data to the final swarm population, items [3] and [4] in the dictionary
-        for par in range(len(swarm)):
-            swarm[par].append(self.local_pos[par])
-            swarm[par].append(self.local_fit[par])
+        #Select and order the last population (best particles first)
+        order=np.argsort(-self.fitness, kind='stable')
+        self.population=self.pos[order]
         
         #mir-grid
         if self.grid_flag:
@@ -504,11 +389,12 @@ class PSO:
     
 
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.pso_hist['last_pop'] = get_population(self.population, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.pso_hist['last_pop'] = get_population(self.population, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.pso_hist['last_pop'] = get_population(self.population, fits=self.fitness[order], grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.pso_hist['last_pop'] = get_population(self.population, fits=self.fitness[order], grid_flag=False)
             
         if self.mode == 'min':
             self.best_scores=[-item for item in self.best_scores]
@@ -519,4 +405,13 @@ class PSO:
         
         self.pso_hist['local_fitness'] = self.best_scores
                 
+        #--number of individuals found in/missing from the fitness cache
+        if self.cache is not None:
+            self.pso_hist['cache_hits']=self.cache.hits
+            self.pso_hist['cache_misses']=self.cache.misses
+        
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.pso_hist['profile']=self.profiler.history()
+        
         return self.swm_pos_correct, self.swm_fit_correct, self.pso_hist
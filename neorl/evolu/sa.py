@@ -23,11 +23,12 @@ import random
 import math
 import numpy as np
 import copy
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 class SA:
     """
@@ -50,10 +51,12 @@ class SA:
     :param threshold: (float) ONLY used if ``cooling = equilibrium``. The threshold (in %) for the acceptance rate of solution under which the algorithm stops running. 
     :param ncores: (int) number of parallel processors (``ncores > 1`` is required for ``cooling = equilibrium``)
     :param seed: (int) random seed for sampling
+    :param evaluator: (Evaluator) pool of workers to reuse across generations and optimizers for running the chains, if ``None``, a pool of ``ncores`` processors is opened every generation (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the SA phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
     def __init__ (self, mode, bounds, fit, cooling='fast', chain_size=10,  
                   Tmax=10000, Tmin=1, chi=0.1, move_func=None, reinforce_best='soft', 
-                  lmbda = 1.5, alpha = 1.5, threshold = 10 ,ncores=1, seed=None):  
+                  lmbda = 1.5, alpha = 1.5, threshold = 10 ,ncores=1, seed=None, evaluator=None, profiler=None):  
 
         set_neorl_seed(seed)
         
@@ -68,10 +71,14 @@ class SA:
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
             
         self.bounds=bounds
         self.reinforce_best=reinforce_best
         self.ncores=ncores
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.npop=chain_size
         self.threshold = threshold
         #assert npop % self.ncores == 0, 'The number of population (npop) to run must be divisible by ncores, {} mod {} != 0'.format(npop,self.ncores)
@@ -122,10 +129,12 @@ class SA:
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=[self.bounds[item][1] for item in self.bounds]
         self.ub=[self.bounds[item][2] for item in self.bounds]
+        self.space=Space(self.orig_bounds)
             
     def GenInd(self, bounds):
         #"""
@@ -165,36 +174,15 @@ class SA:
         return sample
 
     def ensure_bounds(self, vec): # bounds check
-
-        vec_new = []
-
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # less than minimum 
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # more than maximum
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        
+        #clip a single individual to the lower/upper bounds, the int variables stay python integers
+        vec_new=self.space.clip(vec).tolist()
+        for i in self.space.int_index:
+            vec_new[i]=int(vec_new[i])
         return vec_new
 
     def fit_worker(self, x):
-        #This worker is for parallel calculations of the GWO
-        
-        # Clip the wolf with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-        
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
     
     def def_move(self, x, chi):
         #"""
@@ -276,37 +264,40 @@ class SA:
             if self.cooling != 'equilibrium': #Paul. if updated here may not return nan in first few steps
                 T=self.temp(step=k)
                 
-            if self.move_func is None:
-                x=copy.deepcopy(self.move(x=x_prev,chi=self.chi[core_seed-1]))
-            else:
-                x=copy.deepcopy(self.move(x=x_prev))
+            with phase(self.profiler, 'update'):
+                if self.move_func is None:
+                    x=copy.deepcopy(self.move(x=x_prev,chi=self.chi[core_seed-1]))
+                else:
+                    x=copy.deepcopy(self.move(x=x_prev))
             
-            x=self.ensure_bounds(x)
+            with phase(self.profiler, 'ensure_bounds'):
+                x=self.ensure_bounds(x)
             #SA is programmed to maximize reward
             E=self.fit_worker(x)
             dE = E - E_prev        
             #-----------------------------------
             # Improve/Accept/Reject
             #-----------------------------------
-            if dE > 0: #improvement
-                improves += 1
-                accepts += 1
-                x_prev = copy.deepcopy(x)
-                E_prev = E
-                if E > E_best:
-                    x_best = copy.deepcopy(x)
-                    E_best = E     
-                if self.cooling == 'equilibrium':# Paul
-                    accepted_energy.append(E)
-            elif np.exp(dE/T) >= random.random(): #accept the state
-                accepts += 1
-                x_prev = copy.deepcopy(x)
-                E_prev = E
-                if self.cooling == 'equilibrium':# Paul
-                    accepted_energy.append(E)
-            else:
-                # Reject the new solution (maintain the current state!)
-                rejects += 1
+            with phase(self.profiler, 'selection'):
+                if dE > 0: #improvement
+                    improves += 1
+                    accepts += 1
+                    x_prev = copy.deepcopy(x)
+                    E_prev = E
+                    if E > E_best:
+                        x_best = copy.deepcopy(x)
+                        E_best = E     
+                    if self.cooling == 'equilibrium':# Paul
+                        accepted_energy.append(E)
+                elif np.exp(dE/T) >= random.random(): #accept the state
+                    accepts += 1
+                    x_prev = copy.deepcopy(x)
+                    E_prev = E
+                    if self.cooling == 'equilibrium':# Paul
+                        accepted_energy.append(E)
+                else:
+                    # Reject the new solution (maintain the current state!)
+                    rejects += 1
             k+=1
         if self.cooling == 'equilibrium':#Paul.
             return x_prev, E_prev, T, accepts, rejects, improves, x_best, E_best,accepted_energy
@@ -335,13 +326,7 @@ class SA:
             core_step_min=core_step_max+1
             
         
-        if self.ncores > 1:
-
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                results=parallel(joblib.delayed(self.chain_object)(item) for item in core_list)
-        else:
-            results=[]
-            results.append(list(self.chain_object(core_list[0])))
+        results=self.evaluator.map(self.chain_object, core_list)
                 
         # Determine the index and the best solution from all chains
         #best_index=[y[0] for y in results].index(min([y[0] for y in results]))
@@ -384,22 +369,10 @@ class SA:
             for i in range (self.ncores):
                 x0.append(self.GenInd(self.bounds))
         
-        #Evaluate the swarm
-        if self.ncores > 1:  #evaluate chain in parallel
-            core_list=[]
-            for ind in x0:
-                core_list.append(ind)
-           
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                E0=parallel(joblib.delayed(self.fit_worker)(item) for item in core_list)
-            if self.cooling == 'equilibrium': # Paul
-                self.T = np.max([self.alpha * np.std(E0),self.Tmin,1e-10])
-
-        else: #evaluate swarm in series
-            E0=[]
-            for ind in x0:
-                fitness=self.fit_worker(ind)
-                E0.append(fitness)
+        #Evaluate the initial chains
+        E0=self.evaluator.map(self.worker, x0)
+        if self.ncores > 1 and self.cooling == 'equilibrium': # Paul
+            self.T = np.max([self.alpha * np.std(E0),self.Tmin,1e-10])
         
 
         return x0, E0 #return initial guess and initial fitness      
@@ -424,99 +397,114 @@ class SA:
         
         step0=1
         self.steps=ngen * self.npop
+        if self.profiler is not None:
+            self.profiler.reset()
         
-        if x0:
-            if isinstance(x0[0], list):
-                if not all(len(item) == len(x0[0]) for item in x0):
-                    raise Exception ('--error: the variable x0 must be a list of lists, and all internal lists must have same length.')
-            else:
-                x0=[x0]
+        with phase(self.profiler, 'initialization'):
+            if x0:
+                if isinstance(x0[0], list):
+                    if not all(len(item) == len(x0[0]) for item in x0):
+                        raise Exception ('--error: the variable x0 must be a list of lists, and all internal lists must have same length.')
+                else:
+                    x0=[x0]
                 
-            assert len(x0) == self.ncores, '--error: Length of initial guesses x0 ({}) for chains do not equal to ncores or # of chains ({})'.format(len(x0), self.ncores)
-            assert len(x0[0]) == len(self.bounds), '--error: Length of every list in x0 ({}) do not equal to the size of parameter space in bounds ({})'.format(len(x0[0]), len(self.bounds))
-            xinit, Einit=self.InitChains(x0=x0)
-        else:
-            xinit, Einit=self.InitChains()
+                assert len(x0) == self.ncores, '--error: Length of initial guesses x0 ({}) for chains do not equal to ncores or # of chains ({})'.format(len(x0), self.ncores)
+                assert len(x0[0]) == len(self.bounds), '--error: Length of every list in x0 ({}) do not equal to the size of parameter space in bounds ({})'.format(len(x0[0]), len(self.bounds))
+                xinit, Einit=self.InitChains(x0=x0)
+            else:
+                xinit, Einit=self.InitChains()
             
         x_next=copy.deepcopy(xinit)
         E_next=copy.deepcopy(Einit)
         
         ngen=int(ngen/self.ncores)
         for i in range (ngen):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             #if self.cooling == 'equilibrium':# Paul
             #    self.accepted_energy = [] # initialize list of accepted energy to empty at step i
-            x_next,E_next,self.T, acc, rej, imp, x_best, E_best=self.chain(x0=x_next, E0=E_next, step0=step0)
-            step0=step0+self.npop*self.ncores
-            arg_max=np.argmax(E_best)
-            stat['x'].append(x_best[arg_max])
-            if self.mode=='max':
-                stat['fitness'].append(max(E_best))
-            else:
-                stat['fitness'].append(-max(E_best))
-            stat['T'].append(self.T)
-            stat['accept'].append(acc[arg_max])
-            stat['reject'].append(rej[arg_max])
-            stat['improve'].append(imp[arg_max])
+            with phase(self.profiler, 'evaluation'):
+                x_next,E_next,self.T, acc, rej, imp, x_best, E_best=self.chain(x0=x_next, E0=E_next, step0=step0)
+            with phase(self.profiler, 'selection'):
+                step0=step0+self.npop*self.ncores
+                arg_max=np.argmax(E_best)
+                stat['x'].append(x_best[arg_max])
+                if self.mode=='max':
+                    stat['fitness'].append(max(E_best))
+                else:
+                    stat['fitness'].append(-max(E_best))
+                stat['T'].append(self.T)
+                stat['accept'].append(acc[arg_max])
+                stat['reject'].append(rej[arg_max])
+                stat['improve'].append(imp[arg_max])
             
-            if max(E_best) > E_opt:
-                E_opt=max(E_best)
-                x_opt=copy.deepcopy(x_best[arg_max])
+                if max(E_best) > E_opt:
+                    E_opt=max(E_best)
+                    x_opt=copy.deepcopy(x_best[arg_max])
             
-            if self.cooling == 'equilibrium': # Paul
-                if np.mean(self.accepts) <= self.threshold: # help prevent the std to be 0
-                    print("--warning: The SA stopped because the average acceptance rate throughout the chain {} % falls below the threshold {} %".format(np.mean(self.accepts),self.threshold))
-                    break
-                elif np.mean(self.accepts) == 0:
-                    print("--warning: The SA stopped because the average acceptance rate throughout the chain {} % reaches 0%".format(np.mean(self.accepts),self.threshold))
-                    break
+                if self.cooling == 'equilibrium': # Paul
+                    if np.mean(self.accepts) <= self.threshold: # help prevent the std to be 0
+                        print("--warning: The SA stopped because the average acceptance rate throughout the chain {} % falls below the threshold {} %".format(np.mean(self.accepts),self.threshold))
+                        if self.profiler is not None:
+                            self.profiler.end_generation()
+                        break
+                    elif np.mean(self.accepts) == 0:
+                        print("--warning: The SA stopped because the average acceptance rate throughout the chain {} % reaches 0%".format(np.mean(self.accepts),self.threshold))
+                        if self.profiler is not None:
+                            self.profiler.end_generation()
+                        break
             # Paul
-            if self.reinforce_best == 'hard':
-                x_next=[x_opt]*self.ncores
-                E_next=[E_opt]*self.ncores
-            elif self.reinforce_best == 'soft':
-                sampling = np.zeros(self.ncores)
-                normalization = 1 / np.sum(np.exp(- np.abs(E_next) / self.T)) # cte to generate a probability
-                sampling[0] = np.exp(- abs(E_next[0]) / self.T) # utilize last accepted solution to generate the sampling
-                if self.ncores != 1:
-                    rho = np.random.uniform(0,1,size = self.ncores) # sample random number between 0 and 1
-                else:
-                    rho = [1] # probability of choosing itself is 1    
-                for i in range(1,self.ncores):
-                    sampling[i] = sampling[i - 1] + np.exp(- abs(E_next[i]) / self.T)
-                sampling = sampling * normalization
-                for count,prob in enumerate(rho):
-                    if prob == 1:
-                        index = self.ncores - 1
-                    elif math.isnan(sampling[count]):# exponantial can lead to numerical erros
-                        index = np.argmax(E_next)
+            with phase(self.profiler, 'update'):
+                if self.reinforce_best == 'hard':
+                    x_next=[x_opt]*self.ncores
+                    E_next=[E_opt]*self.ncores
+                elif self.reinforce_best == 'soft':
+                    sampling = np.zeros(self.ncores)
+                    normalization = 1 / np.sum(np.exp(- np.abs(E_next) / self.T)) # cte to generate a probability
+                    sampling[0] = np.exp(- abs(E_next[0]) / self.T) # utilize last accepted solution to generate the sampling
+                    if self.ncores != 1:
+                        rho = np.random.uniform(0,1,size = self.ncores) # sample random number between 0 and 1
                     else:
-                        if prob <= sampling[0]:
-                            index = 0
+                        rho = [1] # probability of choosing itself is 1    
+                    for i in range(1,self.ncores):
+                        sampling[i] = sampling[i - 1] + np.exp(- abs(E_next[i]) / self.T)
+                    sampling = sampling * normalization
+                    for count,prob in enumerate(rho):
+                        if prob == 1:
+                            index = self.ncores - 1
+                        elif math.isnan(sampling[count]):# exponantial can lead to numerical erros
+                            index = np.argmax(E_next)
                         else:
-                            index = np.where(sampling > rho)[0][0]
-                    x_next[count] = x_best[index] # re-initialize with the best ever found by the index'th Markov Chain
-                    E_next[count] = E_best[index]
+                            if prob <= sampling[0]:
+                                index = 0
+                            else:
+                                index = np.where(sampling > rho)[0][0]
+                        x_next[count] = x_best[index] # re-initialize with the best ever found by the index'th Markov Chain
+                        E_next[count] = E_best[index]
 
             #mir-grid
-            if self.grid_flag:
-                x_opt_correct = decode_discrete_to_grid(x_opt, self.orig_bounds, self.bounds_map)
-            else:
-                x_opt_correct = x_opt
+            with phase(self.profiler, 'logging'):
+                if self.grid_flag:
+                    x_opt_correct = decode_discrete_to_grid(x_opt, self.orig_bounds, self.bounds_map)
+                else:
+                    x_opt_correct = x_opt
                     
-            if verbose:
-                print('***********************************************************************')
-                print('SA step {}/{}, T={}, Ncores={}, Cooling={}, Reinforce={}'.format(step0-1,self.steps,np.round(self.T), self.ncores, self.cooling, self.reinforce_best))
-                print('***********************************************************************')
-                print('Statistics for the {} parallel chains'.format(self.ncores))
-                if self.mode=='max': 
-                    print('Best fitness:', np.round(max(E_best),6))
-                else: 
-                    print('Best fitness:', -np.round(max(E_best),6))
-                print('Best individual:', x_opt_correct)
-                print('Acceptance Rate (%):', acc)
-                print('Rejection Rate (%):', rej)
-                print('Improvment Rate (%):', imp)
-                print('***********************************************************************')
+                if verbose:
+                    print('***********************************************************************')
+                    print('SA step {}/{}, T={}, Ncores={}, Cooling={}, Reinforce={}'.format(step0-1,self.steps,np.round(self.T), self.ncores, self.cooling, self.reinforce_best))
+                    print('***********************************************************************')
+                    print('Statistics for the {} parallel chains'.format(self.ncores))
+                    if self.mode=='max': 
+                        print('Best fitness:', np.round(max(E_best),6))
+                    else: 
+                        print('Best fitness:', -np.round(max(E_best),6))
+                    print('Best individual:', x_opt_correct)
+                    print('Acceptance Rate (%):', acc)
+                    print('Rejection Rate (%):', rej)
+                    print('Improvment Rate (%):', imp)
+                    print('***********************************************************************')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
             
         #--mir
@@ -534,4 +522,8 @@ class SA:
         if self.equilib_deactivate: #Paul.
             print("-- warning: equilibrium cooling is implemented ONLY for ncores > 1. The cooling is changed to default cooling --> 'fast'")
             
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            stat['profile']=self.profiler.history()
+        
         return x_opt_correct, self.E_opt_correct, stat
@@ -23,11 +23,12 @@ import random
 import numpy as np
 import math
 import time
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 
 class SSA(object):
@@ -41,8 +42,11 @@ class SSA(object):
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors (must be ``<= nsalps``)
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all salps as a 2D array of shape (nsalps, d) and must return an array of shape (nsalps,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the SSA phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__(self, mode, bounds, fit, nsalps=5, int_transform='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, nsalps=5, int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
         
         set_neorl_seed(seed)
         
@@ -58,6 +62,9 @@ class SSA(object):
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
           
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -65,6 +72,8 @@ class SSA(object):
             
         self.bounds=bounds
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.nsalps=nsalps
         
         #infer variable types 
@@ -82,10 +91,12 @@ class SSA(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=np.array([self.bounds[item][1] for item in self.bounds])
         self.ub=np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
 
     def init_sample(self, bounds):
     
@@ -110,15 +121,10 @@ class SSA(object):
         for case in range (0, self.Positions.shape[0]):
             core_lst.append(self.Positions[case, :])
     
-        if self.ncores > 1:
-
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in core_lst)
-                
+        if self.vectorized:
+            fitness_lst=list(self.fit_batch(core_lst))
         else:
-            fitness_lst=[]
-            for item in core_lst:
-                fitness_lst.append(self.fit_worker(item))
+            fitness_lst=self.evaluator.map(self.worker, core_lst)
         
         return fitness_lst
 
@@ -131,39 +137,16 @@ class SSA(object):
         return best_pos, best_fit 
         
     def ensure_bounds(self, vec):
-    
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(self.bounds.items()):
-    
-            # variable exceedes the minimum boundary
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-    
-            # variable exceedes the maximum boundary
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-    
-            # the variable is fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-            
-        return vec_new
-    
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
+
     def fit_worker(self, x):
-        #This worker is for parallel calculations
-        
-        # Clip the salp with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-        
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all salps in one fitness call
+        return self.worker.batch(pop)
     
     def ensure_discrete(self, vec):
         #"""
@@ -177,18 +160,7 @@ class SSA(object):
         #vec - updated salp position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.a,
-                                               method=self.int_transform,
-                                               )
-        
-        return vec
+        return self.space.discretize(vec, alpha=self.a, method=self.int_transform)
 
     def UpdateSalps(self):
 
@@ -211,10 +183,13 @@ class SSA(object):
 
                 self.Positions[:, i] = (point2 + point1) / 2
                 
-            self.Positions[:,i]=self.ensure_bounds(self.Positions[:,i])
-            self.Positions[:, i] = self.ensure_discrete(self.Positions[: , i])
-                
             self.Positions = np.transpose(self.Positions)
+        
+        #all salps are clipped and discretized at once (first check bounds, then check discrete)
+        with phase(self.profiler, 'ensure_bounds'):
+            self.Positions = self.space.clip(self.Positions)
+        with phase(self.profiler, 'ensure_discrete'):
+            self.Positions = self.space.discretize(self.Positions, alpha=self.a, method=self.int_transform)
             
 
     def evolute(self, ngen, x0=None, c1=None, verbose=False):
@@ -233,26 +208,31 @@ class SSA(object):
         self.best_fitness=float("inf") 
         self.verbose=verbose
         self.c1=c1
-        self.Positions = np.zeros((self.nsalps, self.dim))
-        if x0:
-            assert len(x0) == self.nsalps, '--error: the length of x0 ({}) MUST equal the number of salps in the group ({})'.format(len(x0), self.nsalps)
-            for i in range(self.nsalps):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
-                if self.grid_flag:
-                    self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                else:
-                    self.Positions[i,:] = x0[i]
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            self.Positions = np.zeros((self.nsalps, self.dim))
+            if x0:
+                assert len(x0) == self.nsalps, '--error: the length of x0 ({}) MUST equal the number of salps in the group ({})'.format(len(x0), self.nsalps)
+                for i in range(self.nsalps):
+                    check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                    if self.grid_flag:
+                        self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    else:
+                        self.Positions[i,:] = x0[i]
                     
-        else:
-            # Initialize the positions of salps
-            for i in range(self.nsalps):
-                self.Positions[i,:]=self.init_sample(self.bounds)
+            else:
+                # Initialize the positions of salps
+                for i in range(self.nsalps):
+                    self.Positions[i,:]=self.init_sample(self.bounds)
         
-        fitness0=self.eval_salps()
+            fitness0=self.eval_salps()
         
-        self.best_position, self.best_fitness = self.select(self.Positions, fitness0)
+            self.best_position, self.best_fitness = self.select(self.Positions, fitness0)
                        
         for l in range(1, ngen+1):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             self.a= 1 - l * ((1) / ngen)  #mir: a decreases linearly between 1 to 0, for discrete mutation
             
             if self.c1 is None:
@@ -268,45 +248,51 @@ class SSA(object):
             #-----------------------------
             # Update Salp Positions
             #-----------------------------
-            self.UpdateSalps()
+            with phase(self.profiler, 'update'):
+                self.UpdateSalps()
                     
             #----------------------
             #  Evaluate New Salps
             #----------------------
-            fitness=self.eval_salps()
-            for i, fits in enumerate(fitness):
-                #save the best of the best!!!
-                if fits < self.best_fitness:
-                    self.best_fitness=fits
-                    self.best_position=self.Positions[i, :].copy()
+            with phase(self.profiler, 'evaluation'):
+                fitness=self.eval_salps()
+            with phase(self.profiler, 'selection'):
+                for i, fits in enumerate(fitness):
+                    #save the best of the best!!!
+                    if fits < self.best_fitness:
+                        self.best_fitness=fits
+                        self.best_position=self.Positions[i, :].copy()
                 
             #--mir
-            if self.mode=='max':
-                self.fitness_best_correct=-self.best_fitness
-                self.local_fitness=-np.min(fitness)
-            else:
-                self.fitness_best_correct=self.best_fitness
-                self.local_fitness=np.min(fitness)
+            with phase(self.profiler, 'logging'):
+                if self.mode=='max':
+                    self.fitness_best_correct=-self.best_fitness
+                    self.local_fitness=-np.min(fitness)
+                else:
+                    self.fitness_best_correct=self.best_fitness
+                    self.local_fitness=np.min(fitness)
 
-            self.last_pop=self.Positions.copy()
-            self.last_fit=np.array(fitness).copy()            
-            self.history['local_fitness'].append(self.local_fitness)
-            self.history['global_fitness'].append(self.fitness_best_correct)
-            self.history['c1'].append(self.c1r)
+                self.last_pop=self.Positions.copy()
+                self.last_fit=np.array(fitness).copy()            
+                self.history['local_fitness'].append(self.local_fitness)
+                self.history['global_fitness'].append(self.fitness_best_correct)
+                self.history['c1'].append(self.c1r)
             
-            # Print statistics
-            if self.verbose and i % self.nsalps:
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('SSA step {}/{}, nsalps={}, Ncores={}'.format((l)*self.nsalps, ngen*self.nsalps, self.nsalps, self.ncores))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('Best Salp Fitness:', np.round(self.fitness_best_correct,6))
-                if self.grid_flag:
-                    self.salp_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
-                    print('Best Salp Position:', self.salp_decoded)
-                else:
-                    print('Best Salp Position:', self.best_position)
-                print('c1:', self.c1r)
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                # Print statistics
+                if self.verbose and i % self.nsalps:
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('SSA step {}/{}, nsalps={}, Ncores={}'.format((l)*self.nsalps, ngen*self.nsalps, self.nsalps, self.ncores))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('Best Salp Fitness:', np.round(self.fitness_best_correct,6))
+                    if self.grid_flag:
+                        self.salp_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
+                        print('Best Salp Position:', self.salp_decoded)
+                    else:
+                        print('Best Salp Position:', self.best_position)
+                    print('c1:', self.c1r)
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -318,11 +304,12 @@ class SSA(object):
             self.last_fit=-self.last_fit
         
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit, grid_flag=False)
         
         if self.verbose:
             print('------------------------ SSA Summary --------------------------')
@@ -330,5 +317,9 @@ class SSA(object):
             print('Best individual (x) found:', self.salp_correct)
             print('--------------------------------------------------------------')  
             
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.salp_correct, self.fitness_best_correct, self.history
 
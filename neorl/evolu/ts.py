@@ -25,10 +25,12 @@ import numpy as np
 import joblib
 from itertools import combinations
 import copy 
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.profiler import phase
+from neorl.utils.evaluator import FitWorker, Evaluator
 
 class TS(object):
     """
@@ -42,25 +44,39 @@ class TS(object):
                             i.e. importance of the frequency of a certain action performed in the search. The higher the value, the least likely is an action to be performed again after
                             multiple attempts.
     :param swap_mode: (str): either "swap" for swapping two elements of the input or "perturb" to perturb each input within certain bounds (see **Notes** below)
-    :param ncores: (int) number of parallel processors (only ``ncores=1`` is supported now)
+    :param ncores: (int) number of parallel processors to evaluate the neighbourhood (all the moves) of the current solution
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all neighbourhood moves as a 2D array of shape (nmoves, d) and must return an array of shape (nmoves,)
+    :param delta_fit: (function) only for ``swap_mode="swap"``, optional function returning the change of the fitness when two elements of a solution are swapped, without evaluating the new solution: ``delta_fit(x, i, j)=fit(x')-fit(x)``, where ``x'`` is ``x`` with the elements at the indices ``i`` and ``j`` swapped (``x`` must not be modified). If given, the neighbourhood is evaluated with ``delta_fit`` instead of ``fit``
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the TS phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__(self, mode, bounds, fit, tabu_tenure=6, penalization_weight = 0.8, swap_mode = "perturb", ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, tabu_tenure=6, penalization_weight = 0.8, swap_mode = "perturb", ncores=1, seed=None, vectorized=False, evaluator=None, delta_fit=None, profiler=None):
         
         set_neorl_seed(seed)
-        assert ncores == 1,'-error: parallel implementaiton is not yet available. ncores ({}) should be equal to 1.'.format(ncores)
-        #assert ncores <= len(bounds), '--error: ncores ({}) must be less than or equal than the length of an individual solution ({})'.format(ncores, len(bounds))
         
         int_transform='nearest_int'
         self.mode=mode #  mode for optimization: CS only solves a minimization problem.
         if mode == 'min':
             self.fit=fit
+            self.delta_fit=delta_fit
         elif mode == 'max':
             def fitness_wrapper(*args, **kwargs):
                 return -fit(*args, **kwargs) 
             self.fit=fitness_wrapper
+            if delta_fit is not None:
+                def delta_wrapper(*args, **kwargs):
+                    return -delta_fit(*args, **kwargs)
+                self.delta_fit=delta_wrapper
+            else:
+                self.delta_fit=None
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
+            if self.delta_fit is not None:
+                self.delta_fit=profiler.wrap(self.delta_fit, 'fitness')
           
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -68,8 +84,11 @@ class TS(object):
             
         self.bounds=bounds
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         
         assert swap_mode in ["swap","perturb"],'--error: swap_mode must be either "swap" or "perturb" not ({})'.format(swap_mode)
+        assert delta_fit is None or swap_mode == "swap", '--error: delta_fit is only available for swap_mode="swap"'
         self.swap_mode = swap_mode # swapping method for characterizing a "move" in the tabu search
         self.tabu_tenure = tabu_tenure
         self.penalization_weight = penalization_weight
@@ -87,10 +106,12 @@ class TS(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=np.array([self.bounds[item][1] for item in self.bounds])
         self.ub=np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
 
     def init_sample(self, bounds):
         #"""
@@ -142,30 +163,16 @@ class TS(object):
         return best_pos, best_fit 
         
     def ensure_bounds(self, vec):
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # variable exceedes the minimum boundary
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # variable exceedes the maximum boundary
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # the variable is fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        return vec_new
+        #clip a single tabu position to the lower/upper bounds
+        return list(self.space.clip(vec))
 
     def fit_worker(self, x):
-        #This worker is for parallel calculations
-        # Clip the tabu with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all neighbourhood moves in one fitness call
+        return self.worker.batch(pop)
 
     def ensure_discrete(self, vec):
         #"""
@@ -179,18 +186,7 @@ class TS(object):
         #vec - updated tabu position vector with discrete values
         #"""
 
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.a,
-                                               method=self.int_transform,
-                                               )
-
-        return vec
+        return self.space.discretize(vec, method=self.int_transform)
 
     def UpdateTabu(self,Position, i, j):
         #""" 
@@ -198,7 +194,7 @@ class TS(object):
         #if swap option: swap elements
         #if perturb option: perturb elements
         #"""
-        tempposition = copy.deepcopy(Position)
+        tempposition = copy.copy(Position)
         if self.swap_mode == "swap":
             # job index in the Position:
             i_index = tempposition.index(i)
@@ -211,6 +207,48 @@ class TS(object):
                 tempposition[i] = random.uniform(j[0],j[1])
         return tempposition
         
+    def neighbourhood(self, Position):
+        #"""
+        #Builds the candidate solutions of all the moves in self.moves
+        #(in swap mode, the indices of the swapped elements are looked up once for all the moves)
+        #"""
+        if self.swap_mode == "swap":
+            index = self.element_index(Position)
+            neighbours = []
+            for i, j in self.moves:
+                candidate = copy.copy(Position)
+                i_index, j_index = index[i], index[j]
+                candidate[i_index], candidate[j_index] = candidate[j_index], candidate[i_index]
+                neighbours.append(candidate)
+        elif self.swap_mode == "perturb":
+            neighbours = [self.UpdateTabu(Position, i, [self.lb[i], self.ub[i]]) for i in self.moves]
+        return neighbours
+
+    def element_index(self, Position):
+        #index of the (first occurrence of the) elements in Position, as list.index
+        index = {}
+        for k, element in enumerate(Position):
+            index.setdefault(element, k)
+        return index
+
+    def eval_neighbours(self, neighbours):
+        #fitness of all the candidates as one (parallel or vectorized) job
+        if self.vectorized:
+            return np.asarray(self.fit_batch(neighbours), dtype=float)
+        return np.array(self.evaluator.map(self.worker, neighbours), dtype=float)
+
+    def make_move(self, k, neighbours=None):
+        #the current position after the move k, taken from the neighbourhood if it was built
+        if neighbours is not None:
+            return copy.copy(neighbours[k])
+        return self.UpdateTabu(self.Positions, self.moves[k][0], self.moves[k][1])
+
+    def eval_deltas(self, Position, fitness):
+        #fitness of all the swap moves from the fitness of Position and delta_fit, no candidate is built
+        x=self.worker.prepare([Position])[0] # clipped and decoded, as the individuals sent to fit
+        index = self.element_index(Position)
+        return np.array([fitness + self.delta_fit(x, index[i], index[j]) for i, j in self.moves], dtype=float)
+
     def evolute(self,ngen,x0=None, verbose=False):
         """
         This function evolutes the TS algorithm for number of generations
@@ -224,138 +262,133 @@ class TS(object):
         self.history = {'local_fitness':[], 'global_fitness':[]}
         self.best_fitness=float("inf") 
         self.verbose=verbose
-        self.Positions = np.zeros(self.dim)#np.zeros((self.ntabus, self.dim))
-        if x0:
-            if self.ncores==1:  
-                if not any(isinstance(el, list) for el in x0):  #ensure a list of list is submitted for ncores=1
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            self.Positions = np.zeros(self.dim)#np.zeros((self.ntabus, self.dim))
+            if x0:
+                if not any(isinstance(el, list) for el in x0):  #a single tabu is searched, x0 may also be given as a list of one individual
                     x0=[x0]
                     
-            assert len(x0[0]) == self.ntabus, '--error: the length of individual in x0 ({}) MUST equal the size of the problem ({})'.format(len(x0[0]), self.ntabus)        
-            assert len(x0) == self.ncores, '--error: the length of x0 ({}) MUST equal the number of ncores/parallel chains ({})'.format(len(x0), self.ncores)
+                assert len(x0[0]) == self.ntabus, '--error: the length of individual in x0 ({}) MUST equal the size of the problem ({})'.format(len(x0[0]), self.ntabus)        
+                assert len(x0) == 1, '--error: x0 must be a single individual, not ({}) individuals'.format(len(x0))
 
-            for i in range(self.ncores):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                check_mixed_individual(x=x0[0], bounds=self.orig_bounds) #assert the type provided is consistent
                 if self.grid_flag:
-                    self.Positions = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    self.Positions = encode_grid_indv_to_discrete(x0[0], bounds=self.orig_bounds, bounds_map=self.bounds_map)
                 else:
-                    self.Positions = x0[i]
+                    self.Positions = x0[0]
                     
-        else:
-            #self.Positions=self.init_sample(self.bounds)  #TODO, update later for mixed-integer optimisation
-            # Initialize the positions of tabu
-            if self.swap_mode == "swap":# no repetition of element if swap method
-                self.Positions = list(range(1, self.ntabus + 1))
-                random.shuffle(self.Positions)
-            elif self.swap_mode == "perturb":
-                self.Positions = self.init_sample(self.bounds)
+            else:
+                #self.Positions=self.init_sample(self.bounds)  #TODO, update later for mixed-integer optimisation
+                # Initialize the positions of tabu
+                if self.swap_mode == "swap":# no repetition of element if swap method
+                    self.Positions = list(range(1, self.ntabus + 1))
+                    random.shuffle(self.Positions)
+                elif self.swap_mode == "perturb":
+                    self.Positions = self.init_sample(self.bounds)
 
-        fitness=self.fit_worker(self.Positions) # evaluate the initial tabu
-        self.best_position, self.best_fitness = self.Positions.copy(), fitness#self.select(pos = self.Positions,fit = fitness) # find the initial best position and fitness
-        current_solution = self.Positions.copy()
+            fitness=self.fit_worker(self.Positions) # evaluate the initial tabu
+            self.best_position, self.best_fitness = self.Positions.copy(), fitness#self.select(pos = self.Positions,fit = fitness) # find the initial best position and fitness
+            current_solution = self.Positions.copy()
     
-        tabu_structure = {} # record possible the tabu memory for all possible moves
-        if self.swap_mode == "swap":
-            for swap in combinations(range(1,self.ntabus + 1), 2):
-                tabu_structure[swap] = {'tabu_time': 0, 'MoveValue': 0, 'freq': 0, 'Penalized_MV': 0}
-        elif self.swap_mode == "perturb":
-            for l in range(self.ntabus):
-                tabu_structure[l] = {'tabu_time': 0, 'MoveValue': 0, 'freq': 0, 'Penalized_MV': 0}
+            # tabu memory of all the possible moves, move k is self.moves[k]
+            if self.swap_mode == "swap":
+                self.moves = list(combinations(range(1,self.ntabus + 1), 2))
+            elif self.swap_mode == "perturb":
+                self.moves = list(range(self.ntabus))
+            tabu_time = np.zeros(len(self.moves), dtype=int) # iteration until which a move is tabu
+            freq = np.zeros(len(self.moves), dtype=int) # number of times a move was made
                 
         iter = 1    
         for l in range(1, ngen+1):# Main loop
+            if self.profiler is not None:
+                self.profiler.start_generation()
             #-----------------------------
             # Performs multiple moves and evaluate the resulting tabu
             #-----------------------------
-            increment = 0 # utilize to perturb the Position vector at the 'increment'th position
-            temp_candidate = [] # store new candidate for perturbation to avoid the problem of change in perturbation when best move is called
-            for move in tabu_structure:# Searching the whole neighborhood of the current solution:
-                if self.swap_mode == "swap":
-                    candidate_solution = self.UpdateTabu(self.Positions, move[0], move[1])
-                elif self.swap_mode == "perturb":
-                    candidate_solution = self.UpdateTabu(self.Positions, increment,[self.lb[increment], self.ub[increment]])
-                    temp_candidate.append(candidate_solution)
-                    increment +=1
-                fitness = self.fit_worker(candidate_solution)
-                tabu_structure[move]['MoveValue'] = fitness
-                tabu_structure[move]['Penalized_MV'] = fitness + (tabu_structure[move]['freq'] *
-                                                                             self.penalization_weight)# Penalized fitness by simply adding freq to it (minimization):
-            #----------------------
-            #  Manipulate the tabu list
-            #----------------------
-            while True:# Admissible move
-                best_move = min(tabu_structure, key =lambda x: tabu_structure[x]['Penalized_MV']) # select the move with the lowest Penalized fitness in the neighborhood (minimization)
-                MoveValue = tabu_structure[best_move]["MoveValue"]
-                tabu_time = tabu_structure[best_move]["tabu_time"]
-                if tabu_structure[best_move]['Penalized_MV'] > 1e11:# no improvement
-                    break
-                if tabu_time < iter:# Not Tabu: the current move can be potentially added to the tabu list
-                    # make the move
-                    if self.swap_mode == "swap":
-                        self.Positions = self.UpdateTabu(self.Positions, best_move[0], best_move[1])
-                    elif self.swap_mode == "perturb":
-                        best_loc = np.argmin([tabu_structure[x]['Penalized_MV'] for x in tabu_structure.keys()])
-                        self.Positions = temp_candidate[best_loc].copy()
-                    fitness = MoveValue#self.fit(self.Positions)
-                    if MoveValue < self.best_fitness:# Best Improving move
-                        self.best_position = self.Positions.copy()
-                        self.best_fitness = fitness
-                    # update tabu_time for the move and freq count
-                    tabu_structure[best_move]['tabu_time'] = iter + self.tabu_tenure
-                    tabu_structure[best_move]['freq'] += 1
-                    iter += 1
-                    break
-                else:# If tabu
-                    # Aspiration
-                    if MoveValue < self.best_fitness:
+            if self.delta_fit is not None:
+                neighbours = None # the candidates are not needed, only the move made is built below
+                with phase(self.profiler, 'evaluation'):
+                    MoveValues = self.eval_deltas(self.Positions, fitness)
+            else:
+                with phase(self.profiler, 'update'):
+                    neighbours = self.neighbourhood(self.Positions) # all candidates of the neighborhood, evaluated together
+                with phase(self.profiler, 'evaluation'):
+                    MoveValues = self.eval_neighbours(neighbours)
+            with phase(self.profiler, 'selection'):
+                Penalized_MV = MoveValues + freq * self.penalization_weight # Penalized fitness by simply adding freq to it (minimization)
+                #----------------------
+                #  Manipulate the tabu list
+                #----------------------
+                while True:# Admissible move
+                    best_move = np.argmin(Penalized_MV) # select the move with the lowest Penalized fitness in the neighborhood (minimization)
+                    MoveValue = MoveValues[best_move]
+                    if Penalized_MV[best_move] > 1e11:# no improvement
+                        break
+                    if tabu_time[best_move] < iter:# Not Tabu: the current move can be potentially added to the tabu list
                         # make the move
-                        if self.swap_mode == "swap":
-                            self.Positions = self.UpdateTabu(self.Positions, best_move[0], best_move[1])
-                        elif self.swap_mode == "perturb":
-                            best_loc = np.argmin([tabu_structure[x]['Penalized_MV'] for x in tabu_structure.keys()])
-                            self.Positions = temp_candidate[best_loc].copy()
-                        fitness = self.fit_worker(self.Positions)
-                        self.best_position = self.Positions.copy()
-                        self.best_fitness = fitness
-                        tabu_structure[best_move]['freq'] += 1
+                        self.Positions = self.make_move(best_move, neighbours)
+                        fitness = MoveValue#self.fit(self.Positions)
+                        if MoveValue < self.best_fitness:# Best Improving move
+                            self.best_position = self.Positions.copy()
+                            self.best_fitness = fitness
+                        # update tabu_time for the move and freq count
+                        tabu_time[best_move] = iter + self.tabu_tenure
+                        freq[best_move] += 1
                         iter += 1
                         break
-                    else:
-                        tabu_structure[best_move]['Penalized_MV'] = float('inf')
-                        continue
+                    else:# If tabu
+                        # Aspiration
+                        if MoveValue < self.best_fitness:
+                            # make the move
+                            self.Positions = self.make_move(best_move, neighbours)
+                            fitness = self.fit_worker(self.Positions)
+                            self.best_position = self.Positions.copy()
+                            self.best_fitness = fitness
+                            freq[best_move] += 1
+                            iter += 1
+                            break
+                        else:
+                            Penalized_MV[best_move] = float('inf')
+                            continue
             
             #----------------------
             #  Logger related portion
             #----------------------
             #for i, fits in enumerate(fitness):  
-            for i, fits in enumerate([fitness]): 
-                #save the best of the best!!!
-                if fits < self.best_fitness:
-                    self.best_fitness=fits
-                    #self.best_position=self.Positions[i, :].copy()
-                    self.best_position=self.Positions.copy()
+            with phase(self.profiler, 'logging'):
+                for i, fits in enumerate([fitness]): 
+                    #save the best of the best!!!
+                    if fits < self.best_fitness:
+                        self.best_fitness=fits
+                        #self.best_position=self.Positions[i, :].copy()
+                        self.best_position=self.Positions.copy()
             
-            #--mir
-            if self.mode=='max':
-                self.fitness_best_correct=-self.best_fitness
-                self.local_fitness=-np.min(fitness)
-            else:
-                self.fitness_best_correct=self.best_fitness
-                self.local_fitness=np.min(fitness)
-
-            self.history['local_fitness'].append(self.local_fitness)
-            self.history['global_fitness'].append(self.fitness_best_correct)
-            # Print statistics
-            if self.verbose and l % self.ntabus:
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('TS step {}/{}, ntabus={}, Ncores={}'.format((l)*self.ntabus, ngen*self.ntabus, self.ntabus, self.ncores))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('Best Tabu Fitness:', np.round(self.fitness_best_correct,6))
-                if self.grid_flag:
-                    self.tabu_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
-                    print('Best Tabu Position:', self.tabu_decoded)
+                #--mir
+                if self.mode=='max':
+                    self.fitness_best_correct=-self.best_fitness
+                    self.local_fitness=-np.min(fitness)
                 else:
-                    print('Best Tabu Position:', self.best_position)
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    self.fitness_best_correct=self.best_fitness
+                    self.local_fitness=np.min(fitness)
+
+                self.history['local_fitness'].append(self.local_fitness)
+                self.history['global_fitness'].append(self.fitness_best_correct)
+                # Print statistics
+                if self.verbose and l % self.ntabus:
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('TS step {}/{}, ntabus={}, Ncores={}'.format((l)*self.ntabus, ngen*self.ntabus, self.ntabus, self.ncores))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('Best Tabu Fitness:', np.round(self.fitness_best_correct,6))
+                    if self.grid_flag:
+                        self.tabu_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
+                        print('Best Tabu Position:', self.tabu_decoded)
+                    else:
+                        print('Best Tabu Position:', self.best_position)
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -367,4 +400,8 @@ class TS(object):
             print('Best fitness (y) found:', self.fitness_best_correct)
             print('Best individual (x) found:', self.tabu_correct)
             print('--------------------------------------------------------------')  
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
+        
         return self.tabu_correct, self.fitness_best_correct, self.history
\ No newline at end of file
@@ -24,11 +24,12 @@ import random
 import numpy as np
 import math
 import time
-import joblib
-from neorl.evolu.discrete import mutate_discrete, encode_grid_to_discrete 
+from neorl.evolu.discrete import encode_grid_to_discrete, Space
 from neorl.evolu.discrete import decode_discrete_to_grid, encode_grid_indv_to_discrete
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population, check_mixed_individual
+from neorl.utils.evaluator import FitWorker, Evaluator
+from neorl.utils.profiler import phase
 
 class WOA(object):
     """
@@ -43,8 +44,11 @@ class WOA(object):
     :param int_transform: (str): method of handling int/discrete variables, choose from: ``nearest_int``, ``sigmoid``, ``minmax``.
     :param ncores: (int) number of parallel processors (must be ``<= nwhales``)
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with all whales as a 2D array of shape (nwhales, d) and must return an array of shape (nwhales,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the WOA phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
-    def __init__(self, mode, bounds, fit, nwhales=5, a0=2, b=1, int_transform='nearest_int', ncores=1, seed=None):
+    def __init__(self, mode, bounds, fit, nwhales=5, a0=2, b=1, int_transform='nearest_int', ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
         
         set_neorl_seed(seed)
         
@@ -60,6 +64,9 @@ class WOA(object):
             self.fit=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.fit=profiler.wrap(self.fit, 'fitness')
             
         self.int_transform=int_transform
         if int_transform not in ["nearest_int", "sigmoid", "minmax"]:
@@ -67,6 +74,8 @@ class WOA(object):
            
         self.bounds=bounds
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.nwhales=nwhales
         assert a0 > 0, '--error: a0 must be positive'
         self.a0=a0
@@ -87,10 +96,12 @@ class WOA(object):
             self.grid_flag=False
             self.bounds = bounds
             self.orig_bounds=bounds
+        self.worker=FitWorker(self.fit, self.orig_bounds, vectorized=self.vectorized)   #what is sent to the evaluation workers
         
         self.dim = len(bounds)
         self.lb=np.array([self.bounds[item][1] for item in self.bounds])
         self.ub=np.array([self.bounds[item][2] for item in self.bounds])
+        self.space=Space(self.orig_bounds)
 
     def init_sample(self, bounds):
     
@@ -115,15 +126,10 @@ class WOA(object):
         for case in range (0, self.Positions.shape[0]):
             core_lst.append(self.Positions[case, :])
     
-        if self.ncores > 1:
-
-            with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness_lst=parallel(joblib.delayed(self.fit_worker)(item) for item in core_lst)
-                
+        if self.vectorized:
+            fitness_lst=list(self.fit_batch(core_lst))
         else:
-            fitness_lst=[]
-            for item in core_lst:
-                fitness_lst.append(self.fit_worker(item))
+            fitness_lst=self.evaluator.map(self.worker, core_lst)
         
         return fitness_lst
 
@@ -136,36 +142,16 @@ class WOA(object):
         return best_pos, best_fit 
         
     def ensure_bounds(self, vec): # bounds check
+        #clip a single individual to the lower/upper bounds
+        return list(self.space.clip(vec))
 
-        vec_new = []
-
-        for i, (key, val) in enumerate(self.bounds.items()):
-            # less than minimum 
-            if vec[i] < self.bounds[key][1]:
-                vec_new.append(self.bounds[key][1])
-            # more than maximum
-            if vec[i] > self.bounds[key][2]:
-                vec_new.append(self.bounds[key][2])
-            # fine
-            if self.bounds[key][1] <= vec[i] <= self.bounds[key][2]:
-                vec_new.append(vec[i])
-        
-        return vec_new
-    
     def fit_worker(self, x):
-        #This worker is for parallel calculations
-        
-        # Clip the whale with position outside the lower/upper bounds and return same position
-        x=self.ensure_bounds(x)
-        
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map)
-            
-        # Calculate objective function for each search agent
-        fitness = self.fit(x)
-        
-        return fitness
+        #evaluates one individual, it is clipped and decoded by the FitWorker
+        return self.worker(x)
+    
+    def fit_batch(self, pop):
+        #vectorized counterpart of fit_worker, evaluates all whales in one fitness call
+        return self.worker.batch(pop)
 
     def ensure_discrete(self, vec):
         #"""
@@ -179,18 +165,8 @@ class WOA(object):
         #vec - updated bat position vector with discrete values
         #"""
         
-        for dim in range(self.dim):
-            if self.var_type[dim] == 'int':
-                vec[dim] = mutate_discrete(x_ij=vec[dim], 
-                                               x_min=min(vec),
-                                               x_max=max(vec),
-                                               lb=self.lb[dim], 
-                                               ub=self.ub[dim],
-                                               alpha=self.alpha,
-                                               method=self.int_transform,
-                                               )
-        return vec
-        
+        return self.space.discretize(vec, alpha=self.alpha, method=self.int_transform)
+
     def UpdateWhales(self):
 
        # Update the Position of the whales agents
@@ -218,8 +194,11 @@ class WOA(object):
                     self.Positions[i, j] = (distance2Leader * math.exp(self.b * l) 
                                             * math.cos(l * 2 * math.pi) + self.best_position[j])
             
-            self.Positions[i,:]=self.ensure_bounds(self.Positions[i,:])
-            self.Positions[i, :] = self.ensure_discrete(self.Positions[i,:])
+        #all whales are clipped and discretized at once (first check bounds, then check discrete)
+        with phase(self.profiler, 'ensure_bounds'):
+            self.Positions = self.space.clip(self.Positions)
+        with phase(self.profiler, 'ensure_discrete'):
+            self.Positions = self.space.discretize(self.Positions, alpha=self.alpha, method=self.int_transform)
 
 
     def evolute(self, ngen, x0=None, verbose=False, **kwargs):
@@ -235,25 +214,30 @@ class WOA(object):
         self.history = {'local_fitness':[], 'global_fitness':[], 'a': [], 'A': []}
         self.best_fitness=float("inf") 
         self.verbose=verbose
-        self.Positions = np.zeros((self.nwhales, self.dim))
-        if x0:
-            assert len(x0) == self.nwhales, '--error: the length of x0 ({}) MUST equal the number of whales in the group ({})'.format(len(x0), self.nwhales)
-            for i in range(self.nwhales):
-                check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
-                if self.grid_flag:
-                    self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
-                else:
-                    self.Positions[i,:] = x0[i]
-        else:
-            # Initialize the positions of whales
-            for i in range(self.nwhales):
-                self.Positions[i,:]=self.init_sample(self.bounds)
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            self.Positions = np.zeros((self.nwhales, self.dim))
+            if x0:
+                assert len(x0) == self.nwhales, '--error: the length of x0 ({}) MUST equal the number of whales in the group ({})'.format(len(x0), self.nwhales)
+                for i in range(self.nwhales):
+                    check_mixed_individual(x=x0[i], bounds=self.orig_bounds) #assert the type provided is consistent
+                    if self.grid_flag:
+                        self.Positions[i,:] = encode_grid_indv_to_discrete(x0[i], bounds=self.orig_bounds, bounds_map=self.bounds_map)
+                    else:
+                        self.Positions[i,:] = x0[i]
+            else:
+                # Initialize the positions of whales
+                for i in range(self.nwhales):
+                    self.Positions[i,:]=self.init_sample(self.bounds)
                 
-        fitness0=self.eval_whales()
+            fitness0=self.eval_whales()
         
-        self.best_position, self.best_fitness = self.select(self.Positions, fitness0)
+            self.best_position, self.best_fitness = self.select(self.Positions, fitness0)
                        
         for k in range(0, ngen):
+            if self.profiler is not None:
+                self.profiler.start_generation()
             
             self.alpha= 1 - k * ((1) / ngen)  #mir: alpha decreases linearly between 1 to 0, for discrete mutation
             
@@ -275,47 +259,53 @@ class WOA(object):
             #-----------------------------
             # Update Whale Positions
             #-----------------------------
-            self.UpdateWhales()
+            with phase(self.profiler, 'update'):
+                self.UpdateWhales()
                     
             #----------------------
             #  Evaluate New Whales
             #----------------------
-            fitness=self.eval_whales()
+            with phase(self.profiler, 'evaluation'):
+                fitness=self.eval_whales()
             
-            for i, fits in enumerate(fitness):
-                #save the best of the best!!!
-                if fits < self.best_fitness:
-                    self.best_fitness=fits
-                    self.best_position=self.Positions[i, :].copy()
+            with phase(self.profiler, 'selection'):
+                for i, fits in enumerate(fitness):
+                    #save the best of the best!!!
+                    if fits < self.best_fitness:
+                        self.best_fitness=fits
+                        self.best_position=self.Positions[i, :].copy()
                 
             #--mir
-            if self.mode=='max':
-                self.fitness_best_correct=-self.best_fitness
-                self.local_fitness=-np.min(fitness)
-            else:
-                self.fitness_best_correct=self.best_fitness
-                self.local_fitness=np.min(fitness)
+            with phase(self.profiler, 'logging'):
+                if self.mode=='max':
+                    self.fitness_best_correct=-self.best_fitness
+                    self.local_fitness=-np.min(fitness)
+                else:
+                    self.fitness_best_correct=self.best_fitness
+                    self.local_fitness=np.min(fitness)
 
-            self.history['local_fitness'].append(self.local_fitness)
-            self.history['global_fitness'].append(self.fitness_best_correct)
-            self.history['a'].append(self.a)
-            self.history['A'].append(self.A)
+                self.history['local_fitness'].append(self.local_fitness)
+                self.history['global_fitness'].append(self.fitness_best_correct)
+                self.history['a'].append(self.a)
+                self.history['A'].append(self.A)
             
-            # Print statistics
-            if self.verbose and i % self.nwhales:
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('WOA step {}/{}, nwhales={}, Ncores={}'.format((k+1)*self.nwhales, ngen*self.nwhales, self.nwhales, self.ncores))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-                print('Best Whale Fitness:', np.round(self.fitness_best_correct,6))
-                if self.grid_flag:
-                    self.whale_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
-                    print('Best Whale Position:', self.whale_decoded)
-                else:
-                    print('Best Whale Position:', self.best_position)
-                print('a:', np.round(self.a,3))
-                print('A:', np.round(self.A,3))
-                print('fac:', np.round(self.fac,3))
-                print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                # Print statistics
+                if self.verbose and i % self.nwhales:
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('WOA step {}/{}, nwhales={}, Ncores={}'.format((k+1)*self.nwhales, ngen*self.nwhales, self.nwhales, self.ncores))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+                    print('Best Whale Fitness:', np.round(self.fitness_best_correct,6))
+                    if self.grid_flag:
+                        self.whale_decoded = decode_discrete_to_grid(self.best_position, self.orig_bounds, self.bounds_map)
+                        print('Best Whale Position:', self.whale_decoded)
+                    else:
+                        print('Best Whale Position:', self.best_position)
+                    print('a:', np.round(self.a,3))
+                    print('A:', np.round(self.A,3))
+                    print('fac:', np.round(self.fac,3))
+                    print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
+            if self.profiler is not None:
+                self.profiler.end_generation()
 
         #mir-grid
         if self.grid_flag:
@@ -335,11 +325,16 @@ class WOA(object):
             fitness=-np.array(fitness)
 
         #--mir return the last population for restart calculations
-        if self.grid_flag:
-            self.history['last_pop'] = get_population(self.Positions, fits=fitness, grid_flag=True, 
-                                                     bounds=self.orig_bounds, bounds_map=self.bounds_map)
-        else:
-            self.history['last_pop'] = get_population(self.Positions, fits=fitness, grid_flag=False)
+        with phase(self.profiler, 'get_population'):
+            if self.grid_flag:
+                self.history['last_pop'] = get_population(self.Positions, fits=fitness, grid_flag=True, 
+                                                         bounds=self.orig_bounds, bounds_map=self.bounds_map)
+            else:
+                self.history['last_pop'] = get_population(self.Positions, fits=fitness, grid_flag=False)
+        
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
                     
         return self.whale_correct, self.fitness_best_correct, self.history
 
@@ -24,12 +24,14 @@ from numpy import dot, eye, asarray, array, trace, exp
 from numpy import mean, sum, argsort, arange
 from scipy.stats import multivariate_normal, norm
 from scipy.linalg import det, expm
-import joblib
 import random
 import numpy as np
 import copy
+from neorl.evolu.discrete import Space
 from neorl.utils.seeding import set_neorl_seed
 from neorl.utils.tools import get_population
+from neorl.utils.evaluator import batch_fit, Evaluator
+from neorl.utils.profiler import phase
 
 class XNES(object):
     """
@@ -46,10 +48,13 @@ class XNES(object):
     :param adapt_sampling: (bool): activate the adaption sampling option
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with the whole population as a 2D array of shape (npop, d) and must return an array of shape (npop,)
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
+    :param profiler: (Profiler) records the time of the fitness and of the XNES phases in every generation, added to the history as ``profile`` (see ``neorl.utils.profiler.Profiler``). If ``None``, nothing is recorded
     """
     def __init__(self, mode, bounds, fit, A=None, npop=None,
                  eta_mu=1.0, eta_sigma=None, eta_Bmat=None, 
-                 adapt_sampling=False, ncores=1, seed=None):
+                 adapt_sampling=False, ncores=1, seed=None, vectorized=False, evaluator=None, profiler=None):
         
         set_neorl_seed(seed)
             
@@ -66,11 +71,17 @@ class XNES(object):
             self.f=fitness_wrapper
         else:
             raise ValueError('--error: The mode entered by user is invalid, use either `min` or `max`')
+        self.profiler=profiler
+        if profiler is not None:
+            self.f=profiler.wrap(self.f, 'fitness')
             
         self.eta_mu = eta_mu
         self.use_adasam = adapt_sampling
         self.ncores = ncores
+        self.vectorized=vectorized
+        self.evaluator=evaluator if evaluator is not None else Evaluator(ncores=ncores)
         self.bounds=bounds
+        self.space=Space(bounds)
 
         dim = len(bounds)
         A = np.eye(dim) if A is None else A
@@ -134,24 +145,9 @@ class XNES(object):
         return indv
     
     def ensure_bounds(self, vec, bounds):
-    
-        vec_new = []
-        # cycle through each variable in vector 
-        for i, (key, val) in enumerate(bounds.items()):
-    
-            # variable exceedes the minimum boundary
-            if vec[i] < bounds[key][1]:
-                vec_new.append(bounds[key][1])
-    
-            # variable exceedes the maximum boundary
-            if vec[i] > bounds[key][2]:
-                vec_new.append(bounds[key][2])
-    
-            # the variable is fine
-            if bounds[key][1] <= vec[i] <= bounds[key][2]:
-                vec_new.append(vec[i])
-            
-        return vec_new
+        #clip a single individual to the lower/upper bounds
+        space=self.space if bounds is self.bounds else Space(bounds)
+        return list(space.clip(vec))
 
     def evolute(self, ngen, x0=None, verbose=False):
         """
@@ -165,11 +161,14 @@ class XNES(object):
         """
         f = self.f
         self.verbose=verbose
-        if x0:
-            assert len(x0) == self.dim, 'the length of x0 ({}) MUST equal the number of parameters in bounds ({})'.format(len(x0), self.dim)
-            self.mu=x0
-        else:
-            self.mu=self.init_sample(self.bounds)
+        if self.profiler is not None:
+            self.profiler.reset()
+        with phase(self.profiler, 'initialization'):
+            if x0:
+                assert len(x0) == self.dim, 'the length of x0 ({}) MUST equal the number of parameters in bounds ({})'.format(len(x0), self.dim)
+                self.mu=x0
+            else:
+                self.mu=self.init_sample(self.bounds)
         mu, sigma, bmat = self.mu, self.sigma, self.bmat
         eta_mu, eta_sigma, eta_bmat = self.eta_mu, self.eta_sigma, self.eta_bmat
         npop = self.npop
@@ -178,20 +177,26 @@ class XNES(object):
 
         eyemat = eye(dim)
 
-        with joblib.Parallel(n_jobs=self.ncores) as parallel:
-
-            for i in range(ngen):
+        for i in range(ngen):
+            if self.profiler is not None:
+                self.profiler.start_generation()
+            with phase(self.profiler, 'update'):
                 s_try = np.random.randn(npop, dim)
                 z_try = mu + sigma * dot(s_try, bmat)     # broadcast
+            
+            with phase(self.profiler, 'ensure_bounds'):
+                z_try = self.space.clip(z_try)
+            
+            #print(z_try)
                 
-                for k in range (len(z_try)):
-                    z_try[k] = self.ensure_bounds(vec=z_try[k], bounds=self.bounds)
-                
-                #print(z_try)
-                    
-                f_try = parallel(joblib.delayed(f)(z) for z in z_try)
-                f_try = asarray(f_try)
-                
+            with phase(self.profiler, 'evaluation'):
+                if self.vectorized:
+                    f_try = batch_fit(f, z_try)
+                else:
+                    f_try = self.evaluator.map(f, z_try)
+                    f_try = asarray(f_try)
+            
+            with phase(self.profiler, 'selection'):
                 # save if best
                 fitness = mean(f_try)
 
@@ -199,7 +204,7 @@ class XNES(object):
                 f_try = f_try[isort]
                 s_try = s_try[isort]
                 z_try = z_try[isort]
-                
+            
                 for m in range (len(f_try)):
                     if f_try[m] > self.fitness_best:
                         self.fitness_best=f_try[m]
@@ -207,17 +212,18 @@ class XNES(object):
 
                 self.last_pop=z_try.copy()
                 self.last_fit=np.array(f_try).copy()
-                        
+                    
                 if fitness - 1e-8 > self.fitness_best:
                     self.mu_best = mu.copy()
                     self.counter = 0
                 else: 
                     self.counter += 1
-                    
-                #if self.counter > self.patience:
-                #    self.done = True
-                #    return
                 
+            #if self.counter > self.patience:
+            #    self.done = True
+            #    return
+            
+            with phase(self.profiler, 'update'):
                 u_try = self.utilities if self.use_fshape else f_try
 
                 if self.use_adasam and sigma_old is not None:  # sigma_old must be available
@@ -235,11 +241,12 @@ class XNES(object):
                 sigma *= exp(0.5 * eta_sigma * dj_sigma)
                 bmat = dot(bmat, expm(0.5 * eta_bmat * dj_bmat))
 
+            with phase(self.profiler, 'logging'):
                 # logging
                 self.history['fitness'].append(self.fitness_best)
                 self.history['sigma'].append(sigma)
                 self.history['eta_sigma'].append(eta_sigma)
-                
+            
                 #--mir
                 if self.mode=='min':
                     self.fitness_best_correct=-self.fitness_best
@@ -257,7 +264,9 @@ class XNES(object):
                     print('Sigma:', np.round(sigma,3))
                     print('BMAT:', np.round(bmat,3))
                     print('^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^^')
-            
+            if self.profiler is not None:
+                self.profiler.end_generation()
+        
         # keep last results
         self.mu, self.sigma, self.bmat = mu, sigma, bmat
         self.eta_sigma = eta_sigma
@@ -275,8 +284,12 @@ class XNES(object):
 
             self.last_fit=-self.last_fit
         
-        self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit)
+        with phase(self.profiler, 'get_population'):
+            self.history['last_pop'] = get_population(self.last_pop, fits=self.last_fit)
 
+        #--time of every phase in every generation
+        if self.profiler is not None:
+            self.history['profile']=self.profiler.history()
             
         return self.x_best, self.fitness_best_correct, self.history
 
@@ -212,7 +212,12 @@ def get_algo_ngtonevals(obj):
     elif algo == 'PSO':
         return lambda i, a : (i+1)*a
     elif algo == 'DE':
-        return lambda i, a : 2*i*a
+        if 'int' in obj.var_type and obj.int_transform != 'nearest_int':
+            #the targets mutated by ensure_discrete are evaluated again, at most all of them every generation
+            print('--warning: DE with sigmoid/minmax int_transform uses an upper bound for number of function evaluations')
+            return lambda i, a : (2*i+1)*a
+        #the targets keep their fitness, only the trial vectors are evaluated every generation
+        return lambda i, a : (i+1)*a
     elif algo == 'ES':
         return lambda i, a : (i+1)*a
     elif algo == 'HHO':
@@ -237,14 +237,14 @@ class HHO(object):
         #list - hawk fitnesses
         #"""
         #print(self.hawk_positions)
+        return self.eval_pop([self.hawk_positions[i, :] for i in range(self.nhawks)])
+
+    def eval_pop(self, pop):
+        #evaluates a list of hawk positions, in parallel if ncores > 1
         if self.ncores > 1:
             with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                fitness_lst = parallel(joblib.delayed(self.fit_worker)(self.hawk_positions[i, :]) for i in range(self.nhawks))
-        else:
-            fitness_lst = []
-            for i in range(self.nhawks):
-                fitness_lst.append(self.fit_worker(self.hawk_positions[i, :]))
-        return fitness_lst
+                return parallel(joblib.delayed(self.fit_worker)(pos) for pos in pop)
+        return [self.fit_worker(pos) for pos in pop]
 
     def update_hawks(self, cur_gen, ngen, fitness_lst):
         #"""
@@ -259,6 +259,7 @@ class HHO(object):
         #None
         #"""
         E1 = 2 * (1 - (cur_gen / ngen))  # factor to show the decreasing energy of rabbit
+        dives = [] # (hawk index, dive position) of the hawks performing team rapid dives
         for i in range(self.nhawks):
 
             E0 = 2 * random.random() - 1
@@ -286,7 +287,10 @@ class HHO(object):
                 # Phase 2: performing team rapid dives (leapfrog movements) #
                 #############################################################
                 elif r < 0.5:
-                    self.team_rapid_dives(i, fitness_lst[i], rabbit_escape_energy)
+                    dives.append((i, self.team_rapid_dives(i, rabbit_escape_energy)))
+
+        #the candidates of all the rapid dives are evaluated together
+        self.rapid_dives(dives, fitness_lst)
 
     def exploration(self, hawk_index):
         #"""
@@ -340,19 +344,19 @@ class HHO(object):
             self.hawk_positions[hawk_index, :] = (self.rabbit_location - self.hawk_positions[hawk_index, :]) \
                                         - escape_energy * abs(J * self.rabbit_location - self.hawk_positions[hawk_index, :])
 
-    def team_rapid_dives(self, hawk_index, hawk_fitness, escape_energy):
+    def team_rapid_dives(self, hawk_index, escape_energy):
         #"""
         #Exploitation phase 2 based on two strategies:
         #    1. Hard besiege with team rapid dives
         #    2. Soft besiege with team rapid dives
+        #The dive is evaluated later with the dives of the other hawks (see rapid_dives)
 
         #Params:
         #hawk_index - index of hawk being updated
-        #hawk_fitness - fitness of current hawk
         #escape_energy - escape energy of the rabbit
 
         #Return:
-        #None
+        #array - dive position Y, before the bound and discrete checks
         #"""
         #########################
         # Soft besiege eq. (10) #
@@ -361,26 +365,6 @@ class HHO(object):
             J = 2 * (1 - random.random())
             Y = self.rabbit_location \
                 - escape_energy * abs(J * self.rabbit_location - self.hawk_positions[hawk_index, :])
-
-            #mir: uses a built-in function
-            #(order is important for choices.remove(), first check bounds, then check discrete)
-            Y=self.ensure_bounds(Y, self.bounds)
-            Y=self.ensure_discrete(Y)
-
-            if self.fit_worker(Y) < hawk_fitness:  # improved move?
-                self.hawk_positions[hawk_index, :] = Y.copy()
-            else:  # hawks perform self.levy-based short rapid dives around the rabbit
-                Z = self.rabbit_location \
-                    - escape_energy * abs(J * self.rabbit_location - self.hawk_positions[hawk_index, :]) \
-                    + np.multiply(np.random.randn(self.dim), self.levy())
-
-                #mir---
-                #(order is important for choices.remove(), first check bounds, then check discrete)
-                Z=self.ensure_bounds(Z, self.bounds)
-                Z=self.ensure_discrete(Z)
-
-                if self.fit_worker(Z) < hawk_fitness:
-                    self.hawk_positions[hawk_index, :] = Z.copy()
         #########################
         # Hard besiege eq. (11) #
         #########################
@@ -388,27 +372,42 @@ class HHO(object):
             J = 2 * (1 - random.random())
             Y = self.rabbit_location \
                 - escape_energy * abs(J * self.rabbit_location - self.hawk_positions.mean(0))
+        return Y
 
-            #---mir
-            #(order is important for choices.remove(), first check bounds, then check discrete)
-            Y=self.ensure_bounds(Y, self.bounds)
-            Y=self.ensure_discrete(Y)
-
-            if self.fit_worker(Y) < hawk_fitness:  # improved move?
-                self.hawk_positions[hawk_index, :] = Y.copy()
-            else:  # Perform levy-based short rapid dives around the rabbit
-                Z = self.rabbit_location \
-                    - escape_energy * abs(J * self.rabbit_location - self.hawk_positions.mean(0)) \
-                    + np.multiply(np.random.randn(self.dim), self.levy())
-
-                #--mir
-                #(order is important for choices.remove(), first check bounds, then check discrete)
-                Z=self.ensure_bounds(Z, self.bounds)
-                Z=self.ensure_discrete(Z)
+    def rapid_dives(self, dives, fitness_lst):
+        #"""
+        #Moves the hawks performing team rapid dives: the dive positions Y of all the hawks are
+        #evaluated in one batch, then the levy-based short rapid dives Z = Y + levy of the hawks
+        #that did not improve are evaluated in a second batch. A hawk moves to Y or Z if it improves its fitness.
 
-                if self.fit_worker(Z) < hawk_fitness:
-                    self.hawk_positions[hawk_index, :] = Z.copy()
+        #Params:
+        #dives - list of (hawk index, dive position Y) from team_rapid_dives
+        #fitness_lst - list of hawk fitnesses in current generation
 
+        #Return:
+        #None
+        #"""
+        if not dives:
+            return
+
+        #mir: uses a built-in function
+        #(order is important for choices.remove(), first check bounds, then check discrete)
+        Y = [self.ensure_discrete(self.ensure_bounds(dive, self.bounds)) for _, dive in dives]
+        failed = [] # the hawks that did not improve with Y
+        for (i, dive), y, fitness in zip(dives, Y, self.eval_pop(Y)):
+            if fitness < fitness_lst[i]:  # improved move?
+                self.hawk_positions[i, :] = y
+            else:
+                failed.append((i, dive))
+        if not failed:
+            return
+
+        # hawks perform levy-based short rapid dives around the rabbit
+        Z = [self.ensure_discrete(self.ensure_bounds(dive + np.multiply(np.random.randn(self.dim), self.levy()), self.bounds))
+             for _, dive in failed]
+        for (i, _), z, fitness in zip(failed, Z, self.eval_pop(Z)):
+            if fitness < fitness_lst[i]:
+                self.hawk_positions[i, :] = z
 
     def fit_worker(self, hawk_pos):
         #"""
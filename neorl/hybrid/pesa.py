@@ -24,7 +24,7 @@ from neorl.hybrid.pesacore.sa import SAMod
 from neorl.hybrid.pesacore.es import ESMod
 from neorl.hybrid.pesacore.pso import PSOMod
 from copy import deepcopy
-from multiprocessing import Process, Queue
+from neorl.hybrid.pesacore.worker import AlgoWorker
 import random
 import numpy as np
 from collections import defaultdict
@@ -275,6 +275,13 @@ class PESA(ExperienceReplay):
         self.STEP0=1  #step counter
         self.ALPHA=self.ALPHA0  #set alpha to alpha0
         
+        #long-lived worker processes that keep SA, ES, and PSO for the whole run
+        if self.PROC:
+            sa_worker=AlgoWorker(sa)
+            es_worker=AlgoWorker(es)
+            if self.pso_flag:
+                pso_worker=AlgoWorker(pso)
+        
         #--------------------------------
         # Step 4: PESA evolution
         #--------------------------------
@@ -293,38 +300,26 @@ class PESA(ExperienceReplay):
             if self.PROC:
                 t0=time.time()
                 
-                QSA = Queue(); QES=Queue(); QPSO=Queue()
-                def sa_worker():
-                    random.seed(self.SEED)
-                    x_new, E_new, self.T, self.acc, self.rej, self.imp, x_best, E_best, sa_partime= sa.anneal(ngen=1,npop=self.NPOP, x0=self.x_next, 
-                                                                                                  E0=self.E_next, step0=self.STEP0)
-                    QSA.put((x_new, E_new, self.T, self.acc, self.rej, self.imp, x_best, E_best, sa_partime))
-                def es_worker():
-                    random.seed(self.SEED)
-                    pop_new, es_partime=es.evolute(population=self.pop_next,ngen=1,caseids=caseids)
-                    QES.put((pop_new, es_partime))
-                def pso_worker():
-                    random.seed(self.SEED)
-                    if gen > 1:
-                        swm_new, swm_pos_new, swm_fit_new, pso_partime=pso.evolute(ngen=1, swarm=self.swm_next, local_pos=self.local_pos_next, local_fit=self.local_fit_next, 
-                                                                      swm_best=[self.swm_pos, self.swm_fit], mu=self.MU, exstep=self.STEP0, exsteps=self.STEPS, 
-                                                                      caseids=pso_caseids, verbose=0)
-                    else:
-                        swm_new, swm_pos_new, swm_fit_new, pso_partime=pso.evolute(ngen=1, swarm=self.swm_next, local_pos=self.local_pos_next, 
-                                                                      local_fit=self.local_fit_next, mu=self.MU, exstep=self.STEP0, exsteps=self.STEPS, 
-                                                                      caseids=pso_caseids, verbose=0)
-                    QPSO.put((swm_new, swm_pos_new, swm_fit_new, pso_partime))
-                Process(target=sa_worker).start()
-                Process(target=es_worker).start()
+                #SA only samples the best memory sample (greedy replay), so only that part of the memory is sent
+                sa_worker.submit('anneal', seed=self.SEED, attrs={'_memory': self.mymemory.head(k=1)}, 
+                                 ngen=1, npop=self.NPOP, x0=self.x_next, E0=self.E_next, step0=self.STEP0)
+                es_worker.submit('evolute', seed=self.SEED, population=self.pop_next, ngen=1, caseids=caseids)
                 
                 if self.pso_flag:
-                    Process(target=pso_worker).start()
-                    self.swm_next, self.swm_pos, self.swm_fit, pso_partime=QPSO.get()
+                    if gen > 1:
+                        pso_worker.submit('evolute', seed=self.SEED, ngen=1, swarm=self.swm_next, local_pos=self.local_pos_next, local_fit=self.local_fit_next, 
+                                          swm_best=[self.swm_pos, self.swm_fit], mu=self.MU, exstep=self.STEP0, exsteps=self.STEPS, 
+                                          caseids=pso_caseids, verbose=0)
+                    else:
+                        pso_worker.submit('evolute', seed=self.SEED, ngen=1, swarm=self.swm_next, local_pos=self.local_pos_next, 
+                                          local_fit=self.local_fit_next, mu=self.MU, exstep=self.STEP0, exsteps=self.STEPS, 
+                                          caseids=pso_caseids, verbose=0)
+                    self.swm_next, self.swm_pos, self.swm_fit, pso_partime=pso_worker.result()
                     self.local_pos_next=[self.swm_next[key][3] for key in self.swm_next]
                     self.local_fit_next=[self.swm_next[key][4] for key in self.swm_next]
                      
-                self.x_next, self.E_next, self.T, self.acc, self.rej, self.imp, self.x_best, self.E_best, sa_partime=QSA.get()
-                self.pop_next, es_partime=QES.get()
+                self.x_next, self.E_next, self.T, self.acc, self.rej, self.imp, self.x_best, self.E_best, sa_partime=sa_worker.result()
+                self.pop_next, es_partime=es_worker.result()
                 #self.partime.append(time.time()-t0)
                 self.partime['pesa'].append(time.time()-t0)
                 self.partime['pso'].append(pso_partime)
@@ -382,7 +377,7 @@ class PESA(ExperienceReplay):
             #--------------------------------------------------------
             self.pesa_best=self.mymemory.sample(batch_size=1,mode='greedy')[0]  #`greedy` will sample the best in memory
             self.fit_hist.append(self.pesa_best[1])
-            self.memory_size=len(self.mymemory.storage) #memory size so far
+            self.memory_size=len(self.mymemory) #memory size so far
                 
             #--mir
             if self.mode=='min':
@@ -398,6 +393,12 @@ class PESA(ExperienceReplay):
                 
             if self.verbose:  #print summary data to screen
                 self.printout(mode=2, gen=gen)
+        
+        if self.PROC:
+            sa_worker.close()
+            es_worker.close()
+            if self.pso_flag:
+                pso_worker.close()
 
         if self.verbose:
             print('------------------------ PESA Summary --------------------------')
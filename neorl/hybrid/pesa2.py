@@ -25,7 +25,7 @@ from neorl.hybrid.pesacore.de import DEmod
 from neorl.hybrid.pesacore.woa import WOAmod
 from neorl.hybrid.pesacore.es import ESMod
 from copy import deepcopy
-from multiprocessing import Process, Queue
+from neorl.hybrid.pesacore.worker import AlgoWorker
 import random
 import numpy as np
 from collections import defaultdict
@@ -298,6 +298,12 @@ class PESA2(ExperienceReplay):
         self.STEP0=1  #step counter
         self.ALPHA=self.ALPHA0  #set alpha to alpha0
         
+        #long-lived worker processes that keep GWO, DE, and WOA for the whole run
+        if self.PROC:
+            gwo_worker=AlgoWorker(gwo)
+            de_worker=AlgoWorker(de)
+            woa_worker=AlgoWorker(woa)
+        
         #--------------------------------
         # Step 4: PESA evolution
         #--------------------------------
@@ -312,30 +318,14 @@ class PESA2(ExperienceReplay):
             
             if self.PROC:
                 
-                QGWO = Queue(); QDE=Queue(); QWOA=Queue()
-                def gwo_worker():
-                    random.seed(self.SEED)
-                    xgwo_best, ygwo_best, gwo_new= gwo.evolute(ngen=self.GWO_gen*replay_every, x0=self.gwo_next, verbose=0)
-                                                                                                 
-                    QGWO.put((xgwo_best, ygwo_best, gwo_new))
-                def de_worker():
-                    random.seed(self.SEED)
-                    xde_best, yde_best, de_new=de.evolute(ngen=1*replay_every,x0=self.de_next, verbose=0)
-                    QDE.put((xde_best, yde_best, de_new))
-                
-                def woa_worker():
-                    random.seed(self.SEED)
-                    xwoa_best, ywoa_best, woa_new=woa.evolute(ngen=self.WOA_gen*replay_every,x0=self.woa_next, verbose=0)
-                    QWOA.put((xwoa_best, ywoa_best, woa_new))
-                    
-                Process(target=gwo_worker).start()
-                Process(target=de_worker).start()
-                Process(target=woa_worker).start()
+                gwo_worker.submit('evolute', seed=self.SEED, ngen=self.GWO_gen*replay_every, x0=self.gwo_next, verbose=0)
+                de_worker.submit('evolute', seed=self.SEED, ngen=1*replay_every, x0=self.de_next, verbose=0)
+                woa_worker.submit('evolute', seed=self.SEED, ngen=self.WOA_gen*replay_every, x0=self.woa_next, verbose=0)
                 
-                #get the values from the Queue
-                self.gwo_best, self.ygwo_best, self.gwo_next=QGWO.get()
-                self.de_best, self.yde_best, self.de_next=QDE.get()
-                self.woa_best, self.ywoa_best, self.woa_next=QWOA.get()
+                #get the values from the workers
+                self.gwo_best, self.ygwo_best, self.gwo_next=gwo_worker.result()
+                self.de_best, self.yde_best, self.de_next=de_worker.result()
+                self.woa_best, self.ywoa_best, self.woa_next=woa_worker.result()
                 
             #*********************************
             #--Step 5B: Complete Serial calcs
@@ -379,7 +369,7 @@ class PESA2(ExperienceReplay):
             #--------------------------------------------------------
             self.pesa_best=self.mymemory.sample(batch_size=1,mode='greedy')[0]  #`greedy` will sample the best in memory
             self.fit_hist.append(self.pesa_best[1])
-            self.memory_size=len(self.mymemory.storage) #memory size so far
+            self.memory_size=len(self.mymemory) #memory size so far
             
             
             #--mir
@@ -396,6 +386,11 @@ class PESA2(ExperienceReplay):
 
             if self.verbose:  #print summary data to screen
                 self.printout(mode=2, gen=gen)
+        
+        if self.PROC:
+            gwo_worker.close()
+            de_worker.close()
+            woa_worker.close()
             
         #--mir
         if self.mode=='min':
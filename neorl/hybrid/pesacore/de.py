@@ -24,18 +24,7 @@ import multiprocessing
 import multiprocessing.pool
 from neorl.evolu.discrete import mutate_discrete
 from neorl.utils.seeding import set_neorl_seed
-class NoDaemonProcess(multiprocessing.Process):
-    # make 'daemon' attribute always return False
-    def _get_daemon(self):
-        return False
-    def _set_daemon(self, value):
-        pass
-    daemon = property(_get_daemon, _set_daemon)
-
-# We sub-class multiprocessing.pool.Pool instead of multiprocessing.Pool
-# because the latter is only a wrapper function, not a proper class.
-class MyPool(multiprocessing.pool.Pool):
-    Process = NoDaemonProcess
+from neorl.hybrid.pesacore.worker import MyPool
 
 class DEmod:
     """
@@ -168,7 +157,10 @@ class DEmod:
             population = self.InitPopulation(x0=x0)
         else:
             population = self.InitPopulation()
-                
+        
+        #fitness of the current population, None means the target is not evaluated yet
+        fitness=[None]*self.npop
+        
         # loop through all generations
         best_scores=[]
         for gen in range(1,ngen+1):
@@ -176,7 +168,7 @@ class DEmod:
             #print(population)
             gen_scores = [] # score keeping
             
-            x_t_lst=[]
+            x_t_index=[]   #targets that need to be (re-)evaluated
             v_trial_lst = []
             
             # cycle through each individual in the population
@@ -215,30 +207,33 @@ class DEmod:
                     else:
                         v_trial.append(x_t[k])
 
+                x_t_old=list(x_t)
                 x_t=self.ensure_discrete(x_t)
                 v_trial=self.ensure_discrete(v_trial)
                 
-                x_t_lst.append(x_t)
+                #the target keeps its fitness from the last selection, unless it has never
+                #been evaluated or its discrete values are mutated by ensure_discrete
+                if fitness[j] is None or x_t != x_t_old:
+                    x_t_index.append(j)
                 v_trial_lst.append(v_trial)
             
-            #paralell evaluation
+            #paralell evaluation (trials and outdated targets in one batch)
+            eval_lst=v_trial_lst + [population[j] for j in x_t_index]
             if self.ncores > 1:
 
                 p=MyPool(self.ncores)
-                score_trial_lst = p.map(self.fit, v_trial_lst)
-                p.close(); p.join()
-
-                p=MyPool(self.ncores)
-                score_target_lst = p.map(self.fit, x_t_lst)
+                scores = p.map(self.fit, eval_lst)
                 p.close(); p.join()
                                     
             else:
-                score_trial_lst=[]
-                score_target_lst=[]
-                for item in v_trial_lst:
-                    score_trial_lst.append(self.fit(item))  
-                for item in x_t_lst:
-                    score_target_lst.append(self.fit(item))  
+                scores=[]
+                for item in eval_lst:
+                    scores.append(self.fit(item))  
+            
+            score_trial_lst=scores[:self.npop]
+            for j, score in zip(x_t_index, scores[self.npop:]):
+                fitness[j]=score
+            score_target_lst=list(fitness)
             #-----------------------------
             #Selection
             #-----------------------------
@@ -248,6 +243,7 @@ class DEmod:
             for (score_trial, score_target, v_trial) in zip(score_trial_lst, score_target_lst, v_trial_lst):
                 if score_trial > score_target:
                     population[index] = v_trial
+                    fitness[index] = score_trial
                     gen_scores.append(score_trial)
                 else:
                     gen_scores.append(score_target)
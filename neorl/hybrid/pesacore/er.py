@@ -20,6 +20,7 @@ Created on Fri Jun 19 17:23:10 2020
 """
 
 import random 
+import bisect
 import numpy as np
 
 #alpha0=0, anneal_alpha=False, anneal_steps=None, alpha_end=1
@@ -27,11 +28,50 @@ class ExperienceReplay:
     def __init__(self, size):
         #"""
         #:param size (int): the max size of the memory
+        #
+        #The memory is made of preallocated arrays with a hash index to detect duplicated samples and 
+        #a rank list sorted by the objective for greedy and priortized sampling. When the memory 
+        #is full, the worst sample is dropped to store the new one. The rank list is kept sorted 
+        #with bisect.insort, which is a binary search plus an O(n) list shift per insert 
+        #(a fast memmove, cheaper than a heap for the sorted slices used in greedy/prior sampling)
         #"""
         random.seed(1)
         self.size=size
-        self.storage = []
-        self.next_indx=0    
+        self.clear()
+    
+    def clear(self):
+        #"""
+        #empties the memory
+        #"""
+        size=self.size
+        self.xvec=np.empty(size, dtype=object)    #input attributes of each sample
+        self.obj=np.zeros(size)                    #objective value of each sample
+        self.method=np.empty(size, dtype=object)  #method of which each sample belongs to
+        self.index={}     #hash index: sample key --> slot in the buffer
+        self.keys=[None]*size
+        self.ranks=[]     #sorted list of (-obj, counter, slot), i.e. best sample first
+        self.rank_of=[None]*size
+        self.count=0      #number of samples in the memory
+        self.counter=0    #total number of samples inserted, breaks ties in the ranks
+        
+    def __len__(self):
+        return self.count
+    
+    def get(self, slot):
+        #"""
+        #returns the sample stored in a slot as a tuple (x, obj, method) or (x, obj)
+        #"""
+        if self.method[slot] is None:
+            return (self.xvec[slot], self.obj[slot])
+        return (self.xvec[slot], self.obj[slot], self.method[slot])
+    
+    @property
+    def storage(self):
+        #"""
+        #content of the memory buffer
+        #[(np.ndarray, float, str)]: 
+        #"""
+        return [self.get(slot) for slot in range(self.count)]
         
     @property
     def memory(self):
@@ -53,14 +93,14 @@ class ExperienceReplay:
         #:param n_samples (int):  number of samples to draw
         #:return (bool): whether we can sample or not
         #"""
-        return len(self.storage) >= n_samples
+        return self.count >= n_samples
 
     def memory_is_full(self):
         #"""
         #Check whether the replay buffer is full or not.
         #:return: (bool)
         #"""
-        return len(self.storage) == self.buffer_size
+        return self.count == self.buffer_size
 
     def add(self, xvec, obj, method=None):
         #"""
@@ -74,44 +114,52 @@ class ExperienceReplay:
         #check if multiple or single samples is to be added 
         if type(obj) is list: # multiple samples 
             if method:
-                data = [(x, o, m) for x,o,m in zip(xvec,obj,method)]
+                for x,o,m in zip(xvec,obj,method):
+                    self.insert(x, o, m)
             else:
-                data = [(x, o) for x,o in zip(xvec,obj)]
-            
-            for sample in data:
-                # check if sample is in memory
-                if sample not in self.storage:
-                    if self.next_indx >= len(self.storage):
-                        self.storage.append(sample)
-                    else:
-                        self.storage[self.next_indx] = sample
-                    self.next_indx = (self.next_indx + 1) % self.size
+                for x,o in zip(xvec,obj):
+                    self.insert(x, o)
             
         else: #single sample
-            if method:
-                data = (xvec, obj, method)
-            else:
-                data = (xvec, obj)
-            
-            # check if sample is in memory
-            if data not in self.storage:
-                if self.next_indx >= len(self.storage):
-                    self.storage.append(data)
-                else:
-                    self.storage[self.next_indx] = data
-                self.next_indx = (self.next_indx + 1) % self.size
+            self.insert(xvec, obj, method if method else None)
+    
+    def insert(self, x, obj, method=None):
+        #"""
+        #inserts one sample in memory, unless it is already there
+        #"""
+        key=(tuple(x), obj, method)
+        # check if sample is in memory (hash lookup)
+        if key in self.index:
+            return
+        
+        if self.count == self.size:
+            #the memory is full, the worst sample (last rank) is overwritten
+            slot=self.ranks.pop()[2]
+            del self.index[self.keys[slot]]
+        else:
+            slot=self.count
+            self.count+=1
+        
+        self.xvec[slot]=x
+        self.obj[slot]=obj
+        self.method[slot]=method
+        self.keys[slot]=key
+        self.index[key]=slot
+        rank=(-obj, self.counter, slot)
+        bisect.insort(self.ranks, rank)
+        self.rank_of[slot]=rank
+        self.counter+=1
                     
     def calc_priorities(self, alpha):
         #"""
         #calculate priorties for each memory sample
         #:param alpha: priortization value 
         #:return
-        #  - list of normalized priorities 
+        #  - list of normalized priorities (ordered from the best to the worst sample)
         #"""
         #Fixed :)
         
-        self.storage.sort(key=lambda e: e[1], reverse=True)
-        ranks=np.array(range(1,len(self.storage)+1))
+        ranks=np.arange(1,self.count+1)
         ranks=1/ranks
         priors=ranks**alpha/np.sum(ranks**alpha)
         assert np.round(np.sum(priors)) == 1.0, 'the calculated priorties are not normalized'
@@ -130,35 +178,53 @@ class ExperienceReplay:
         #    - batch_size of samples in a list of tuples [(np.ndarray, float, str),...,(np.ndarray, float, str)]
         #"""
         if mode=='uniform': # uniform sampling
-            idxs = [random.randint(0, len(self.storage) - 1) for _ in range(batch_size)]
-            return [self.storage[i] for i in idxs]
+            idxs = [random.randint(0, self.count - 1) for _ in range(batch_size)]
+            return [self.get(i) for i in idxs]
         elif mode=='greedy': #greedy mode (always take the highest)
             #Fixed :) 
-            self.storage.sort(key=lambda e: e[1], reverse=True)
-            return self.storage[:batch_size]
+            return [self.get(rank[2]) for rank in self.ranks[:batch_size]]
         elif mode=='prior':  #priortized replay
             priors=self.calc_priorities(alpha=alpha)
             np.random.seed(seed)
-            idxs = np.random.choice(range(len(self.storage)),p=priors, size=batch_size)
-            return [self.storage[i] for i in idxs]
+            idxs = np.random.choice(self.count, p=priors, size=batch_size)
+            return [self.get(self.ranks[i][2]) for i in idxs]
         else:
             raise ('unknown mode is entered for experience replay: either uniform, greedy, or prior are allowed')
     
+    def head(self, k=1):
+        #"""
+        #returns a new memory with the k best samples, which is enough for greedy sampling
+        #of up to k samples, e.g. to send the memory to another process without copying all samples
+        #"""
+        memory=ExperienceReplay.__new__(ExperienceReplay)   #__init__ is skipped to keep the random state
+        memory.size=max(k, 1)
+        memory.clear()
+        for rank in self.ranks[:k]:
+            slot=rank[2]
+            memory.insert(self.xvec[slot], self.obj[slot], self.method[slot])
+        return memory
+    
     def remove_duplicates(self):
+        #"""
+        #removes the samples with duplicated input attributes (keeping the best one), 
+        #as samples with the same x but different obj/method can coexist in memory
+        #"""
+        if self.count == 0:
+            return
+        #best to worst sample
+        seen=set()
+        samples=[]
+        for rank in self.ranks:
+            slot=rank[2]
+            x=tuple(self.xvec[slot])
+            if x not in seen:
+                seen.add(x)
+                samples.append((self.xvec[slot], self.obj[slot], self.method[slot]))
         
-        #TODO: Time consuming step!!!
-        if len(self.storage[0])==3: #(x, obj, method) tuple
-            seen = []
-            # using list comprehension 
-            self.storage = [(a, b, c) for a, b, c in self.storage 
-                     if not (a in seen or seen.append(a))]
-        elif len(self.storage[0])==2:   #(x, obj) tuple
-            seen = []
-            # using list comprehension 
-            self.storage = [(a, b) for a, b in self.storage 
-                     if not (a in seen or seen.append(a))]
-        else:
-            raise ('memory content is corrupted and cannot be filtered')
+        #rebuild the memory with the unique samples
+        self.clear()
+        for x, obj, method in samples:
+            self.insert(x, obj, method)
 
 #if __name__=='__main__':
 #    random.seed(1)
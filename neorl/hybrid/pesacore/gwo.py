@@ -34,18 +34,7 @@ import multiprocessing.pool
 from neorl.evolu.discrete import mutate_discrete
 from neorl.utils.seeding import set_neorl_seed
 
-class NoDaemonProcess(multiprocessing.Process):
-    # make 'daemon' attribute always return False
-    def _get_daemon(self):
-        return False
-    def _set_daemon(self, value):
-        pass
-    daemon = property(_get_daemon, _set_daemon)
-
-# We sub-class multiprocessing.pool.Pool instead of multiprocessing.Pool
-# because the latter is only a wrapper function, not a proper class.
-class MyPool(multiprocessing.pool.Pool):
-    Process = NoDaemonProcess
+from neorl.hybrid.pesacore.worker import MyPool
 
 #multiprocessing trick to paralllelize nested functions in python (un-picklable objects!)
 def globalize(func):
@@ -0,0 +1,129 @@
+#    This file is part of NEORL.
+
+#    Copyright (c) 2021 Exelon Corporation and MIT Nuclear Science and Engineering
+#    NEORL is free software: you can redistribute it and/or modify
+#    it under the terms of the MIT LICENSE
+
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#    SOFTWARE.
+
+# -*- coding: utf-8 -*-
+#"""
+#Created on Sat Oct 17 15:02:47 2026
+#
+#@author: NEORL team
+#"""
+
+import atexit
+import copy
+import random
+import numpy as np
+import traceback
+import multiprocessing
+import multiprocessing.pool
+
+class NoDaemonProcess(multiprocessing.Process):
+    # make 'daemon' attribute always return False
+    @property
+    def daemon(self):
+        return False
+    @daemon.setter
+    def daemon(self, value):
+        pass
+
+class NoDaemonContext(type(multiprocessing.get_context())):
+    Process = NoDaemonProcess
+
+# The processes of MyPool are not daemons, so the algorithms running in them (e.g. ES inside PESA)
+# can open their own pool. Since python 3.8, the process class is taken from the pool context
+class MyPool(multiprocessing.pool.Pool):
+    def __init__(self, *args, **kwargs):
+        kwargs['context'] = NoDaemonContext()
+        super(MyPool, self).__init__(*args, **kwargs)
+
+def _worker_loop(algo, conn):
+    #"""
+    #Main loop of the worker process: receives a request through the pipe, runs the method
+    #of the algorithm object, and sends back the output. A ``None`` request stops the worker.
+    #Every request runs on a fresh copy of the algorithm object, with the python random seed and the
+    #numpy random state of the main process, as a process forked from the main process for every generation would
+    #"""
+    while True:
+        try:
+            request=conn.recv()
+        except EOFError:
+            #the main process is gone
+            break
+        if request is None:
+            break
+        method, seed, np_state, attrs, kwargs = request
+        try:
+            run=copy.deepcopy(algo)   #the state left by the previous generation is not carried over
+            for key in attrs:
+                setattr(run, key, attrs[key])
+            random.seed(seed)
+            np.random.set_state(np_state)
+            conn.send((True, getattr(run, method)(**kwargs)))
+        except Exception:
+            conn.send((False, traceback.format_exc()))
+    conn.close()
+
+class AlgoWorker:
+    #"""
+    #A long-lived process that holds one algorithm object of PESA/PESA2 (e.g. SAMod, ESMod, PSOMod)
+    #for the whole run. The object is copied to the worker once, then every generation only
+    #the next population is sent through a pipe and the results are sent back.
+    #Each generation starts from the object as it was sent to the worker (plus ``attrs``), with the python 
+    #random seed ``seed`` and the numpy random state of the main process at ``submit``, so the seeded runs are the 
+    #same as with a new process forked every generation
+    #
+    #The worker is not a daemon, so the algorithm can still open its own pool of processors
+    #
+    #Example:
+    #    worker=AlgoWorker(es)
+    #    worker.submit('evolute', seed=1, population=pop, ngen=1)
+    #    pop_new, es_partime=worker.result()
+    #    worker.close()
+    #"""
+    def __init__(self, algo):
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process=multiprocessing.Process(target=_worker_loop, args=(algo, child_conn))
+        self.process.start()
+        child_conn.close()
+        #the worker is not a daemon, so it must be stopped before the main process exits (e.g. after an error)
+        atexit.register(self.close)
+
+    def submit(self, method, seed=None, attrs=None, **kwargs):
+        #"""
+        #Runs ``algo.method(**kwargs)`` in the worker without waiting for it
+        #:param method (str): name of the method of the algorithm object
+        #:param seed (int): the python random seed set before calling the method (the numpy random state is the one of the main process)
+        #:param attrs (dict): attributes to update in the algorithm object before calling the method
+        #"""
+        self.conn.send((method, seed, np.random.get_state(), attrs if attrs else {}, kwargs))
+
+    def result(self):
+        #"""
+        #Waits for the output of the last submitted method
+        #"""
+        success, output = self.conn.recv()
+        if not success:
+            raise RuntimeError('--error: the PESA worker process failed with the following error:\n{}'.format(output))
+        return output
+
+    def close(self):
+        #"""
+        #Stops the worker process
+        #"""
+        if self.conn.closed:
+            return
+        if self.process.is_alive():
+            self.conn.send(None)
+            self.process.join()
+        self.conn.close()
+        atexit.unregister(self.close)
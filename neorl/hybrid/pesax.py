@@ -334,7 +334,7 @@ class PESAX(ExperienceReplay):
             #--------------------------------------------------------
             self.pesa_best=self.mymemory.sample(batch_size=1,mode='greedy')[0]  #`greedy` will sample the best in memory
             self.fit_hist.append(self.pesa_best[1])
-            self.memory_size=len(self.mymemory.storage) #memory size so far
+            self.memory_size=len(self.mymemory) #memory size so far
             if self.verbose:  #print summary data to screen
                 self.printout(mode=2, gen=gen)
                 
@@ -21,16 +21,14 @@
 # from DEAP implementation: https://github.com/DEAP/deap/blob/master/deap/tools/emo.py#L15 
 #"""
 
-import random
 import numpy as np
 from collections import defaultdict
 import copy
-import joblib
-from neorl.evolu.crossover import cxES2point, cxESBlend
 from neorl.evolu.discrete import encode_grid_to_discrete, decode_discrete_to_grid
 from neorl.utils.seeding import set_neorl_seed
 
 from neorl.evolu.es import ES
+from neorl.utils.evaluator import FitWorker
 from itertools import chain
 from neorl.multi.tools import sortNondominated, sortLogNondominated, assignCrowdingDist
 from neorl.utils.tools import get_population_nsga
@@ -53,17 +51,19 @@ class NSGAII(ES):
     :param smax: (float): maximum bound for the strategy vector
     :param ncores: (int) number of parallel processors
     :param seed: (int) random seed for sampling
+    :param vectorized: (bool) if ``True``, ``fit`` is called once per generation with the whole population as a 2D array of shape (lambda\_, d) and must return an array of shape (lambda\_, nobj), e.g. ``fit=DTLZ2(n_var=d, n_obj=nobj).evaluate``
+    :param evaluator: (Evaluator) pool of evaluation workers to reuse across generations and optimizers, if ``None``, a pool of ``ncores`` processors is opened for every evaluation batch (see ``neorl.utils.evaluator.Evaluator``)
     
     NSGA-II specific parameters:
 
     :param sorting: (str) sorting type, ``standard`` or ``log``. The latter should be faster and is used as default.#Paul
     """
     def __init__ (self, mode, bounds, fit, lambda_=60, cxmode='cx2point', 
-                  alpha=0.5, cxpb=0.6, mutpb=0.3, smin=0.01, smax=0.5, clip=True, ncores=1, seed=None,sorting = 'log', **kwargs):  
+                  alpha=0.5, cxpb=0.6, mutpb=0.3, smin=0.01, smax=0.5, clip=True, ncores=1, seed=None, vectorized=False, evaluator=None,sorting = 'log', **kwargs):  
         
         set_neorl_seed(seed)
         super().__init__(mode = mode, bounds = bounds, fit = fit, lambda_=lambda_, mu=lambda_, cxmode=cxmode, 
-                  alpha=alpha, cxpb=cxpb, mutpb=mutpb, smin=smin, smax=smax, clip=clip, ncores=ncores, seed=seed)
+                  alpha=alpha, cxpb=cxpb, mutpb=mutpb, smin=smin, smax=smax, clip=clip, ncores=ncores, seed=seed, vectorized=vectorized, evaluator=evaluator)
 
         # new hyper-parameters #Paul
         self.sorting = sorting
@@ -85,21 +85,8 @@ class NSGAII(ES):
                 elif mode == 'min':
                     return -np.array([fitness])
         self.fit=fitness_wrapper   
+        self.worker=FitWorker(self.fit, self.orig_bounds, clip=False, vectorized=vectorized, multi_objective=True)
     
-    def fit_worker(self, x):
-        #"""
-        #Evaluates fitness of an individual.
-        #"""
-        
-        
-        #mir-grid
-        if self.grid_flag:
-            #decode the individual back to the int/float/grid mixed space
-            x=decode_discrete_to_grid(x,self.orig_bounds,self.bounds_map) 
-                    
-        fitness = self.fit(x)
-        return fitness
-        
     def select(self,pop, k = 1, nd='standard'):
         """
         Apply NSGA-II selection operator on the *pop*. 
@@ -151,56 +138,14 @@ class NSGAII(ES):
         #"""
         
         
-        pop_indices=list(range(0,len(pop)))
+        #the variation operators of ES work on the population arrays, the offspring
+        #get the keys following the ones of the parents
+        x, strat=self.to_arrays(pop)
+        x_off, strat_off=super().GenOffspring(x=x, strat=strat)
         offspring = defaultdict(list)
         for i in range(self.lambda_):
-            rn = random.random()
-            #------------------------------
-            # Crossover
-            #------------------------------
-            if rn < self.cxpb:            
-                index1, index2 = random.sample(pop_indices,2)
-                if self.cxmode.strip() =='cx2point':
-                    ind1, ind2, strat1, strat2 = cxES2point(ind1=list(pop[index1][0]),ind2=list(pop[index2][0]), 
-                                                            strat1=list(pop[index1][1]),strat2=list(pop[index2][1]))
-                elif self.cxmode.strip() == 'blend':
-                    ind1, ind2, strat1, strat2=cxESBlend(ind1=list(pop[index1][0]), ind2=list(pop[index2][0]), 
-                                                                         strat1=list(pop[index1][1]),strat2=list(pop[index2][1]),
-                                                                         alpha=self.alpha)
-                else:
-                    raise ValueError('--error: the cxmode selected (`{}`) is not available in ES, either choose `cx2point` or `blend`'.format(self.cxmode))
-                
-                ind1=self.ensure_bounds(ind1)
-                ind2=self.ensure_bounds(ind2)
-                
-                ind1=self.ensure_discrete(ind1)  #check discrete variables after crossover
-                ind2=self.ensure_discrete(ind2)  #check discrete variables after crossover
-                
-                offspring[i + len(pop)].append(ind1)
-                offspring[i + len(pop)].append(strat1)
-                #print('crossover is done for sample {} between {} and {}'.format(i,index1,index2))
-            #------------------------------
-            # Mutation
-            #------------------------------
-            elif rn < self.cxpb + self.mutpb:  # Apply mutation
-                index = random.choice(pop_indices)
-                ind, strat=self.mutES(ind=list(pop[index][0]), strat=list(pop[index][1]))
-                offspring[i + len(pop)].append(ind)
-                offspring[i + len(pop)].append(strat)
-                #print('mutation is done for sample {} based on {}'.format(i,index))
-            #------------------------------
-            # Reproduction from population
-            #------------------------------
-            else:                         
-                index=random.choice(pop_indices)
-                pop[index][0]=self.ensure_discrete(pop[index][0])
-                offspring[i + len(pop)].append(pop[index][0])
-                offspring[i + len(pop)].append(pop[index][1])
-                #print('reproduction is done for sample {} based on {}'.format(i,index))
-                
-        if self.clip:
-            for item in offspring:
-                offspring[item][1]=list(np.clip(offspring[item][1], self.smin, self.smax))
+            offspring[i + len(pop)].append(self.to_indv(x_off[i]))
+            offspring[i + len(pop)].append(list(strat_off[i]))
         
         return offspring
           
@@ -232,23 +177,14 @@ class NSGAII(ES):
         for gen in range(1, ngen + 1):
             # Vary the population and generate new offspring
             offspring = self.GenOffspring(pop=self.population)
-            # Evaluate the individuals with an invalid fitness with multiprocessign Pool
-            # create and run the Pool
-            if self.ncores > 1:
-                core_list=[]
-                for key in offspring:
-                    core_list.append(offspring[key][0])
-
-                with joblib.Parallel(n_jobs=self.ncores) as parallel:
-                    fitness=parallel(joblib.delayed(self.fit_worker)(item) for item in core_list)
-                for ind in range(len(offspring)):
-                    offspring[ind + len(self.population)].append(fitness[ind]) 
-                
-            else: #serial calcs
-                
-                for ind in offspring.keys():
-                    fitness=self.fit_worker(offspring[ind][0])
-                    offspring[ind].append(fitness)
+            # Evaluate the offspring in one batch (vectorized fitness) or with the evaluator pool
+            core_list=[]
+            for key in offspring:
+                core_list.append(offspring[key][0])
+            
+            fitness=self.eval_pop(core_list)
+            for ind in range(len(offspring)):
+                offspring[ind + len(self.population)].append(fitness[ind]) 
         
             
             # Select the next generation population
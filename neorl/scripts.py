@@ -79,6 +79,11 @@ print('best y:', y_best)
   
 def main():
     
+    #the benchmark runner has its own parser: neorl bench --help
+    if len(sys.argv) > 1 and sys.argv[1] == 'bench':
+        from neorl.utils.bench import main as bench_main
+        sys.exit(bench_main(sys.argv[2:]))
+    
     logo="""
     
     \t    NEORL: NeuroEvolution Optimisation with Reinforcement Learning
@@ -99,7 +104,7 @@ def main():
                            
     __version__=version()
     path=os.path.dirname(neorl.__file__)
-    parser = argparse.ArgumentParser(description='NEORL command line API parser')
+    parser = argparse.ArgumentParser(description='NEORL command line API parser', epilog='run "neorl bench --help" for the benchmark runner')
     parser.add_argument('-i', '--input', required=False, help='Name of the input ASCII file, e.g. INPUT.inp, INPUT.dat (required arg)')
     parser.add_argument('-c', '--check', help="check input file syntax and exit")
     parser.add_argument('-t', '--test', action='store_true', help="run NEORL units tests")
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import numpy as np
+from neorl.utils.bench import run_benchmarks, compare_benchmarks, run_case, main
+from neorl.benchmarks.tools import transforms
+
+def test_bench():
+    results=run_benchmarks(optimizers=['DE', 'ES', 'GWO'], benchmarks=['classic:sphere', 'cec08:F1'], 
+                           dims=[5], seeds=[1, 2], ngen=5, npop=10, verbose=False)
+    assert len(results) == 12
+    assert (results['wall_time'] > 0).all() and (results['nfev'] > 0).all()
+    assert np.isfinite(results['overhead_per_gen']).all()
+    #same seeds give the same results
+    again=run_benchmarks(optimizers=['DE'], benchmarks=['classic:sphere'], dims=[5], seeds=[1, 2], ngen=5, npop=10, verbose=False)
+    assert np.allclose(again['best_fitness'], results['best_fitness'][:2])
+
+    #no regression against itself, a baseline that was much faster is flagged
+    comp=compare_benchmarks(results, results)
+    assert len(comp) == 6 and not comp['regression'].any() and not comp['fitness_changed'].any()
+    fast=results.copy()
+    fast['wall_time']=fast['wall_time']/10
+    comp=compare_benchmarks(results, fast, min_time=0)
+    assert comp['regression'].all()
+    
+    #optimizers without a vectorized mode get the fitness of one individual
+    row=run_case('SA', 'cec08:F1', d=5, ngen=3, vectorized=True)
+    assert not row['vectorized'] and row['nfev'] > 0
+    #optimizers without a profiler argument get a profiled fitness
+    row=run_case('ACO', 'classic:sphere', d=5, ngen=3, npop=10)
+    assert row['nfev'] > 0 and np.isfinite(row['overhead_per_gen'])
+    
+    #the CEC2017 benchmarks are skipped when their data is not installed
+    cec17=run_benchmarks(optimizers=['DE'], benchmarks=['cec17:f1'], dims=[10], ngen=2, npop=10, verbose=False)
+    assert len(cec17) == (1 if os.path.exists(transforms._pkl_path) else 0)
+    
+    #the command line only writes a results file when it is asked to
+    cwd=os.getcwd()
+    folder=tempfile.mkdtemp()
+    try:
+        os.chdir(folder)
+        assert main(['-a', 'DE', '-d', '5', '-g', '2', '-p', '10']) == 0
+        assert os.listdir(folder) == []
+        assert main(['-a', 'DE', '-d', '5', '-g', '2', '-p', '10', '-o', 'results.csv']) == 0
+        assert os.listdir(folder) == ['results.csv']
+    finally:
+        os.chdir(cwd)
+
+test_bench()
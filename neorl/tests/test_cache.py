@@ -0,0 +1,35 @@
+from neorl import DE, PSO, ES, GWO
+import numpy as np
+
+def test_cache():
+    #Define the fitness function and count the calls
+    calls=[]
+    def Sphere(individual):
+        calls.append(1)
+        y=sum(float(x)**2 for x in individual[:-1])
+        return y + (0 if individual[-1] == 'a' else 10)
+
+    #Setup a small int/grid parameter space where individuals are repeated often
+    BOUNDS={'x1': ['int', -3, 3], 'x2': ['int', -3, 3], 'x3': ['grid', ('a', 'b', 'c')]}
+
+    algs=[(DE, dict(npop=20)), (PSO, dict(npar=20)), (ES, dict(lambda_=20, mu=10)), (GWO, dict(nwolves=10))]
+
+    #the cache must reproduce the search without it while calling the fitness less
+    for alg, kwargs in algs:
+        y=[]
+        ncalls=[]
+        for cache_size in [None, 1000]:
+            del calls[:]
+            opt=alg(mode='min', bounds=BOUNDS, fit=Sphere, ncores=1, seed=1, cache_size=cache_size, **kwargs)
+            x_best, y_best, hist=opt.evolute(ngen=10)
+            y.append(y_best)
+            ncalls.append(len(calls))
+        assert np.isclose(y[0], y[1]), '--error: cached {} does not match the uncached run'.format(alg.__name__)
+        assert ncalls[1] < ncalls[0]
+        assert hist['cache_misses'] == ncalls[1]
+        assert hist['cache_hits'] + hist['cache_misses'] == ncalls[0]
+        if alg is DE:
+            #only the individuals sent to the fitness are counted as evaluations
+            assert hist['nfev'] == ncalls[1]
+
+test_cache()
@@ -0,0 +1,26 @@
+import numpy as np
+from neorl.benchmarks.cec08 import F1, F2, F3, F4, F5, F6, F7
+from neorl import DE
+
+def test_cec08():
+
+    nx = 20
+    X = np.random.uniform(low=-100, high=100, size=(15, nx))
+    for f in [F1(), F2(), F3(), F4(), F5(), F6(), F7()]:
+        #batched evaluation matches the single evaluation
+        assert np.allclose(f.fit_batch(X), [f.fit(x) for x in X], rtol=1e-10)
+        if f.f_bias is not None:
+            xmin, ymin = f.return_global(nx)
+            assert np.isclose(ymin, f.f_bias)
+
+    #the shift data is read once and shared by all instances
+    assert F1().load_shift_data() is F1().load_shift_data()
+
+    BOUNDS={}
+    for i in range(1,nx+1):
+        BOUNDS['x'+str(i)]=['float', -100, 100]
+    de=DE(mode='min', bounds=BOUNDS, fit=F1().fit_batch, npop=50, ncores=1, seed=1, vectorized=True)
+    x_best, y_best, de_hist=de.evolute(ngen=100, verbose=0)
+    assert np.isclose(y_best, F1().fit(np.array(x_best)))
+
+test_cec08()
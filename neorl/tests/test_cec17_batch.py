@@ -0,0 +1,24 @@
+import numpy as np
+import neorl.benchmarks.cec17 as functions    #import all cec17 functions
+from neorl import DE
+
+def test_cec17_batch():
+
+    #a population of shape (npop, d) gives the same values as evaluating every vector alone
+    for nx in [10, 30]:
+        X = np.random.uniform(low=-100, high=100, size=(20, nx))
+        for f in functions.all_functions:
+            y = f(X)
+            assert y.shape == (20,)
+            assert np.allclose(y, [f(x) for x in X], rtol=1e-10)
+
+    #the functions can be passed directly as a vectorized fitness
+    nx = 10
+    BOUNDS={}
+    for i in range(1,nx+1):
+        BOUNDS['x'+str(i)]=['float', -100, 100]
+    de=DE(mode='min', bounds=BOUNDS, fit=functions.f1, npop=60, ncores=1, seed=1, vectorized=True)
+    x_best, y_best, de_hist=de.evolute(ngen=20, verbose=0)
+    assert np.isclose(y_best, functions.f1(x_best))
+
+test_cec17_batch()
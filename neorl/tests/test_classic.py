@@ -0,0 +1,25 @@
+import random
+import numpy as np
+import neorl.benchmarks.classic as classics   #import all classical functions (NumPy)
+import neorl.benchmarks.tools.classic_ref as reference   #pure python reference implementation
+
+def test_classic():
+
+    #the NumPy functions give the same values as the reference for one individual and a population
+    for f, f_ref, bounds in zip(classics.all_functions, reference.all_functions, classics.all_bounds):
+        assert f.__name__ == f_ref.__name__
+        for d in [2, 10, 1000]:
+            X = np.random.uniform(low=bounds[0], high=bounds[1], size=(5, d))
+            #yang and quartic are stochastic, the same python random numbers are drawn by both
+            with np.errstate(all='ignore'):  #some functions overflow for d=1000
+                random.seed(1)
+                y_ref = [f_ref(list(x)) for x in X]
+                random.seed(1)
+                y_pop = f(X)
+                random.seed(1)
+                y_ind = [f(list(x)) for x in X]
+            assert y_pop.shape == (5,)
+            assert np.allclose(y_pop, y_ref, rtol=1e-8, equal_nan=True), f.__name__
+            assert np.allclose(y_ind, y_ref, rtol=1e-8, equal_nan=True), f.__name__
+
+test_classic()
@@ -1,4 +1,5 @@
 from neorl import DE
+import numpy as np
 
 def test_de():
     #Define the fitness function
@@ -20,5 +21,43 @@ def test_de():
     
     de=DE(mode='min', bounds=BOUNDS, fit=FIT, npop=60, F=0.5, CR=0.7, ncores=1, seed=1)
     x_best, y_best, de_hist=de.evolute(ngen=100, verbose=0)
+    #the targets keep their fitness, only the initial population and the trials are evaluated
+    assert de_hist['nfev'] == 60 + 100*60
 
-test_de()
\ No newline at end of file
+test_de()
+
+def test_de_mixed():
+    #mixed int/float/grid space, every int_transform, the last population and the seeding
+    GRID={'a': 0.5, 'b': -1, 'c': 2}
+    def FIT(individual):
+        return (individual[0]-2)**2 + individual[1]**2 + GRID[individual[2]]
+    
+    BOUNDS={'x1': ['int', -5, 5], 'x2': ['float', -2, 2], 'x3': ['grid', ('a', 'b', 'c')]}
+    for int_transform in ['nearest_int', 'sigmoid', 'minmax']:
+        results=[]
+        for _ in range(2):
+            de=DE(mode='min', bounds=BOUNDS, fit=FIT, npop=20, F=0.5, CR=0.7, int_transform=int_transform, ncores=1, seed=1)
+            results.append(de.evolute(ngen=15, verbose=0))
+        (x_best, y_best, de_hist), (x_best2, y_best2, de_hist2)=results
+        
+        #the same seed gives the same result
+        assert x_best == x_best2 and y_best == y_best2
+        assert np.array_equal(de_hist['global_fitness'], de_hist2['global_fitness'])
+        assert de_hist['last_pop'].equals(de_hist2['last_pop'])
+        
+        #the best individual is given in the original space
+        assert type(x_best[0]) == int and -5 <= x_best[0] <= 5 and x_best[2] in ('a', 'b', 'c')
+        #sigmoid/minmax may perturb the best target, global_fitness keeps the best found so far
+        assert y_best == FIT(x_best) and de_hist['global_fitness'][-1] <= y_best
+        
+        #one row per individual in population order, the fitness of each row is its own
+        last_pop=de_hist['last_pop']
+        assert last_pop.shape == (20, 4)
+        assert list(last_pop.columns) == ['var1', 'var2', 'var3', 'fitness']
+        assert list(last_pop.index) == ['indv'+str(i) for i in range(1,21)]
+        for indv in last_pop.values:
+            assert indv[0] == int(indv[0]) and indv[2] in ('a', 'b', 'c')
+            assert np.isclose(indv[-1], FIT(indv[:-1]))
+        assert np.isclose(last_pop['fitness'].min(), y_best)
+
+test_de_mixed()
\ No newline at end of file
@@ -0,0 +1,52 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from neorl import NSGAII, NSGAIII
+from neorl.benchmarks.dtlz import DTLZ1, DTLZ2, DTLZ3, DTLZ4, reference_front
+from neorl.multi.tools import uniform_reference_points
+
+def test_dtlz():
+
+    #the reference fronts are saved in a temporary cache folder instead of the user cache
+    cache_home=os.environ.get('XDG_CACHE_HOME')
+    os.environ['XDG_CACHE_HOME']=tempfile.mkdtemp()
+    try:
+        check_problems()
+    finally:
+        shutil.rmtree(os.environ['XDG_CACHE_HOME'])
+        if cache_home is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME']=cache_home
+
+def check_problems():
+    #a population of shape (npop, n_var) gives the same objectives as evaluating every individual alone
+    for problem in [DTLZ1(n_var=7, n_obj=3), DTLZ2(n_var=12, n_obj=3), DTLZ3(n_var=10, n_obj=4), DTLZ4(n_var=10, n_obj=2)]:
+        X = np.random.uniform(size=(30, problem.n_var))
+        F = problem.evaluate(X)
+        assert F.shape == (30, problem.n_obj)
+        assert np.allclose(F, [problem.evaluate(x) for x in X])
+
+        #the reference front is computed once and matches the front on the same reference points
+        pf = problem.pareto_front(p=6)
+        assert pf is reference_front(problem, p=6)
+        assert np.allclose(pf, problem.pareto_front(uniform_reference_points(nobj=problem.n_obj, p=6)))
+        assert os.path.exists(os.path.join(os.environ['XDG_CACHE_HOME'], 'neorl', 'pareto_fronts', 
+                                           '{}_M{}_p6.npy'.format(problem.name(), problem.n_obj)))
+    
+    #the problems can be passed directly as a vectorized fitness
+    nx=12
+    problem = DTLZ2(n_var=nx, n_obj=3)
+    BOUNDS={}
+    for i in range(1,nx+1):
+        BOUNDS['x'+str(i)]=['float', 0, 1]
+    for optimizer in [NSGAII, NSGAIII]:
+        y_best={}
+        for vectorized in [False, True]:
+            nsga=optimizer(mode='min', bounds=BOUNDS, fit=problem.evaluate, lambda_=40, mutpb=0.1,
+                           cxmode='blend', cxpb=0.8, ncores=1, seed=1, vectorized=vectorized)
+            x_best, y_best[vectorized], nsga_hist=nsga.evolute(ngen=5)
+        assert np.allclose(y_best[False], y_best[True])
+
+test_dtlz()
@@ -0,0 +1,42 @@
+from neorl.hybrid.pesacore.er import ExperienceReplay
+import random
+
+def test_er():
+    #fill a small memory with repeated samples from three methods
+    random.seed(2)
+    memory=ExperienceReplay(size=50)
+    offsets={'de': 0.0, 'gwo': 0.5, 'woa': 0.25}
+    samples=[]
+    for i in range(300):
+        x=[random.randint(1,4) for _ in range(3)]
+        method=random.choice(['de', 'gwo', 'woa'])
+        obj=float(sum(x))+offsets[method]    #the same x has a different obj for each method
+        memory.add(xvec=[x], obj=[obj], method=[method])
+        if (x, obj, method) not in [item[:3] for item in samples]:
+            if len(samples) == 50:
+                #the worst sample (the newest one among ties) is overwritten when the memory is full
+                samples.remove(max(samples, key=lambda item: (-item[1], item[3])))
+            samples.append((x, obj, method, i))
+    samples=[item[:3] for item in samples]
+    
+    #the memory holds the best unique samples, without duplicates
+    assert len(memory) == len(samples) == 50
+    assert sorted(memory.storage) == sorted(samples)
+    
+    #greedy sampling returns the best samples in order
+    best=memory.sample(batch_size=10, mode='greedy')
+    assert [item[1] for item in best] == sorted([item[1] for item in samples], reverse=True)[:10]
+    
+    #priortized sampling draws from the memory
+    for mode in ['uniform', 'prior']:
+        batch=memory.sample(batch_size=20, mode=mode, alpha=0.5)
+        assert len(batch) == 20 and all(item in samples for item in batch)
+    
+    #only the best sample per input vector is kept
+    memory.remove_duplicates()
+    xs=[tuple(item[0]) for item in memory.storage]
+    assert len(xs) == len(set(xs)) == len(set(tuple(item[0]) for item in samples))
+    for item in memory.storage:
+        assert item[1] == max(obj for x, obj, method in samples if x == item[0])
+
+test_er()
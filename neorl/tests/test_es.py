@@ -22,4 +22,21 @@ def test_es():
          cxmode='blend', cxpb=0.7, ncores=1, seed=1)
     x_best, y_best, es_hist=es.evolute(ngen=100, verbose=0)
 
-test_es()
\ No newline at end of file
+def test_es_mixed():
+    #mixed float/int/grid space, the fitness receives python integers and grid values
+    BOUNDS={'x1': ['float', -10, 10], 'x2': ['float', -10, 10], 
+            'x3': ['int', -5, 5], 'x4': ['int', 2, 2], 'x5': ['grid', ('a', 'b', 'c')]}
+    def FIT(individual):
+        assert type(individual[2]) is int and individual[3] == 2 and individual[4] in ('a', 'b', 'c')
+        return individual[0]**2 + individual[1]**2 + individual[2]**2 + {'a': 1, 'b': 0, 'c': 2}[individual[4]]
+    
+    for cxmode in ['cx2point', 'blend']:
+        es=ES(mode='min', bounds=BOUNDS, fit=FIT, lambda_=30, mu=10, cxmode=cxmode, seed=1)
+        x_best, y_best, es_hist=es.evolute(ngen=30, verbose=0)
+        assert FIT(x_best) == y_best
+        assert es_hist['last_pop'].shape == (30, 6)
+        #same seed, same search
+        assert ES(mode='min', bounds=BOUNDS, fit=FIT, lambda_=30, mu=10, cxmode=cxmode, seed=1).evolute(ngen=30)[1] == y_best
+
+test_es()
+test_es_mixed()
\ No newline at end of file
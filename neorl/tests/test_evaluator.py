@@ -0,0 +1,47 @@
+from neorl import DE, GWO, Evaluator
+
+def test_evaluator():
+    #Define the fitness function
+    def FIT(individual):
+        """Sphere test objective function.
+                        F(x) = sum_{i=1}^d xi^2
+                        d=1,2,3,...
+                        Range: [-100,100]
+                        Minima: 0
+        """
+        y=sum(x**2 for x in individual)
+        return y
+    
+    #Setup the parameter space (d=5)
+    nx=5
+    BOUNDS={}
+    for i in range(1,nx+1):
+        BOUNDS['x'+str(i)]=['float', -100, 100]
+    
+    de=DE(mode='min', bounds=BOUNDS, fit=FIT, npop=20, ncores=1, seed=1)
+    x_serial, y_serial, de_hist=de.evolute(ngen=10)
+    
+    #the same workers are shared by both optimizers and kept warm between evolute calls
+    with Evaluator(ncores=2) as evaluator:
+        de=DE(mode='min', bounds=BOUNDS, fit=FIT, npop=20, seed=1, evaluator=evaluator)
+        x_best, y_best, de_hist=de.evolute(ngen=10)
+        assert y_best == y_serial
+        x_best, y_best, de_hist=de.evolute(ngen=10)
+        assert evaluator.started
+        
+        gwo=GWO(mode='min', bounds=BOUNDS, fit=FIT, nwolves=5, seed=1, evaluator=evaluator)
+        x_best, y_best, gwo_hist=gwo.evolute(ngen=10)
+        
+        #only the FitWorker is sent to the workers, once for all the generations
+        class LocalDE(DE):
+            def __getstate__(self):
+                raise RuntimeError('--error: the optimizer is pickled')
+        de=LocalDE(mode='min', bounds=BOUNDS, fit=FIT, npop=20, seed=1, evaluator=evaluator)
+        x_best, y_best, de_hist=de.evolute(ngen=10)
+        assert y_best == y_serial
+        assert evaluator.ship(de.worker) is evaluator.ship(de.worker)
+        assert evaluator.ship(de.worker).payload is not None
+    
+    assert not evaluator.started
+
+test_evaluator()
@@ -22,4 +22,36 @@ def test_hho():
     hho=HHO(mode='min', bounds=BOUNDS, fit=FIT, nhawks=20, ncores=1, seed=1)
     x_best, y_best, hho_hist=hho.evolute(ngen=200, verbose=1)
 
-test_hho()
\ No newline at end of file
+def test_hho_batches():
+    #the hawks and their rapid dives are evaluated in at most 3 batches per generation
+    import numpy as np
+    batches=[]
+    def FIT(X):
+        batches.append(len(X))
+        return np.sum(np.asarray(X)**2, axis=1)
+    
+    BOUNDS={'x'+str(i): ['float', -100, 100] for i in range(1,6)}
+    ngen=50
+    hho=HHO(mode='min', bounds=BOUNDS, fit=FIT, nhawks=20, seed=1, vectorized=True)
+    x_best, y_best, hho_hist=hho.evolute(ngen=ngen)
+    assert len(batches) <= 3*ngen and len(batches) > ngen
+    assert np.isclose(FIT([x_best])[0], y_best)
+
+def test_hho_vectorized_seed():
+    #a seeded run gives the same hawks with the vectorized fitness and with the evaluation of every hawk
+    import numpy as np
+    def FIT(individual):
+        return sum(x**2 for x in individual)
+    def FIT_vec(X):
+        return np.sum(np.asarray(X, dtype=float)**2, axis=1)
+    
+    BOUNDS={'x'+str(i): ['float', -100, 100] for i in range(1,5)}
+    BOUNDS['x5']=['int', -10, 10]
+    x_ref, y_ref, hist_ref=HHO(mode='min', bounds=BOUNDS, fit=FIT, nhawks=20, seed=1).evolute(ngen=30)
+    x_best, y_best, hho_hist=HHO(mode='min', bounds=BOUNDS, fit=FIT_vec, nhawks=20, seed=1, vectorized=True).evolute(ngen=30)
+    assert np.allclose(x_best, x_ref) and np.isclose(y_best, y_ref)
+    assert np.allclose(hho_hist['global_fitness'], hist_ref['global_fitness'])
+
+test_hho()
+test_hho_batches()
+test_hho_vectorized_seed()
\ No newline at end of file
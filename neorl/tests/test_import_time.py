@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+def import_time(module):
+    #import the module in a fresh interpreter (like a new evaluation worker) and return 
+    #the names of all loaded modules and the import time in seconds (-X importtime needs python 3.7)
+    code='import sys, time; t0=time.time(); import {}; print(time.time()-t0); print("\\n".join(sys.modules))'.format(module)
+    out=subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, 
+                       universal_newlines=True, env=dict(os.environ, NEORL_NO_LOGO='1'))
+    assert out.returncode == 0, out.stderr
+    lines=out.stdout.splitlines()
+    return set(lines[1:]), float(lines[0])
+
+def test_import_time():
+    heavy=['pandas', 'matplotlib', 'tensorflow', 'gym', 'neat']
+    for module in ['neorl.evolu.discrete', 'neorl.utils.tools', 'neorl.evolu.de', 'neorl.evolu.pso', 
+                   'neorl.evolu.es', 'neorl.evolu.gwo', 'neorl.evolu.hho']:
+        loaded, seconds=import_time(module)
+        assert module in loaded
+        found=[name for name in heavy if name in loaded]
+        assert not found, '--error: importing {} loads {}'.format(module, found)
+        assert seconds < 5, '--error: importing {} takes {} s'.format(module, seconds)
+    
+    #the helper modules must not leave example data behind at import
+    from neorl.evolu import discrete
+    from neorl.utils import tools
+    for name in ['bounds', 'bounds_map', 'x', 'y', 'x2', 'y2']:
+        assert not hasattr(discrete, name) and not hasattr(tools, name)
+
+test_import_time()
@@ -0,0 +1,25 @@
+import numpy as np
+from neorl.benchmarks import KP
+
+def test_kp():
+    np.random.seed(1)
+    nx = 60
+    obj_list = [list(obj) for obj in np.random.randint(1, 10, size=(nx,2))]
+    weight_capacity = sum(obj[1] for obj in obj_list)//2
+    env = KP(obj_list=obj_list, weight_capacity=weight_capacity, method='ppo', episode_length=2)
+
+    #the reward of a knapsack is the sum of the values of its objects, within the weight capacity
+    state, reward, done, info = env.step(list(np.random.randint(0, nx, size=nx)))
+    selection = np.zeros(nx)
+    selection[np.array(info['x'], dtype=int)-1] = 1
+    values, weights, feasible = env.evaluate(selection)
+    assert values == reward and feasible
+
+    #a population of knapsacks is evaluated at once
+    X = np.random.randint(0, 2, size=(20,nx))
+    values, weights, feasible = env.evaluate(X)
+    assert values.shape == weights.shape == feasible.shape == (20,)
+    assert np.allclose(values, [sum(obj_list[i][0] for i in range(nx) if x[i]) for x in X])
+    assert np.array_equal(feasible, [sum(obj_list[i][1] for i in range(nx) if x[i]) <= weight_capacity for x in X])
+
+test_kp()
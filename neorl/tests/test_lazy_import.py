@@ -0,0 +1,15 @@
+import os
+import subprocess
+import sys
+
+def test_lazy_import():
+    #importing neorl and an optimizer must not load the RL/neuroevolution dependencies
+    code=("import sys, neorl; from neorl import DE, PSO; "
+          "heavy=[m for m in ['tensorflow', 'gym', 'neat'] if m in sys.modules]; "
+          "assert not heavy, heavy; print(DE.__name__, PSO.__name__)")
+    out=subprocess.run([sys.executable, '-c', code], stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True, 
+                       env=dict(os.environ, NEORL_NO_LOGO='1'))
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip() == 'DE PSO'    #the logo is silenced
+
+test_lazy_import()
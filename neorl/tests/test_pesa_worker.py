@@ -0,0 +1,34 @@
+import random
+import numpy as np
+from neorl.hybrid.pesacore.worker import AlgoWorker
+
+class Counter:
+    #an algorithm object whose output depends on its state and on both random generators
+    def __init__(self):
+        self.calls=0
+        self.offset=0
+
+    def step(self, x):
+        self.calls+=1
+        return self.calls, self.offset+x, random.random(), np.random.random()
+
+def test_pesa_worker():
+    np.random.seed(1)
+    worker=AlgoWorker(Counter())
+    try:
+        outputs=[]
+        for gen in range(3):
+            worker.submit('step', seed=7, attrs={'offset': gen}, x=10)
+            outputs.append(worker.result())
+    finally:
+        worker.close()
+
+    #every generation starts from the object sent to the worker, with the seeds of the main process
+    for gen, output in enumerate(outputs):
+        algo=Counter()
+        algo.offset=gen
+        random.seed(7)
+        np.random.seed(1)
+        assert output == algo.step(x=10)
+
+test_pesa_worker()
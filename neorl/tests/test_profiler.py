@@ -0,0 +1,46 @@
+import numpy as np
+from neorl import DE, ES, PSO, GWO, WOA, MFO, SSA, JAYA, BAT, CS, HHO, HCLPSO, XNES, SA, TS
+from neorl.utils.profiler import Profiler
+
+def test_profiler():
+    def FIT(individual):
+        return sum(x**2 for x in individual)
+
+    BOUNDS={'x'+str(i): ['float', -100, 100] for i in range(1,6)}
+    ngen=10
+    runs={'DE': (lambda **kw: DE(mode='min', bounds=BOUNDS, fit=FIT, npop=20, seed=1, **kw), 'de_hist'),
+          'ES': (lambda **kw: ES(mode='min', bounds=BOUNDS, fit=FIT, lambda_=20, mu=10, seed=1, **kw), 'es_hist'),
+          'PSO': (lambda **kw: PSO(mode='min', bounds=BOUNDS, fit=FIT, npar=20, seed=1, **kw), 'pso_hist'),
+          'GWO': (lambda **kw: GWO(mode='min', bounds=BOUNDS, fit=FIT, nwolves=10, seed=1, **kw), 'history'),
+          'WOA': (lambda **kw: WOA(mode='min', bounds=BOUNDS, fit=FIT, nwhales=10, seed=1, **kw), 'history'),
+          'MFO': (lambda **kw: MFO(mode='min', bounds=BOUNDS, fit=FIT, nmoths=10, seed=1, **kw), 'history'),
+          'SSA': (lambda **kw: SSA(mode='min', bounds=BOUNDS, fit=FIT, nsalps=10, seed=1, **kw), 'history'),
+          'JAYA': (lambda **kw: JAYA(mode='min', bounds=BOUNDS, fit=FIT, npop=10, seed=1, **kw), 'history'),
+          'BAT': (lambda **kw: BAT(mode='min', bounds=BOUNDS, fit=FIT, nbats=10, seed=1, **kw), 'history'),
+          'CS': (lambda **kw: CS(mode='min', bounds=BOUNDS, fit=FIT, ncuckoos=10, seed=1, **kw), 'history'),
+          'HHO': (lambda **kw: HHO(mode='min', bounds=BOUNDS, fit=FIT, nhawks=10, seed=1, **kw), 'history'),
+          'HCLPSO': (lambda **kw: HCLPSO(mode='min', bounds=BOUNDS, fit=FIT, g1=5, g2=5, seed=1, **kw), 'history'),
+          'XNES': (lambda **kw: XNES(mode='min', bounds=BOUNDS, fit=FIT, npop=10, seed=1, **kw), 'history'),
+          'SA': (lambda **kw: SA(mode='min', bounds=BOUNDS, fit=FIT, chain_size=10, seed=1, **kw), 'stat'),
+          'TS': (lambda **kw: TS(mode='min', bounds=BOUNDS, fit=FIT, seed=1, **kw), 'history')}
+
+    for name, (make, _) in runs.items():
+        x_ref, y_ref, _=make().evolute(ngen=ngen, verbose=0)
+        profiler=Profiler()
+        x_best, y_best, hist=make(profiler=profiler).evolute(ngen=ngen, verbose=0)
+        #the profiler does not change the search
+        assert np.allclose(x_best, x_ref) and y_best == y_ref, name
+
+        profile=hist['profile']
+        assert len(profile) == ngen, name
+        for column in ['fitness', 'evaluation', 'other', 'total']:
+            assert column in profile.columns, name
+        #the phases add up to the wall time of the generation
+        assert np.allclose(profile.drop(columns='total').sum(axis=1), profile['total']), name
+        assert (profile['fitness'] > 0).all(), name
+
+        summary=profiler.summary()
+        assert 'run' in summary.index and 'initialization' in summary.index, name
+        assert np.isclose(summary.loc['run', 'percent'], 100)
+
+test_profiler()
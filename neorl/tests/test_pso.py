@@ -1,4 +1,5 @@
 from neorl import PSO
+import numpy as np
 
 def test_pso():
     #Define the fitness function
@@ -21,4 +22,40 @@ def test_pso():
     pso=PSO(mode='min', bounds=BOUNDS, fit=FIT, c1=2.05, c2=2.05, speed_mech='constric', ncores=1, seed=1)
     x_best, y_best, pso_hist=pso.evolute(ngen=100, verbose=1)
 
-test_pso()
\ No newline at end of file
+test_pso()
+
+def test_pso_mixed():
+    #mixed int/float/grid space for every speed mechanism, the last population and the seeding
+    GRID={'a': 0.5, 'b': -1, 'c': 2}
+    def FIT(individual):
+        return (individual[0]-2)**2 + individual[1]**2 + GRID[individual[2]]
+    
+    BOUNDS={'x1': ['int', -5, 5], 'x2': ['float', -2, 2], 'x3': ['grid', ('a', 'b', 'c')]}
+    for speed_mech in ['constric', 'timew', 'globw']:
+        results=[]
+        for _ in range(2):
+            pso=PSO(mode='min', bounds=BOUNDS, fit=FIT, npar=20, speed_mech=speed_mech, ncores=1, seed=1)
+            results.append(pso.evolute(ngen=15, verbose=0))
+        (x_best, y_best, pso_hist), (x_best2, y_best2, pso_hist2)=results
+        
+        #the same seed gives the same result
+        assert x_best == x_best2 and y_best == y_best2
+        assert np.array_equal(pso_hist['global_fitness'], pso_hist2['global_fitness'])
+        assert pso_hist['last_pop'].equals(pso_hist2['last_pop'])
+        
+        #the best particle is given in the original space
+        assert int(x_best[0]) == x_best[0] and -5 <= x_best[0] <= 5 and x_best[2] in ('a', 'b', 'c')
+        #global_fitness follows the current particles, the swarm best is never worse
+        assert np.isclose(y_best, FIT(x_best)) and pso_hist['global_fitness'][-1] >= y_best
+        
+        #one row per particle with its own fitness, the best particles come first
+        last_pop=pso_hist['last_pop']
+        assert last_pop.shape == (20, 4)
+        assert list(last_pop.columns) == ['var1', 'var2', 'var3', 'fitness']
+        assert list(last_pop.index) == ['indv'+str(i) for i in range(1,21)]
+        for indv in last_pop.values:
+            assert indv[0] == int(indv[0]) and indv[2] in ('a', 'b', 'c')
+            assert np.isclose(indv[-1], FIT(indv[:-1]))
+        assert np.all(np.diff(last_pop['fitness'].values.astype(float)) >= 0)
+
+test_pso_mixed()
\ No newline at end of file
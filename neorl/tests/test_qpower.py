@@ -0,0 +1,24 @@
+import numpy as np
+from neorl.benchmarks.qpower_model import QPowerModel, get_model, qPowerModel, cpath
+
+def test_qpower():
+    pm = QPowerModel()
+    perts = np.random.uniform(low=-np.pi, high=np.pi, size=(20,8))
+    powers = pm.eval_batch(perts)
+    assert powers.shape == (20,4)
+    assert np.allclose(powers.sum(axis=1), 1)
+    assert np.allclose(powers, [pm.eval(p) for p in perts])
+
+    #the wrapper shares one model per process
+    assert get_model() is get_model()
+    assert np.allclose(qPowerModel(perts[0]), powers[0])
+
+    #same predictions as the keras model, when tensorflow is available
+    try:
+        from tensorflow.keras.models import load_model
+    except ImportError:
+        return
+    unorm = load_model(cpath / "tools/microreactor_power_model.h5").predict(perts)
+    assert np.allclose(powers, unorm/unorm.sum(axis=1, keepdims=True), rtol=1e-4, atol=1e-6)
+
+test_qpower()
@@ -0,0 +1,31 @@
+import numpy as np
+from neorl.benchmarks.reactivity_model import (ReactivityModel, get_model, reactivityModelEval,
+                                               calc_zetatildes, int_bounds, integrate_sq, adj_coords)
+
+def reference_eval(model, pert):
+    #drum-by-drum evaluation with the integration routines of the module
+    pert = adj_coords(pert)
+    zetatildes = calc_zetatildes(pert, model.cangles, model.alphas, model.jmA, model.jmB)
+    react = 0
+    for i in range(8):
+        jm = model.jmA if i in [0, 3, 4, 7] else model.jmB
+        b1, b2 = int_bounds(pert[i], model.cangles[i])
+        react += zetatildes[i]*(integrate_sq(jm["centers"], jm["hist"], *b1) - integrate_sq(jm["centers"], jm["hist"], *b2))
+    return react
+
+def test_reactivity():
+    rm = ReactivityModel()
+    p5 = np.array([0, 0, 2.201331,-2.137274,-2.512146,2.02961,0.19566370000000002,3.140272])
+    assert np.isclose(rm.eval(p5), 0.02702797820717859, rtol=1e-10, atol=0)
+
+    perts = np.random.uniform(low=-np.pi, high=np.pi, size=(50,8))
+    react = rm.eval_batch(perts)
+    assert react.shape == (50,)
+    assert np.allclose(react, [reference_eval(rm, p) for p in perts], rtol=1e-10, atol=1e-14)
+    assert np.allclose(rm.eval_batch(perts, nom=p5), react - rm.eval(p5))
+
+    #the wrappers share one model per process
+    assert get_model() is get_model()
+    assert np.isclose(reactivityModelEval(p5), rm.eval(p5))
+
+test_reactivity()
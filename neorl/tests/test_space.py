@@ -0,0 +1,56 @@
+from neorl.evolu.discrete import Space, mutate_discrete, random_other_int
+from neorl.evolu.discrete import encode_grid_to_discrete, encode_grid_indv_to_discrete, decode_discrete_to_grid
+from neorl.utils.tools import get_population
+import random
+import numpy as np
+
+def test_space():
+    BOUNDS={'x1': ['int', -5, 5], 'x2': ['float', -2.5, 2.5], 'x3': ['grid', ('a', 'b', 'c')], 'x4': ['int', 0, 10**6]}
+    space=Space(BOUNDS)
+    assert list(space.int_index) == [0, 2, 3] and list(space.float_index) == [1] and list(space.grid_index) == [2]
+    assert list(space.ub) == [5, 2.5, 2, 10**6]
+
+    pop=np.random.uniform(low=-8, high=8, size=(50, 4))
+    pop[:,3]=np.random.uniform(low=0, high=10**6, size=50)
+    x=space.clip(pop)
+    assert np.all(x >= space.lb) and np.all(x <= space.ub)
+
+    #nearest_int gives the same values as mutate_discrete for the whole population at once
+    new=space.discretize(x)
+    for row, new_row in zip(x, new):
+        for dim in space.int_index:
+            assert new_row[dim] == mutate_discrete(row[dim], row.min(), row.max(), space.lb[dim], space.ub[dim],
+                                                   alpha=1, method='nearest_int')
+    assert np.array_equal(new[:,1], x[:,1])
+
+    #the random transforms give integers within the bounds, single individuals keep their shape
+    for method in ['sigmoid', 'minmax']:
+        new=space.discretize(x, alpha=0.5, method=method)
+        assert np.array_equal(new[:,space.int_index], np.trunc(new[:,space.int_index]))
+        assert np.all(new >= space.lb) and np.all(new <= space.ub)
+        assert space.discretize(x[0], alpha=0.5, method=method).shape == (4,)
+        #an individual with all equal values is always perturbed
+        assert space.discretize(np.zeros(4), alpha=0, method=method)[0] != 0
+
+    #decode gives python ints and grid values, and encode goes back to the array
+    indvs=space.decode(new)
+    assert all(type(indv[0]) == int and indv[2] in ('a', 'b', 'c') for indv in indvs)
+    assert np.array_equal(space.encode(indvs), new)
+
+    #the grid lookups give the same individuals as the bounds_map, also in get_population
+    bounds, bounds_map=encode_grid_to_discrete(BOUNDS)
+    assert all(encode_grid_indv_to_discrete(indv, BOUNDS, bounds_map) == list(x) for indv, x in zip(indvs, new))
+    df=get_population(new, fits=np.zeros(50), grid_flag=True, bounds=BOUNDS, bounds_map=bounds_map)
+    assert df.values[:,:-1].tolist() == [decode_discrete_to_grid(list(x), BOUNDS, bounds_map) for x in new]
+    assert df['var3'].tolist() == [indv[2] for indv in indvs]
+
+    #random_other_int makes the same draw as random.choice on the list of the other integers
+    for x_ij, lb, ub in [(0, 0, 1), (3, -5, 5), (5, -5, 5)]:
+        choices=list(range(lb, ub+1))
+        choices.remove(x_ij)
+        random.seed(x_ij)
+        ref=[random.choice(choices) for _ in range(20)]
+        random.seed(x_ij)
+        assert [random_other_int(x_ij, lb, ub) for _ in range(20)] == ref
+
+test_space()
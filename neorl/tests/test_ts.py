@@ -25,4 +25,30 @@ def test_ts():
           penalization_weight = 0.8, swap_mode = "perturb", ncores=1, seed=1)
     x_best, y_best, ts_hist=ts.evolute(ngen = 700, x0=x0, verbose=0)
 
-test_ts
\ No newline at end of file
+def test_ts_swap():
+    #travelling salesman tour of 10 cities, the elements of the tour are swapped
+    import numpy as np
+    rng=np.random.RandomState(0)
+    D=rng.rand(10,10)
+    D=D+D.T
+    def Tour(individual):
+        x=np.array(individual)-1
+        return D[x, np.roll(x,-1)].sum()
+    def DeltaTour(individual, i, j):
+        #change of the tour length when the cities at the indices i and j are swapped
+        y=list(individual)
+        y[i], y[j]=y[j], y[i]
+        return Tour(y)-Tour(individual)
+    
+    BOUNDS={'x'+str(i): ['int', 1, 10] for i in range(10)}
+    x_best, y_best, ts_hist=TS(mode="min", bounds=BOUNDS, fit=Tour, swap_mode="swap", seed=1).evolute(ngen=50)
+    assert sorted(x_best) == list(range(1,11)) and np.isclose(Tour(x_best), y_best)
+    
+    #same search with the moves evaluated in parallel or from the fitness change of the swaps
+    x_par, y_par, _=TS(mode="min", bounds=BOUNDS, fit=Tour, swap_mode="swap", ncores=2, seed=1).evolute(ngen=50)
+    x_delta, y_delta, _=TS(mode="min", bounds=BOUNDS, fit=Tour, swap_mode="swap", delta_fit=DeltaTour, seed=1).evolute(ngen=50)
+    assert x_par == x_best and y_par == y_best
+    assert x_delta == x_best and np.isclose(y_delta, y_best)
+
+test_ts()
+test_ts_swap()
\ No newline at end of file
@@ -0,0 +1,43 @@
+import numpy as np
+from neorl.benchmarks import TSP
+
+def test_tsp():
+    np.random.seed(1)
+    nx = 40
+    city_loc_list = [list(loc) for loc in np.random.uniform(low=0, high=100, size=(nx,2))]
+    env = TSP(city_loc_list=city_loc_list, method='ppo', episode_length=2)
+
+    #a complete tour gives the same cost in the environment and with the distance matrix
+    state, reward, done, info = env.step(list(np.random.randint(0, nx, size=nx)))
+    tour = np.array(info['x'], dtype=int)
+    assert sorted(tour) == list(range(1, nx+1))
+    tour_map = -10**6.0*np.ones((nx,4))
+    tour_map[:,:2] = env.city_loc[tour-1]
+    assert env.tour_length(tour) == -env.Compute_tour_cost(tour=tour_map)
+
+    #local search on a batch of tours never increases their cost
+    tours = np.array([np.random.permutation(nx)+1 for _ in range(5)])
+    improved, cost = env.local_search(tours)
+    assert improved.shape == tours.shape
+    assert all(sorted(t) == list(range(1, nx+1)) for t in improved.tolist())
+    assert np.array_equal(cost, env.tour_length(improved))
+    assert (cost <= env.tour_length(tours)).all()
+
+def test_tsp_local_search_passes():
+    #every pass of the local search keeps or shortens the tour, also for small tours where
+    #the segment moved by Or-opt starts at the first city of the array
+    from neorl.benchmarks.tsp import _local_search
+    np.random.seed(1)
+    for nx in range(5, 26):
+        env = TSP(city_loc_list=[list(loc) for loc in np.random.uniform(low=0, high=100, size=(nx,2))], method='ppo', episode_length=2)
+        for _ in range(20):
+            tour = np.random.permutation(nx)
+            cost = env.tour_length(tour+1)
+            for _ in range(10):
+                tour = _local_search(tour, env.round_dist_matrix, env.neighbours, max_passes=1)
+                assert sorted(tour) == list(range(nx))
+                assert env.tour_length(tour+1) <= cost
+                cost = env.tour_length(tour+1)
+
+test_tsp()
+test_tsp_local_search_passes()
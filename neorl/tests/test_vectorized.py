@@ -0,0 +1,44 @@
+from neorl import DE, PSO, ES, GWO, WOA, MFO, SSA, JAYA, BAT, CS, HHO, XNES, ACO, TS, HCLPSO
+import numpy as np
+
+def test_vectorized():
+    #Define the fitness function (one individual per call)
+    def Sphere(individual):
+        """Sphere test objective function.
+                        F(x) = sum_{i=1}^d xi^2
+                        d=1,2,3,...
+                        Range: [-100,100]
+                        Minima: 0
+        """
+        y=sum(x**2 for x in individual)
+        return y
+
+    #Vectorized version of the same fitness (whole population per call)
+    def SphereBatch(X):
+        return np.sum(X**2, axis=1)
+
+    #Setup the parameter space (d=5)
+    nx=5
+    BOUNDS={}
+    for i in range(1,nx+1):
+        BOUNDS['x'+str(i)]=['float', -100, 100]
+
+    algs=[(DE, dict(npop=20)), (PSO, dict(npar=20)), (ES, dict(lambda_=20, mu=10)),
+          (GWO, dict(nwolves=10)), (WOA, dict(nwhales=10)), (MFO, dict(nmoths=10)),
+          (SSA, dict(nsalps=10)), (JAYA, dict(npop=10)), (BAT, dict(nbats=10)),
+          (CS, dict(ncuckoos=10)), (HHO, dict(nhawks=10)), (XNES, dict(npop=10)),
+          (ACO, dict(nants=10, narchive=5)), (TS, dict()), (HCLPSO, dict(g1=5, g2=5))]
+
+    #the vectorized mode must reproduce the serial search for the same seed
+    for alg, kwargs in algs:
+        y=[]
+        for fit, vectorized in [(Sphere, False), (SphereBatch, True)]:
+            opt=alg(mode='min', bounds=BOUNDS, fit=fit, ncores=1, seed=1, vectorized=vectorized, **kwargs)
+            if alg == XNES:
+                x_best, y_best, hist=opt.evolute(ngen=10, x0=[1.0]*nx)
+            else:
+                x_best, y_best, hist=opt.evolute(ngen=10)
+            y.append(y_best)
+        assert np.isclose(y[0], y[1]), '--error: vectorized {} does not match the serial run'.format(alg.__name__)
+
+test_vectorized()
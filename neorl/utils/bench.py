@@ -0,0 +1,321 @@
+#    This file is part of NEORL.
+
+#    Copyright (c) 2021 Exelon Corporation and MIT Nuclear Science and Engineering
+#    NEORL is free software: you can redistribute it and/or modify
+#    it under the terms of the MIT LICENSE
+
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#    SOFTWARE.
+
+# -*- coding: utf-8 -*-
+#Created on Sat Oct 17 16:40:12 2026
+#@author: NEORL team
+
+import argparse
+import importlib
+import inspect
+import itertools
+import time
+import numpy as np
+import pandas as pd
+from neorl.utils.evaluator import Evaluator
+from neorl.utils.profiler import Profiler
+
+#name of the population size argument of each optimizer
+pop_args={'DE': 'npop', 'PSO': 'npar', 'ES': 'lambda_', 'GWO': 'nwolves', 'HHO': 'nhawks',
+          'XNES': 'npop', 'WOA': 'nwhales', 'SSA': 'nsalps', 'MFO': 'nmoths', 'JAYA': 'npop',
+          'BAT': 'nbats', 'CS': 'ncuckoos', 'ACO': 'nants', 'PESA': 'npop', 'PESA2': 'npop',
+          'NSGAII': 'lambda_', 'NSGAIII': 'lambda_', 'SA': None, 'TS': None, 'HCLPSO': None}
+
+multi_objective=['NSGAII', 'NSGAIII']
+
+#search space of the CEC2008 functions
+cec08_bounds={'F1': 100, 'F2': 100, 'F3': 100, 'F4': 5, 'F5': 600, 'F6': 32, 'F7': 1}
+
+#columns of the results file, a case is identified by the columns before 'seed'
+columns=['optimizer', 'benchmark', 'd', 'ncores', 'npop', 'ngen', 'vectorized', 'seed',
+         'wall_time', 'overhead_per_gen', 'nfev', 'best_fitness']
+case_columns=['optimizer', 'benchmark', 'd', 'ncores', 'npop', 'ngen', 'vectorized']
+
+#default benchmarks, they do not need the CEC2017 data (data.pkl), which is not always installed
+default_benchmarks=['classic:sphere', 'cec08:F1']
+
+class CountedFitness:
+    #"""
+    #Fitness wrapper that counts the evaluations (only the calls made in the current process are counted),
+    #the time spent in the fitness is recorded by the profiler of the optimizer
+    #"""
+    def __init__(self, fit):
+        self.fit=fit
+        self.nfev=0
+
+    def __call__(self, x):
+        self.nfev+=len(x) if np.ndim(x) == 2 else 1
+        return self.fit(x)
+
+class CountedEvaluator(Evaluator):
+    #"""
+    #Evaluator that counts the individuals sent to the workers
+    #"""
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.nfev=0
+
+    def map(self, func, items):
+        items=list(items)
+        self.nfev+=len(items)
+        return super().map(func, items)
+
+def get_benchmark(name, d, nobj=3):
+    """
+    Returns the fitness function and the parameter space of a benchmark
+
+    :param name: (str) ``suite:function``, e.g. ``classic:sphere``, ``cec08:F1``, ``cec17:f1`` or ``dtlz:DTLZ2``
+    :param d: (int) number of dimensions
+    :param nobj: (int) number of objectives of the DTLZ problems
+
+    :return: (tuple) the fitness (a single objective function to minimize or a DTLZ problem),
+             its vectorized counterpart and the bounds dictionary
+    """
+    suite, _, fname=name.partition(':')
+    if suite == 'classic':
+        classics=importlib.import_module('neorl.benchmarks.classic')
+        fit=getattr(classics, fname)
+        low, high=classics.all_bounds[classics.all_functions.index(fit)]
+        fit_batch=fit
+    elif suite == 'cec08':
+        problem=getattr(importlib.import_module('neorl.benchmarks.cec08'), fname)()
+        fit, fit_batch=problem.fit, problem.fit_batch
+        low, high=-cec08_bounds[fname], cec08_bounds[fname]
+    elif suite == 'cec17':
+        fit=getattr(importlib.import_module('neorl.benchmarks.cec17'), fname)
+        #raises FileNotFoundError here, before any run, if data.pkl is not installed
+        importlib.import_module('neorl.benchmarks.tools.transforms').get_shifts()
+        fit_batch=fit
+        low, high=-100, 100
+    elif suite == 'dtlz':
+        problem=getattr(importlib.import_module('neorl.benchmarks.dtlz'), fname)(n_var=d, n_obj=nobj)
+        fit=fit_batch=problem
+        low, high=0, 1
+    else:
+        raise ValueError('--error: the benchmark suite must be classic, cec08, cec17 or dtlz, not {}'.format(suite))
+
+    bounds={}
+    for i in range(1,d+1):
+        bounds['x'+str(i)]=['float', low, high]
+    return fit, fit_batch, bounds
+
+def igd(front, reference):
+    """
+    Inverted generational distance: mean distance from every point of the reference front to the closest point of ``front``
+
+    :param front: (2D array) objectives of the pareto front found by the optimizer
+    :param reference: (2D array) reference pareto front
+    :return: (float) the IGD, 0 if the reference front is found
+    """
+    front=np.asarray(front, dtype=float)
+    dist=np.linalg.norm(reference[:,None,:]-front[None,:,:], axis=2)
+    return np.mean(np.min(dist, axis=1))
+
+def run_case(optimizer, benchmark, d=10, seed=1, ncores=1, ngen=50, npop=30, vectorized=False, nobj=3):
+    """
+    Runs one optimizer on one benchmark and measures it
+
+    :param optimizer: (str) name of a NEORL optimizer, e.g. ``DE``
+    :param benchmark: (str) benchmark name (see ``get_benchmark``)
+    :param d: (int) number of dimensions
+    :param seed: (int) random seed of the optimizer
+    :param ncores: (int) number of parallel processors
+    :param ngen: (int) number of generations
+    :param npop: (int) population size, for optimizers that have one
+    :param vectorized: (bool) evaluate whole populations at once, for optimizers that support it
+    :param nobj: (int) number of objectives of the DTLZ problems
+
+    :return: (dict) the row of the results: wall time, framework overhead per generation
+             (wall time minus the ``fitness`` phase of a ``Profiler``, divided by ngen), number of fitness evaluations
+             and best fitness (IGD to the reference front for the DTLZ problems).
+             With ``ncores > 1``, the fitness runs in worker processes and the time waiting for them
+             (the ``evaluation`` phase) is counted as fitness time. The overhead is NaN when it cannot be measured,
+             i.e. when the fitness runs in worker processes of an optimizer without a ``profiler`` argument (e.g. PESA),
+             and the evaluations are NaN when the workers are not managed by an ``Evaluator``.
+    """
+    import neorl
+    fit, fit_batch, bounds=get_benchmark(benchmark, d=d, nobj=nobj)
+    is_dtlz=benchmark.startswith('dtlz')
+    if is_dtlz != (optimizer in multi_objective):
+        raise ValueError('--error: the DTLZ problems are only solved by {} and the other benchmarks by single objective optimizers'.format(multi_objective))
+
+    params=inspect.signature(getattr(neorl, optimizer)).parameters
+    #the batch fitness is only given to the optimizers that evaluate whole populations at once
+    vectorized=vectorized and 'vectorized' in params
+    counted=CountedFitness(fit.evaluate if is_dtlz else (fit_batch if vectorized else fit))
+    profiler=Profiler()
+    if 'profiler' in params:
+        kwargs={'mode': 'min', 'bounds': bounds, 'fit': counted, 'ncores': ncores, 'seed': seed, 'profiler': profiler}
+    else:
+        #the fitness is timed by the profiler outside of any generation
+        kwargs={'mode': 'min', 'bounds': bounds, 'fit': profiler.wrap(counted), 'ncores': ncores, 'seed': seed}
+    if pop_args.get(optimizer):
+        kwargs[pop_args[optimizer]]=npop
+    if optimizer == 'ES':
+        kwargs['mu']=max(npop//2, 1)
+    if vectorized:
+        kwargs['vectorized']=True
+    evaluator=None
+    if ncores > 1 and 'evaluator' in params:
+        evaluator=kwargs['evaluator']=CountedEvaluator(ncores=ncores)
+
+    t0=time.perf_counter()
+    opt=getattr(neorl, optimizer)(**kwargs)
+    x_best, y_best, hist=opt.evolute(ngen=ngen)
+    wall_time=time.perf_counter()-t0
+
+    #time of the fitness (and of the workers running it) in all generations and outside of them
+    in_workers=ncores > 1 or optimizer in ['PESA', 'PESA2']
+    phases=['fitness', 'evaluation'] if in_workers else ['fitness']
+    profile=profiler.history()
+    fit_time=sum(profile[name].sum() for name in phases if name in profile)+sum(profiler.outside.get(name, 0) for name in phases)
+    if in_workers and 'profiler' not in params:
+        #the optimizer has no evaluation phase, only the wall time is known
+        fit_time=np.nan
+    nfev=counted.nfev
+    if evaluator is not None:
+        nfev+=evaluator.nfev
+    elif in_workers:
+        #the fitness runs in worker processes that are not managed by an evaluator
+        nfev=np.nan
+
+    if is_dtlz:
+        from neorl.benchmarks.dtlz import reference_front
+        best_fitness=igd(hist['global_fitness'], reference_front(fit, p=12))
+    else:
+        best_fitness=float(y_best)
+
+    return {'optimizer': optimizer, 'benchmark': benchmark, 'd': d, 'ncores': ncores, 'npop': npop,
+            'ngen': ngen, 'vectorized': vectorized, 'seed': seed, 'wall_time': wall_time,
+            'overhead_per_gen': (wall_time-fit_time)/ngen, 'nfev': nfev, 'best_fitness': best_fitness}
+
+def run_benchmarks(optimizers=('DE', 'PSO', 'ES', 'GWO', 'HHO', 'XNES'), benchmarks=tuple(default_benchmarks),
+                   dims=(10,), seeds=(1,), ncores=(1,), ngen=50, npop=30, vectorized=False, nobj=3, output=None, verbose=True):
+    """
+    Runs a matrix of optimizers x benchmarks x dimensions x seeds x ncores and records
+    the wall time, framework overhead per generation, number of evaluations and best fitness of every run.
+    The DTLZ problems are only run with NSGA-II/III, the other benchmarks with the single objective optimizers.
+
+    :param optimizers: (list) names of the NEORL optimizers
+    :param benchmarks: (list) benchmark names, ``suite:function`` with suite ``classic``, ``cec08``, ``cec17`` or ``dtlz``.
+                       The benchmarks whose data is not installed (``cec17`` without data.pkl) are skipped with a warning
+    :param dims: (list) numbers of dimensions
+    :param seeds: (list) random seeds
+    :param ncores: (list) numbers of parallel processors
+    :param ngen: (int) number of generations of every run
+    :param npop: (int) population size, for optimizers that have one
+    :param vectorized: (bool) evaluate whole populations at once, for optimizers that support it
+    :param nobj: (int) number of objectives of the DTLZ problems
+    :param output: (str) path of the CSV file to write the results to, if ``None``, no file is written
+    :param verbose: (bool) print every run
+
+    :return: (pandas.DataFrame) one row per run
+    """
+    available=[]
+    for benchmark in benchmarks:
+        try:
+            get_benchmark(benchmark, d=dims[0], nobj=nobj)
+            available.append(benchmark)
+        except FileNotFoundError as error:
+            print('--warning: the benchmark {} is skipped, its data is not installed ({})'.format(benchmark, error))
+
+    rows=[]
+    for optimizer, benchmark, d, n, seed in itertools.product(optimizers, available, dims, ncores, seeds):
+        if benchmark.startswith('dtlz') != (optimizer in multi_objective):
+            continue
+        row=run_case(optimizer, benchmark, d=d, seed=seed, ncores=n, ngen=ngen, npop=npop, vectorized=vectorized, nobj=nobj)
+        rows.append(row)
+        if verbose:
+            print('{optimizer:8s} {benchmark:16s} d={d:<4d} ncores={ncores:<3d} seed={seed:<5d} time={wall_time:.3f}s overhead/gen={overhead_per_gen:.2e}s nfev={nfev} best={best_fitness:.6g}'.format(**row))
+
+    results=pd.DataFrame(rows, columns=columns)
+    if output:
+        results.to_csv(output, index=False)
+    return results
+
+def compare_benchmarks(results, baseline, tolerance=0.25, min_time=0.01):
+    """
+    Compares benchmark results to a baseline (e.g. the results of a previous NEORL version).
+    The median over the seeds of the wall time and of the framework overhead of every case are compared,
+    and a case is flagged as a regression when one of them is more than (1 + tolerance) times the baseline
+    and at least ``min_time`` seconds slower. The best fitness is also compared, as the same seeds
+    are expected to give the same results.
+
+    :param results: (pandas.DataFrame or str) results of ``run_benchmarks`` or path to their CSV file
+    :param baseline: (pandas.DataFrame or str) baseline results or path to their CSV file
+    :param tolerance: (float) allowed relative slowdown
+    :param min_time: (float) slowdowns of less than ``min_time`` seconds (per run for the wall time,
+                     per generation for the overhead) are ignored
+
+    :return: (pandas.DataFrame) one row per case found in both results, with the baseline and new medians,
+             their ratios, and the ``regression`` and ``fitness_changed`` flags
+    """
+    if isinstance(results, str):
+        results=pd.read_csv(results)
+    if isinstance(baseline, str):
+        baseline=pd.read_csv(baseline)
+
+    metrics=['wall_time', 'overhead_per_gen', 'best_fitness']
+    new=results.groupby(case_columns)[metrics].median()
+    old=baseline.groupby(case_columns)[metrics].median()
+    comp=old.join(new, how='inner', lsuffix='_baseline', rsuffix='_new')
+
+    comp['regression']=False
+    for metric in ['wall_time', 'overhead_per_gen']:
+        diff=comp[metric+'_new']-comp[metric+'_baseline']
+        comp[metric+'_ratio']=comp[metric+'_new']/comp[metric+'_baseline']
+        comp['regression']|=(comp[metric+'_ratio'] > 1+tolerance) & (diff > min_time)
+    comp['fitness_changed']=~np.isclose(comp['best_fitness_new'], comp['best_fitness_baseline'], rtol=1e-6, equal_nan=True)
+
+    return comp.reset_index()
+
+def main(argv=None):
+    """
+    Command line API of ``neorl bench``, returns 1 if a regression is found against the baseline and 0 otherwise
+    """
+    parser = argparse.ArgumentParser(prog='neorl bench', description='NEORL benchmark runner: runs optimizers x benchmarks x seeds x ncores and compares them to a baseline')
+    parser.add_argument('-a', '--optimizers', nargs='+', default=['DE', 'PSO', 'ES', 'GWO', 'HHO', 'XNES'], help='optimizers to run, e.g. DE PSO ES')
+    parser.add_argument('-b', '--benchmarks', nargs='+', default=default_benchmarks, help='benchmarks to run, e.g. classic:sphere cec08:F1 cec17:f1 dtlz:DTLZ2')
+    parser.add_argument('-d', '--dims', nargs='+', type=int, default=[10], help='numbers of dimensions')
+    parser.add_argument('-s', '--seeds', nargs='+', type=int, default=[1], help='random seeds')
+    parser.add_argument('-n', '--ncores', nargs='+', type=int, default=[1], help='numbers of parallel processors')
+    parser.add_argument('-g', '--ngen', type=int, default=50, help='number of generations')
+    parser.add_argument('-p', '--npop', type=int, default=30, help='population size')
+    parser.add_argument('--nobj', type=int, default=3, help='number of objectives of the DTLZ problems')
+    parser.add_argument('--vectorized', action='store_true', help='evaluate whole populations at once when the optimizer supports it')
+    parser.add_argument('-o', '--output', help='CSV file to write the results to, if not given the results are only printed')
+    parser.add_argument('--baseline', help='CSV file of previous results to compare to')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative slowdown against the baseline')
+    args = parser.parse_args(argv)
+
+    results=run_benchmarks(optimizers=args.optimizers, benchmarks=args.benchmarks, dims=args.dims, seeds=args.seeds,
+                           ncores=args.ncores, ngen=args.ngen, npop=args.npop, vectorized=args.vectorized,
+                           nobj=args.nobj, output=args.output)
+    print('--------------------------------------------------------------')
+    if args.output:
+        print('Results of {} runs are written to {}'.format(len(results), args.output))
+    else:
+        with pd.option_context('display.max_columns', None, 'display.width', 200):
+            print(results)
+    if not args.baseline:
+        return 0
+
+    comp=compare_benchmarks(results, args.baseline, tolerance=args.tolerance)
+    with pd.option_context('display.max_columns', None, 'display.width', 200):
+        print(comp[case_columns+['wall_time_ratio', 'overhead_per_gen_ratio', 'regression', 'fitness_changed']])
+    if comp['regression'].any():
+        print('--warning: {} case(s) are slower than the baseline'.format(comp['regression'].sum()))
+        return 1
+    print('No performance regression against the baseline')
+    return 0
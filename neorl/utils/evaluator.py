@@ -0,0 +1,332 @@
+#    This file is part of NEORL.
+
+#    Copyright (c) 2021 Exelon Corporation and MIT Nuclear Science and Engineering
+#    NEORL is free software: you can redistribute it and/or modify
+#    it under the terms of the MIT LICENSE
+
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#    SOFTWARE.
+
+# -*- coding: utf-8 -*-
+#Created on Sat Oct 17 10:12:31 2026
+#@author: NEORL team
+
+import uuid
+import numpy as np
+from collections import OrderedDict
+import joblib
+from neorl.evolu.discrete import decode_discrete_to_grid, Space
+
+def to_batch(pop):
+    #"""
+    #Stacks a list of individuals into a 2D array of shape (npop, d)
+    #Numeric individuals become a float array, while individuals
+    #that carry categorical grid values (e.g. strings) are kept as an object array
+    #"""
+    try:
+        return np.array(pop, dtype=float).reshape(len(pop), -1)
+    except (ValueError, TypeError):
+        return np.array(pop, dtype=object).reshape(len(pop), -1)
+
+def batch_fit(fit, pop, ensure_bounds=None, grid_flag=False, bounds=None, bounds_map=None, multi_objective=False):
+    """
+    Evaluates a whole population with a single call to a vectorized fitness function.
+    The individuals are processed in the same way as ``fit_worker`` of the optimizers
+    (bounds are enforced, then grid variables are decoded) before being stacked
+
+    :param fit: (function) vectorized fitness, takes an array of shape (npop, d) and returns an array of shape (npop,)
+    :param pop: (list of lists or 2D array) individuals to evaluate
+    :param ensure_bounds: (function) optional function to clip each individual into the bounds
+    :param grid_flag: (bool) whether grid variables need to be decoded before evaluation
+    :param bounds: (dict) original parameter space used for grid decoding
+    :param bounds_map: (dict) map of grid variables used for grid decoding
+    :param multi_objective: (bool) if ``True``, ``fit`` returns an array of shape (npop, nobj), which is kept as is
+
+    :return: (numpy.ndarray) fitness array of shape (npop,), or (npop, nobj) for multi-objective problems
+    """
+    X=[]
+    for x in pop:
+        if ensure_bounds is not None:
+            x=ensure_bounds(x)
+        if grid_flag:
+            #decode the individual back to the int/float/grid mixed space
+            x=decode_discrete_to_grid(x,bounds,bounds_map)
+        X.append(x)
+
+    fitness=np.asarray(fit(to_batch(X)), dtype=float)
+    fitness=fitness.reshape(len(X), -1) if multi_objective else fitness.reshape(-1)
+    if fitness.shape[0] != len(X):
+        raise ValueError('--error: the vectorized fitness function returned {} values for a population of {} individuals'.format(fitness.shape[0], len(X)))
+
+    return fitness
+
+class FitWorker:
+    """
+    The fitness of an optimizer in the form sent to the evaluation workers. It only carries the fitness 
+    function and the parameter space, so the optimizer itself is never pickled when its individuals are 
+    evaluated in parallel. Before calling ``fit``, an individual of the encoded space is clipped to the bounds, 
+    then decoded to the original space (int variables as python integers, grid variables to their grid values)
+
+    :param fit: (function) the fitness function
+    :param bounds: (dict) the original parameter space of the optimizer (with its grid variables)
+    :param clip: (bool) clip the individuals to the bounds before evaluating them
+    :param vectorized: (bool) ``fit`` takes a 2D array of individuals (see ``batch_fit``)
+    :param multi_objective: (bool) ``fit`` returns several objectives for every individual
+    """
+    def __init__(self, fit, bounds, clip=True, vectorized=False, multi_objective=False):
+        self.fit=fit
+        self.space=Space(bounds)
+        self.clip=clip
+        self.vectorized=vectorized
+        self.multi_objective=multi_objective
+
+    def prepare(self, pop):
+        #"""
+        #Returns the list of individuals of pop (encoded space) in the form they are sent to the fitness
+        #"""
+        x=np.asarray(pop, dtype=float).reshape(len(pop), self.space.dim)
+        if self.clip:
+            x=self.space.clip(x)
+        return self.space.decode(x)
+
+    def __call__(self, x):
+        x=self.prepare([x])[0]
+        if self.vectorized:
+            #a vectorized fitness expects a 2D array, so x is evaluated as a batch of one
+            return batch_fit(self.fit, [x], multi_objective=self.multi_objective)[0]
+        return self.fit(x)
+
+    def batch(self, pop):
+        #"""
+        #Evaluates all individuals of pop in one call to a vectorized fitness
+        #"""
+        return batch_fit(self.fit, self.prepare(pop), multi_objective=self.multi_objective)
+
+def _cloudpickle():
+    #cloudpickle also pickles the functions defined in __main__, it is vendored by the older versions of joblib
+    try:
+        import cloudpickle
+    except ImportError:
+        from joblib.externals import cloudpickle
+    return cloudpickle
+
+def eval_pop(opt, pop):
+    """
+    Evaluates a list of individuals of an optimizer, in one call to its vectorized fitness if ``opt.vectorized``, 
+    or with its evaluator pool otherwise. The individuals found in the fitness cache of the optimizer 
+    (``opt.cache``, if any) are not evaluated again
+
+    :param opt: (object) the optimizer, with the attributes ``worker`` (FitWorker), ``vectorized``, ``evaluator`` and optionally ``cache`` (FitnessCache or None)
+    :param pop: (list) individuals of the encoded space
+
+    :return: (list) fitness of every individual in ``pop``
+    """
+    worker=opt.worker
+    if opt.vectorized:
+        run=lambda items: list(worker.batch(items))
+    else:
+        run=lambda items: opt.evaluator.map(worker, items)
+    
+    cache=getattr(opt, 'cache', None)
+    if cache is None:
+        return run(pop)
+    
+    #the individuals are memorized in the same form they are sent to the fitness
+    return cache.evaluate(pop, keys=[tuple(x) for x in worker.prepare(pop)], run=run)
+
+_received=OrderedDict()   #functions received by this worker process, by token
+
+class _Shipped:
+    #wraps a function mapped by an Evaluator: it is pickled once in the main process, 
+    #and unpickled once in every worker process, which reuses it for the next calls
+    def __init__(self, func):
+        self.func=func
+        self.token=uuid.uuid4().hex
+        self.payload=None
+    
+    def __call__(self, item):
+        return self.func(item)
+    
+    def __getstate__(self):
+        if self.payload is None:
+            self.payload=_cloudpickle().dumps(self.func)
+        return {'token': self.token, 'payload': self.payload}
+    
+    def __setstate__(self, state):
+        self.token=state['token']
+        self.payload=None
+        if self.token not in _received:
+            _received[self.token]=_cloudpickle().loads(state['payload'])
+            if len(_received) > 16:
+                _received.popitem(last=False)
+        self.func=_received[self.token]
+
+class Evaluator:
+    """
+    A pool of evaluation workers that can be shared by several optimizers.
+    Once started (via ``start`` or a ``with`` statement), the workers stay alive 
+    across generations and across consecutive ``evolute`` calls, so they are created once 
+    and can keep any data they load (e.g. surrogate models) in memory. 
+    If the evaluator is not started, each call to ``map`` opens and closes its own pool.
+    
+    :param ncores: (int) number of parallel processors
+    :param backend: (str) joblib backend used to run the workers, e.g. ``loky`` (processes) or ``threading``
+    :param batch_size: (int or str) number of individuals sent to a worker at once, ``auto`` lets joblib decide
+    
+    Example:
+    
+    .. code-block:: python
+    
+        with Evaluator(ncores=8) as evaluator:
+            de=DE(mode='min', bounds=BOUNDS, fit=FIT, npop=50, evaluator=evaluator)
+            x_best, y_best, de_hist=de.evolute(ngen=100)
+            gwo=GWO(mode='min', bounds=BOUNDS, fit=FIT, nwolves=8, evaluator=evaluator)
+            x_best, y_best, gwo_hist=gwo.evolute(ngen=100)
+    """
+    def __init__(self, ncores=1, backend='loky', batch_size='auto'):
+        assert ncores >= 1, '--error: ncores ({}) must be more than or equal 1'.format(ncores)
+        self.ncores=ncores
+        self.backend=backend
+        self.batch_size=batch_size
+        self._parallel=None
+        self._shipped=OrderedDict()   #id(func) --> _Shipped of the functions mapped recently
+    
+    def start(self):
+        #"""
+        #Starts the workers, they are kept alive until ``close`` is called
+        #"""
+        if self._parallel is None and self.ncores > 1:
+            self._parallel=joblib.Parallel(n_jobs=self.ncores, backend=self.backend, batch_size=self.batch_size)
+            self._parallel.__enter__()
+        return self
+    
+    def close(self):
+        #"""
+        #Shuts down the workers started by ``start``
+        #"""
+        if self._parallel is not None:
+            self._parallel.__exit__(None, None, None)
+            self._parallel=None
+    
+    @property
+    def started(self):
+        return self._parallel is not None
+    
+    def ship(self, func):
+        #"""
+        #Returns the _Shipped wrapper of func, the same for every call with the same func, so func 
+        #is serialized once however many times it is mapped
+        #"""
+        key=id(func)
+        if key not in self._shipped or self._shipped[key].func is not func:
+            self._shipped[key]=_Shipped(func)
+            if len(self._shipped) > 16:
+                self._shipped.popitem(last=False)
+        self._shipped.move_to_end(key)
+        return self._shipped[key]
+    
+    def map(self, func, items):
+        """
+        Applies ``func`` to every item and returns the results in the same order.
+        ``func`` is serialized once and kept by the workers, so it should not change between 
+        calls (e.g. the ``FitWorker`` of an optimizer rather than a bound method of the optimizer)
+
+        :param func: (function) the function to evaluate (e.g. the ``FitWorker`` of an optimizer)
+        :param items: (iterable) the inputs to ``func``
+
+        :return: (list) the output of ``func`` for every item
+        """
+        if self.ncores == 1:
+            return [func(item) for item in items]
+        
+        func=self.ship(func)
+        if self._parallel is not None:
+            return self._parallel(joblib.delayed(func)(item) for item in items)
+        
+        with joblib.Parallel(n_jobs=self.ncores, backend=self.backend, batch_size=self.batch_size) as parallel:
+            return parallel(joblib.delayed(func)(item) for item in items)
+    
+    def __enter__(self):
+        return self.start()
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def __getstate__(self):
+        #the optimizers carry their evaluator, so it is pickled with them when they are 
+        #sent to the workers. The pool itself stays in the main process
+        state=self.__dict__.copy()
+        state['_parallel']=None
+        state['_shipped']=OrderedDict()
+        return state
+
+class FitnessCache:
+    """
+    A bounded least-recently-used (LRU) memory of evaluated individuals. It is meant for 
+    int/grid spaces, where the optimizers regenerate the same individuals many times (e.g. when the 
+    population collapses), so repeated individuals are not sent to the fitness function again.
+    
+    :param maxsize: (int) maximum number of individuals kept in the cache
+    """
+    def __init__(self, maxsize=10000):
+        assert maxsize >= 1, '--error: the size of the fitness cache ({}) must be more than or equal 1'.format(maxsize)
+        self.maxsize=maxsize
+        self.memory=OrderedDict()
+        self.hits=0
+        self.misses=0
+    
+    def __len__(self):
+        return len(self.memory)
+    
+    def __contains__(self, key):
+        return key in self.memory
+    
+    def get(self, key):
+        #returns the cached fitness of ``key`` and marks it as recently used
+        self.memory.move_to_end(key)
+        return self.memory[key]
+    
+    def put(self, key, fitness):
+        #stores a new fitness and discards the least recently used one if the cache is full
+        self.memory[key]=fitness
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.maxsize:
+            self.memory.popitem(last=False)
+    
+    def evaluate(self, pop, keys, run):
+        """
+        Evaluates a population by only running the individuals that are not in the cache 
+
+        :param pop: (list) individuals to evaluate
+        :param keys: (list) hashable key of every individual (e.g. its decoded values as a tuple)
+        :param run: (function) evaluates a list of individuals and returns a list of fitness values
+
+        :return: (list) fitness of every individual in ``pop``
+        """
+        fitness=[None]*len(pop)
+        new={}   #key --> indices of the individuals that need this evaluation
+        for i, key in enumerate(keys):
+            if key in self.memory:
+                fitness[i]=self.get(key)
+                self.hits+=1
+            elif key in new:
+                #duplicate inside the same population, evaluated only once
+                new[key].append(i)
+                self.hits+=1
+            else:
+                new[key]=[i]
+                self.misses+=1
+        
+        if new:
+            results=run([pop[index[0]] for index in new.values()])
+            for (key, index), fit in zip(new.items(), results):
+                self.put(key, fit)
+                for i in index:
+                    fitness[i]=fit
+        
+        return fitness
@@ -0,0 +1,182 @@
+#    This file is part of NEORL.
+
+#    Copyright (c) 2021 Exelon Corporation and MIT Nuclear Science and Engineering
+#    NEORL is free software: you can redistribute it and/or modify
+#    it under the terms of the MIT LICENSE
+
+#    THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+#    IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+#    FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+#    AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+#    LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+#    OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+#    SOFTWARE.
+
+# -*- coding: utf-8 -*-
+#Created on Sat Oct 17 18:05:47 2026
+#@author: NEORL team
+
+import time
+import threading
+from collections import OrderedDict
+
+class Profiler:
+    """
+    Records the time spent in the phases of every generation of an optimizer, to separate
+    the time of the fitness function from the time of NEORL itself (operators, selection,
+    parallel dispatch, logging). Pass it to an optimizer with ``profiler=Profiler()``,
+    the per-generation timings are then added to the history returned by ``evolute`` under the key ``profile``.
+
+    The phases do not overlap: the time of a phase does not include the phases run inside it,
+    e.g. ``evaluation`` is the time to dispatch the individuals and collect their fitness (joblib, fitness cache,
+    batching), without the time spent in the fitness function itself, which is recorded as ``fitness``.
+    With ``ncores > 1``, the fitness runs in the worker processes, so the time waiting for the workers
+    is part of ``evaluation``. The time of a generation that is not in any phase is recorded as ``other``.
+
+    Example:
+
+    .. code-block:: python
+
+        profiler=Profiler()
+        de=DE(mode='min', bounds=BOUNDS, fit=FIT, npop=50, profiler=profiler)
+        x_best, y_best, de_hist=de.evolute(ngen=100)
+        print(profiler.summary())
+        de_hist['profile']   #one row per generation, one column per phase
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        #"""
+        #Forgets all the timings, called at the start of every evolute
+        #"""
+        self.generations=[]    #one {phase: time} dict per generation
+        self.outside=OrderedDict()    #phases run outside the generations (e.g. initialization)
+        self._current=None
+        self._stack=[]
+
+    def start_generation(self):
+        self._current=OrderedDict()
+        self._t0=time.perf_counter()
+
+    def end_generation(self):
+        total=time.perf_counter()-self._t0
+        self._current['other']=total-sum(self._current.values())
+        self._current['total']=total
+        self.generations.append(self._current)
+        self._current=None
+
+    def phase(self, name):
+        #"""
+        #Context manager that records the time of a phase in the current generation
+        #"""
+        return _Phase(self, name)
+
+    def _add(self, name, seconds):
+        record=self._current if self._current is not None else self.outside
+        record[name]=record.get(name, 0)+seconds
+
+    def wrap(self, func, name='fitness'):
+        #"""
+        #Returns func, with each call recorded as the phase name (used to time the fitness function)
+        #"""
+        return _Profiled(self, func, name)
+
+    def history(self):
+        """
+        Per-generation timings
+
+        :return: (pandas.DataFrame) one row per generation and one column per phase (in seconds),
+                 the column ``total`` is the wall time of the generation
+        """
+        import pandas as pd   #imported here, so the optimizers do not load pandas
+        df=pd.DataFrame(self.generations).fillna(0)
+        if len(df):
+            columns=[c for c in df.columns if c not in ['other', 'total']]+['other', 'total']
+            df=df[columns]
+            df.index=range(1, len(df)+1)
+            df.index.name='generation'
+        return df
+
+    def summary(self):
+        """
+        Summary table of the run
+
+        :return: (pandas.DataFrame) for every phase: the total time, the mean time per generation,
+                 and the percentage of the run time. The phases run outside the generations are reported
+                 with their total time only
+        """
+        import pandas as pd
+        hist=self.history()
+        total=hist.sum()
+        runtime=total.get('total', 0)+sum(self.outside.values())
+        rows=OrderedDict()
+        for name in hist.columns:
+            if name != 'total':
+                rows[name]=[total[name], hist[name].mean()]
+        for name, seconds in self.outside.items():
+            rows[name]=[seconds+rows.get(name, [0])[0], rows.get(name, [0, float('nan')])[1]]
+        df=pd.DataFrame.from_dict(rows, orient='index', columns=['total_time', 'time_per_gen'])
+        df['percent']=100*df['total_time']/runtime if runtime > 0 else 0
+        df.loc['run']=[runtime, hist['total'].mean() if len(hist) else float('nan'), 100.0]
+        return df
+
+    def __getstate__(self):
+        #the workers of a parallel pool only need an empty profiler
+        state=self.__dict__.copy()
+        state.update({'generations': [], 'outside': OrderedDict(), '_current': None, '_stack': []})
+        return state
+
+class _Phase:
+    #context manager of Profiler.phase, the time of nested phases is removed from their parent
+    __slots__=['profiler', 'name', 't0', 'nested']
+    def __init__(self, profiler, name):
+        self.profiler=profiler
+        self.name=name
+
+    def __enter__(self):
+        self.nested=0
+        self.profiler._stack.append(self)
+        self.t0=time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        elapsed=time.perf_counter()-self.t0
+        stack=self.profiler._stack
+        stack.pop()
+        if stack:
+            stack[-1].nested+=elapsed
+        self.profiler._add(self.name, elapsed-self.nested)
+
+class _NoPhase:
+    #context manager of phase when there is no profiler, it does nothing
+    __slots__=[]
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+_no_phase=_NoPhase()
+
+class _Profiled:
+    #picklable wrapper of Profiler.wrap, so the optimizers can still send their fitness to the workers
+    def __init__(self, profiler, func, name):
+        self.profiler=profiler
+        self.func=func
+        self.name=name
+
+    def __call__(self, *args, **kwargs):
+        if threading.current_thread() is not threading.main_thread():
+            #calls from a thread pool (threading backend) would interleave with the phases of the main thread
+            return self.func(*args, **kwargs)
+        with self.profiler.phase(self.name):
+            return self.func(*args, **kwargs)
+
+def phase(profiler, name):
+    #"""
+    #Shortcut used in the optimizers: profiler.phase(name), or a context manager that does nothing if profiler is None
+    #"""
+    if profiler is None:
+        return _no_phase
+    return profiler.phase(name)
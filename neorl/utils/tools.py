@@ -20,9 +20,8 @@
 #@author: majdi
 #"""
 
-import pandas as pd
 import numpy as np
-from neorl.evolu.discrete import decode_discrete_to_grid
+from neorl.evolu.discrete import decode_discrete_to_grid, grid_lookups
 
 def is_integer_num(n):
     if isinstance(n, int):
@@ -31,15 +30,6 @@ def is_integer_num(n):
         return n.is_integer()
     return False
 
-bounds = {}
-x=[20.0, 0.1875, 59.0, 149.0, 'Hi', -4.0]
-bounds['x1'] = ['int', 1, 20]
-bounds['x2'] = ['grid', (0.0625, 0.125, 0.1875, 0.25, 0.3125, 0.375, 0.4375, 0.5, 0.5625, 0.625)]
-bounds['x3'] = ['int', 10, 200]
-bounds['x4'] = ['int', 10, 200]
-bounds['x5'] = ['grid', ('Hi', 'Bye', 'New')]
-bounds['x6'] = ['int', -5, 5]
-
 def check_mixed_individual(x, bounds):
     #auxiliary function to assert the type of the individual passed to x0 as initial guess
     # to check if it fits the discrete, float, grid types.
@@ -65,14 +55,15 @@ def check_mixed_individual(x, bounds):
    
 def get_population(pop, fits=None, grid_flag=False, bounds=None, bounds_map=None):
     
+    import pandas as pd   #imported here, so the evaluation workers do not load pandas
+    
     if isinstance(pop, dict):
         #either ES or PSO
         d=len(pop[0][0])
         npop=len(pop)
         df_pop=np.zeros((npop, d+1))   #additional column for fitness        
-        for i, indv in enumerate(pop):
-            df_pop[i,:d]=pop[indv][0]
-            df_pop[i,-1]=pop[indv][2]
+        df_pop[:,:d]=[pop[indv][0] for indv in pop]
+        df_pop[:,-1]=[pop[indv][2] for indv in pop]
     
     elif isinstance(pop, list):   
         #DE mainly
@@ -81,9 +72,8 @@ def get_population(pop, fits=None, grid_flag=False, bounds=None, bounds_map=None
         if fits is not None:
             assert len(fits) == npop, '--error: the size of fits and pop are not equal, pop cannot be constructed'
         df_pop=np.zeros((npop, d+1))   #additional column for fitness        
-        for i, indv in enumerate(pop):
-            df_pop[i,:d]=indv
-            df_pop[i,-1]=fits[i]
+        df_pop[:,:d]=pop
+        df_pop[:,-1]=fits
 
     elif type(pop).__module__ == 'numpy':   
         #GWO, HHO, MFO, WOA mainly
@@ -103,12 +93,11 @@ def get_population(pop, fits=None, grid_flag=False, bounds=None, bounds_map=None
         df_pop=pd.DataFrame(np.zeros((5, 5)))   #return an empty dataframe
     
     if grid_flag:
-        #convert the categorical value from the discrete space to its orignal grid space
-        for k in range (df_pop.shape[0]):
-            xx=list(df_pop.iloc[k,:-1].values)
-            yy=decode_discrete_to_grid(xx, bounds, bounds_map)
-            #print(yy)
-            df_pop.iloc[k,:-1] = yy
+        #convert the categorical value from the discrete space to its orignal grid space, one column at a time
+        for i, key in enumerate(bounds):
+            if bounds[key][0]=='grid':
+                col=df_pop.columns[i]
+                df_pop[col]=grid_lookups(bounds_map[key]).forward[df_pop[col].values.astype(int)]
         
     return df_pop
 
@@ -119,6 +108,8 @@ def get_population_nsga(pop,mode):#Paul
     :param mode: (str) type of optimization
     :Returns df_pop: (DataFrame) position and value of each objective for each individual in the population
     """
+    import pandas as pd
+    
     d=len(pop[0][0])
     p= len(pop[0][2])
     npop=len(pop)